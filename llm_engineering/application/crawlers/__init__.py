@@ -1,6 +1,6 @@
 from .github import GithubCrawler
 from .medium import MediumCrawler
-from .linkedin import LinkdinCrawler
+from .linkedin import LinkedInCrawler
 from .dispatcher import CrawlerDispatcher
 
-__all__ = ["CrawlerDispatcher", "GithubCrawler", "MediumCrawler", "LinkdinCrawler"]
\ No newline at end of file
+__all__ = ["CrawlerDispatcher", "GithubCrawler", "MediumCrawler", "LinkedInCrawler"]
\ No newline at end of file
@@ -1,6 +1,9 @@
+import sqlite3
+import threading
 import time
 from abc import ABC, abstractmethod
 from tempfile import mkdtemp
+from urllib.parse import urlparse
 
 from click import option
 
@@ -8,15 +11,21 @@ from click import option
     
 """
 import chromedriver_autoinstaller
+from loguru import logger
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 
-from llm_engineering.domain.documents import NoSQLBaseDocument
+from llm_engineering.domain.documents import NoSQLBaseDocument, UserDocument
+from llm_engineering.infrastructure import instrumentation
+from llm_engineering.infrastructure.db.response_archive import get_response_archive
+from llm_engineering.settings import settings
+
+from .page_profile import PAGE_LOAD_STRATEGIES, BlockingPolicy, PageLoadStats, count_network_events, page_load_stats
+from .resilience import Deadline, RetryPolicy, call_resiliently, circuit_breakers
 
-# Check if the current version of chromedriver exists
-# and if it doesn't exist, download it automatically, 
-# then add chromedriver to path
-chromedriver_autoinstaller.install() 
 
 class BaseCrawler(ABC):
     model: type[NoSQLBaseDocument]
@@ -24,11 +33,92 @@ class BaseCrawler(ABC):
     @abstractmethod
     # using ... to indicate an empty body for the abstract method
     # extract method must be implemented by subclasses
+    # `timeout` (seconds), when given in kwargs, bounds each fetch, page load or clone
     def extract(self, link: str, **kwargs) -> None: ... 
 
+    def crawl(
+        self,
+        link: str,
+        deadline: Deadline | None = None,
+        retry_policy: RetryPolicy | None = None,
+        **kwargs,
+    ) -> None:
+        """
+        Run `extract` behind the shared resilience layer: transient failures are
+        retried with jittered backoff, the link's domain circuit breaker is
+        honoured, and every attempt gets `timeout=` the time left before `deadline`.
+        """
+        with self.span("crawl"):
+            call_resiliently(
+                lambda timeout: self.extract(link, timeout=timeout, **kwargs),
+                breaker=circuit_breakers.get(urlparse(link).netloc),
+                deadline=deadline,
+                retry_policy=retry_policy,
+            )
+
+    def span(self, operation: str):
+        """A span of one of this crawler's operations: "crawl", "fetch", "parse" or "save"."""
+        return instrumentation.span(f"crawler.{operation}", crawler=type(self).__name__)
+
+    @classmethod
+    def parse(cls, link: str, html: str, user: UserDocument) -> NoSQLBaseDocument:
+        """
+        Build the document of `link` from its fetched page, without saving it.
+
+        Crawlers that implement it keep their raw responses in the response archive
+        and can rebuild their documents from it (see `crawlers.reparse`).
+        """
+        raise NotImplementedError(f"{cls.__name__} cannot rebuild documents from raw responses.")
+
+    @classmethod
+    def supports_reparse(cls) -> bool:
+        return cls.parse.__func__ is not BaseCrawler.parse.__func__
+
+    def archive_response(
+        self, link: str, body: bytes | str, user: UserDocument, status: int = 200, headers: dict | None = None
+    ) -> None:
+        """Keep the raw response of `link` in the response archive. Never fails the crawl."""
+        if not settings.RESPONSE_ARCHIVE_ENABLED:
+            return
+
+        try:
+            get_response_archive().put(
+                link,
+                body,
+                status=status,
+                headers=headers,
+                crawler=type(self).__name__,
+                user_id=str(user.id),
+                user_full_name=user.full_name,
+            )
+        except (OSError, sqlite3.Error):
+            logger.exception(f"Failed to archive the response of {link}.")
+
 
 class BaseSeleniumCrawler(BaseCrawler, ABC):
-    def __init__(self, scroll_limit: int = 5) -> None:
+    _chromedriver_lock = threading.Lock()
+    _chromedriver_installed = False
+
+    # The page profile of the crawler (see `page_profile`); None uses the settings.
+    blocking_policy: BlockingPolicy | None = None
+    page_load_strategy: str | None = None
+    # CSS selector of an element that must be present before the page counts as loaded.
+    ready_selector: str | None = None
+
+    def __init__(
+        self,
+        scroll_limit: int = 5,
+        blocking_policy: BlockingPolicy | None = None,
+        page_load_strategy: str | None = None,
+    ) -> None:
+        self.blocking_policy = blocking_policy or self.blocking_policy or BlockingPolicy.from_settings()
+        self.page_load_strategy = page_load_strategy or self.page_load_strategy or settings.CRAWL_PAGE_LOAD_STRATEGY
+        if self.page_load_strategy not in PAGE_LOAD_STRATEGIES:
+            raise ValueError(f"Unknown page-load strategy {self.page_load_strategy!r}, expected one of {PAGE_LOAD_STRATEGIES}.")
+        self.page_stats = PageLoadStats()
+
+        self._install_chromedriver()
+
         options = webdriver.ChromeOptions()
     
         # Running Chrome without opening a window and with new headless mode
@@ -67,18 +157,90 @@ class BaseSeleniumCrawler(BaseCrawler, ABC):
         #Uses a new temporary folder specifically for storing cached files (images, scripts)
         options.add_argument(f"--disk-cache-dir={mkdtemp()}")
         
-        #Opens port 9226 so you can remotely connect to and control/inspect the browser
-        options.add_argument("--remote-debugging-port=9226")
+        #Lets the OS pick a free DevTools port, so concurrent crawls never share one
+        options.add_argument("--remote-debugging-port=0")
+
+        # Return from `driver.get` once the DOM is parsed, not after every subresource
+        options.page_load_strategy = self.page_load_strategy
+
+        # Never download images, even from URLs without a file extension
+        if self.blocking_policy.blocks_images:
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+        # Keep the network events, to count the requests made and blocked by each page load
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
         self.set_extra_driver_options(options) # Hook for subclasses to add more options
 
         self.scroll_limit = scroll_limit
         # Initialize the Chrome WebDriver with specified options
         self.driver = webdriver.Chrome(options=options)
+        self._apply_blocking_policy()
+
+    def crawl(self, link: str, *args, **kwargs) -> None:
+        """Crawl `link`, then quit the browser, whether the crawl succeeded or not."""
+        try:
+            super().crawl(link, *args, **kwargs)
+        finally:
+            self.driver.quit()
+
+    @classmethod
+    def _install_chromedriver(cls) -> None:
+        # Check if the current version of chromedriver exists
+        # and if it doesn't exist, download it automatically,
+        # then add chromedriver to path.
+        # Done once per process by the first browser crawler, not at import time.
+        with cls._chromedriver_lock:
+            if not BaseSeleniumCrawler._chromedriver_installed:
+                chromedriver_autoinstaller.install()
+                BaseSeleniumCrawler._chromedriver_installed = True
+
+    def _apply_blocking_policy(self) -> None:
+        if blocked_urls := self.blocking_policy.blocked_urls():
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
 
     def set_extra_driver_options(self, options: Options) -> None:
         pass
 
+    def load_page(self, link: str, timeout: float | None = None) -> None:
+        """
+        Open `link` and wait until it is ready: the document is interactive and
+        `ready_selector`, if any, matches. Both the load and the wait are bounded by
+        `timeout`; past it Selenium raises TimeoutException, which is retried.
+        """
+        timeout = timeout or settings.CRAWL_REQUEST_TIMEOUT_S
+        start_time = time.perf_counter()
+
+        with self.span("fetch"):
+            self.driver.set_page_load_timeout(timeout) # a page that loads longer raises TimeoutException
+            self.driver.get(link)
+            WebDriverWait(self.driver, max(timeout - (time.perf_counter() - start_time), 0.1), poll_frequency=0.1).until(
+                self._is_ready
+            )
+
+        load_time_s = time.perf_counter() - start_time
+        requests, blocked_requests, bytes_received = self._network_counts()
+        for stats in (self.page_stats, page_load_stats):
+            stats.record(load_time_s, requests, blocked_requests, bytes_received)
+        logger.debug(
+            f"Loaded {link} in {load_time_s:.2f}s: {requests} request(s), {blocked_requests} blocked, "
+            f"{bytes_received} byte(s) received."
+        )
+
+    def _is_ready(self, driver) -> bool:
+        if driver.execute_script("return document.readyState") == "loading":
+            return False
+
+        return not self.ready_selector or bool(driver.find_elements(By.CSS_SELECTOR, self.ready_selector))
+
+    def _network_counts(self) -> tuple[int, int, int]:
+        # Reading the performance log also clears it, so each load only counts its own events.
+        try:
+            return count_network_events(self.driver.get_log("performance"))
+        except WebDriverException:
+            return 0, 0, 0
+
     def login(self) -> None:
         pass
 
@@ -1,12 +1,15 @@
 from urllib.parse import urlparse
 
-from langchain_community.document_loaders import AsyncHtmlLoader
+import requests
 from langchain_community.document_transformers.html2text import Html2TextTransformer
+from langchain_core.documents import Document
 from loguru import logger
 
-from llm_engineering.domain.documents import ArticleDocument
+from llm_engineering.domain.documents import ArticleDocument, UserDocument
+from llm_engineering.settings import settings
 
 from .base import BaseCrawler
+from .parsing import page_metadata, run_parser
 
 
 class CustomArticleCrawler(BaseCrawler):
@@ -24,8 +27,24 @@ class CustomArticleCrawler(BaseCrawler):
 
         logger.info(f"Starting scrapping article: {link}")
 
-        loader = AsyncHtmlLoader([link])
-        docs = loader.load()
+        # A plain GET, so that the timeout comes from the caller and HTTP errors raise:
+        # retries are left to the resilience layer (see `BaseCrawler.crawl`).
+        with self.span("fetch"):
+            response = requests.get(link, timeout=kwargs.get("timeout") or settings.CRAWL_REQUEST_TIMEOUT_S)
+            response.raise_for_status()
+
+        user = kwargs["user"]
+        self.archive_response(link, response.content, user, status=response.status_code, headers=dict(response.headers))
+        with self.span("parse"):
+            instance = run_parser(type(self).parse, link, response.text, user)
+        with self.span("save"):
+            instance.save()
+
+        logger.info(f"Finished scrapping custom article: {link}")
+
+    @classmethod
+    def parse(cls, link: str, html: str, user: UserDocument) -> ArticleDocument:
+        docs = [Document(page_content=html, metadata=cls._metadata(html, link))]
 
         html2text = Html2TextTransformer()
         docs_transformed = html2text.transform_documents(docs)
@@ -40,14 +59,19 @@ class CustomArticleCrawler(BaseCrawler):
         parsed_url = urlparse(link)
         platform = parsed_url.netloc
 
-        user = kwargs["user"]
-        instance = self.model(
+        return cls.model(
             content=content,
             link=link,
             platform=platform,
             author_id=user.id,
             author_full_name=user.full_name,
         )
-        instance.save()
 
-        logger.info(f"Finished scrapping custom article: {link}")
\ No newline at end of file
+    @staticmethod
+    def _metadata(html: str, link: str) -> dict:
+        metadata = {"source": link}
+        for key, value in page_metadata(html).items():
+            if value is not None:
+                metadata[key] = value
+
+        return metadata
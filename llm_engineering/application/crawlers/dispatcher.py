@@ -42,10 +42,14 @@ class CrawlerDispatcher:
         self._crawlers[r"https://(www\.)?{}/*".format(re.escape(domain))] = crawler
 
     def get_crawler(self, url: str) -> BaseCrawler:
+        return self.get_crawler_class(url)()
+
+    def get_crawler_class(self, url: str) -> type[BaseCrawler]:
+        """The crawler for `url`, without instantiating it (which starts a browser for Selenium crawlers)."""
         for pattern, crawler in self._crawlers.items():
             if re.match(pattern, url):
-                return crawler()
+                return crawler
         else:
             logger.warning(f"No crawler found for {url}. Defaulting to CustomArticleCrawler.")
 
-            return CustomArticleCrawler()
\ No newline at end of file
+            return CustomArticleCrawler
\ No newline at end of file
@@ -31,23 +31,25 @@ class GithubCrawler(BaseCrawler):
         local_temp = tempfile.mkdtemp()
 
         try:
-            os.chdir(local_temp)
-            subprocess.run(["git", "clone", link])
+            # `timeout` bounds the clone; an expired clone raises subprocess.TimeoutExpired, which is retried.
+            with self.span("fetch"):
+                subprocess.run(["git", "clone", link], cwd=local_temp, check=True, timeout=kwargs.get("timeout"))
 
             repo_path = os.path.join(local_temp, os.listdir(local_temp)[0])  # noqa: PTH118
 
             tree = {}
-            for root, _, files in os.walk(repo_path):
-                dir = root.replace(repo_path, "").lstrip("/")
-                if dir.startswith(self._ignore):
-                    continue
-
-                for file in files:
-                    if file.endswith(self._ignore):
+            with self.span("parse"):
+                for root, _, files in os.walk(repo_path):
+                    dir = root.replace(repo_path, "").lstrip("/")
+                    if dir.startswith(self._ignore):
                         continue
-                    file_path = os.path.join(dir, file)  # noqa: PTH118
-                    with open(os.path.join(root, file), "r", errors="ignore") as f:  # noqa: PTH123, PTH118
-                        tree[file_path] = f.read().replace(" ", "")
+
+                    for file in files:
+                        if file.endswith(self._ignore):
+                            continue
+                        file_path = os.path.join(dir, file)  # noqa: PTH118
+                        with open(os.path.join(root, file), "r", errors="ignore") as f:  # noqa: PTH123, PTH118
+                            tree[file_path] = f.read().replace(" ", "")
 
             user = kwargs["user"]
             instance = self.model(
@@ -58,10 +60,9 @@ class GithubCrawler(BaseCrawler):
                 author_id=user.id,
                 author_full_name=user.full_name,
             )
-            instance.save()
+            with self.span("save"):
+                instance.save()
 
-        except Exception:
-            raise
         finally:
             shutil.rmtree(local_temp)
 
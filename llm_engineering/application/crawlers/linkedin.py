@@ -1,9 +1,10 @@
 import time
 from typing import Dict, List
 
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from bs4.element import Tag
 from loguru import logger
+from lxml.html import HtmlElement
 from selenium.webdriver.common.by import By
 
 from llm_engineering.domain.documents import PostDocument
@@ -11,6 +12,7 @@ from llm_engineering.domain.exceptions import ImproperlyConfigured
 from llm_engineering.settings import settings
 
 from .base import BaseSeleniumCrawler
+from .parsing import any_class, class_xpath, parse_html, parse_tree, xpath_text
 
 
 class LinkedInCrawler(BaseSeleniumCrawler):
@@ -30,7 +32,7 @@ class LinkedInCrawler(BaseSeleniumCrawler):
                 "As LinkedIn has updated its security measures, the login() method is no longer supported."
             )
 
-        self.driver.get("https://www.linkedin.com/login")
+        self.load_page("https://www.linkedin.com/login")
         if not settings.LINKEDIN_USERNAME or not settings.LINKEDIN_PASSWORD:
             raise ImproperlyConfigured(
                 "LinkedIn scraper requires the {LINKEDIN_USERNAME} and {LINKEDIN_PASSWORD} settings."
@@ -57,17 +59,18 @@ class LinkedInCrawler(BaseSeleniumCrawler):
 
         self.login()
 
-        soup = self._get_page_content(link)
+        # One lxml parse of the profile page for its three sections
+        tree = self._get_page_content(link)
 
         data = {  # noqa
-            "Name": self._scrape_section(soup, "h1", class_="text-heading-xlarge"),
-            "About": self._scrape_section(soup, "div", class_="display-flex ph5 pv3"),
-            "Main Page": self._scrape_section(soup, "div", {"id": "main-content"}),
+            "Name": xpath_text(tree, class_xpath("h1", "text-heading-xlarge")),
+            "About": xpath_text(tree, '//div[@class="display-flex ph5 pv3"]'),
+            "Main Page": xpath_text(tree, '//div[@id="main-content"]'),
             "Experience": self._scrape_experience(link),
             "Education": self._scrape_education(link),
         }
 
-        self.driver.get(link)
+        self.load_page(link)
         time.sleep(5)
         button = self.driver.find_element(
             By.CSS_SELECTOR, ".app-aware-link.profile-creator-shared-content-view__footer-action"
@@ -76,37 +79,35 @@ class LinkedInCrawler(BaseSeleniumCrawler):
 
         # Scrolling and scraping posts
         self.scroll_page()
-        soup = BeautifulSoup(self.driver.page_source, "html.parser")
-        post_elements = soup.find_all(
-            "div",
-            class_="update-components-text relative update-components-update-v2__commentary",
-        )
-        buttons = soup.find_all("button", class_="update-components-image__image-link")
-        post_images = self._extract_image_urls(buttons)
+        with self.span("parse"):
+            # Only the posts and their image buttons are built into the tree
+            soup = parse_html(
+                self.driver.page_source,
+                parse_only=SoupStrainer(
+                    ["div", "button"], class_=any_class("update-components-text", "update-components-image__image-link")
+                ),
+            )
+            post_elements = soup.find_all(
+                "div",
+                class_="update-components-text relative update-components-update-v2__commentary",
+            )
+            buttons = soup.find_all("button", class_="update-components-image__image-link")
+            post_images = self._extract_image_urls(buttons)
 
-        posts = self._extract_posts(post_elements, post_images)
+            posts = self._extract_posts(post_elements, post_images)
         logger.info(f"Found {len(posts)} posts for profile: {link}")
 
-        self.driver.close()
-
         user = kwargs["user"]
-        self.model.bulk_insert(
-            [
-                PostDocument(platform="linkedin", content=post, author_id=user.id, author_full_name=user.full_name)
-                for post in posts
-            ]
-        )
+        with self.span("save"):
+            self.model.bulk_insert(
+                [
+                    PostDocument(platform="linkedin", content=post, author_id=user.id, author_full_name=user.full_name)
+                    for post in posts
+                ]
+            )
 
         logger.info(f"Finished scrapping data for profile: {link}")
 
-    def _scrape_section(self, soup: BeautifulSoup, *args, **kwargs) -> str:
-        """Scrape a specific section of the LinkedIn profile."""
-        # Example: Scrape the 'About' section
-
-        parent_div = soup.find(*args, **kwargs)
-
-        return parent_div.get_text(strip=True) if parent_div else ""
-
     def _extract_image_urls(self, buttons: List[Tag]) -> Dict[str, str]:
         """
         Extracts image URLs from button elements.
@@ -127,13 +128,13 @@ class LinkedInCrawler(BaseSeleniumCrawler):
                 logger.warning("No image found in this button")
         return post_images
 
-    def _get_page_content(self, url: str) -> BeautifulSoup:
-        """Retrieve the page content of a given URL."""
+    def _get_page_content(self, url: str) -> HtmlElement | None:
+        """Retrieve the page content of a given URL, parsed with lxml."""
 
-        self.driver.get(url)
+        self.load_page(url)
         time.sleep(5)
 
-        return BeautifulSoup(self.driver.page_source, "html.parser")
+        return parse_tree(self.driver.page_source)
 
     def _extract_posts(self, post_elements: List[Tag], post_images: Dict[str, str]) -> Dict[str, Dict[str, str]]:
         """
@@ -160,17 +161,17 @@ class LinkedInCrawler(BaseSeleniumCrawler):
     def _scrape_experience(self, profile_url: str) -> str:
         """Scrapes the Experience section of the LinkedIn profile."""
 
-        self.driver.get(profile_url + "/details/experience/")
+        self.load_page(profile_url + "/details/experience/")
         time.sleep(5)
-        soup = BeautifulSoup(self.driver.page_source, "html.parser")
+        soup = parse_html(self.driver.page_source, parse_only=SoupStrainer("section", id="experience-section"))
         experience_content = soup.find("section", {"id": "experience-section"})
 
         return experience_content.get_text(strip=True) if experience_content else ""
 
     def _scrape_education(self, profile_url: str) -> str:
-        self.driver.get(profile_url + "/details/education/")
+        self.load_page(profile_url + "/details/education/")
         time.sleep(5)
-        soup = BeautifulSoup(self.driver.page_source, "html.parser")
+        soup = parse_html(self.driver.page_source, parse_only=SoupStrainer("section", id="education-section"))
         education_content = soup.find("section", {"id": "education-section"})
 
         return education_content.get_text(strip=True) if education_content else ""
\ No newline at end of file
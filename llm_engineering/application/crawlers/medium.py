@@ -1,15 +1,14 @@
 import platform
-from bs4 import BeautifulSoup # bs4 is used to parse HTML content
-                              # BeautifulSoup is used to extract data from HTML and XML files.
 from loguru import logger
-from sympy import content, use
 
-from llm_engineering.domain.documents import ArticleDocument
+from llm_engineering.domain.documents import ArticleDocument, UserDocument
 
 from .base import BaseSeleniumCrawler
+from .parsing import class_xpath, content_text, element_text, parse_tree, run_parser, select
 
 class MediumCrawler(BaseSeleniumCrawler):
     model = ArticleDocument # specify the document model for Medium articles
+    ready_selector = "article" # the article body is rendered client-side
 
     def set_extra_driver_options(self, options) -> None:
       """
@@ -28,34 +27,46 @@ class MediumCrawler(BaseSeleniumCrawler):
        
         logger.info(f"Starting scrapping Medium article: {link}")
 
-        self.driver.get(link) # using selenium to open the link and load dynamic content
+        self.load_page(link, timeout=kwargs.get("timeout")) # using selenium to open the link and load dynamic content
         self.scroll_page() # scroll the page to load all content
 
-        # using BeautifulSoup to parse the loaded page source
-        soup = BeautifulSoup(self.driver.page_source, "html.parser")
+        html = self.driver.page_source
+
+        user = kwargs["user"]
+        self.archive_response(link, html, user)
+        with self.span("parse"):
+            instance = run_parser(type(self).parse, link, html, user)
+        with self.span("save"):
+            instance.save()
+        logger.info(f"Article saved to database: {link}")
+
+    @classmethod
+    def parse(cls, link: str, html: str, user: UserDocument) -> ArticleDocument:
+        # parsing the loaded page source with lxml and keeping only the <article>
+        # subtree, or the whole body for the rare pages without one
+        tree = parse_tree(html)
+        article = select(tree, "//article")
+        if article is None:
+            article = select(tree, "//body")
 
         # Extracting the article title
-        #it is a list of h1 tags with class "pw-post-title"
-        title = soup.find_all("h1", class_ = "pw-post-title")
+        # the first h1 tag with class "pw-post-title"
+        title = select(article, class_xpath("h1", "pw-post-title", relative=True))
 
         # Extracting the article subtitle
-        # it is a list of h2 tags with class "pw-subtitle- paragraph"
-        subtitle = soup.find_all("h2", class_ = "pw-subtitle- paragraph")
+        # the first h2 tag with class "pw-subtitle- paragraph"
+        subtitle = select(article, './/h2[@class="pw-subtitle- paragraph"]')
 
         data = {
-            "Title": title[0].string if title else None,
-            "Subtitle": subtitle[0].string if subtitle else None,
-            "Content": soup.get_text(),
+            "Title": element_text(title) if title is not None else None,
+            "Subtitle": element_text(subtitle) if subtitle is not None else None,
+            "Content": content_text(article),
         }
-        self.driver.quit() # close the selenium driver
 
-        user = kwargs["user"]
-        instance = self.model(
+        return cls.model(
             platform="medium",
             content=data,
             link=link,
             author_id = user.id,
             author_full_name=user.full_name,
         )
-        instance.save()
-        logger.info(f"Article saved to database: {link}")
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+The lean page profile of the Selenium crawlers: what Chrome may download, and
+when a page counts as loaded.
+
+The crawlers only keep the text of a page, so by default images, media and fonts
+are never downloaded, nor are analytics and ad scripts. Requests are blocked in
+the browser with the Chrome DevTools Protocol (`Network.setBlockedURLs`), which
+matches URL patterns only: resource types are translated to the file extensions
+they are served with, and images are also turned off in the profile, which
+catches the extension-less image URLs of CDNs such as Medium's.
+
+With the `eager` (or `none`) page-load strategy, `driver.get` returns once the DOM
+is parsed (or at once) instead of waiting for every subresource; the crawler then
+waits explicitly until the document is interactive and, optionally, until the
+element it extracts is present.
+
+Every page load is counted: requests made and blocked, bytes received and time
+spent, read from Chrome's performance log.
+
+پروفایل سبک مرورگر برای خزنده‌های سلنیوم: تصاویر، ویدئوها، فونت‌ها و اسکریپت‌های
+تبلیغاتی از طریق پروتکل DevTools کروم مسدود می‌شوند، صفحه با راهبرد `eager` بارگذاری
+و آمادگی آن صریحاً بررسی می‌شود، و تعداد درخواست‌های مسدودشده و زمان بارگذاری ثبت می‌شود.
+"""
+import json
+import threading
+from dataclasses import dataclass, field, fields
+
+from llm_engineering.settings import settings
+
+PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+
+RESOURCE_TYPE_PATTERNS: dict[str, tuple[str, ...]] = {
+    "image": ("*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp"),
+    "media": ("*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.m4a", "*.ogg", "*.wav", "*.mov"),
+    "font": ("*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"),
+    "stylesheet": ("*.css",),
+}
+
+
+@dataclass(frozen=True)
+class BlockingPolicy:
+    """The requests a crawler's browser must not make."""
+
+    resource_types: frozenset[str] = frozenset()
+    url_patterns: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        if unknown := set(self.resource_types) - RESOURCE_TYPE_PATTERNS.keys():
+            raise ValueError(f"Unknown resource type(s) to block: {sorted(unknown)}.")
+
+    @classmethod
+    def from_settings(cls) -> "BlockingPolicy":
+        return cls(
+            resource_types=frozenset(settings.CRAWL_BLOCKED_RESOURCE_TYPES),
+            url_patterns=tuple(settings.CRAWL_BLOCKED_URL_PATTERNS),
+        )
+
+    @property
+    def blocks_images(self) -> bool:
+        return "image" in self.resource_types
+
+    def blocked_urls(self) -> list[str]:
+        """The patterns for `Network.setBlockedURLs` (`*` matches any characters)."""
+        patterns = [
+            pattern for resource_type in sorted(self.resource_types) for pattern in RESOURCE_TYPE_PATTERNS[resource_type]
+        ]
+
+        return patterns + list(self.url_patterns)
+
+
+@dataclass
+class PageLoadStats:
+    """Counters of the pages loaded by Selenium crawlers."""
+
+    pages: int = 0
+    load_time_s: float = 0.0
+    requests: int = 0
+    blocked_requests: int = 0
+    bytes_received: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, load_time_s: float, requests: int = 0, blocked_requests: int = 0, bytes_received: int = 0) -> None:
+        with self._lock:
+            self.pages += 1
+            self.load_time_s += load_time_s
+            self.requests += requests
+            self.blocked_requests += blocked_requests
+            self.bytes_received += bytes_received
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            stats = {item.name: getattr(self, item.name) for item in fields(self) if not item.name.startswith("_")}
+
+        stats["mean_load_time_s"] = stats["load_time_s"] / stats["pages"] if stats["pages"] else 0.0
+
+        return stats
+
+
+# Totals of every Selenium crawler of the process.
+page_load_stats = PageLoadStats()
+
+
+def count_network_events(performance_log: list[dict]) -> tuple[int, int, int]:
+    """
+    Count the requests, blocked requests and received bytes in entries of Chrome's
+    performance log (`driver.get_log("performance")`).
+
+    Requests blocked by `Network.setBlockedURLs` fail with the `inspector` reason.
+    """
+    requests = blocked = bytes_received = 0
+    for entry in performance_log:
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            requests += 1
+        elif method == "Network.loadingFailed" and params.get("blockedReason") == "inspector":
+            blocked += 1
+        elif method == "Network.loadingFinished":
+            bytes_received += int(params.get("encodedDataLength", 0))
+
+    return requests, blocked, bytes_received
@@ -0,0 +1,164 @@
+"""
+The HTML parsing layer of the crawlers.
+
+Pages are parsed with lxml, a C parser many times faster than Python's
+`html.parser`, and only the elements a crawler extracts are visited:
+    - `parse_tree` + XPath (`select`, `xpath_text`, `content_text`) for extraction
+      that is a few lookups: no Python object is built per element;
+    - `parse_html` with a `SoupStrainer` where BeautifulSoup tags are needed: only
+      the matching elements are built, the rest of the page (navigation, scripts,
+      recommendations, ...) is skipped while parsing.
+
+Parsing is CPU-bound and holds the GIL, so when links are crawled concurrently
+`run_parser` hands it to a process pool: the streaming ETL starts one sized to its
+crawl concurrency, and `settings.CRAWL_PARSE_WORKERS` sets its size explicitly.
+
+لایه‌ی تجزیه‌ی HTML خزنده‌ها: تجزیه با lxml که به زبان C نوشته شده، ساختن درخت فقط
+برای عناصر موردنیاز با SoupStrainer، و در صورت خزش هم‌زمان، انجام تجزیه در مجموعه‌ای از پردازه‌ها.
+"""
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, TypeVar
+
+import lxml.html
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+from lxml.etree import ParserError
+
+from llm_engineering.settings import settings
+
+R = TypeVar("R")
+
+HTML_PARSER = "lxml"
+
+# Elements whose text is never part of the content of a page.
+NON_CONTENT_TAGS = ("script", "style", "noscript", "template", "svg")
+
+
+def parse_html(html: str, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    """Parse `html` with lxml, building only the elements matched by `parse_only`, if given."""
+    return BeautifulSoup(html, HTML_PARSER, parse_only=parse_only)
+
+
+def any_class(*class_names: str) -> Callable[[str | None], bool]:
+    """
+    A `class_` filter for `SoupStrainer` matching elements with any of `class_names`.
+
+    While parsing, strainers see the raw `class` attribute ("a b c"), so
+    `class_="a"` would not match an element with several classes.
+    """
+    wanted = frozenset(class_names)
+
+    def matches(value: str | list[str] | None) -> bool:
+        if value is None:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+
+        return not wanted.isdisjoint(classes)
+
+    return matches
+
+
+def parse_tree(html: str) -> lxml.html.HtmlElement | None:
+    """
+    Parse `html` into an lxml tree, for pages whose extraction is a few XPath
+    lookups: no Python object is built per element, which makes it the fastest path.
+    """
+    try:
+        return lxml.html.document_fromstring(html)
+    except (ParserError, ValueError):
+        return None
+
+
+def class_xpath(tag: str, class_name: str, relative: bool = False) -> str:
+    """An XPath matching `tag` elements with the class `class_name` among others."""
+    return f'{"." if relative else ""}//{tag}[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]'
+
+
+def select(tree: lxml.html.HtmlElement | None, xpath: str) -> lxml.html.HtmlElement | None:
+    """The first element matching `xpath`, if any."""
+    elements = tree.xpath(xpath) if tree is not None else []
+
+    return elements[0] if elements else None
+
+
+def element_text(element: lxml.html.HtmlElement | None, strip: bool = False) -> str:
+    """The text of `element`, like BeautifulSoup's `get_text()` or `get_text(strip=True)`."""
+    if element is None:
+        return ""
+    if strip:
+        return "".join(text.strip() for text in element.itertext())
+
+    return "".join(element.itertext())
+
+
+def xpath_text(tree: lxml.html.HtmlElement | None, xpath: str) -> str:
+    """The stripped text of the first element matching `xpath`."""
+    return element_text(select(tree, xpath), strip=True)
+
+
+def content_text(element: lxml.html.HtmlElement | None) -> str:
+    """The text of `element`, without the text of scripts, styles and other non-content elements."""
+    if element is None:
+        return ""
+    etree.strip_elements(element, *NON_CONTENT_TAGS, with_tail=False)
+
+    return element_text(element)
+
+
+def page_metadata(html: str) -> dict[str, str | None]:
+    """The description and language of a page, read with lxml without building a BeautifulSoup tree."""
+    root = parse_tree(html)
+    if root is None:
+        return {"description": None, "language": None}
+
+    descriptions = root.xpath('//meta[@name="description"]/@content')
+
+    return {"description": str(descriptions[0]) if descriptions else None, "language": root.get("lang")}
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def start_parse_pool(workers: int) -> ProcessPoolExecutor | None:
+    """
+    Start the process-wide parsing pool with `workers` processes, unless it is
+    running already or `workers` is 0. Returns the pool, if any.
+
+    Workers are spawned, not forked: the pool is started while crawler threads run.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None and workers > 0:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_pool.shutdown, cancel_futures=True)
+
+        return _pool
+
+
+def get_parse_pool() -> ProcessPoolExecutor | None:
+    """
+    The process-wide parsing pool: the one started by `start_parse_pool`, else one of
+    `settings.CRAWL_PARSE_WORKERS` processes started on first use; None when parsing runs inline.
+    """
+    if _pool is None and settings.CRAWL_PARSE_WORKERS:
+        return start_parse_pool(settings.CRAWL_PARSE_WORKERS)
+
+    return _pool
+
+
+def run_parser(parse: Callable[..., R], *args) -> R:
+    """
+    Call `parse(*args)` in the parsing pool, or inline when there is none.
+
+    `parse` and its arguments must be picklable, e.g. a crawler's `parse` classmethod.
+    """
+    pool = get_parse_pool()
+    if pool is None:
+        return parse(*args)
+
+    return pool.submit(parse, *args).result()
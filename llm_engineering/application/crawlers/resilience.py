@@ -0,0 +1,260 @@
+"""
+The resilience layer shared by every crawler: retries, circuit breakers and deadlines.
+
+`call_resiliently` runs one extraction attempt at a time:
+    - transient failures (timeouts, dropped connections, 408/429/5xx responses) are
+      retried after a jittered exponential delay;
+    - each domain has a circuit breaker that opens after consecutive transient
+      failures, so further links to a failing site fail at once instead of each
+      waiting for its own timeouts, and lets a single probe through once it cools down;
+    - a deadline bounds the whole call, retries included, and every attempt gets
+      the time that is left as its timeout.
+
+لایه‌ی مشترک پایداری خزنده‌ها: تلاش دوباره با تأخیر نمایی تصادفی برای خطاهای گذرا،
+قطع‌کننده‌ی مدار برای هر دامنه تا سایت‌های خراب سریعاً رد شوند، و مهلت زمانی
+که به هر تلاش منتقل می‌شود.
+"""
+import random
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Callable, TypeVar
+
+import requests
+from loguru import logger
+from selenium.common.exceptions import TimeoutException as SeleniumTimeoutException
+
+from llm_engineering.domain.exceptions import CircuitOpenError, DeadlineExceeded, TransientCrawlError
+from llm_engineering.settings import settings
+
+R = TypeVar("R")
+
+TRANSIENT_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether the same request may succeed if retried."""
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in TRANSIENT_STATUS_CODES
+
+    return isinstance(
+        error,
+        (
+            TransientCrawlError,
+            requests.ConnectionError,
+            requests.Timeout,
+            ConnectionError,
+            TimeoutError,
+            subprocess.TimeoutExpired,
+            SeleniumTimeoutException,
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """A point in time, on a monotonic clock, by which a call must finish."""
+
+    expires_at: float
+    timer: Callable[[], float] = field(default=time.monotonic, compare=False)
+
+    @classmethod
+    def after(cls, seconds: float, timer: Callable[[], float] = time.monotonic) -> "Deadline":
+        return cls(timer() + seconds, timer)
+
+    def remaining(self) -> float:
+        return max(self.expires_at - self.timer(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded("Crawl deadline exceeded.")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: the n-th retry waits a uniformly random
+    time up to `min(max_delay_s, base_delay_s * 2**n)`, which spreads out the
+    retries of concurrent workers instead of synchronising them.
+    """
+
+    max_attempts: int = 3
+    base_delay_s: float = 1.0
+    max_delay_s: float = 30.0
+    rng: random.Random = field(default_factory=random.Random, compare=False)
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=settings.CRAWL_RETRIES + 1,
+            base_delay_s=settings.CRAWL_RETRY_BASE_DELAY_S,
+            max_delay_s=settings.CRAWL_RETRY_MAX_DELAY_S,
+        )
+
+    def delay(self, retry: int) -> float:
+        return self.rng.uniform(0.0, min(self.max_delay_s, self.base_delay_s * 2**retry))
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout_s`. Then one probe call is let through: its success closes the
+    circuit, its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        domain: str,
+        failure_threshold: int,
+        reset_timeout_s: float,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.domain = domain
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def before_call(self) -> None:
+        """Raises CircuitOpenError if the call must not be made."""
+        with self._lock:
+            if self._state is CircuitState.CLOSED:
+                return
+
+            retry_after = self._opened_at + self.reset_timeout_s - self._timer()
+            if self._state is CircuitState.OPEN and retry_after <= 0:
+                self._state = CircuitState.HALF_OPEN
+                self._probing = False
+            if self._state is CircuitState.HALF_OPEN and not self._probing:
+                self._probing = True
+
+                return
+
+            raise CircuitOpenError(self.domain, max(retry_after, 0.0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state is not CircuitState.OPEN:
+                    logger.warning(f"Opening the circuit for {self.domain} after {self._failures} failure(s).")
+                self._state = CircuitState.OPEN
+                self._opened_at = self._timer()
+
+
+class CircuitBreakerRegistry:
+    """One circuit breaker per domain, created on first use."""
+
+    def __init__(
+        self,
+        failure_threshold: int | None = None,
+        reset_timeout_s: float | None = None,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold or settings.CRAWL_BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout_s = settings.CRAWL_BREAKER_RESET_S if reset_timeout_s is None else reset_timeout_s
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, domain: str) -> CircuitBreaker:
+        with self._lock:
+            if domain not in self._breakers:
+                self._breakers[domain] = CircuitBreaker(
+                    domain, self.failure_threshold, self.reset_timeout_s, timer=self._timer
+                )
+
+            return self._breakers[domain]
+
+    def states(self) -> dict[str, CircuitState]:
+        with self._lock:
+            return {domain: breaker.state for domain, breaker in self._breakers.items()}
+
+
+circuit_breakers = CircuitBreakerRegistry()
+
+
+def call_resiliently(
+    attempt: Callable[[float], R],
+    breaker: CircuitBreaker,
+    deadline: Deadline | None = None,
+    retry_policy: RetryPolicy | None = None,
+    request_timeout: float | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> R:
+    """
+    Call `attempt(timeout)` until it succeeds, fails permanently, or runs out of
+    attempts or time.
+
+    `timeout` is the smaller of `request_timeout` and the time left before the
+    deadline. Only transient failures are retried and count against the breaker;
+    any other error means the domain answered, so it counts as a success for it.
+
+    Raises:
+        CircuitOpenError: The domain's circuit is open.
+        DeadlineExceeded: The deadline passed before an attempt could start.
+    """
+    retry_policy = retry_policy or RetryPolicy.from_settings()
+    deadline = deadline or Deadline.after(settings.CRAWL_LINK_DEADLINE_S)
+    request_timeout = settings.CRAWL_REQUEST_TIMEOUT_S if request_timeout is None else request_timeout
+
+    retry = 0
+    while True:
+        deadline.check()
+        breaker.before_call()
+        try:
+            result = attempt(min(request_timeout, deadline.remaining()))
+        except Exception as error:
+            if not is_transient(error):
+                breaker.record_success()
+
+                raise
+
+            breaker.record_failure()
+            delay = retry_policy.delay(retry)
+            # Stop at the last attempt, when the wait would outlast the deadline, or once
+            # this failure has opened the circuit: the caller gets the real error.
+            if (
+                retry + 1 >= retry_policy.max_attempts
+                or delay >= deadline.remaining()
+                or breaker.state is CircuitState.OPEN
+            ):
+                raise
+
+            logger.warning(
+                f"Transient error from {breaker.domain} "
+                f"(attempt {retry + 1}/{retry_policy.max_attempts}): {error!s}. Retrying in {delay:.2f}s."
+            )
+            sleep(delay)
+            retry += 1
+        else:
+            breaker.record_success()
+
+            return result
@@ -47,8 +47,10 @@ from sentence_transformers.SentenceTransformer import SentenceTransformer
 from sentence_transformers.cross_encoder import CrossEncoder
 from transformers import AutoTokenizer
 
+from llm_engineering.infrastructure import instrumentation
 from llm_engineering.settings import settings
 
+from .base import SingletonMeta
 
 """
     ───────────────────────────────────────────────
@@ -103,7 +105,7 @@ from llm_engineering.settings import settings
         - در پروژه‌های رگ به عنوان لایه‌ی امبدینگ استفاده می‌شود.
     ───────────────────────────────────────────────
 """
-class EmbeddingModelSingleton:
+class EmbeddingModelSingleton(metaclass=SingletonMeta):
     """Singleton wrapper for embedding models to avoid redundant loads."""
 
     def __init__(self,
@@ -188,7 +190,14 @@ class EmbeddingModelSingleton:
         try:
             # Generate embeddings.
             # using for (for example) calculating similarity later like cosine.
-            embeddings = self._model.encode(input_txt)
+            with instrumentation.span("embedding.encode", model=self._model_id):
+                embeddings = self._model.encode(input_txt)
+            instrumentation.observe(
+                "embedding.batch_size",
+                1 if isinstance(input_txt, str) else len(input_txt),
+                buckets=instrumentation.SIZE_BUCKETS,
+                model=self._model_id,
+            )
         except Exception:
             logger.error("Failed to generate embeddings.")
             return [] if to_list else np.array([])
@@ -201,8 +210,8 @@ class EmbeddingModelSingleton:
     
 
 
-class CrossEncoderModelSingleton:
-    def _init_(
+class CrossEncoderModelSingleton(metaclass=SingletonMeta):
+    def __init__(
         self,
         model_id:str = settings.RERANKING_CROSS_ENCODER_MODEL_ID,
         device: str = settings.RAG_MODEL_DEVICE,
@@ -219,11 +228,41 @@ class CrossEncoderModelSingleton:
         )
         self._model.eval()  # Set the model to evaluation mode
 
-    def __call__(self, pairs: list[tuple[str, str]], to_list: bool = True) -> NDArray[np.float32] | list[float]:
-        scores = self._model.predict(pairs)
+    @property
+    def model_id(self) -> str:
+        """
+        Returns the identifier of the pre-trained cross-encoder model.
+
+        Returns:
+            str: The identifier of the pre-trained cross-encoder model.
+        """
+        return self._model_id
+
+    def __call__(
+        self,
+        pairs: list[tuple[str, str]],
+        to_list: bool = True,
+        batch_size: int = settings.RERANKING_BATCH_SIZE,
+    ) -> NDArray[np.float32] | list[float]:
+        """
+        Scores (query, document) pairs with the cross-encoder.
+
+        Args:
+            pairs (list[tuple[str, str]]): The (query, document) pairs to score.
+            to_list (bool): Whether to return the scores as a list or numpy array. Defaults to True.
+            batch_size (int): The number of pairs sent through the model at once.
+
+        Returns:
+            Union[np.ndarray, list]: One relevance score per input pair, in input order.
+        """
+        if not pairs:
+            return [] if to_list else np.array([], dtype=np.float32)
+
+        with instrumentation.span("rerank.score", model=self._model_id):
+            scores = self._model.predict(pairs, batch_size=batch_size, show_progress_bar=False)
+        instrumentation.observe("rerank.pairs", len(pairs), buckets=instrumentation.SIZE_BUCKETS, model=self._model_id)
 
         if to_list:
             scores = scores.tolist()
 
         return scores
-    
\ No newline at end of file
@@ -0,0 +1,13 @@
+from .chunking import ChunkingPipeline, TokenChunker, chunk_documents
+from .cleaning import clean_text, document_to_text
+from .ingestion import IncrementalEmbeddingPipeline, IngestionReport
+
+__all__ = [
+    "ChunkingPipeline",
+    "IncrementalEmbeddingPipeline",
+    "IngestionReport",
+    "TokenChunker",
+    "chunk_documents",
+    "clean_text",
+    "document_to_text",
+]
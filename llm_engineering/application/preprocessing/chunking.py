@@ -0,0 +1,208 @@
+import hashlib
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+from loguru import logger
+
+from llm_engineering.application.networks import EmbeddingModelSingleton
+from llm_engineering.application.rag.sparse import BM25Index
+from llm_engineering.application.utils import batch
+from llm_engineering.domain.chunks import ArticleChunk, Chunk, PostChunk, RepositoryChunk
+from llm_engineering.domain.documents import ArticleDocument, Document, PostDocument, RepositoryDocument
+from llm_engineering.domain.types import DataCategory
+from llm_engineering.settings import settings
+
+from .cleaning import document_to_text
+
+
+class TokenChunker:
+    """
+    Splits texts into overlapping windows of at most `chunk_size` tokens.
+
+    Token boundaries come from the embedding model's own tokenizer, so every
+    chunk fits the model input without being silently truncated. Fast (Rust)
+    tokenizers encode a whole batch of texts in one call and the chunks are
+    sliced from the original text through the returned character offsets.
+    Slow tokenizers fall back to encoding and decoding text by text.
+    """
+
+    def __init__(
+        self,
+        tokenizer=None,
+        chunk_size: int | None = settings.CHUNK_SIZE_TOKENS,
+        chunk_overlap: int = settings.CHUNK_OVERLAP_TOKENS,
+    ) -> None:
+        if tokenizer is None or chunk_size is None:
+            embedding_model = EmbeddingModelSingleton()
+            tokenizer = tokenizer or embedding_model.tokenizer
+            chunk_size = chunk_size or embedding_model.max_input_length - tokenizer.num_special_tokens_to_add()
+
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size.")
+
+        self._tokenizer = tokenizer
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def split(self, texts: list[str]) -> list[list[tuple[str, int]]]:
+        """
+        Splits every text into chunks.
+
+        Args:
+            texts (list[str]): The texts to split.
+
+        Returns:
+            list[list[tuple[str, int]]]: For every text, its chunks as (chunk text, token count) pairs.
+        """
+        if getattr(self._tokenizer, "is_fast", False):
+            return self._split_fast(texts)
+
+        return [self._split_slow(text) for text in texts]
+
+    def _split_fast(self, texts: list[str]) -> list[list[tuple[str, int]]]:
+        encodings = self._tokenizer(
+            texts,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False,
+        )
+
+        splits = []
+        for text, offsets in zip(texts, encodings["offset_mapping"], strict=True):
+            splits.append(
+                [(text[offsets[start][0] : offsets[end - 1][1]], end - start) for start, end in self._windows(len(offsets))]
+            )
+
+        return splits
+
+    def _split_slow(self, text: str) -> list[tuple[str, int]]:
+        token_ids = self._tokenizer.encode(text, add_special_tokens=False)
+
+        return [
+            (self._tokenizer.decode(token_ids[start:end]), end - start) for start, end in self._windows(len(token_ids))
+        ]
+
+    def _windows(self, num_tokens: int) -> Iterator[tuple[int, int]]:
+        if num_tokens == 0:
+            return
+
+        step = self.chunk_size - self.chunk_overlap
+        for start in range(0, max(num_tokens - self.chunk_overlap, 1), step):
+            yield start, min(start + self.chunk_size, num_tokens)
+
+
+def chunk_documents(documents: list[Document], chunker: TokenChunker) -> list[Chunk]:
+    """Cleans a batch of documents and turns them into chunk records ready for embedding."""
+    texts = [document_to_text(document) for document in documents]
+
+    chunks = []
+    for document, pieces in zip(documents, chunker.split(texts), strict=True):
+        chunk_class, extra_fields = _chunk_spec(document)
+        for index, (content, num_tokens) in enumerate(pieces):
+            chunks.append(
+                chunk_class(
+                    id=_chunk_id(document.id, index),
+                    content=content,
+                    platform=document.platform,
+                    document_id=document.id,
+                    author_id=document.author_id,
+                    author_full_name=document.author_full_name,
+                    metadata={"chunk_index": index, "token_count": num_tokens},
+                    **extra_fields,
+                )
+            )
+
+    return chunks
+
+
+class ChunkingPipeline:
+    """
+    Streams documents from MongoDB through cleaning and chunking.
+
+    Documents are read with a cursor in batches of `batch_size` and the
+    batches are chunked by `max_workers` threads. At most `2 * max_workers`
+    batches are in flight, so memory stays constant however large the
+    collections are. Chunks are yielded in document order.
+
+    If `sparse_indexes` is given, every chunk is also added to the BM25 index
+    of its data category, so the lexical index is built in the same pass.
+    """
+
+    def __init__(
+        self,
+        chunker: TokenChunker | None = None,
+        batch_size: int = settings.CHUNKING_BATCH_SIZE,
+        max_workers: int = settings.CHUNKING_MAX_WORKERS,
+        sparse_indexes: dict[DataCategory, BM25Index] | None = None,
+    ) -> None:
+        self.chunker = chunker or TokenChunker()
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.sparse_indexes = sparse_indexes or {}
+
+    def run(
+        self,
+        document_classes: Iterable[type[Document]] = (ArticleDocument, PostDocument, RepositoryDocument),
+        **filter_options,
+    ) -> Iterator[Chunk]:
+        for document_class in document_classes:
+            logger.info(f"Chunking documents from collection: {document_class.get_collection_name()}")
+
+            documents = document_class.iter_find(batch_size=self.batch_size, **filter_options)
+
+            yield from self.chunk(documents)
+
+    def chunk(self, documents: Iterable[Document]) -> Iterator[Chunk]:
+        num_documents = num_chunks = 0
+        max_in_flight = 2 * self.max_workers
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight: deque[Future[list[Chunk]]] = deque()
+            for document_batch in batch(documents, self.batch_size):
+                num_documents += len(document_batch)
+                in_flight.append(executor.submit(chunk_documents, document_batch, self.chunker))
+
+                if len(in_flight) >= max_in_flight:
+                    chunks = in_flight.popleft().result()
+                    num_chunks += len(chunks)
+                    self._index(chunks)
+
+                    yield from chunks
+
+            while in_flight:
+                chunks = in_flight.popleft().result()
+                num_chunks += len(chunks)
+                self._index(chunks)
+
+                yield from chunks
+
+        logger.info(f"Chunked {num_documents} documents into {num_chunks} chunks.")
+
+
+    def _index(self, chunks: list[Chunk]) -> None:
+        for chunk in chunks:
+            sparse_index = self.sparse_indexes.get(chunk.get_category())
+            if sparse_index is not None:
+                sparse_index.add(chunk.id, chunk.content)
+
+
+def _chunk_spec(document: Document) -> tuple[type[Chunk], dict]:
+    if isinstance(document, PostDocument):
+        return PostChunk, {"image": document.image}
+    if isinstance(document, ArticleDocument):
+        return ArticleChunk, {"link": document.link}
+    if isinstance(document, RepositoryDocument):
+        return RepositoryChunk, {"name": document.name, "link": document.link}
+
+    raise ValueError(f"Unsupported document type for chunking: {type(document).__name__}")
+
+
+def _chunk_id(document_id: uuid.UUID, index: int) -> uuid.UUID:
+    """Derives a stable chunk id, so re-chunking a document overwrites its previous chunks."""
+    digest = hashlib.md5(f"{document_id}:{index}".encode()).hexdigest()  # noqa: S324
+
+    return uuid.UUID(digest, version=4)
@@ -0,0 +1,44 @@
+import re
+import unicodedata
+
+from llm_engineering.domain.documents import Document, RepositoryDocument
+
+# Keys of a document's `content` dict that hold metadata rather than text.
+_NON_TEXT_KEYS = frozenset({"image", "language"})
+
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_INLINE_WHITESPACE = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n[ \t]*(?:\n[ \t]*)+")
+
+
+def clean_text(text: str) -> str:
+    """
+    Normalises raw crawled text before chunking.
+
+    Unicode is NFKC-normalised, control characters are dropped, runs of spaces
+    are collapsed and more than one blank line is squeezed into one.
+    Punctuation is kept, since repository content is source code.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _CONTROL_CHARS.sub("", text)
+    text = _INLINE_WHITESPACE.sub(" ", text)
+    text = _BLANK_LINES.sub("\n\n", text)
+
+    return text.strip()
+
+
+def document_to_text(document: Document) -> str:
+    """
+    Flattens the `content` dict of a crawled document into one cleaned text.
+
+    Repository files are prefixed with their path so chunks keep their origin.
+    """
+    if isinstance(document, RepositoryDocument):
+        parts = [f"{path}\n{source}" for path, source in document.content.items() if source]
+    else:
+        parts = [
+            str(value) for key, value in document.content.items() if value and key not in _NON_TEXT_KEYS
+        ]
+
+    return clean_text("\n\n".join(parts))
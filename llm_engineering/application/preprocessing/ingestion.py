@@ -0,0 +1,278 @@
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator, Sequence
+
+from loguru import logger
+
+from llm_engineering.application.networks import EmbeddingModelSingleton
+from llm_engineering.application.rag.hybrid import sparse_index_path
+from llm_engineering.application.rag.sparse import BM25Index
+from llm_engineering.application.utils import batch
+from llm_engineering.domain.chunks import Chunk
+from llm_engineering.domain.documents import (
+    ArticleDocument,
+    Document,
+    IngestionStateDocument,
+    PostDocument,
+    RepositoryDocument,
+)
+from llm_engineering.domain.embedded_chunks import (
+    EmbeddedArticleChunk,
+    EmbeddedChunk,
+    EmbeddedPostChunk,
+    EmbeddedRepositoryChunk,
+)
+from llm_engineering.settings import settings
+
+from .chunking import ChunkingPipeline
+
+SOURCES: tuple[tuple[type[Document], type[EmbeddedChunk]], ...] = (
+    (ArticleDocument, EmbeddedArticleChunk),
+    (PostDocument, EmbeddedPostChunk),
+    (RepositoryDocument, EmbeddedRepositoryChunk),
+)
+
+
+@dataclass
+class IngestionReport:
+    """What one incremental run changed in one collection."""
+
+    collection: str
+    changed_documents: int = 0
+    deleted_documents: int = 0
+    upserted_chunks: int = 0
+    deleted_chunks: int = 0
+    watermark: datetime | None = None
+    seconds: float = 0.0
+
+
+class IncrementalEmbeddingPipeline:
+    """
+    Keeps the Qdrant chunk collections in sync with the MongoDB document collections.
+
+    Every run only chunks and embeds the documents written since the previous run:
+    the newest `updated_at` processed is stored per collection as a high-water mark
+    (`IngestionStateDocument`), and the next run reads the documents past it, minus
+    `watermark_overlap_s` to tolerate late writes. Chunk ids are derived from the
+    document id and the chunk index, so re-embedding a document overwrites its
+    points; chunks a shorter new version no longer produces are deleted.
+
+    With `detect_deletions`, the document ids of MongoDB and Qdrant are compared
+    (ids only, no payloads or vectors): points of removed documents are deleted and
+    documents missing from Qdrant, such as documents written before `updated_at`
+    existed, are embedded too.
+
+    The mark is only advanced once every chunk of the collection was upserted, so
+    a failed run is retried from the same point.
+    """
+
+    def __init__(
+        self,
+        chunking_pipeline: ChunkingPipeline | None = None,
+        embedding_model: Callable[..., list[list[float]]] | None = None,
+        embedding_batch_size: int = settings.INGESTION_EMBEDDING_BATCH_SIZE,
+        watermark_overlap_s: float = settings.INGESTION_WATERMARK_OVERLAP_S,
+        detect_deletions: bool = settings.INGESTION_DETECT_DELETIONS,
+        update_sparse_indexes: bool = True,
+    ) -> None:
+        self.chunking_pipeline = chunking_pipeline or ChunkingPipeline()
+        self._embedding_model = embedding_model if embedding_model is not None else EmbeddingModelSingleton()
+        self.embedding_batch_size = embedding_batch_size
+        self.watermark_overlap = timedelta(seconds=watermark_overlap_s)
+        self.detect_deletions = detect_deletions
+        self.update_sparse_indexes = update_sparse_indexes
+
+    def run(self, sources: Sequence[tuple[type[Document], type[EmbeddedChunk]]] = SOURCES) -> list[IngestionReport]:
+        return [self.ingest(document_class, embedded_class) for document_class, embedded_class in sources]
+
+    def ingest(self, document_class: type[Document], embedded_class: type[EmbeddedChunk]) -> IngestionReport:
+        """
+        Brings one chunk collection up to date with its document collection.
+
+        Args:
+            document_class (type[Document]): The MongoDB documents to read.
+            embedded_class (type[EmbeddedChunk]): The Qdrant collection their chunks are written to.
+
+        Returns:
+            IngestionReport: The counts of changed and deleted documents and chunks.
+        """
+        start_time = time.perf_counter()
+        collection_name = document_class.get_collection_name()
+        report = IngestionReport(collection=collection_name)
+
+        state = IngestionStateDocument.get_or_create(collection=collection_name)
+        if state is None:
+            raise RuntimeError(f"Failed to load the ingestion state of '{collection_name}'.")
+
+        embedded_class.get_or_create_collection()
+        sparse_index = self._sparse_index(embedded_class)
+
+        indexed_chunks, missing_ids = None, set()
+        if self.detect_deletions:
+            indexed_chunks = self._indexed_chunks(embedded_class)
+            document_ids = document_class.find_ids()
+            removed_ids = indexed_chunks.keys() - document_ids
+            missing_ids = document_ids - indexed_chunks.keys()
+
+            removed_chunk_ids = [chunk_id for document_id in removed_ids for chunk_id in indexed_chunks[document_id]]
+            self._delete_chunks(embedded_class, removed_chunk_ids, sparse_index)
+            report.deleted_documents = len(removed_ids)
+            report.deleted_chunks += len(removed_chunk_ids)
+
+        watermark = _as_utc(state.updated_at)
+        changed_documents = _ChangeTracker(self._changed_documents(document_class, watermark, missing_ids))
+        written_chunk_ids: dict[uuid.UUID, set[str]] = {}
+        for chunk_batch in batch(self.chunking_pipeline.chunk(changed_documents), self.embedding_batch_size):
+            embedded_chunks = self._embed(chunk_batch, embedded_class)
+            if not embedded_class.bulk_insert(embedded_chunks):
+                raise RuntimeError(f"Failed to upsert chunks into '{embedded_class.get_collection_name()}'.")
+
+            for chunk in embedded_chunks:
+                written_chunk_ids.setdefault(chunk.document_id, set()).add(str(chunk.id))
+            report.upserted_chunks += len(embedded_chunks)
+
+        stale_chunk_ids = self._stale_chunks(embedded_class, changed_documents.ids, written_chunk_ids, indexed_chunks)
+        self._delete_chunks(embedded_class, stale_chunk_ids, sparse_index)
+        report.deleted_chunks += len(stale_chunk_ids)
+        report.changed_documents = len(changed_documents.ids)
+
+        if sparse_index is not None:
+            sparse_index.save(sparse_index_path(embedded_class))
+
+        if changed_documents.max_updated_at is not None and (
+            watermark is None or changed_documents.max_updated_at > watermark
+        ):
+            state.updated_at = changed_documents.max_updated_at
+            if state.upsert() is None:
+                raise RuntimeError(f"Failed to save the ingestion state of '{collection_name}'.")
+        report.watermark = _as_utc(state.updated_at)
+
+        report.seconds = time.perf_counter() - start_time
+        logger.info(
+            f"Ingested '{collection_name}' in {report.seconds:.1f}s: {report.changed_documents} changed and "
+            f"{report.deleted_documents} deleted documents, {report.upserted_chunks} chunks upserted and "
+            f"{report.deleted_chunks} deleted."
+        )
+
+        return report
+
+    def _changed_documents(
+        self, document_class: type[Document], watermark: datetime | None, missing_ids: set[uuid.UUID]
+    ) -> Iterator[Document]:
+        batch_size = self.chunking_pipeline.batch_size
+        if watermark is None:
+            yield from document_class.iter_find(batch_size=batch_size)
+
+            return
+
+        seen_ids = set()
+        for document in document_class.iter_find(
+            batch_size=batch_size, updated_at={"$gt": watermark - self.watermark_overlap}
+        ):
+            seen_ids.add(document.id)
+            yield document
+
+        for id_batch in batch(sorted(str(_id) for _id in missing_ids - seen_ids), batch_size):
+            yield from document_class.iter_find(batch_size=batch_size, _id={"$in": id_batch})
+
+    def _embed(self, chunks: list[Chunk], embedded_class: type[EmbeddedChunk]) -> list[EmbeddedChunk]:
+        embeddings = self._embedding_model([chunk.content for chunk in chunks], to_list=True)
+        if len(embeddings) != len(chunks):
+            raise RuntimeError(f"Failed to embed {len(chunks)} chunks.")
+
+        return [
+            embedded_class(**chunk.model_dump(), embedding=embedding)
+            for chunk, embedding in zip(chunks, embeddings, strict=True)
+        ]
+
+    @staticmethod
+    def _indexed_chunks(embedded_class: type[EmbeddedChunk]) -> dict[uuid.UUID, list[str]]:
+        """Maps every document id in the collection to the ids of its chunks."""
+        indexed_chunks: dict[uuid.UUID, list[str]] = {}
+        for chunk in embedded_class.iter_all(payload_fields=["document_id"]):
+            indexed_chunks.setdefault(uuid.UUID(str(chunk.document_id)), []).append(str(chunk.id))
+
+        return indexed_chunks
+
+    @staticmethod
+    def _stale_chunks(
+        embedded_class: type[EmbeddedChunk],
+        changed_ids: set[uuid.UUID],
+        written_chunk_ids: dict[uuid.UUID, set[str]],
+        indexed_chunks: dict[uuid.UUID, list[str]] | None,
+    ) -> list[str]:
+        if not changed_ids:
+            return []
+
+        if indexed_chunks is not None:
+            previous_chunks = ((document_id, indexed_chunks.get(document_id, ())) for document_id in changed_ids)
+        else:
+            chunks = embedded_class.iter_all(
+                filter=embedded_class.filter(document_id=list(changed_ids)), payload_fields=["document_id"]
+            )
+            previous_chunks = ((uuid.UUID(str(chunk.document_id)), (str(chunk.id),)) for chunk in chunks)
+
+        return [
+            chunk_id
+            for document_id, chunk_ids in previous_chunks
+            for chunk_id in chunk_ids
+            if chunk_id not in written_chunk_ids.get(document_id, ())
+        ]
+
+    def _delete_chunks(
+        self, embedded_class: type[EmbeddedChunk], chunk_ids: list[str], sparse_index: BM25Index | None
+    ) -> None:
+        if not chunk_ids:
+            return
+
+        if not embedded_class.bulk_delete(chunk_ids):
+            raise RuntimeError(f"Failed to delete chunks from '{embedded_class.get_collection_name()}'.")
+        if sparse_index is not None:
+            sparse_index.remove(chunk_ids)
+
+    def _sparse_index(self, embedded_class: type[EmbeddedChunk]) -> BM25Index | None:
+        if not self.update_sparse_indexes:
+            return None
+
+        category = embedded_class.get_category()
+        if category not in self.chunking_pipeline.sparse_indexes:
+            self.chunking_pipeline.sparse_indexes[category] = load_sparse_index(embedded_class)
+
+        return self.chunking_pipeline.sparse_indexes[category]
+
+
+def load_sparse_index(embedded_class: type[EmbeddedChunk]) -> BM25Index:
+    """The saved BM25 index of a chunk collection, or an empty one if none was saved yet."""
+    path = sparse_index_path(embedded_class)
+
+    return BM25Index.load(path) if path.exists() else BM25Index()
+
+
+class _ChangeTracker:
+    """Passes documents through while recording their ids and the newest `updated_at`."""
+
+    def __init__(self, documents: Iterable[Document]) -> None:
+        self._documents = documents
+        self.ids: set[uuid.UUID] = set()
+        self.max_updated_at: datetime | None = None
+
+    def __iter__(self) -> Iterator[Document]:
+        for document in self._documents:
+            self.ids.add(document.id)
+            # Documents stored before `updated_at` existed get the read time as default, which is no mark.
+            if "updated_at" in document.model_fields_set:
+                updated_at = _as_utc(document.updated_at)
+                if self.max_updated_at is None or updated_at > self.max_updated_at:
+                    self.max_updated_at = updated_at
+
+            yield document
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    # MongoDB returns naive datetimes in UTC.
+    if value is None or value.tzinfo is not None:
+        return value
+
+    return value.replace(tzinfo=timezone.utc)
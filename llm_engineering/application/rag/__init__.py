@@ -0,0 +1,17 @@
+from .hybrid import HybridSearch, HybridSearchStats, reciprocal_rank_fusion
+from .reranking import Reranker, RerankStats
+from .retriever import ContextRetriever, RetrievalResult, RetrievalStats
+from .sparse import BM25Index, tokenize
+
+__all__ = [
+    "BM25Index",
+    "ContextRetriever",
+    "HybridSearch",
+    "HybridSearchStats",
+    "Reranker",
+    "RerankStats",
+    "RetrievalResult",
+    "RetrievalStats",
+    "reciprocal_rank_fusion",
+    "tokenize",
+]
@@ -0,0 +1,154 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Generic, Hashable, Iterable, Sequence, TypeVar
+
+import numpy as np
+from qdrant_client.models import Filter
+
+from llm_engineering.domain.base.filters import FilterBuilder
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.infrastructure import instrumentation
+from llm_engineering.settings import settings
+
+from .sparse import BM25Index
+
+T = TypeVar("T", bound=VectorBaseDocument)
+K = TypeVar("K", bound=Hashable)
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[K]], k: int = settings.HYBRID_RRF_K) -> list[tuple[K, float]]:
+    """
+    Merges several rankings by summing 1 / (k + rank) for every list an item appears in.
+
+    Only ranks are used, so scores on different scales (cosine, BM25) need no calibration.
+
+    Returns:
+        list[tuple[K, float]]: Every item with its fused score, best first.
+    """
+    scores: dict[K, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def sparse_index_path(document_class: type[VectorBaseDocument]) -> Path:
+    """Where the BM25 index of a collection is saved."""
+    return Path(settings.SPARSE_INDEX_DIR) / f"{document_class.get_collection_name()}.json.gz"
+
+
+@dataclass
+class HybridSearchStats:
+    """Measurements of one hybrid query."""
+
+    dense_hits: int = 0
+    sparse_hits: int = 0
+    overlap: int = 0
+    dense_ms: float = 0.0
+    sparse_ms: float = 0.0
+    total_ms: float = 0.0
+
+
+class HybridSearch(Generic[T]):
+    """
+    Dense + BM25 retrieval over one collection, fused with reciprocal-rank fusion.
+
+    The dense search (Qdrant) and the sparse search (local BM25 index, then a
+    payload-filtered fetch of the hits) run concurrently, each returning up to
+    `candidates` documents. Lexical matches recover exact identifiers, names
+    and rare terms that the embedding model blurs.
+    """
+
+    def __init__(
+        self,
+        document_class: type[T],
+        sparse_index: BM25Index | None = None,
+        candidates: int = settings.HYBRID_CANDIDATES,
+        rrf_k: int = settings.HYBRID_RRF_K,
+    ) -> None:
+        self.document_class = document_class
+        self.sparse_index = sparse_index if sparse_index is not None else self._load_index(document_class)
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-search")
+
+    def search(
+        self,
+        query: str,
+        query_vector: Sequence[float],
+        limit: int = 10,
+        query_filter: Filter | FilterBuilder | None = None,
+    ) -> list[T]:
+        documents, _ = self.search_with_stats(query, query_vector, limit=limit, query_filter=query_filter)
+
+        return documents
+
+    @instrumentation.traced("rag.hybrid_search")
+    def search_with_stats(
+        self,
+        query: str,
+        query_vector: Sequence[float],
+        limit: int = 10,
+        query_filter: Filter | FilterBuilder | None = None,
+    ) -> tuple[list[T], HybridSearchStats]:
+        """
+        Runs the dense and sparse searches concurrently and fuses their rankings.
+
+        Args:
+            query (str): The query text, matched lexically.
+            query_vector (Sequence[float]): The query embedding.
+            limit (int): The number of documents to return.
+            query_filter (Filter | FilterBuilder | None): Payload filter applied to both retrievers.
+
+        Returns:
+            tuple[list[T], HybridSearchStats]: The fused documents, best first, and the timings.
+        """
+        start_time = time.perf_counter()
+        stats = HybridSearchStats()
+
+        dense_future = self._executor.submit(self._timed, self._dense, query_vector, query_filter)
+        sparse_future = self._executor.submit(self._timed, self._sparse, query, query_filter)
+        dense, stats.dense_ms = dense_future.result()
+        sparse, stats.sparse_ms = sparse_future.result()
+
+        documents = {document.id: document for document in (*sparse, *dense)}
+        fused = reciprocal_rank_fusion(([d.id for d in dense], [d.id for d in sparse]), k=self.rrf_k)
+
+        stats.dense_hits, stats.sparse_hits = len(dense), len(sparse)
+        stats.overlap = len(dense) + len(sparse) - len(documents)
+        stats.total_ms = (time.perf_counter() - start_time) * 1000
+
+        return [documents[doc_id] for doc_id, _ in fused[:limit]], stats
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _dense(self, query_vector: Sequence[float], query_filter: Filter | FilterBuilder | None) -> list[T]:
+        return self.document_class.search(
+            np.asarray(query_vector, dtype=np.float32).tolist(), limit=self.candidates, query_filter=query_filter
+        )
+
+    def _sparse(self, query: str, query_filter: Filter | FilterBuilder | None) -> list[T]:
+        # The BM25 index holds no payloads, so with a filter more hits are fetched to survive it.
+        num_hits = self.candidates if query_filter is None else 4 * self.candidates
+        hits = self.sparse_index.search(query, limit=num_hits)
+        documents = self.document_class.find_by_ids([doc_id for doc_id, _ in hits], query_filter=query_filter)
+
+        return documents[: self.candidates]
+
+    @staticmethod
+    def _timed(fn, *args) -> tuple[list[T], float]:
+        start_time = time.perf_counter()
+        result = fn(*args)
+
+        return result, (time.perf_counter() - start_time) * 1000
+
+    @staticmethod
+    def _load_index(document_class: type[T]) -> BM25Index:
+        path = sparse_index_path(document_class)
+
+        return BM25Index.load(path) if path.exists() else BM25Index()
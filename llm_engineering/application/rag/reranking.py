@@ -0,0 +1,132 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+from loguru import logger
+
+from llm_engineering.application.networks import CrossEncoderModelSingleton
+from llm_engineering.application.utils import LRUCache
+from llm_engineering.infrastructure import instrumentation
+from llm_engineering.settings import settings
+
+T = TypeVar("T")
+
+
+@dataclass
+class RerankStats:
+    """Measurements collected while reranking the candidates of one request."""
+
+    candidates: int = 0
+    scored: int = 0
+    cache_hits: int = 0
+    skipped: int = 0
+    batches: int = 0
+    latency_ms: float = 0.0
+    budget_ms: float | None = None
+
+    @property
+    def budget_exceeded(self) -> bool:
+        return self.budget_ms is not None and self.latency_ms > self.budget_ms
+
+
+class Reranker:
+    """
+    Reorders first-stage retrieval results with a cross-encoder.
+
+    Only the first `top_n` candidates are scored. Pairs are sorted by document
+    length and scored in batches of `batch_size`, so each batch pads to similar
+    lengths. Scores are cached per (query, document id). Once the latency budget
+    is spent, the remaining batches are skipped and their candidates keep their
+    first-stage order after every scored candidate.
+
+    Candidates are any objects that expose an `id` and a text `content`.
+    """
+
+    def __init__(
+        self,
+        model: Callable[..., list[float]] | None = None,
+        batch_size: int = settings.RERANKING_BATCH_SIZE,
+        top_n: int = settings.RERANKING_TOP_N,
+        latency_budget_ms: float | None = settings.RERANKING_LATENCY_BUDGET_MS,
+        cache_size: int = settings.RERANKING_CACHE_SIZE,
+    ) -> None:
+        self._model = model if model is not None else CrossEncoderModelSingleton()
+        self.batch_size = batch_size
+        self.top_n = top_n
+        self.latency_budget_ms = latency_budget_ms
+
+        self._cache: LRUCache[tuple[str, str], float] = LRUCache(maxsize=cache_size)
+
+    def generate(self, query: str, documents: list[T], keep_top_k: int) -> list[T]:
+        reranked_documents, _ = self.rerank(query, documents, keep_top_k)
+
+        return reranked_documents
+
+    @instrumentation.traced("rag.rerank")
+    def rerank(self, query: str, documents: list[T], keep_top_k: int) -> tuple[list[T], RerankStats]:
+        """
+        Scores the candidates against the query and keeps the best ones.
+
+        Args:
+            query (str): The user query.
+            documents (list[T]): Candidates, ordered by first-stage relevance.
+            keep_top_k (int): The number of documents to return.
+
+        Returns:
+            tuple[list[T], RerankStats]: The top-k documents, best first, and the request measurements.
+        """
+        start_time = time.perf_counter()
+
+        candidates = documents[: self.top_n]
+        stats = RerankStats(candidates=len(candidates), budget_ms=self.latency_budget_ms)
+
+        scores: list[float | None] = [None] * len(candidates)
+        pending = []
+        for idx, document in enumerate(candidates):
+            cached_score = self._cache.get((query, str(document.id)))
+            if cached_score is None:
+                pending.append(idx)
+            else:
+                scores[idx] = cached_score
+                stats.cache_hits += 1
+
+        pending.sort(key=lambda idx: len(candidates[idx].content))
+        for batch_start in range(0, len(pending), self.batch_size):
+            if batch_start > 0 and self._is_over_budget(start_time):
+                stats.skipped = len(pending) - batch_start
+
+                break
+
+            batch = pending[batch_start : batch_start + self.batch_size]
+            pairs = [(query, candidates[idx].content) for idx in batch]
+            batch_scores = self._model(pairs, to_list=True, batch_size=len(pairs))
+
+            for idx, score in zip(batch, batch_scores, strict=True):
+                scores[idx] = score
+                self._cache.put((query, str(candidates[idx].id)), score)
+
+            stats.batches += 1
+            stats.scored += len(batch)
+
+        ranking = sorted(
+            range(len(candidates)),
+            key=lambda idx: (scores[idx] is None, -scores[idx] if scores[idx] is not None else 0.0, idx),
+        )
+        reranked_documents = [candidates[idx] for idx in ranking[:keep_top_k]]
+
+        stats.latency_ms = (time.perf_counter() - start_time) * 1000
+        instrumentation.count("rag.rerank.cache_hits", stats.cache_hits)
+        instrumentation.count("rag.rerank.skipped", stats.skipped)
+        if stats.budget_exceeded or stats.skipped:
+            logger.warning(
+                f"Reranking took {stats.latency_ms:.1f}ms (budget {self.latency_budget_ms}ms). "
+                f"Skipped scoring {stats.skipped} of {stats.candidates} candidates."
+            )
+
+        return reranked_documents, stats
+
+    def _is_over_budget(self, start_time: float) -> bool:
+        if self.latency_budget_ms is None:
+            return False
+
+        return (time.perf_counter() - start_time) * 1000 > self.latency_budget_ms
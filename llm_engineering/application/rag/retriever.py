@@ -0,0 +1,302 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Sequence
+
+from loguru import logger
+
+from llm_engineering.application.networks import EmbeddingModelSingleton
+from llm_engineering.application.utils import LRUCache, TTLCache
+from llm_engineering.domain.base.filters import FilterBuilder
+from llm_engineering.domain.base.vector import VectorQuery
+from llm_engineering.domain.embedded_chunks import (
+    EmbeddedArticleChunk,
+    EmbeddedChunk,
+    EmbeddedPostChunk,
+    EmbeddedRepositoryChunk,
+)
+from llm_engineering.domain.exceptions import EmbeddingError
+from llm_engineering.infrastructure import instrumentation
+from llm_engineering.settings import settings
+
+from .hybrid import HybridSearch, reciprocal_rank_fusion
+from .reranking import Reranker, RerankStats
+
+DEFAULT_DOCUMENT_CLASSES = (EmbeddedPostChunk, EmbeddedArticleChunk, EmbeddedRepositoryChunk)
+
+
+@dataclass
+class RetrievalStats:
+    """Per-stage measurements of one retrieval, so slow requests can be attributed to a stage."""
+
+    cached: bool = False
+    embedding_cached: bool = False
+    candidates: int = 0
+    duplicates: int = 0
+    dropped_by_budget: int = 0
+    embed_ms: float = 0.0
+    search_ms: float = 0.0
+    dedupe_ms: float = 0.0
+    rerank_ms: float = 0.0
+    budget_ms: float = 0.0
+    total_ms: float = 0.0
+    rerank: RerankStats | None = None
+
+    @property
+    def stages(self) -> dict[str, float]:
+        return {
+            "embed": self.embed_ms,
+            "search": self.search_ms,
+            "dedupe": self.dedupe_ms,
+            "rerank": self.rerank_ms,
+            "budget": self.budget_ms,
+        }
+
+
+@dataclass
+class RetrievalResult:
+    """The retrieved chunks, best first, and the context built from them."""
+
+    documents: list[EmbeddedChunk]
+    context: str
+    num_tokens: int
+    stats: RetrievalStats = field(default_factory=RetrievalStats)
+
+
+class ContextRetriever:
+    """
+    Retrieves the context of a query from the posts, articles and repositories collections.
+
+    The query is embedded once (embeddings are cached per query), every collection
+    is searched concurrently and the per-collection rankings are merged with
+    reciprocal-rank fusion. Chunks returned by several collections or with the same
+    content are kept once, the rest are reranked with a cross-encoder and as many
+    as fit the token budget form the context. Final results are cached for
+    `result_cache_ttl` seconds, keyed by the normalised query, the filters and `k`.
+
+    Filters are payload fields shared by the chunk classes, e.g. `author_id=...`
+    or `platform=["medium", "github"]`.
+    """
+
+    def __init__(
+        self,
+        embedding_model: Callable[..., Any] | None = None,
+        reranker: Reranker | None = None,
+        document_classes: Sequence[type[EmbeddedChunk]] = DEFAULT_DOCUMENT_CLASSES,
+        hybrid: bool = False,
+        candidates_per_collection: int = settings.RETRIEVAL_CANDIDATES_PER_COLLECTION,
+        top_k: int = settings.RETRIEVAL_TOP_K,
+        max_context_tokens: int | None = None,
+        token_counter: Callable[[str], int] | None = None,
+        embedding_cache_size: int = settings.RETRIEVAL_EMBEDDING_CACHE_SIZE,
+        result_cache_size: int = settings.RETRIEVAL_RESULT_CACHE_SIZE,
+        result_cache_ttl: float = settings.RETRIEVAL_RESULT_CACHE_TTL_S,
+    ) -> None:
+        self._embedding_model = embedding_model if embedding_model is not None else EmbeddingModelSingleton()
+        self._reranker = reranker if reranker is not None else Reranker()
+        self.document_classes = tuple(document_classes)
+        self.candidates_per_collection = candidates_per_collection
+        self.top_k = top_k
+        self.max_context_tokens = max_context_tokens or int(
+            settings.OPEN_MAX_TOKEN_WINDOW * settings.RETRIEVAL_CONTEXT_TOKEN_SHARE
+        )
+        self._token_counter = token_counter
+
+        self._hybrid_searches = (
+            {
+                document_class: HybridSearch(document_class, candidates=candidates_per_collection)
+                for document_class in self.document_classes
+            }
+            if hybrid
+            else {}
+        )
+        self._executor = ThreadPoolExecutor(max_workers=len(self.document_classes), thread_name_prefix="retriever")
+        self._embedding_cache: LRUCache[str, list[float]] = LRUCache(maxsize=embedding_cache_size)
+        self._result_cache: TTLCache[tuple, RetrievalResult] = TTLCache(
+            maxsize=result_cache_size, ttl=result_cache_ttl
+        )
+
+    def search(self, query: str, k: int | None = None, **filters: Any) -> list[EmbeddedChunk]:
+        return self.retrieve(query, k=k, **filters).documents
+
+    @instrumentation.traced("rag.retrieve")
+    def retrieve(self, query: str, k: int | None = None, **filters: Any) -> RetrievalResult:
+        """
+        Runs the retrieval pipeline: embed, search, deduplicate, rerank and fit the token budget.
+
+        Args:
+            query (str): The user query.
+            k (int | None): The maximum number of chunks to return. Defaults to `top_k`.
+            **filters: Payload fields every returned chunk must match.
+
+        Returns:
+            RetrievalResult: The chunks, best first, the joined context, its token count and the timings.
+        """
+        start_time = time.perf_counter()
+        query = _normalize_query(query)
+        k = k or self.top_k
+
+        cache_key = (query, _freeze(filters), k)
+        cached_result = self._result_cache.get(cache_key)
+        if cached_result is not None:
+            instrumentation.count("rag.retrieve.cache_hits")
+            stats = RetrievalStats(cached=True, total_ms=(time.perf_counter() - start_time) * 1000)
+
+            # Every caller gets its own list, so mutating it cannot corrupt the cached result.
+            return replace(cached_result, documents=list(cached_result.documents), stats=stats)
+
+        stats = RetrievalStats()
+
+        stage_start = time.perf_counter()
+        query_vector = self._embed(query, stats)
+        stats.embed_ms = _elapsed_ms(stage_start)
+
+        stage_start = time.perf_counter()
+        rankings = self._search(query, query_vector, filters)
+        stats.search_ms = _elapsed_ms(stage_start)
+
+        stage_start = time.perf_counter()
+        candidates = self._deduplicate(rankings, stats)
+        stats.dedupe_ms = _elapsed_ms(stage_start)
+
+        stage_start = time.perf_counter()
+        documents, stats.rerank = self._reranker.rerank(query, candidates, keep_top_k=k)
+        stats.rerank_ms = _elapsed_ms(stage_start)
+
+        stage_start = time.perf_counter()
+        documents, context, num_tokens = self._fit_token_budget(documents)
+        stats.dropped_by_budget = min(len(candidates), k) - len(documents)
+        stats.budget_ms = _elapsed_ms(stage_start)
+
+        stats.total_ms = _elapsed_ms(start_time)
+        logger.debug(
+            f"Retrieved {len(documents)} chunks ({num_tokens} tokens) in {stats.total_ms:.1f}ms: "
+            + ", ".join(f"{stage} {ms:.1f}ms" for stage, ms in stats.stages.items())
+        )
+
+        result = RetrievalResult(documents=documents, context=context, num_tokens=num_tokens, stats=stats)
+        self._result_cache.put(cache_key, replace(result, documents=list(documents)))
+
+        return result
+
+    def clear_cache(self) -> None:
+        self._embedding_cache.clear()
+        self._result_cache.clear()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        for hybrid_search in self._hybrid_searches.values():
+            hybrid_search.close()
+
+    def _embed(self, query: str, stats: RetrievalStats) -> list[float]:
+        query_vector = self._embedding_cache.get(query)
+        if query_vector is not None:
+            stats.embedding_cached = True
+
+            return query_vector
+
+        query_vector = self._embedding_model(query, to_list=True)
+        # The embedding model logs failures and returns an empty vector; caching it would fail the query until evicted.
+        expected_size = getattr(self._embedding_model, "embedding_size", None)
+        if len(query_vector) == 0 or (expected_size is not None and len(query_vector) != expected_size):
+            raise EmbeddingError(f"Failed to embed the query: got a vector of size {len(query_vector)}.")
+        self._embedding_cache.put(query, query_vector)
+
+        return query_vector
+
+    @instrumentation.traced("rag.search")
+    def _search(self, query: str, query_vector: list[float], filters: dict[str, Any]) -> list[list[EmbeddedChunk]]:
+        query_filters = {
+            document_class: FilterBuilder(document_class).where(**filters) if filters else None
+            for document_class in self.document_classes
+        }
+
+        if self._hybrid_searches:
+            futures = [
+                self._executor.submit(
+                    hybrid_search.search,
+                    query,
+                    query_vector,
+                    limit=self.candidates_per_collection,
+                    query_filter=query_filters[document_class],
+                )
+                for document_class, hybrid_search in self._hybrid_searches.items()
+            ]
+
+            return [future.result() for future in futures]
+
+        results = EmbeddedChunk.search_collections(
+            {
+                document_class: [VectorQuery(query_vector, self.candidates_per_collection, query_filters[document_class])]
+                for document_class in self.document_classes
+            }
+        )
+
+        return [class_results[0] for class_results in results.values()]
+
+    @staticmethod
+    def _deduplicate(rankings: list[list[EmbeddedChunk]], stats: RetrievalStats) -> list[EmbeddedChunk]:
+        # Collections score on different scales, so only ranks are merged.
+        documents = {document.id: document for ranking in rankings for document in ranking}
+        fused = reciprocal_rank_fusion([document.id for document in ranking] for ranking in rankings)
+
+        candidates, seen_contents = [], set()
+        for doc_id, _ in fused:
+            content_hash = hashlib.md5(documents[doc_id].content.encode("utf-8")).digest()
+            if content_hash in seen_contents:
+                continue
+            seen_contents.add(content_hash)
+            candidates.append(documents[doc_id])
+
+        stats.candidates = len(candidates)
+        stats.duplicates = sum(len(ranking) for ranking in rankings) - len(candidates)
+
+        return candidates
+
+    def _fit_token_budget(self, documents: list[EmbeddedChunk]) -> tuple[list[EmbeddedChunk], str, int]:
+        """Keeps the documents, in order, that fit `max_context_tokens`; larger ones are skipped."""
+        kept, num_tokens = [], 0
+        for document in documents:
+            document_tokens = self._count_tokens(document.content)
+            if num_tokens + document_tokens > self.max_context_tokens:
+                continue
+            kept.append(document)
+            num_tokens += document_tokens
+
+        return kept, "\n\n".join(document.content for document in kept), num_tokens
+
+    def _count_tokens(self, text: str) -> int:
+        if self._token_counter is None:
+            self._token_counter = _openai_token_counter()
+
+        return self._token_counter(text)
+
+
+def _openai_token_counter() -> Callable[[str], int]:
+    # Imported lazily: the encoding files are only fetched when a budget is first computed.
+    import tiktoken
+
+    try:
+        encoding = tiktoken.encoding_for_model(settings.OPENAI_MODEL_ID)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted(str(_freeze(item)) for item in value))
+
+    return str(value)
+
+
+def _elapsed_ms(start_time: float) -> float:
+    return (time.perf_counter() - start_time) * 1000
@@ -0,0 +1,154 @@
+import gzip
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+from llm_engineering.settings import settings
+
+_WORD_RE = re.compile(r"\w+")
+_IDENTIFIER_PART_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lower-cased word tokens that keep code identifiers searchable both whole and by part.
+
+    `getUserName` yields `getusername`, `get`, `user`, `name`; `max_batch_bytes`
+    yields `max_batch_bytes`, `max`, `batch`, `bytes`. Plain words are kept as is.
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        tokens.append(word.lower())
+
+        parts = [part for chunk in word.split("_") for part in _IDENTIFIER_PART_RE.findall(chunk)]
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts)
+
+    return tokens
+
+
+class BM25Index:
+    """
+    In-memory inverted index scored with Okapi BM25.
+
+    Keeps, for every term, the term frequency per document id, plus every
+    document's length and term counts so documents can be replaced or removed.
+    Ids are the ids of the matching points in the vector collection, so sparse
+    hits can be joined with dense hits. Thread-safe.
+    """
+
+    def __init__(self, k1: float = settings.BM25_K1, b: float = settings.BM25_B) -> None:
+        self.k1 = k1
+        self.b = b
+
+        self._postings: dict[str, dict[str, int]] = {}
+        self._documents: dict[str, dict[str, int]] = {}
+        self._lengths: dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return str(doc_id) in self._documents
+
+    def add(self, doc_id: object, text: str) -> None:
+        """Indexes a document, replacing any previous version with the same id."""
+        terms = Counter(tokenize(text))
+        doc_id = str(doc_id)
+
+        with self._lock:
+            self._remove(doc_id)
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = frequency
+            self._documents[doc_id] = dict(terms)
+            self._lengths[doc_id] = sum(terms.values())
+            self._total_length += self._lengths[doc_id]
+
+    def add_documents(self, documents: Iterable) -> None:
+        """Indexes documents exposing an `id` and a text `content`, such as chunks."""
+        for document in documents:
+            self.add(document.id, document.content)
+
+    def remove(self, doc_ids: Iterable[object]) -> None:
+        with self._lock:
+            for doc_id in doc_ids:
+                self._remove(str(doc_id))
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[str, float]]:
+        """
+        Returns the ids of the best matching documents with their BM25 scores, best first.
+
+        Only the posting lists of the query terms are visited.
+        """
+        query_terms = Counter(tokenize(query))
+
+        with self._lock:
+            num_documents = len(self._documents)
+            if num_documents == 0:
+                return []
+            average_length = self._total_length / num_documents
+
+            scores: dict[str, float] = {}
+            for term, query_frequency in query_terms.items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (num_documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + query_frequency * idf * frequency * (self.k1 + 1) / (
+                        frequency + norm
+                    )
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def save(self, path: str | Path) -> None:
+        """
+        Writes the index as gzipped JSON.
+
+        The file is written next to `path` and then renamed over it, so an interrupted
+        save leaves the previous index intact instead of a truncated one.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            documents = {doc_id: dict(terms) for doc_id, terms in self._documents.items()}
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "documents": documents}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BM25Index":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+
+        index = cls(k1=data["k1"], b=data["b"])
+        for doc_id, terms in data["documents"].items():
+            for term, frequency in terms.items():
+                index._postings.setdefault(term, {})[doc_id] = frequency
+            index._documents[doc_id] = terms
+            index._lengths[doc_id] = sum(terms.values())
+            index._total_length += index._lengths[doc_id]
+
+        return index
+
+    def _remove(self, doc_id: str) -> None:
+        terms = self._documents.pop(doc_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
@@ -0,0 +1,4 @@
+from .engine import Stage, StreamingPipeline, StreamReport
+from .etl import ETLReport, StreamingETL, UserReport
+
+__all__ = ["ETLReport", "Stage", "StreamReport", "StreamingETL", "StreamingPipeline", "UserReport"]
@@ -0,0 +1,336 @@
+"""
+A staged streaming engine: items flow from a source through stages connected by
+bounded queues.
+
+Every stage runs its own workers, threads for I/O-bound work or processes for
+CPU-bound work, so all stages make progress at the same time. A full queue blocks
+the stage feeding it, and back-pressure propagates up to the source, so the
+number of items in memory is bounded by the queue sizes whatever the size of the
+input. Each stage counts the items it received and produced, its errors, its busy
+time and the depth of its input queue.
+
+موتور خط لوله‌ی جریانی: هر مرحله با نخ‌ها یا پردازه‌های خودش اجرا می‌شود و مراحل با
+صف‌های محدود به هم وصل‌اند؛ پر شدن یک صف مرحله‌ی قبلی را متوقف می‌کند، پس حافظه ثابت
+می‌ماند و مراحل هم‌زمان پیش می‌روند. توان عملیاتی و عمق صف هر مرحله اندازه‌گیری می‌شود.
+"""
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Literal, Sequence
+
+from loguru import logger
+
+from llm_engineering.infrastructure import instrumentation
+
+# Marks the end of the stream in a stage's input queue: one per worker of the stage.
+_END = object()
+_POLL_S = 0.1
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One step of a `StreamingPipeline`.
+
+    `fn` is called with each input item, or with lists of up to `batch_size` items,
+    and returns one output, or an iterable of outputs with `fan_out`. None outputs
+    are dropped. Process stages need a picklable, module-level `fn`; their
+    `initializer(*initargs)` runs once in every worker process (once in this
+    process for thread stages), to set up state such as models.
+    """
+
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    executor: Literal["thread", "process"] = "thread"
+    queue_size: int = 64
+    batch_size: int | None = None
+    batch_timeout_s: float = 0.05
+    fan_out: bool = False
+    fail_fast: bool = False
+    initializer: Callable[..., None] | None = None
+    initargs: tuple = ()
+
+    def __post_init__(self) -> None:
+        if self.workers < 1 or self.queue_size < 1:
+            raise ValueError(f"Stage '{self.name}' needs at least one worker and a queue of at least one item.")
+        if self.executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor {self.executor!r} for stage '{self.name}'.")
+
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int
+    executor: str
+    queue_size: int
+    items_in: int = 0
+    items_out: int = 0
+    errors: int = 0
+    busy_s: float = 0.0
+    max_queue_depth: int = 0
+    _queue_depth_sum: int = field(default=0, repr=False)
+    _queue_depth_samples: int = field(default=0, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def sample_queue_depth(self, depth: int) -> None:
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            self._queue_depth_sum += depth
+            self._queue_depth_samples += 1
+
+    def record(self, items_in: int, items_out: int, busy_s: float, failed: bool) -> None:
+        with self._lock:
+            self.items_in += items_in
+            self.items_out += items_out
+            self.busy_s += busy_s
+            self.errors += failed
+
+    def as_dict(self, elapsed_s: float, queue_depth: int | None = None) -> dict:
+        with self._lock:
+            stats = {
+                "workers": self.workers,
+                "executor": self.executor,
+                "items_in": self.items_in,
+                "items_out": self.items_out,
+                "errors": self.errors,
+                "busy_s": round(self.busy_s, 3),
+                # Share of the workers' time spent working rather than waiting on the queues.
+                "utilisation": round(self.busy_s / (self.workers * elapsed_s), 3) if elapsed_s else 0.0,
+                "throughput_per_s": round(self.items_in / elapsed_s, 3) if elapsed_s else 0.0,
+                "queue_size": self.queue_size,
+                "max_queue_depth": self.max_queue_depth,
+                "mean_queue_depth": round(self._queue_depth_sum / self._queue_depth_samples, 3)
+                if self._queue_depth_samples
+                else 0.0,
+            }
+        if queue_depth is not None:
+            stats["queue_depth"] = queue_depth
+
+        return stats
+
+
+@dataclass
+class StreamReport:
+    elapsed_s: float
+    stages: dict[str, dict]
+
+    @property
+    def errors(self) -> int:
+        return sum(stats["errors"] for stats in self.stages.values())
+
+
+class PipelineStopped(Exception):
+    """Raised inside the pipeline's threads to unwind them once it is stopped."""
+
+
+class StreamingPipeline:
+    """
+    Runs `stages` over a source, one after the other for each item and all of them
+    at the same time across items.
+
+    Failing items are logged, counted and dropped, except in `fail_fast` stages,
+    where the first error stops the whole pipeline and is raised by `run`.
+    """
+
+    def __init__(self, stages: Sequence[Stage], progress_interval_s: float | None = 30.0) -> None:
+        if not stages:
+            raise ValueError("A streaming pipeline needs at least one stage.")
+        if len({stage.name for stage in stages}) != len(stages):
+            raise ValueError("Stage names must be unique.")
+
+        self.stages = list(stages)
+        self.progress_interval_s = progress_interval_s
+        self._queues: list[queue.Queue] = []
+        self._stats: list[StageStats] = []
+        self._start_time: float | None = None
+        self._stop = threading.Event()
+        self._error: BaseException | None = None
+
+    def run(self, source: Iterable[Any]) -> StreamReport:
+        """Stream every item of `source` through the stages and wait until all of them are done."""
+        self._queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        self._stats = [StageStats(stage.name, stage.workers, stage.executor, stage.queue_size) for stage in self.stages]
+        self._stop.clear()
+        self._error = None
+        self._start_time = time.perf_counter()
+
+        executors = [self._start_executor(stage) for stage in self.stages]
+        remaining_workers = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+
+        def work(index: int) -> None:
+            try:
+                self._work(index, executors[index])
+            except PipelineStopped:
+                pass
+            except BaseException as e:  # A bug in the engine itself: stop rather than hang.
+                self._fail(self.stages[index], e)
+            finally:
+                with remaining_lock:
+                    remaining_workers[index] -= 1
+                    last = remaining_workers[index] == 0
+                if last and index + 1 < len(self.stages):
+                    self._end_stream(index + 1)
+
+        threads = [threading.Thread(target=self._feed, args=(source,), name="stream-source", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(target=work, args=(index,), name=f"stream-{stage.name}-{i}", daemon=True)
+                for i in range(stage.workers)
+            )
+
+        for thread in threads:
+            thread.start()
+        try:
+            self._wait(threads)
+        finally:
+            self._stop.set()
+            for executor in executors:
+                if executor is not None:
+                    executor.shutdown(wait=True, cancel_futures=True)
+
+        report = StreamReport(elapsed_s=time.perf_counter() - self._start_time, stages=self.stats())
+        if self._error is not None:
+            raise self._error
+
+        return report
+
+    def stats(self) -> dict[str, dict]:
+        """The counters of every stage, including the current depth of its queue. Safe to call while running."""
+        elapsed_s = time.perf_counter() - self._start_time if self._start_time is not None else 0.0
+
+        return {
+            stats.name: stats.as_dict(elapsed_s, queue_depth=stage_queue.qsize())
+            for stats, stage_queue in zip(self._stats, self._queues, strict=True)
+        }
+
+    def _start_executor(self, stage: Stage) -> Executor | None:
+        if stage.executor == "thread":
+            if stage.initializer is not None:
+                stage.initializer(*stage.initargs)
+
+            return None
+
+        # Spawned rather than forked: the pipeline's threads may hold locks a fork would copy.
+        return ProcessPoolExecutor(
+            max_workers=stage.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=stage.initializer,
+            initargs=stage.initargs,
+        )
+
+    def _feed(self, source: Iterable[Any]) -> None:
+        try:
+            for item in source:
+                self._put(0, item)
+        except PipelineStopped:
+            return
+        except Exception as e:
+            self._fail(None, e)
+
+            return
+
+        self._end_stream(0)
+
+    def _work(self, index: int, executor: Executor | None) -> None:
+        stage, stats = self.stages[index], self._stats[index]
+        is_last = index + 1 == len(self.stages)
+
+        while True:
+            items, ended = self._take(index)
+            if items:
+                start_time = time.perf_counter()
+                argument = items if stage.batch_size else items[0]
+                try:
+                    with instrumentation.span("stream.stage", stage=stage.name):
+                        result = stage.fn(argument) if executor is None else executor.submit(stage.fn, argument).result()
+                    outputs = [] if result is None else list(result) if stage.fan_out else [result]
+                except Exception as e:
+                    stats.record(len(items), 0, time.perf_counter() - start_time, failed=True)
+                    if stage.fail_fast:
+                        self._fail(stage, e)
+
+                        raise PipelineStopped from e
+                    logger.opt(exception=e).error(f"Stage '{stage.name}' failed on {len(items)} item(s): {e!s}")
+                else:
+                    outputs = [output for output in outputs if output is not None]
+                    stats.record(len(items), len(outputs), time.perf_counter() - start_time, failed=False)
+                    if not is_last:
+                        for output in outputs:
+                            self._put(index + 1, output)
+            if ended:
+                return
+
+    def _take(self, index: int) -> tuple[list, bool]:
+        """The next item, or batch of items, of stage `index`, and whether its stream ended."""
+        stage = self.stages[index]
+        item = self._get(index)
+        if item is _END:
+            return [], True
+        if not stage.batch_size:
+            return [item], False
+
+        items = [item]
+        linger_until = time.perf_counter() + stage.batch_timeout_s
+        while len(items) < stage.batch_size:
+            try:
+                item = self._queues[index].get(timeout=max(linger_until - time.perf_counter(), 0.0))
+            except queue.Empty:
+                break
+            if item is _END:
+                return items, True
+            items.append(item)
+
+        return items, False
+
+    def _get(self, index: int) -> Any:
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped
+            try:
+                return self._queues[index].get(timeout=_POLL_S)
+            except queue.Empty:
+                continue
+
+    def _put(self, index: int, item: Any) -> None:
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped
+            try:
+                self._queues[index].put(item, timeout=_POLL_S)
+            except queue.Full:
+                continue
+            self._stats[index].sample_queue_depth(self._queues[index].qsize())
+
+            return
+
+    def _end_stream(self, index: int) -> None:
+        try:
+            for _ in range(self.stages[index].workers):
+                self._put(index, _END)
+        except PipelineStopped:
+            pass
+
+    def _fail(self, stage: Stage | None, error: BaseException) -> None:
+        if self._error is None:
+            self._error = error
+            logger.error(f"Stopping the streaming pipeline: {'the source' if stage is None else stage.name} failed: {error!s}")
+        self._stop.set()
+
+    def _wait(self, threads: list[threading.Thread]) -> None:
+        last_progress = time.perf_counter()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1.0)
+                if self.progress_interval_s is not None and time.perf_counter() - last_progress >= self.progress_interval_s:
+                    last_progress = time.perf_counter()
+                    logger.info(f"Streaming pipeline progress: {self._progress_line()}")
+
+    def _progress_line(self) -> str:
+        return ", ".join(
+            f"{name} {stats['items_in']} in / {stats['queue_depth']} queued" for name, stats in self.stats().items()
+        )
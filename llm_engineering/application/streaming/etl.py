@@ -0,0 +1,360 @@
+"""
+The digital-data ETL as one streaming pipeline: crawl → store → clean → chunk → embed → load.
+
+    crawl + store (threads)   links are claimed from the crawl frontier as the stage
+                              has room for them; each crawler fetches, parses and
+                              saves its document to MongoDB;
+    chunk (processes)         the documents are cleaned and split into chunks;
+    embed (processes)         the chunks are embedded in batches;
+    load (threads)            the embedded chunks are upserted into Qdrant and added
+                              to the BM25 index of their collection, saved once the
+                              stream ends.
+
+A document is searchable as soon as its own chunks are loaded, not once every link
+has been crawled, and memory is bounded by the queues between the stages.
+
+One run crawls the links of many users. Their links are claimed in turns, one per
+user with a claimable link, so an author with thousands of links does not hold back
+the others, and the report counts the links, documents and chunks of every user.
+
+خط لوله‌ی جریانی داده‌های دیجیتال: خزش، ذخیره، پاک‌سازی، قطعه‌بندی، بردارسازی و
+بارگذاری، هر مرحله با هم‌روندی خودش و صف‌های محدود میان مراحل. پیوندهای چند کاربر
+به نوبت برداشته می‌شوند تا هیچ نویسنده‌ای نوبت دیگران را نگیرد.
+"""
+import os
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Sequence
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from llm_engineering.application.crawlers.dispatcher import CrawlerDispatcher
+from llm_engineering.application.crawlers.parsing import start_parse_pool
+from llm_engineering.application.crawlers.resilience import Deadline
+from llm_engineering.application.networks import EmbeddingModelSingleton
+from llm_engineering.application.preprocessing.chunking import TokenChunker, chunk_documents
+from llm_engineering.application.preprocessing.ingestion import SOURCES, load_sparse_index
+from llm_engineering.application.rag.hybrid import sparse_index_path
+from llm_engineering.domain.base.content import LazyContent
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.chunks import Chunk
+from llm_engineering.domain.documents import Document, UserDocument
+from llm_engineering.domain.embedded_chunks import EmbeddedChunk
+from llm_engineering.domain.exceptions import CircuitOpenError
+from llm_engineering.infrastructure.db.crawl_frontier import CrawlFrontier, FrontierLink
+from llm_engineering.settings import settings
+
+from .engine import Stage, StreamingPipeline
+
+# Seconds between two frontier polls while links are crawled but none can be claimed.
+_FRONTIER_POLL_S = 0.5
+
+
+def crawl_claimed_link(
+    dispatcher: CrawlerDispatcher, frontier: CrawlFrontier, link: str, user: UserDocument, worker_id: str
+) -> bool:
+    """Crawl a link `worker_id` claimed from `frontier` and record the outcome in it. Returns whether it succeeded."""
+    crawler = dispatcher.get_crawler(link)
+
+    try:
+        crawler.crawl(link, deadline=Deadline.after(settings.CRAWL_LINK_DEADLINE_S), user=user)
+    except CircuitOpenError as e:
+        # The domain is failing: retry the link once its circuit lets calls through again.
+        frontier.postpone(link, worker_id, e.retry_after)
+        logger.warning(f"Skipping {link} for now: {e!s}")
+
+        return False
+    except Exception as e:
+        state = frontier.fail(link, worker_id, f"{type(e).__name__}: {e!s}")
+        logger.error(f"An error occurred while crawling {link} ({state or 'claim lost'}): {e!s}")
+
+        return False
+
+    if not frontier.complete(link, worker_id):
+        # The document is saved; the worker that took over the expired claim finds it and skips the link.
+        logger.warning(f"Crawled {link} after its claim expired; another worker holds it now.")
+
+    return True
+
+
+@dataclass
+class UserReport:
+    full_name: str
+    links: int = 0
+    crawled_links: list[str] = field(default_factory=list)
+    failed_links: int = 0
+    documents: int = 0
+    chunks: int = 0
+    frontier: dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "full_name": self.full_name,
+            "links": self.links,
+            "crawled_links": len(self.crawled_links),
+            "failed_links": self.failed_links,
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "frontier": self.frontier,
+        }
+
+
+@dataclass
+class ETLReport:
+    crawled_links: list[str] = field(default_factory=list)
+    failed_links: int = 0
+    documents: int = 0
+    chunks: int = 0
+    elapsed_s: float = 0.0
+    stages: dict[str, dict] = field(default_factory=dict)
+    frontier: dict[str, int] = field(default_factory=dict)
+    # Keyed by user id.
+    users: dict[str, UserReport] = field(default_factory=dict)
+
+
+class StreamingETL:
+    """
+    Crawls links into MongoDB and their chunks into Qdrant, streaming every document
+    through all the stages as soon as it is crawled.
+
+    Crawls resume from the crawl frontier like `crawl_links`: links done by an earlier
+    run are skipped and links it left in flight are crawled again. With `embed=False`
+    the pipeline stops after the crawl, and `feature_engineering` embeds the documents.
+
+    Crawled pages are parsed in a process pool, so concurrent crawls do not take turns
+    on the GIL: one process per crawl worker, up to the CPUs, unless
+    `settings.CRAWL_PARSE_WORKERS` sets the pool size.
+
+    The ingestion watermarks are left alone: the next `IncrementalEmbeddingPipeline`
+    run embeds the streamed documents again, overwriting the same chunk ids, rather
+    than skipping documents written elsewhere since its last run.
+    """
+
+    def __init__(
+        self,
+        dispatcher: CrawlerDispatcher | None = None,
+        frontier: CrawlFrontier | None = None,
+        chunker: TokenChunker | None = None,
+        embedding_model: Callable[..., list[list[float]]] | None = None,
+        embed: bool = True,
+        update_sparse_indexes: bool = True,
+        crawl_workers: int | None = None,
+        chunk_workers: int | None = None,
+        chunk_executor: str | None = None,
+        embed_workers: int | None = None,
+        embed_executor: str | None = None,
+        embed_batch_size: int | None = None,
+        load_workers: int | None = None,
+        queue_size: int | None = None,
+    ) -> None:
+        self.dispatcher = dispatcher or CrawlerDispatcher.build().register_linkedin().register_medium().register_github()
+        self.frontier = frontier or CrawlFrontier()
+        self.chunker = chunker
+        self.embedding_model = embedding_model
+        self.embed = embed
+        self.update_sparse_indexes = update_sparse_indexes
+        self.crawl_workers = crawl_workers or settings.ETL_CRAWL_WORKERS
+        self.chunk_workers = chunk_workers or settings.ETL_CHUNK_WORKERS
+        self.chunk_executor = chunk_executor or settings.ETL_CHUNK_EXECUTOR
+        self.embed_workers = embed_workers or settings.ETL_EMBED_WORKERS
+        self.embed_executor = embed_executor or settings.ETL_EMBED_EXECUTOR
+        self.embed_batch_size = embed_batch_size or settings.INGESTION_EMBEDDING_BATCH_SIZE
+        self.load_workers = load_workers or settings.ETL_LOAD_WORKERS
+        self.queue_size = queue_size or settings.ETL_QUEUE_SIZE
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def run(self, user: UserDocument, links: list[str]) -> ETLReport:
+        return self.run_many([(user, links)])
+
+    def run_many(self, jobs: Sequence[tuple[UserDocument, Sequence[str]]]) -> ETLReport:
+        """
+        Stream the links of every `(user, links)` job in one run, claiming the users'
+        links in turns. A link already in the frontier keeps the user it was added for.
+        """
+        report = ETLReport()
+        lock = threading.Lock()
+        users: dict[str, UserDocument] = {}
+        for user, links in jobs:
+            user_id = str(user.id)
+            users[user_id] = user
+            user_report = report.users.setdefault(user_id, UserReport(full_name=user.full_name))
+            user_report.links += len(links)
+
+        new_links = resumed = 0
+        for user, links in jobs:
+            new_links += self.frontier.add(links, user_id=str(user.id))
+        for user_id in users:
+            resumed += self.frontier.requeue_in_flight(user_id=user_id)
+        total_links = sum(user_report.links for user_report in report.users.values())
+        logger.info(
+            f"Streaming {total_links} link(s) of {len(users)} user(s): {new_links} new, "
+            f"{resumed} resumed from an interrupted run."
+        )
+
+        def crawl(link: FrontierLink) -> list[Document]:
+            user_report = report.users[link.user_id]
+            if not crawl_claimed_link(self.dispatcher, self.frontier, link.link, users[link.user_id], self.worker_id):
+                with lock:
+                    report.failed_links += 1
+                    user_report.failed_links += 1
+
+                return []
+
+            documents = self._stored_documents(link.link)
+            with lock:
+                report.crawled_links.append(link.link)
+                report.documents += len(documents)
+                user_report.crawled_links.append(link.link)
+                user_report.documents += len(documents)
+
+            return documents
+
+        sparse_indexes = {}
+        if self.embed and self.update_sparse_indexes:
+            sparse_indexes = {embedded_class: load_sparse_index(embedded_class) for _, embedded_class in SOURCES}
+
+        def load(embedded_chunks: list[EmbeddedChunk]) -> int:
+            if not VectorBaseDocument.bulk_insert_mixed(embedded_chunks):
+                raise RuntimeError(f"Failed to upsert {len(embedded_chunks)} chunks into Qdrant.")
+            for chunk in embedded_chunks:
+                if (sparse_index := sparse_indexes.get(type(chunk))) is not None:
+                    sparse_index.add(chunk.id, chunk.content)
+            with lock:
+                report.chunks += len(embedded_chunks)
+                for chunk in embedded_chunks:
+                    if (user_report := report.users.get(str(chunk.author_id))) is not None:
+                        user_report.chunks += 1
+
+            return len(embedded_chunks)
+
+        if settings.CRAWL_PARSE_WORKERS is None and self.crawl_workers > 1:
+            start_parse_pool(min(self.crawl_workers, os.cpu_count() or 1))
+
+        stages = [Stage("crawl", crawl, workers=self.crawl_workers, queue_size=self.queue_size, fan_out=True)]
+        if self.embed:
+            for _, embedded_class in SOURCES:
+                embedded_class.get_or_create_collection()
+            stages += [
+                Stage(
+                    "chunk",
+                    _chunk_batch,
+                    workers=self.chunk_workers,
+                    executor=self.chunk_executor,
+                    queue_size=self.queue_size,
+                    batch_size=settings.CHUNKING_BATCH_SIZE,
+                    fan_out=True,
+                    initializer=_init_chunk_worker,
+                    initargs=(self.chunker,),
+                ),
+                Stage(
+                    "embed",
+                    _embed_batch,
+                    workers=self.embed_workers,
+                    executor=self.embed_executor,
+                    queue_size=self.queue_size,
+                    batch_size=self.embed_batch_size,
+                    fail_fast=True,
+                    initializer=_init_embed_worker,
+                    initargs=(self.embedding_model,),
+                ),
+                Stage("load", load, workers=self.load_workers, queue_size=self.queue_size, fail_fast=True),
+            ]
+
+        try:
+            stream = StreamingPipeline(stages).run(self._claims(list(users)))
+        finally:
+            # The chunks loaded before a failure are in Qdrant, so their terms are kept too.
+            for embedded_class, sparse_index in sparse_indexes.items():
+                sparse_index.save(sparse_index_path(embedded_class))
+
+        report.elapsed_s = stream.elapsed_s
+        report.stages = stream.stages
+        for user_id, user_report in report.users.items():
+            user_report.frontier = self.frontier.stats(user_id=user_id)
+            for state, count in user_report.frontier.items():
+                report.frontier[state] = report.frontier.get(state, 0) + count
+        logger.info(
+            f"Streamed {len(report.crawled_links)} / {total_links} link(s) of {len(users)} user(s) into "
+            f"{report.documents} document(s) and {report.chunks} chunk(s) in {report.elapsed_s:.1f}s."
+        )
+
+        return report
+
+    def _claims(self, user_ids: list[str]) -> Iterator[FrontierLink]:
+        """
+        The frontier's links, claimed one at a time as the crawl stage takes them, so
+        that leases start when crawling does. Users take turns, one link each, and
+        a user leaves the rotation once none of their links is left to crawl, after
+        the retries of the links failing in the meantime.
+        """
+        rotation = deque(user_ids)
+        while rotation:
+            claimed_any = False
+            next_wait: float | None = None
+            for _ in range(len(rotation)):
+                user_id = rotation.popleft()
+                claimed = self.frontier.claim(self.worker_id, user_id=user_id)
+                if claimed:
+                    claimed_any = True
+                    rotation.append(user_id)
+                    yield from claimed
+
+                    continue
+
+                wait = self.frontier.seconds_until_eligible(user_id=user_id)
+                if wait is None:
+                    continue
+                rotation.append(user_id)
+                next_wait = wait if next_wait is None else min(next_wait, wait)
+
+            if not claimed_any and next_wait is not None:
+                time.sleep(min(next_wait, _FRONTIER_POLL_S))
+
+    def _stored_documents(self, link: str) -> list[Document]:
+        document = self.dispatcher.get_crawler_class(link).model.find(link=link)
+        if document is None:
+            logger.debug(f"No document stored for {link} ({urlparse(link).netloc}), nothing to embed.")
+
+            return []
+        # Spilled content is fetched here, once, rather than pickled unread to the chunking processes.
+        if isinstance(document.content, LazyContent):
+            document.content = dict(document.content)
+
+        return [document]
+
+
+# The state of a chunking or embedding worker, set by the stage initializers: in each
+# worker process for process stages, in this process for thread stages.
+_worker_state: dict[str, object] = {}
+
+
+def _init_chunk_worker(chunker: TokenChunker | None) -> None:
+    _worker_state["chunker"] = chunker or TokenChunker()
+
+
+def _chunk_batch(documents: list[Document]) -> list[Chunk]:
+    return chunk_documents(documents, _worker_state["chunker"])
+
+
+def _init_embed_worker(embedding_model: Callable[..., list[list[float]]] | None) -> None:
+    _worker_state["embedding_model"] = embedding_model if embedding_model is not None else EmbeddingModelSingleton()
+    _worker_state["embedded_classes"] = {
+        embedded_class.get_category(): embedded_class for _, embedded_class in SOURCES
+    }
+
+
+def _embed_batch(chunks: list[Chunk]) -> list[EmbeddedChunk]:
+    embeddings = _worker_state["embedding_model"]([chunk.content for chunk in chunks], to_list=True)
+    if len(embeddings) != len(chunks):
+        raise RuntimeError(f"Failed to embed {len(chunks)} chunks.")
+
+    embedded_classes = _worker_state["embedded_classes"]
+
+    return [
+        embedded_classes[chunk.get_category()](**chunk.model_dump(), embedding=embedding)
+        for chunk, embedding in zip(chunks, embeddings, strict=True)
+    ]
@@ -1,3 +1,5 @@
+from .caching import LRUCache, TTLCache
+from .misc import batch
 from .split_user_full_name import split_user_full_name
 
-__all__ = ["split_user_full_name"]
\ No newline at end of file
+__all__ = ["LRUCache", "TTLCache", "batch", "split_user_full_name"]
\ No newline at end of file
@@ -0,0 +1,14 @@
+from itertools import islice
+from typing import Generator, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+def batch(items: Iterable[T], size: int) -> Generator[list[T], None, None]:
+    """Yields consecutive lists of at most `size` items, consuming `items` lazily."""
+    if size <= 0:
+        raise ValueError("Batch size must be a positive integer.")
+
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,107 @@
+"""
+Transparent compression and externalisation of large document `content`.
+
+`encode_content` turns a content dict into what is stored in MongoDB:
+    - the dict itself, while its BSON size is at most `settings.CONTENT_COMPRESSION_THRESHOLD_BYTES`;
+    - an envelope holding the zstd-compressed BSON inline, up to `settings.CONTENT_SPILL_THRESHOLD_BYTES`;
+    - beyond that, an envelope holding only the key of the compressed bytes in the blob store.
+
+`decode_content` reverses it. Content kept in the blob store comes back as a
+`LazyContent`, a dict that fetches and decompresses itself on first access, so
+reading documents does not pull every large repository over the network.
+
+محتوای بزرگ اسناد به‌صورت فشرده (zstd) در مونگودیبی ذخیره می‌شود و اگر باز هم بزرگ
+باشد به مخزن بلاب منتقل می‌شود و فقط هنگام اولین دسترسی خوانده می‌شود. خواننده‌های
+فعلی همچنان یک دیکشنری معمولی دریافت می‌کنند.
+"""
+import bson
+import zstandard
+from bson.binary import Binary
+
+from llm_engineering.infrastructure.db.blob_store import get_blob_store
+from llm_engineering.settings import settings
+
+CODEC_KEY = "_codec"
+ZSTD = "zstd"
+
+
+class LazyContent(dict):
+    """
+    Content stored in the blob store, fetched on first access.
+
+    Until then it only holds the stored envelope, and saving the document again
+    writes the envelope back without fetching the content.
+    """
+
+    __slots__ = ("envelope", "loaded")
+
+    def __init__(self, envelope: dict) -> None:
+        super().__init__()
+        self.envelope = envelope
+        self.loaded = False
+
+    def load(self) -> "LazyContent":
+        if not self.loaded:
+            dict.update(self, _decompress(get_blob_store().get(self.envelope["blob"])))
+            self.loaded = True
+
+        return self
+
+    def __repr__(self) -> str:
+        if not self.loaded:
+            return f"LazyContent(blob={self.envelope['blob']!r}, size={self.envelope['size']})"
+
+        return dict.__repr__(self)
+
+
+def _loading(name: str):
+    method = getattr(dict, name)
+
+    def wrapper(self: LazyContent, *args, **kwargs):
+        self.load()
+
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+
+    return wrapper
+
+
+for _name in (
+    "__getitem__", "__setitem__", "__delitem__", "__contains__", "__iter__", "__reversed__", "__len__",
+    "__eq__", "__ne__", "__or__", "__ior__", "__reduce_ex__",
+    "get", "keys", "values", "items", "copy", "pop", "popitem", "setdefault", "update", "clear",
+):  # fmt: skip
+    setattr(LazyContent, _name, _loading(_name))
+
+
+def encode_content(content: dict) -> dict:
+    """The form of `content` to store in MongoDB."""
+    if isinstance(content, LazyContent) and not content.loaded:
+        return dict(content.envelope)
+
+    raw = bson.encode(content)
+    if len(raw) <= settings.CONTENT_COMPRESSION_THRESHOLD_BYTES:
+        return content
+
+    compressed = zstandard.ZstdCompressor(level=settings.CONTENT_COMPRESSION_LEVEL).compress(raw)
+    if len(compressed) > settings.CONTENT_SPILL_THRESHOLD_BYTES:
+        return {CODEC_KEY: ZSTD, "size": len(raw), "blob": get_blob_store().put(compressed)}
+
+    return {CODEC_KEY: ZSTD, "size": len(raw), "data": Binary(compressed)}
+
+
+def decode_content(stored: dict | None) -> dict | None:
+    """The content dict for a stored value: plain dicts (and missing content) are returned as they are."""
+    if not isinstance(stored, dict) or CODEC_KEY not in stored:
+        return stored
+    if stored[CODEC_KEY] != ZSTD:
+        raise ValueError(f"Unknown content codec '{stored[CODEC_KEY]}'.")
+    if "blob" in stored:
+        return LazyContent(stored)
+
+    return _decompress(stored["data"])
+
+
+def _decompress(data: bytes) -> dict:
+    return bson.decode(zstandard.ZstdDecompressor().decompress(data))
@@ -0,0 +1,94 @@
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel
+from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchText, MatchValue, Range
+
+
+class FilterBuilder:
+    """
+    Builds Qdrant payload filters for one document class.
+
+    Every field name is checked against the document model, so a typo fails
+    when the filter is built instead of silently matching nothing. Values are
+    converted to their payload representation (UUIDs become strings).
+
+    Example:
+        query_filter = EmbeddedArticleChunk.filter(author_id=author.id, platform="medium").build()
+        EmbeddedArticleChunk.search(query_vector, query_filter=query_filter)
+    """
+
+    def __init__(self, document_class: type[BaseModel] | None = None) -> None:
+        self._document_class = document_class
+        self._must: list[FieldCondition] = []
+        self._must_not: list[FieldCondition] = []
+
+    def where(self, **fields: Any) -> "FilterBuilder":
+        """Keeps points whose field equals the value, or any of the values if a list, tuple or set is given."""
+        for key, value in fields.items():
+            self._must.append(self._match(key, value))
+
+        return self
+
+    def exclude(self, **fields: Any) -> "FilterBuilder":
+        """Drops points whose field equals the value, or any of the values if a list, tuple or set is given."""
+        for key, value in fields.items():
+            self._must_not.append(self._match(key, value))
+
+        return self
+
+    def text(self, key: str, text: str) -> "FilterBuilder":
+        """Keeps points whose field contains every word of `text`. Needs a full-text index on the field."""
+        self._must.append(FieldCondition(key=self._check_key(key), match=MatchText(text=text)))
+
+        return self
+
+    def range(
+        self,
+        key: str,
+        gt: float | None = None,
+        gte: float | None = None,
+        lt: float | None = None,
+        lte: float | None = None,
+    ) -> "FilterBuilder":
+        """Keeps points whose numeric field lies within the given bounds."""
+        self._must.append(FieldCondition(key=self._check_key(key), range=Range(gt=gt, gte=gte, lt=lt, lte=lte)))
+
+        return self
+
+    def build(self) -> Filter | None:
+        """Returns the Qdrant filter, or None if no condition was added."""
+        if not self._must and not self._must_not:
+            return None
+
+        return Filter(must=self._must or None, must_not=self._must_not or None)
+
+    def _match(self, key: str, value: Any) -> FieldCondition:
+        key = self._check_key(key)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return FieldCondition(key=key, match=MatchAny(any=[_to_payload_value(v) for v in value]))
+
+        return FieldCondition(key=key, match=MatchValue(value=_to_payload_value(value)))
+
+    def _check_key(self, key: str) -> str:
+        if self._document_class is not None:
+            field_name = key.split(".", 1)[0]
+            if field_name not in self._document_class.model_fields:
+                raise ValueError(f"'{self._document_class.__name__}' has no field '{field_name}' to filter on.")
+
+        return key
+
+
+def as_filter(query_filter: Filter | FilterBuilder | None) -> Filter | None:
+    """Accepts either a ready Qdrant filter or a builder wherever a filter is expected."""
+    if isinstance(query_filter, FilterBuilder):
+        return query_filter.build()
+
+    return query_filter
+
+
+def _to_payload_value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+
+    return value
@@ -1,7 +1,6 @@
 import uuid
 from abc import ABC
 
-from llm_engineering.domain import documents # abc is used to create abstract base classes
 """
 This file imports three core typing utilities — TypeVar, Generic, and Type —  
 which are used to build flexible, reusable, and type-safe class or function templates.  
@@ -48,7 +47,7 @@ Type:
 تا کلاس‌ها و استپ‌ها بتوانند با مدل‌های مختلف (مثل User، Comment، LinkedInProfile) کار کنند  
 بدون آنکه منطق تکراری یا وابستگی خاصی ایجاد شود.
 """
-from typing import Generic, Type, TypeVar
+from typing import Generic, Iterator, Type, TypeVar
 
 from loguru import logger
 """
@@ -63,8 +62,10 @@ from pydantic import BaseModel, Field, UUID4
 from pymongo import errors
 
 from llm_engineering.settings import settings
+from llm_engineering.infrastructure import instrumentation
 from llm_engineering.infrastructure.db.mongo import connection
 from llm_engineering.domain.exceptions import ImproperlyConfigured
+from llm_engineering.domain.base.serialization import construct_trusted, stringify_uuids
 
 
 _database = connection.get_database(settings.DATABASE_NAME)
@@ -88,13 +89,21 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
         return hash(self.id)
     
     @classmethod
-    def from_mongo(cls: Type[T], data: dict) -> T:
-        """Convert "_id" (str object) into "id" (UUID object)."""
+    def from_mongo(cls: Type[T], data: dict, trusted: bool | None = None) -> T:
+        """Convert "_id" (str object) into "id" (UUID object).
+
+        With `trusted` (default: `settings.TRUSTED_DB_READS`) the model is built without
+        pydantic validation; only its UUID fields are parsed. Use it for bulk reads of
+        documents this code wrote.
+        """
         if not data: 
             raise ValueError("Data is Empty")
 
-        id = data.pop("_id") # pop is used to remove the key from dict and return its value
-        return cls(**dict(id=uuid.UUID(id), **data)) # unpacking the dict and passing it to the class constructor
+        data["id"] = data.pop("_id") # pop is used to remove the key from dict and return its value
+        if settings.TRUSTED_DB_READS if trusted is None else trusted:
+            return construct_trusted(cls, data)
+
+        return cls(**data) # unpacking the dict and passing it to the class constructor
     
     def to_mongo(self:T, **kwargs) -> dict :    
         """**kwargs means any number of keyword arguments can be passed to the function."""
@@ -108,11 +117,7 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
         parsed = self._model_dump(exclude_unset=exclude_unset, by_alias=by_alias, **kwargs)
 
         if "_id" not in parsed and "id" in parsed:
-            parsed["_id"] = str(parsed.pop("id")) # convert UUID to str
-
-        for key, value in parsed.items():
-            if isinstance(value, uuid.UUID):
-                parsed[key] = str(value)
+            parsed["_id"] = parsed.pop("id") # already converted to str by _model_dump
 
         return parsed
     
@@ -120,12 +125,8 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
         """Override pydantic's model_dump to convert "_id" back to "id"."""
         dict_ = super().model_dump(**kwargs) # call the parent class's model_dump method
 
-        for key, value in dict_.items():
-            """isistance is used instead of if type(value) == uuid.UUID"""
-            if isinstance(value, uuid.UUID): # check if the value is of type UUID
-                dict_[key] = str(value)
-
-        return dict_
+        # Only the fields typed as UUID are converted; the plan is computed once per class.
+        return stringify_uuids(type(self), dict_, by_alias=bool(kwargs.get("by_alias")))
     
     @classmethod
     def get_collection_name(cls: Type[T]) -> str:
@@ -141,19 +142,35 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
 
         collection = _database[self.get_collection_name()]
         try:
-            instance = collection.insert_one(self.to_mongo(**kwargs))
+            with instrumentation.span("mongo.insert_one", collection=self.get_collection_name()):
+                instance = collection.insert_one(self.to_mongo(**kwargs))
 
             return self
         except errors.WriteError:
             logger.exception("Failed to insert document.")
 
             return None
+
+    def upsert(self: T, **kwargs) -> T | None:
+        """Insert the document, or replace the stored document with the same id."""
+
+        collection = _database[self.get_collection_name()]
+        try:
+            with instrumentation.span("mongo.replace_one", collection=self.get_collection_name()):
+                collection.replace_one({"_id": str(self.id)}, self.to_mongo(**kwargs), upsert=True)
+
+            return self
+        except errors.WriteError:
+            logger.exception("Failed to upsert document.")
+
+            return None
         
     @classmethod
     def get_or_create(cls:Type[T], **filter_options) -> T | None:
         collection = _database[cls.get_collection_name()]
         try:
-            inctance = collection.find_one(filter_options)
+            with instrumentation.span("mongo.find_one", collection=cls.get_collection_name()):
+                inctance = collection.find_one(filter_options)
             if inctance:
                 return cls.from_mongo(inctance)
             else:
@@ -165,12 +182,51 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
             logger.exception(f"Failed to retrieve document with filter options: {filter_options}")
             raise
 
+    @classmethod
+    def bulk_get_or_create(cls: Type[T], filters: list[dict]) -> list[T]:
+        """Get or create one document per filter, in one read and one write.
+
+        Returns the documents in the order of `filters`; equal filters share a
+        document. The filters are equality filters on the fields of the document.
+        This is a find then an insert, not an atomic upsert: without a unique index on
+        the filtered fields, concurrent calls can create the same document twice.
+        """
+        collection = _database[cls.get_collection_name()]
+        keys = list(dict.fromkeys(tuple(sorted(filter_options.items())) for filter_options in filters))
+        if not keys:
+            return []
+
+        try:
+            found = {}
+            with instrumentation.span("mongo.find", collection=cls.get_collection_name()):
+                instances = list(collection.find({"$or": [dict(key) for key in keys]}))
+            for instance in instances:
+                document = cls.from_mongo(instance)
+                for key in keys:
+                    if key not in found and all(instance.get(field) == value for field, value in key):
+                        found[key] = document
+
+            missing = {key: cls(**dict(key)) for key in keys if key not in found}
+            if missing:
+                with instrumentation.span("mongo.insert_many", collection=cls.get_collection_name()):
+                    collection.insert_many(document.to_mongo() for document in missing.values())
+                logger.info(f"Created {len(missing)} {cls.__name__}(s), {len(found)} already existed.")
+
+        except (errors.OperationFailure, errors.BulkWriteError):
+            logger.exception(f"Failed to get or create {len(keys)} {cls.__name__}(s).")
+            raise
+
+        documents = found | missing
+
+        return [documents[tuple(sorted(filter_options.items()))] for filter_options in filters]
+
     @classmethod
     def bulk_insert(cls:Type[T], documents: list[T], **kwargs) -> bool:
         """Insert multiple documents into the database."""
         collection = _database[cls.get_collection_name()]
         try:
-            collection.insert_many(doc.to_mongo(**kwargs) for doc in documents)
+            with instrumentation.span("mongo.insert_many", collection=cls.get_collection_name()):
+                collection.insert_many(doc.to_mongo(**kwargs) for doc in documents)
             return True
         except errors.BulkWriteError:
             logger.exception("Failed to bulk insert documents.")
@@ -180,7 +236,8 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
     def find(cls: Type[T], **filter_options) -> T | None:
         collection = _database[cls.get_collection_name()]
         try:
-            instance = collection.find_one(filter_options)
+            with instrumentation.span("mongo.find_one", collection=cls.get_collection_name()):
+                instance = collection.find_one(filter_options)
             if instance:
                 return cls.from_mongo(instance)
 
@@ -191,13 +248,46 @@ class NoSQLBaseDocument(BaseModel, Generic[T], ABC):
             return None
 
     @classmethod
-    def bulk_find(cls: Type[T], **filter_options) -> list[T]:
+    def bulk_find(cls: Type[T], trusted: bool | None = None, **filter_options) -> list[T]:
         collection = _database[cls.get_collection_name()]
         try:
-            instances = collection.find(filter_options)
-            return [document for instance in instances if (document := cls.from_mongo(instance)) is not None]
+            with instrumentation.span("mongo.find", collection=cls.get_collection_name()):
+                instances = list(collection.find(filter_options))
+            return [
+                document
+                for instance in instances
+                if (document := cls.from_mongo(instance, trusted=trusted)) is not None
+            ]
         
         except errors.OperationFailure:
             logger.error("Failed to retrieve documents")
             return []
-  
+
+    @classmethod
+    def iter_find(cls: Type[T], batch_size: int = 100, trusted: bool | None = None, **filter_options) -> Iterator[T]:
+        """Lazily yield every matching document, fetching `batch_size` rows per round-trip.
+
+        Unlike `bulk_find`, only one cursor batch is held in memory at a time,
+        so whole collections can be streamed in constant memory. `trusted` skips
+        validation, as in `from_mongo`.
+        """
+        collection = _database[cls.get_collection_name()]
+        try:
+            for instance in collection.find(filter_options).batch_size(batch_size):
+                yield cls.from_mongo(instance, trusted=trusted)
+
+        except errors.OperationFailure:
+            logger.error("Failed to retrieve documents")
+
+    @classmethod
+    def find_ids(cls: Type[T], **filter_options) -> set[uuid.UUID]:
+        """Return the ids of the matching documents, without fetching their fields."""
+        collection = _database[cls.get_collection_name()]
+        try:
+            with instrumentation.span("mongo.find", collection=cls.get_collection_name()):
+                return {uuid.UUID(instance["_id"]) for instance in collection.find(filter_options, {"_id": 1})}
+
+        except errors.OperationFailure:
+            logger.error("Failed to retrieve document ids")
+
+            return set()
@@ -0,0 +1,108 @@
+"""
+Per-class field plans for converting documents to and from their database form.
+
+Stored documents keep UUIDs as strings. Instead of checking every value of every
+row with `isinstance`, the UUID-typed fields of each model class are resolved once
+and only those keys are converted. `construct_trusted` builds models from rows this
+code wrote itself, skipping pydantic validation and copying the fields directly.
+
+اسناد ذخیره‌شده شناسه‌ها (UUID) را به‌صورت رشته نگه می‌دارند. به‌جای بررسی تک‌تک
+مقادیر هر ردیف، فیلدهای از نوع UUID هر کلاس یک بار مشخص می‌شوند و فقط همان کلیدها
+تبدیل می‌شوند. `construct_trusted` مدل را بدون اعتبارسنجی پایدانتیک و با کپی مستقیم
+فیلدها از داده‌هایی که خود این کد نوشته است می‌سازد.
+"""
+
+import functools
+import types
+import typing
+import uuid
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@functools.cache
+def uuid_field_keys(model_class: type[BaseModel], by_alias: bool = True) -> tuple[str, ...]:
+    """The keys of the UUID fields (`UUID` or `UUID4`, optional or not): their aliases if `by_alias`, else names."""
+    return tuple(
+        (field.alias or name) if by_alias else name
+        for name, field in model_class.model_fields.items()
+        if _is_uuid_annotation(field.annotation)
+    )
+
+
+def stringify_uuids(model_class: type[BaseModel], data: dict, by_alias: bool = True) -> dict:
+    """Converts the UUID fields of a dumped model to strings, in place."""
+    for key in uuid_field_keys(model_class, by_alias):
+        value = data.get(key)
+        if isinstance(value, uuid.UUID):
+            data[key] = str(value)
+
+    return data
+
+
+def construct_trusted(model_class: type[M], data: dict) -> M:
+    """
+    Builds a model from a stored row without validating it.
+
+    Only UUID fields are converted back from strings; every other value is used as
+    stored. Use it for rows this code wrote, never for external input.
+    """
+    for key in uuid_field_keys(model_class):
+        value = data.get(key)
+        if isinstance(value, str):
+            data[key] = _parse_uuid(value)
+
+    plan = _construction_plan(model_class)
+    if plan is None:
+        return model_class.model_construct(**data)
+
+    values = {}
+    for alias, name in plan:
+        if alias in data:
+            values[name] = data[alias]
+        elif name in data:
+            values[name] = data[name]
+        else:
+            # Partial row: let pydantic fill in the defaults.
+            return model_class.model_construct(**data)
+
+    instance = model_class.__new__(model_class)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(values))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+
+    return instance
+
+
+@functools.cache
+def _construction_plan(model_class: type[BaseModel]) -> tuple[tuple[str, str], ...] | None:
+    """
+    The (key, field name) pairs to copy from a complete row, or None when the class
+    needs `model_construct` (extra fields allowed or private attributes to initialise).
+    """
+    if model_class.model_config.get("extra") == "allow" or model_class.__private_attributes__:
+        return None
+
+    return tuple((field.alias or name, name) for name, field in model_class.model_fields.items())
+
+
+# Author and document ids repeat across many rows; parsing them once pays for the cache.
+_parse_uuid = functools.lru_cache(maxsize=16_384)(uuid.UUID)
+
+
+def _is_uuid_annotation(annotation: Any) -> bool:
+    # Pydantic strips `Annotated` from a field's own type, but not from the members of a Union (`UUID4 | None`).
+    if typing.get_origin(annotation) is typing.Annotated:
+        annotation = typing.get_args(annotation)[0]
+    if annotation is uuid.UUID:
+        return True
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+
+        return len(args) == 1 and _is_uuid_annotation(args[0])
+
+    return False
@@ -1,20 +1,20 @@
-from doctest import UnexpectedException
-from gc import collect
-import selectors
-from tokenize import Ignore
+import random
+import time
 import uuid
 from uuid import UUID
 from abc import ABC
-from typing import Any, List, Optional, Callable, Generic, Type, TypeVar, Dict
-from aiohttp import Payload
-from attr import has
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, ClassVar, Iterable, Iterator, List, Literal, Optional, Callable, Generic, Sequence, Type, TypeVar, Dict
 import numpy as np
+from numpy.typing import NDArray
 
-from loguru import Record, logger
+from loguru import logger
 from pydantic import BaseModel, Field, UUID4 # pydantic is used for data validation and settings management
 
 from qdrant_client.http import exceptions
-from sympy import false, use
 
 from llm_engineering.domain import documents
 """
@@ -39,7 +39,22 @@ FA — توضیح فارسی
 در عمل، نخست اندازهٔ بردار و سنجه انتخاب می‌شود و سپس این تنظیمات هنگام ساخت مجموعه
 استفاده می‌گردد تا موتور جست‌وجوی برداری بداند چگونه شباهت را محاسبه کند.
 """
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client.http.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Distance,
+    HnswConfigDiff,
+    OptimizersConfigDiff,
+    PointIdsList,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
 """
 EN — qdrant_client.models: PointStruct, CollectionInfo
 ------------------------------------------------------
@@ -54,7 +69,7 @@ EN — qdrant_client.models: PointStruct, CollectionInfo
   Useful for validating that a collection was created/configured as expected.
 
 Typical use:
-    from qdrant_client.models import PointStruct, CollectionInfo
+    from qdrant_client.models import Batch, Filter, PointStruct, CollectionInfo, Record, QueryRequest
     point = PointStruct(id="doc-1", vector=vec, payload={"source": "blog"})
     # upsert point into a collection
     # later, fetch CollectionInfo to verify collection settings & counts
@@ -69,40 +84,227 @@ FA — توضیح فارسی
   سنجهٔ شباهت، شمارِ موارد و وضعیت عملیاتی. برای اطمینان از درست بودن پیکربندی
   و پایش مجموعه کاربرد دارد.
 """
-from qdrant_client.models import PointStruct, CollectionInfo
+from qdrant_client.models import (
+    Batch,
+    CollectionInfo,
+    Filter,
+    HasIdCondition,
+    PayloadSchemaType,
+    PointStruct,
+    QueryRequest,
+    Record,
+)
 
 from llm_engineering.application.networks.embeddings import EmbeddingModelSingleton
+from llm_engineering.domain.base.filters import FilterBuilder, as_filter
+from llm_engineering.domain.base.serialization import construct_trusted
 from llm_engineering.domain.exceptions import ImproperlyConfigured
 from llm_engineering.domain.types import DataCategory
-from llm_engineering.infrastructure.db.qdrant import connection
+from llm_engineering.infrastructure import instrumentation
+from llm_engineering.infrastructure.db.vector_backend import connection
+from llm_engineering.settings import settings
 
 T = TypeVar('T', bound='VectorBaseDocument')
 
+# Base delay of the exponential backoff between upsert retries.
+_UPSERT_BACKOFF_SECONDS = 0.5
+
+# Qdrant's default indexing threshold, restored after a bulk load if the collection had none set.
+_DEFAULT_INDEXING_THRESHOLD = 20_000
+
+# Collections whose payload indexes were already checked by this process.
+_migrated_collections: set[str] = set()
+
+# Filled by `VectorBaseDocument.__pydantic_init_subclass__`: collection name -> class and category -> classes.
+_collection_registry: dict[str, type["VectorBaseDocument"]] = {}
+_category_registry: defaultdict[DataCategory, list[type["VectorBaseDocument"]]] = defaultdict(list)
+
+@dataclass
+class VectorBatch:
+    """
+    Columnar view of a group of points: N ids, an (N, D) float32 matrix and N payloads.
+
+    Used by the columnar read/write paths so that vectors stay in one numpy
+    array instead of N Python float lists wrapped in N models.
+    """
+
+    ids: list[UUID]
+    vectors: NDArray[np.float32]
+    payloads: list[dict]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Record]) -> "VectorBatch":
+        if records and records[0].vector is not None:
+            vectors = np.asarray([record.vector for record in records], dtype=np.float32)
+        else:
+            vectors = np.empty((len(records), 0), dtype=np.float32)
+
+        return cls(
+            ids=[UUID(str(record.id)) for record in records],
+            vectors=vectors,
+            payloads=[record.payload or {} for record in records],
+        )
+
+
+@dataclass(frozen=True)
+class VectorIndexOptions:
+    """
+    Storage and index tuning of a collection, read from the document class's `Config`.
+
+    Every option left to None keeps Qdrant's default.
+
+    Attributes:
+        hnsw_m: Edges per node of the HNSW graph. Lower saves RAM, higher improves recall.
+        hnsw_ef_construct: Neighbours considered while building the graph.
+        search_ef: Neighbours considered at search time (`hnsw_ef`). Trades latency for recall.
+        quantization: "int8" keeps an int8 scalar-quantized copy of the vectors in RAM (4x smaller).
+        quantization_rescore: Re-scores the quantized candidates with the original vectors.
+        quantization_oversampling: Fetches `limit * oversampling` quantized candidates before rescoring.
+        on_disk_vectors: Keeps the original vectors memory-mapped on disk instead of in RAM.
+        on_disk_payload: Keeps the payloads on disk instead of in RAM.
+        indexing_threshold: Segment size (in KB of vectors) above which the HNSW index is built.
+            0 disables indexing, which speeds up bulk loads.
+    """
+
+    hnsw_m: int | None = None
+    hnsw_ef_construct: int | None = None
+    search_ef: int | None = None
+    quantization: Literal["int8"] | None = None
+    quantization_rescore: bool = True
+    quantization_oversampling: float | None = None
+    on_disk_vectors: bool | None = None
+    on_disk_payload: bool | None = None
+    indexing_threshold: int | None = None
+
+    @property
+    def search_params(self) -> SearchParams | None:
+        if self.search_ef is None and self.quantization is None:
+            return None
+
+        quantization = None
+        if self.quantization is not None:
+            quantization = QuantizationSearchParams(
+                rescore=self.quantization_rescore, oversampling=self.quantization_oversampling
+            )
+
+        return SearchParams(hnsw_ef=self.search_ef, quantization=quantization)
+
+
+@dataclass
+class BulkLoadReport:
+    """Outcome of a `VectorBaseDocument.bulk_load` block."""
+
+    collection_name: str
+    alias: str | None = None
+    num_points: int = 0
+    upload_seconds: float = 0.0
+    optimization_seconds: float = 0.0
+
+    @property
+    def total_seconds(self) -> float:
+        return self.upload_seconds + self.optimization_seconds
+
+
+class BulkLoad:
+    """
+    Handle yielded by `VectorBaseDocument.bulk_load`.
+
+    Its insert methods write into the collection being loaded, which is a new
+    shadow collection in shadow mode.
+    """
+
+    def __init__(self, document_class: type["VectorBaseDocument"], collection_name: str, alias: str | None) -> None:
+        self.document_class = document_class
+        self.report = BulkLoadReport(collection_name=collection_name, alias=alias)
+
+    @property
+    def collection_name(self) -> str:
+        return self.report.collection_name
+
+    def bulk_insert(self, documents: Iterable["VectorBaseDocument"], **kwargs) -> bool:
+        return self.document_class.bulk_insert(documents, collection_name=self.collection_name, **kwargs)
+
+    def bulk_insert_vectors(self, vectors: NDArray[np.float32], payloads: Sequence[dict], **kwargs) -> bool:
+        return self.document_class.bulk_insert_vectors(
+            vectors, payloads, collection_name=self.collection_name, **kwargs
+        )
+
+
+@dataclass
+class VectorQuery:
+    """One similarity query of a `VectorBaseDocument.search_batch` request."""
+
+    vector: Sequence[float] | NDArray[np.float32]
+    limit: int = 10
+    filter: Filter | FilterBuilder | None = None
+
+
 class VectorBaseDocument(ABC, Generic[T], BaseModel):
     """
     Abstract base class for vector-based document representations.
     Provides common properties and methods for handling vector embeddings.
     """
     id: UUID4 = Field(default_factory=uuid.uuid4)
+
+    # Resolved once per class in `__pydantic_init_subclass__`, instead of on every deserialised record.
+    _has_embedding: ClassVar[bool] = False
+
     def __eq__(self, value: object) -> bool:
         if not isinstance(value, self.__class__):
             return False
         return self.id == value.id
     def __hash__(self) -> int:
         return hash(self.id)
-    
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        """Registers every subclass that declares its own `Config` under its collection name and category."""
+        super().__pydantic_init_subclass__(**kwargs)
+
+        cls._has_embedding = cls._has_class_attribute("embedding")
+
+        config = cls.__dict__.get("Config")
+        if config is None:
+            return
+
+        collection_name = getattr(config, "name", None)
+        if collection_name is not None:
+            registered = _collection_registry.get(collection_name)
+            if registered is not None and _qualified_name(registered) != _qualified_name(cls):
+                raise ImproperlyConfigured(
+                    f"Collection '{collection_name}' is already used by {_qualified_name(registered)}; "
+                    f"{_qualified_name(cls)} must declare another name."
+                )
+            _collection_registry[collection_name] = cls
+
+        category = getattr(config, "category", None)
+        if category is not None:
+            classes = _category_registry[category]
+            classes[:] = [registered for registered in classes if _qualified_name(registered) != _qualified_name(cls)]
+            classes.append(cls)
+
     @classmethod
-    def from_record(cls: Type[T], point: Record) -> T:
-        _id = UUID(point.id, version=4) # ensure UUID4. it means _id is UUID4 type
-        payload = point.payload or {}
+    def from_record(cls: Type[T], point: Record, trusted: bool | None = None) -> T:
+        """
+        Builds a document from a Qdrant point.
 
+        With `trusted` (default: `settings.TRUSTED_DB_READS`) the document is built without
+        pydantic validation; only its UUID fields are parsed. Use it for bulk reads of
+        points this code wrote.
+        """
         attributres = {
-            "id": _id,
-            **payload,
+            "id": point.id,
+            **(point.payload or {}),
         }
-        if cls._has_class_attribute("embedding"):
+        if cls._has_embedding:
             attributres["embedding"] = point.vector or None
 
+        if settings.TRUSTED_DB_READS if trusted is None else trusted:
+            return construct_trusted(cls, attributres)
+
         return cls(**attributres)
     
 
@@ -110,18 +312,21 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
         exclude_unset = kwargs.pop("exclude_unset", False)
         by_alias = kwargs.pop("by_alias", True)
 
-        payload = self.model_dump(exclude_unset=exclude_unset, by_alias=by_alias)
+        # mode="json" lets pydantic's serializer stringify UUIDs (and datetimes) natively,
+        # instead of walking the whole payload again in Python with `_uuid_to_str`.
+        payload = BaseModel.model_dump(
+            self, mode="json", exclude={"id", "embedding"}, exclude_unset=exclude_unset, by_alias=by_alias
+        )
 
-        _id = str(payload.pop("id"))
-        vector = payload.pop("embedding", None) # using vector to store embedding
-        if vector and isinstance(vector, np.ndarray):
+        vector = getattr(self, "embedding", None) # using vector to store embedding
+        if isinstance(vector, np.ndarray):
             vector = vector.tolist()
             """
             Ensure the vector is a list for PointStruct
             Qdrant expects vectors as lists, not numpy arrays
             PointStruct requires id, vector, payload arguments
             """
-        return PointStruct(id=_id, vector=vector, payload=payload)
+        return PointStruct.model_construct(id=str(self.id), vector=vector, payload=payload)
     
 
     def model_dump(self: T, **kwargs) -> dict:
@@ -145,42 +350,320 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
         return item
     
     @classmethod
-    def bulk_insert(cls: Type[T], documents:List["VectorBaseDocument"]) -> bool:
-        try:
-            cls._bulk_insert(documents)
-            
-        except exceptions.UnexpectedResponse:
-            logger.info(
-                f"Collection '{cls.get_collection_name()}' does not exist. Trying to create the collection and reinsert the documents."
+    def bulk_insert(
+        cls: Type[T],
+        documents: Iterable["VectorBaseDocument"],
+        batch_size: int = settings.QDRANT_UPSERT_BATCH_SIZE,
+        max_batch_bytes: int = settings.QDRANT_UPSERT_MAX_BATCH_BYTES,
+        max_workers: int = settings.QDRANT_UPSERT_MAX_WORKERS,
+        max_retries: int = settings.QDRANT_UPSERT_MAX_RETRIES,
+        collection_name: str | None = None,
+    ) -> bool:
+        """
+        Upserts documents into the collection in size-bounded, parallel requests.
+
+        Documents are converted to points lazily and grouped into requests of at
+        most `batch_size` points and roughly `max_batch_bytes` bytes. Up to
+        `max_workers` requests are in flight at once, each sent with `wait=False`
+        and retried on its own with exponential backoff. Once every request is
+        acknowledged, the last one is re-sent with `wait=True` as a consistency
+        barrier: Qdrant applies updates in order, so it returns only after all
+        previous requests are applied.
+
+        Args:
+            documents: The documents to upsert. Any iterable, consumed once.
+            batch_size (int): The maximum number of points per request.
+            max_batch_bytes (int): The approximate maximum request body size.
+            max_workers (int): The maximum number of requests in flight.
+            max_retries (int): How many times a failed request is retried.
+            collection_name (str | None): Writes into this collection instead of the class's own.
+
+        Returns:
+            bool: True if every document was upserted, False otherwise.
+        """
+        batches = cls._split_points(documents, batch_size, max_batch_bytes)
+
+        return cls._upload(
+            batches, max_workers=max_workers, max_retries=max_retries, collection_name=collection_name
+        )
+
+    @classmethod
+    def bulk_insert_vectors(
+        cls: Type[T],
+        vectors: NDArray[np.float32],
+        payloads: Sequence[dict],
+        ids: Sequence[UUID | str] | None = None,
+        batch_size: int = settings.QDRANT_UPSERT_BATCH_SIZE,
+        max_workers: int = settings.QDRANT_UPSERT_MAX_WORKERS,
+        max_retries: int = settings.QDRANT_UPSERT_MAX_RETRIES,
+        collection_name: str | None = None,
+    ) -> bool:
+        """
+        Columnar upsert: uploads an (N, D) matrix of vectors with N payloads.
+
+        No model or `PointStruct` is built per point. Each request takes a
+        zero-copy row slice of the matrix and converts it in one `tolist()` call
+        into a Qdrant `Batch`. Requests are sent exactly like in `bulk_insert`.
+
+        Args:
+            vectors (NDArray[np.float32]): The (N, D) vectors. Cast to float32 only if needed.
+            payloads (Sequence[dict]): The N JSON-ready payloads, in row order.
+            ids (Sequence[UUID | str] | None): The N point ids. Random UUID4s are generated if None.
+            batch_size (int): The maximum number of points per request.
+            max_workers (int): The maximum number of requests in flight.
+            max_retries (int): How many times a failed request is retried.
+            collection_name (str | None): Writes into this collection instead of the class's own.
+
+        Returns:
+            bool: True if every vector was upserted, False otherwise.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError(f"Expected a 2D (N, D) array of vectors, got shape {vectors.shape}.")
+        if ids is None:
+            ids = [uuid.uuid4() for _ in range(len(vectors))]
+        if not len(vectors) == len(payloads) == len(ids):
+            raise ValueError("vectors, payloads and ids must have the same length.")
+
+        str_ids = [str(_id) for _id in ids]
+        batches = (
+            Batch.model_construct(
+                ids=str_ids[start : start + batch_size],
+                vectors=vectors[start : start + batch_size].tolist(),
+                payloads=list(payloads[start : start + batch_size]),
             )
+            for start in range(0, len(vectors), batch_size)
+        )
 
-            cls.create_collection()
+        return cls._upload(
+            batches, max_workers=max_workers, max_retries=max_retries, collection_name=collection_name
+        )
 
-            try:
-                cls._bulk_insert(documents)
-            except exceptions.UnexpectedResponse as e:
-                logger.error(f"Failed to insert documents in '{cls.get_collection_name()}'.")
+    @classmethod
+    @contextmanager
+    def bulk_load(
+        cls: Type[T], shadow: bool = False, optimization_timeout: float = settings.QDRANT_OPTIMIZATION_TIMEOUT
+    ) -> Iterator[BulkLoad]:
+        """
+        Context manager for backfills: uploads with HNSW indexing switched off, then indexes once.
 
-                return False
+        On entry the collection's indexing threshold is set to 0, so Qdrant only
+        appends points instead of growing the graph while they stream in. On exit
+        the previous threshold is restored and the block waits until Qdrant
+        reports the collection as optimized (green).
 
-        return True
+        With `shadow=True` the points go into a new collection instead. Once it
+        is indexed, the class's collection name is atomically re-pointed to it as
+        an alias and the previous backing collection is dropped, so live queries
+        never hit a half-built index. The live name must be an alias (or not
+        exist yet), not a plain collection. If the block raises, the shadow
+        collection is dropped and the alias is left untouched.
+
+        Example:
+            with EmbeddedArticleChunk.bulk_load(shadow=True) as load:
+                load.bulk_insert(chunks)
+            logger.info(load.report)
 
+        Args:
+            shadow (bool): Whether to build into a shadow collection and swap an alias.
+            optimization_timeout (float): Seconds to wait for the optimization to finish.
+
+        Yields:
+            BulkLoad: Exposes `bulk_insert`, `bulk_insert_vectors` and the `report`.
+        """
+        alias = cls.get_collection_name()
+        if shadow:
+            previous_collection = cls._resolve_alias(alias)
+            collection_name = f"{alias}_{time.time_ns()}"
+            cls._create_collection(collection_name=collection_name, use_vector_index=cls.get_use_vector_index())
+        else:
+            previous_collection = None
+            collection_name = alias
+            cls._ensure_collection(collection_name)
+
+        optimizer_config = connection.get_collection(collection_name=collection_name).config.optimizer_config
+        indexing_threshold = optimizer_config.indexing_threshold
+        if indexing_threshold is None or indexing_threshold == 0:
+            indexing_threshold = cls.get_index_options().indexing_threshold or _DEFAULT_INDEXING_THRESHOLD
+
+        load = BulkLoad(cls, collection_name=collection_name, alias=alias if shadow else None)
+        connection.update_collection(
+            collection_name=collection_name, optimizers_config=OptimizersConfigDiff(indexing_threshold=0)
+        )
+        start_time = time.perf_counter()
+        try:
+            yield load
+        except BaseException:
+            if shadow:
+                connection.delete_collection(collection_name=collection_name)
+            else:
+                connection.update_collection(
+                    collection_name=collection_name,
+                    optimizers_config=OptimizersConfigDiff(indexing_threshold=indexing_threshold),
+                )
+
+            raise
+
+        load.report.upload_seconds = time.perf_counter() - start_time
+        load.report.num_points = connection.count(collection_name=collection_name, exact=True).count
+
+        start_time = time.perf_counter()
+        connection.update_collection(
+            collection_name=collection_name, optimizers_config=OptimizersConfigDiff(indexing_threshold=indexing_threshold)
+        )
+        cls._wait_until_optimized(collection_name, timeout=optimization_timeout)
+        load.report.optimization_seconds = time.perf_counter() - start_time
+
+        if shadow:
+            operations = [CreateAliasOperation(create_alias=CreateAlias(collection_name=collection_name, alias_name=alias))]
+            if previous_collection is not None:
+                operations.insert(0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+            connection.update_collection_aliases(change_aliases_operations=operations)
+            if previous_collection is not None:
+                connection.delete_collection(collection_name=previous_collection)
+
+        logger.info(
+            f"Bulk loaded {load.report.num_points} points into '{collection_name}' in {load.report.total_seconds:.1f}s "
+            f"(upload {load.report.upload_seconds:.1f}s, indexing {load.report.optimization_seconds:.1f}s)."
+        )
 
     @classmethod
-    def _bulk_insert(cls: Type[T], documents:List["VectorBaseDocument"]) -> None:
-            # doc is VectorBaseDocument and forward to_point method AUTOMATICALLY
-            points = [doc.to_point() for doc in documents]
-            
-            # Upsert points into the collection.
-            # collection_name determines where should function begin to search in DB
-            connection.upsert(
-                collection_name=cls.get_collection_name(),
-                points=points,
+    def _resolve_alias(cls: Type[T], alias: str) -> str | None:
+        """Returns the collection behind `alias`, None if nothing has that name yet."""
+        for description in connection.get_aliases().aliases:
+            if description.alias_name == alias:
+                return description.collection_name
+
+        if connection.collection_exists(collection_name=alias):
+            raise ImproperlyConfigured(
+                f"'{alias}' is a collection, not an alias. Shadow bulk loads swap an alias, "
+                "so migrate the collection behind an alias first."
             )
 
+        return None
+
+    @staticmethod
+    def _wait_until_optimized(collection_name: str, timeout: float, poll_interval: float = 0.5) -> None:
+        deadline = time.monotonic() + timeout
+        while True:
+            status = connection.get_collection(collection_name=collection_name).status
+            if status == "green":
+                return
+            if status == "grey":
+                # Pending optimizations only start on the next update, so send an empty one.
+                connection.update_collection(collection_name=collection_name, optimizers_config=OptimizersConfigDiff())
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Collection '{collection_name}' was not optimized within {timeout:.0f}s.")
+
+            time.sleep(poll_interval)
+
+    @classmethod
+    def _upload(
+        cls: Type[T],
+        batches: Iterator[list[PointStruct] | Batch],
+        max_workers: int,
+        max_retries: int,
+        collection_name: str | None = None,
+    ) -> bool:
+        collection_name = collection_name or cls.get_collection_name()
+
+        try:
+            cls._ensure_collection(collection_name)
+        except exceptions.UnexpectedResponse:
+            logger.error(f"Failed to create collection '{collection_name}'.")
+
+            return False
+
+        start_time = time.perf_counter()
+        num_points = num_requests = 0
+        last_batch = None
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                in_flight: deque[Future] = deque()
+                for points in batches:
+                    in_flight.append(
+                        executor.submit(cls._upsert_with_retry, collection_name, points, False, max_retries)
+                    )
+                    num_points += _num_points(points)
+                    num_requests += 1
+                    last_batch = points
+
+                    if len(in_flight) >= max_workers:
+                        in_flight.popleft().result()
+
+                while in_flight:
+                    in_flight.popleft().result()
+
+            if last_batch is not None:
+                cls._upsert_with_retry(collection_name, last_batch, True, max_retries)
+        except (exceptions.UnexpectedResponse, exceptions.ResponseHandlingException):
+            logger.error(f"Failed to insert documents in '{collection_name}'.")
+
+            return False
+
+        elapsed = time.perf_counter() - start_time
+        logger.info(
+            f"Upserted {num_points} points into '{collection_name}' with {num_requests} requests "
+            f"in {elapsed:.2f}s ({num_points / max(elapsed, 1e-9):.0f} points/s)."
+        )
+
+        return True
+
+    @classmethod
+    def _ensure_collection(cls: Type[T], collection_name: str) -> None:
+        if not connection.collection_exists(collection_name=collection_name):
+            logger.info(f"Collection '{collection_name}' does not exist. Creating it before inserting the documents.")
+
+            cls._create_collection(collection_name=collection_name, use_vector_index=cls.get_use_vector_index())
+        elif collection_name not in _migrated_collections:
+            cls.migrate_payload_indexes(collection_name=collection_name)
+
+    @staticmethod
+    def _split_points(
+        documents: Iterable["VectorBaseDocument"], batch_size: int, max_batch_bytes: int
+    ) -> Iterator[list[PointStruct]]:
+        points, batch_bytes = [], 0
+        for doc in documents:
+            point = doc.to_point()
+            point_bytes = _estimate_point_size(point)
+
+            if points and (len(points) >= batch_size or batch_bytes + point_bytes > max_batch_bytes):
+                yield points
+                points, batch_bytes = [], 0
+
+            points.append(point)
+            batch_bytes += point_bytes
+
+        if points:
+            yield points
+
+    @staticmethod
+    def _upsert_with_retry(
+        collection_name: str, points: list[PointStruct] | Batch, wait: bool, max_retries: int
+    ) -> None:
+        for attempt in range(max_retries + 1):
+            try:
+                with instrumentation.span("vector.upsert", collection=collection_name):
+                    connection.upsert(collection_name=collection_name, points=points, wait=wait)
+
+                return
+            except (exceptions.UnexpectedResponse, exceptions.ResponseHandlingException) as e:
+                status_code = getattr(e, "status_code", None)
+                is_transient = status_code is None or status_code == 429 or status_code >= 500
+                if not is_transient or attempt == max_retries:
+                    raise
+
+                delay = _UPSERT_BACKOFF_SECONDS * 2**attempt * (1 + random.random())
+                logger.warning(
+                    f"Upsert of {_num_points(points)} points into '{collection_name}' failed ({e!s}). "
+                    f"Retrying in {delay:.1f}s ({attempt + 1}/{max_retries})."
+                )
+                time.sleep(delay)
+
     @classmethod
     def bulk_find(cls:Type[T], limit: int = 10, **kwargs) -> tuple[list[T], UUID|None]:
-        try
+        try:
             documents, next_offset = cls._bulk_find(limit=limit, **kwargs)
         except exceptions.UnexpectedResponse:
             logger.error(f"Failed to search documents in '{cls.get_collection_name()}'.")
@@ -189,6 +672,38 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
 
         return documents, next_offset
 
+    @classmethod
+    def bulk_find_vectors(cls: Type[T], limit: int = 10, **kwargs) -> tuple[VectorBatch, UUID | None]:
+        """
+        Columnar counterpart of `bulk_find`.
+
+        Returns one page of points as a `VectorBatch`, with the vectors in a
+        single (N, D) float32 array and the payloads left as plain dicts, so no
+        model is validated per point. Accepts the same options as `bulk_find`.
+        """
+        collection_name = cls.get_collection_name()
+
+        offset = kwargs.pop("offset", None)
+        try:
+            with instrumentation.span("vector.scroll", collection=collection_name):
+                records, next_offset = connection.scroll(
+                    collection_name=collection_name,
+                    limit=limit,
+                    with_payload=kwargs.pop("with_payload", True),
+                    with_vectors=True,
+                    offset=str(offset) if offset else None,
+                    scroll_filter=as_filter(kwargs.pop("scroll_filter", None)),
+                    **kwargs,
+                )
+        except exceptions.UnexpectedResponse:
+            logger.error(f"Failed to search documents in '{collection_name}'.")
+
+            return VectorBatch.from_records([]), None
+
+        if next_offset is not None:
+            next_offset = UUID(str(next_offset), version=4)
+
+        return VectorBatch.from_records(records), next_offset
 
     @classmethod
     def _bulk_find(cls:Type[T], limit: int = 10, **kwargs) -> tuple[list[T], UUID|None]:
@@ -269,20 +784,98 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
         offset = kwargs.pop("offset", None) # offset comes from qdrant as str or None
         offset = str(offset) if offset else None
 
-        records, next_offset = connection.scroll(
-            collection_name=collection_name,
-            limit=limit,
-            with_payload = kwargs.pop("with_payload", True),
-            with_vectors = kwargs.pop("with_vectors", false),
-            offset=offset,
-            **kwargs
-        )
+        with instrumentation.span("vector.scroll", collection=collection_name):
+            records, next_offset = connection.scroll(
+                collection_name=collection_name,
+                limit=limit,
+                with_payload = kwargs.pop("with_payload", True),
+                with_vectors = kwargs.pop("with_vectors", False),
+                offset=offset,
+                scroll_filter=as_filter(kwargs.pop("scroll_filter", None)),
+                **kwargs
+            )
 
         documents = [cls.from_record(record) for record in records]
         if next_offset is not None:
             next_offset = UUID(next_offset, version=4)
 
         return documents, next_offset
+
+    @classmethod
+    def iter_all(
+        cls: Type[T],
+        batch_size: int = settings.QDRANT_SCROLL_BATCH_SIZE,
+        filter: Filter | FilterBuilder | None = None,
+        with_vectors: bool = False,
+        payload_fields: Sequence[str] | None = None,
+        trusted: bool | None = None,
+    ) -> Iterator[T]:
+        """
+        Lazily yields every document of the collection, page by page.
+
+        While the current page is consumed, the next one is already being
+        fetched in a background thread, so network time overlaps with the
+        caller's work. At most two pages are held in memory.
+
+        Args:
+            batch_size (int): The number of points fetched per scroll request.
+            filter (Filter | FilterBuilder | None): Only points matching this filter are returned.
+            with_vectors (bool): Whether to fetch the vectors as well. Defaults to False.
+            payload_fields (Sequence[str] | None): If set, only these payload fields are
+                fetched. The documents are then built without validation and the other
+                fields are left unset.
+            trusted (bool | None): Build full documents without validation, as in `from_record`.
+
+        Yields:
+            T: The documents of the collection, in scroll (id) order.
+        """
+
+        """
+        همه‌ی اسناد کالکشن را صفحه‌به‌صفحه و به‌صورت تنبل برمی‌گرداند.
+
+        در حالی که صفحه‌ی فعلی مصرف می‌شود، صفحه‌ی بعدی در یک رشته‌ی پس‌زمینه
+        واکشی می‌شود؛ بنابراین در هر لحظه حداکثر دو صفحه در حافظه است.
+        """
+        collection_name = cls.get_collection_name()
+        with_payload = list(payload_fields) if payload_fields is not None else True
+        scroll_filter = as_filter(filter)
+
+        def fetch_page(offset: Any) -> tuple[list[Record], Any]:
+            with instrumentation.span("vector.scroll", collection=collection_name):
+                return connection.scroll(
+                    collection_name=collection_name,
+                    scroll_filter=scroll_filter,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=with_payload,
+                    with_vectors=with_vectors,
+                )
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page: Future | None = executor.submit(fetch_page, None)
+            while next_page is not None:
+                try:
+                    records, next_offset = next_page.result()
+                except exceptions.UnexpectedResponse:
+                    logger.error(f"Failed to scroll documents in '{collection_name}'.")
+
+                    raise
+
+                next_page = executor.submit(fetch_page, next_offset) if next_offset is not None else None
+
+                for record in records:
+                    if payload_fields is None:
+                        yield cls.from_record(record, trusted=trusted)
+                    else:
+                        yield cls._from_partial_record(record)
+
+    @classmethod
+    def _from_partial_record(cls: Type[T], point: Record) -> T:
+        attributes = {"id": str(point.id), **(point.payload or {})}
+        if cls._has_embedding and point.vector is not None:
+            attributes["embedding"] = point.vector
+
+        return construct_trusted(cls, attributes)
     
     @classmethod
     def search(cls:Type[T], query_vector:List[float], limit:int=10, **kwargs) -> list[T]:
@@ -299,6 +892,7 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
             query_vector (List[float]): The embedding vector to search against.
             limit (int): The maximum number of similar documents to return. Defaults to 10.
             **kwargs: Additional keyword arguments passed directly to the `search()` method.
+                `query_filter` may be a Qdrant `Filter` or a `FilterBuilder`.
 
         Returns:
             list[T]: A list of the most similar documents found, as class instances.
@@ -316,29 +910,168 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
     def _search(cls:Type[T], query_vector:List[float], limit:int=10, **kwargs) -> list[T]:
         collection_name = cls.get_collection_name()
 
-        records = connection.search(
-            collection_name=collection_name,
-            query_vector=query_vector,
-            limit=limit,
-            with_payload=kwargs.pop("with_payload", True),
-            with_vectors=kwargs.pop("with_vectors", False),
-            **kwargs
-        )
+        with instrumentation.span("vector.search", collection=collection_name):
+            records = connection.search(
+                collection_name=collection_name,
+                query_vector=query_vector,
+                limit=limit,
+                with_payload=kwargs.pop("with_payload", True),
+                with_vectors=kwargs.pop("with_vectors", False),
+                query_filter=as_filter(kwargs.pop("query_filter", None)),
+                search_params=kwargs.pop("search_params", None) or cls.get_index_options().search_params,
+                **kwargs
+            )
         documents = [cls.from_record(record) for record in records]
 
         return documents
+
+    @classmethod
+    def search_batch(
+        cls: Type[T], queries: Sequence[VectorQuery], with_payload: bool = True, with_vectors: bool = False
+    ) -> list[list[T]]:
+        """
+        Runs several similarity searches against the collection in a single request.
+
+        Each query carries its own vector, filter and limit. All of them are sent
+        through Qdrant's batch query API, so N queries cost one round-trip
+        instead of N.
+
+        Args:
+            queries (Sequence[VectorQuery]): The queries to run.
+            with_payload (bool): Whether to return the payloads. Defaults to True.
+            with_vectors (bool): Whether to return the vectors. Defaults to False.
+
+        Returns:
+            list[list[T]]: One result list per query, in query order.
+        """
+        try:
+            documents = cls._search_batch(queries, with_payload=with_payload, with_vectors=with_vectors)
+        except exceptions.UnexpectedResponse:
+            logger.error(f"Failed to search documents in '{cls.get_collection_name()}'.")
+
+            documents = [[] for _ in queries]
+
+        return documents
+
+    @classmethod
+    def _search_batch(
+        cls: Type[T], queries: Sequence[VectorQuery], with_payload: bool, with_vectors: bool
+    ) -> list[list[T]]:
+        if not queries:
+            return []
+
+        search_params = cls.get_index_options().search_params
+        requests = [
+            QueryRequest(
+                query=query.vector.tolist() if isinstance(query.vector, np.ndarray) else list(query.vector),
+                filter=as_filter(query.filter),
+                limit=query.limit,
+                with_payload=with_payload,
+                with_vector=with_vectors,
+                params=search_params,
+            )
+            for query in queries
+        ]
+        with instrumentation.span("vector.search_batch", collection=cls.get_collection_name()):
+            responses = connection.query_batch_points(collection_name=cls.get_collection_name(), requests=requests)
+
+        return [[cls.from_record(point) for point in response.points] for response in responses]
+
+    @classmethod
+    def search_collections(
+        cls, queries: dict[type["VectorBaseDocument"], Sequence[VectorQuery]], max_workers: int | None = None
+    ) -> dict[type["VectorBaseDocument"], list[list["VectorBaseDocument"]]]:
+        """
+        Fans `search_batch` out over several collections concurrently.
+
+        Args:
+            queries (dict): The queries to run, keyed by the document class of each collection.
+            max_workers (int | None): The maximum number of collections searched at once.
+                Defaults to one thread per collection.
+
+        Returns:
+            dict: For every document class, one result list per query.
+        """
+        if not queries:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(queries)) as executor:
+            futures = {
+                document_class: executor.submit(document_class.search_batch, class_queries)
+                for document_class, class_queries in queries.items()
+            }
+
+        return {document_class: future.result() for document_class, future in futures.items()}
+
+    @classmethod
+    def find_by_ids(
+        cls: Type[T], ids: Sequence[UUID | str], query_filter: Filter | FilterBuilder | None = None
+    ) -> list[T]:
+        """
+        Fetches the documents with the given ids, in the given order, skipping missing ones.
+
+        If `query_filter` is set, only the documents that also match it are returned,
+        which lets ids found outside Qdrant (e.g. by a lexical index) be filtered by payload.
+        """
+        if not ids:
+            return []
+
+        has_ids = HasIdCondition(has_id=[str(_id) for _id in ids])
+        query_filter = as_filter(query_filter)
+        scroll_filter = Filter(must=[has_ids, query_filter] if query_filter is not None else [has_ids])
+        try:
+            with instrumentation.span("vector.scroll", collection=cls.get_collection_name()):
+                records, _ = connection.scroll(
+                    collection_name=cls.get_collection_name(), scroll_filter=scroll_filter, limit=len(ids)
+                )
+        except exceptions.UnexpectedResponse:
+            logger.error(f"Failed to fetch documents by id in '{cls.get_collection_name()}'.")
+
+            return []
+
+        documents = {str(record.id): cls.from_record(record) for record in records}
+
+        return [documents[str(_id)] for _id in ids if str(_id) in documents]
+
+    @classmethod
+    def bulk_delete(cls: Type[T], ids: Sequence[UUID | str]) -> bool:
+        """Deletes the points with the given ids. Ids that are not in the collection are ignored."""
+        if not ids:
+            return True
+
+        try:
+            with instrumentation.span("vector.delete", collection=cls.get_collection_name()):
+                connection.delete(
+                    collection_name=cls.get_collection_name(),
+                    points_selector=PointIdsList(points=[str(_id) for _id in ids]),
+                )
+        except exceptions.UnexpectedResponse:
+            logger.error(f"Failed to delete {len(ids)} points from '{cls.get_collection_name()}'.")
+
+            return False
+
+        return True
+
+    @classmethod
+    def filter(cls: Type[T], **fields: Any) -> FilterBuilder:
+        """
+        Starts a payload filter on this class's fields, e.g. `cls.filter(author_id=author_id, platform="medium")`.
+
+        Accepted wherever the collection methods take a filter: `search(query_filter=...)`,
+        `bulk_find(scroll_filter=...)`, `iter_all(filter=...)` and `VectorQuery.filter`.
+        """
+        return FilterBuilder(cls).where(**fields)
     
     @classmethod
     def get_or_create_collection(cls: Type[T]) -> CollectionInfo:
         """        
         Idempotent method to get or create a Qdrant collection.
 
-        This function first attempts to get the collection by the name
-        provided by `cls.get_collection_name()`. If it exists, it returns
+        This function first checks whether the collection named by
+        `cls.get_collection_name()` exists. If it does, it returns
         the collection info immediately.
         
-        If it fails with an `UnexpectedResponse` (signaling that the
-        collection does not exist), it calls the internal `_create_collection`
+        If it does not, it calls the internal `_create_collection`
         method to build it, using the class's specific vector configuration.
         
         After ensuring the collection is created, it calls `get_collection`
@@ -351,12 +1084,12 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
         """        
         تابع اصلی برای «دریافت یا ایجاد» کالکشن.
 
-        این متد هوشمند، ابتدا تلاش می‌کند تا کالکشن را با نامی که از
-        `get_collection_name` کلاس می‌گیرد، دریافت کند.
+        این متد هوشمند، ابتدا بررسی می‌کند که کالکشنی با نامی که از
+        `get_collection_name` کلاس می‌گیرد، وجود دارد یا نه.
         
         اگر کالکشن وجود داشته باشد، همان را برمی‌گرداند.
         
-        اگر وجود نداشته باشد (و خطای `UnexpectedResponse` رخ دهد)،
+        اگر وجود نداشته باشد،
         به صورت خودکار متد `_create_collection` را صدا می‌زند تا آن را
         بسازد. پس از اطمینان از ساخت، کالکشن را دوباره دریافت کرده
         و اطلاعات آن را برمی‌گرداند.
@@ -369,9 +1102,9 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
         """
         collection_name = cls.get_collection_name()
 
-        try:
-            return connection.get_collection(collection_name=collection_name)
-        except exceptions.UnexpectedResponse:
+        # Checked explicitly: the server answers a missing collection with `UnexpectedResponse`,
+        # but the in-process backends raise `ValueError`.
+        if not connection.collection_exists(collection_name=collection_name):
             use_vector_index = cls.get_use_vector_index()
 
             collection_created = cls._create_collection(
@@ -382,6 +1115,12 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
 
             return connection.get_collection(collection_name=collection_name)
 
+        collection_info = connection.get_collection(collection_name=collection_name)
+        if cls.migrate_payload_indexes():
+            collection_info = connection.get_collection(collection_name=collection_name)
+
+        return collection_info
+
     @classmethod
     def create_collection(cls: Type[T]) -> bool:
         """        
@@ -418,7 +1157,8 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
 
         If `use_vector_index` is True, it configures the `VectorParams`
         using the size from the `EmbeddingModelSingleton` and `COSINE`
-        distance. If False, it passes an empty config.
+        distance. If False, it passes an empty config. HNSW, quantization,
+        on-disk storage and indexing threshold come from `get_index_options()`.
 
         Args:
             collection_name (str): The name for the new collection.
@@ -445,12 +1185,68 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
         بازگشت:
             bool: نتیجه عملیات ساخت کالکشن (معمولاً True).
         """
+        options = cls.get_index_options()
         if use_vector_index is True:
-            vectors_config = VectorParams(size=EmbeddingModelSingleton().embedding_size, distance=Distance.COSINE)
+            vectors_config = VectorParams(
+                size=EmbeddingModelSingleton().embedding_size, distance=Distance.COSINE, on_disk=options.on_disk_vectors
+            )
         else:
             vectors_config = {}
 
-        return connection.create_collection(collection_name=collection_name, vectors_config=vectors_config)
+        created = connection.create_collection(
+            collection_name=collection_name,
+            vectors_config=vectors_config,
+            on_disk_payload=options.on_disk_payload,
+            **_index_config(options),
+        )
+        if created:
+            for field_name, field_schema in cls.get_payload_indexes().items():
+                connection.create_payload_index(
+                    collection_name=collection_name, field_name=field_name, field_schema=field_schema, wait=True
+                )
+            _migrated_collections.add(collection_name)
+
+        return created
+
+    @classmethod
+    def migrate_payload_indexes(cls: Type[T], collection_name: str | None = None) -> list[str]:
+        """
+        Brings the payload indexes of an existing collection in line with `Config.payload_indexes`.
+
+        Missing indexes are created and indexes of the wrong type are recreated.
+        Indexes that are not declared are left alone. Running it again is a no-op.
+
+        Args:
+            collection_name (str | None): The collection to migrate; the class's own collection by default.
+
+        Returns:
+            list[str]: The fields whose index was created or recreated.
+        """
+        collection_name = collection_name or cls.get_collection_name()
+        payload_schema = connection.get_collection(collection_name=collection_name).payload_schema or {}
+
+        migrated = []
+        for field_name, field_schema in cls.get_payload_indexes().items():
+            existing = payload_schema.get(field_name)
+            if existing is not None and existing.data_type == _schema_type(field_schema):
+                continue
+
+            if existing is not None:
+                logger.info(
+                    f"Recreating the payload index on '{collection_name}.{field_name}' "
+                    f"({existing.data_type} -> {_schema_type(field_schema)})."
+                )
+                connection.delete_payload_index(collection_name=collection_name, field_name=field_name, wait=True)
+            connection.create_payload_index(
+                collection_name=collection_name, field_name=field_name, field_schema=field_schema, wait=True
+            )
+            migrated.append(field_name)
+
+        if migrated:
+            logger.info(f"Created payload indexes on '{collection_name}': {', '.join(migrated)}.")
+        _migrated_collections.add(collection_name)
+
+        return migrated
     
     @classmethod
     def get_category(cls:Type[T]) -> DataCategory:
@@ -481,9 +1277,31 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
         return cls.Config.use_vector_index  
     
     @classmethod
-    def grou_by_class(
-        cls:Type["VectorBaseDocument"], documents:List["VectorBaseDocument"]
-    ) -> Dict[Type["VectorBaseDocument"], List["VectorBaseDocument"]]:
+    def get_index_options(cls: Type[T]) -> VectorIndexOptions:
+        """
+        Returns the HNSW, quantization and storage options declared in `Config`, using the
+        `VectorIndexOptions` field names (e.g. `hnsw_m = 16`, `quantization = "int8"`).
+        """
+        config = getattr(cls, "Config", None)
+        options = {
+            name: getattr(config, name)
+            for name in VectorIndexOptions.__dataclass_fields__
+            if hasattr(config, name)
+        }
+
+        return VectorIndexOptions(**options)
+
+    @classmethod
+    def get_payload_indexes(cls: Type[T]) -> dict[str, Any]:
+        """
+        Returns the payload indexes declared in `Config.payload_indexes`, mapping each payload
+        field to a `PayloadSchemaType` (keyword, uuid, integer, text, ...) or to index params
+        such as `TextIndexParams`. Classes without the option get no payload index.
+        """
+        return dict(getattr(getattr(cls, "Config", None), "payload_indexes", {}))
+
+    @classmethod
+    def group_by_class(cls: Type[T], documents: Iterable[T]) -> Dict[Type[T], List[T]]:
         """        
         Public convenience method to group documents by their actual Python class.
 
@@ -522,20 +1340,23 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
             یک دیکشنری که بر اساس نوع کلاس گروه‌بندی شده است (مانند:
             {کلاس_کاربر: [...]، کلاس_مقاله: [...]}).
         """
-        return cls._group_by(documents, selectors=lambda doc: doc.__class__)
+        return cls._group_by(documents, selector=type)
+
+    @classmethod
+    def grou_by_class(cls: Type[T], documents: Iterable[T]) -> Dict[Type[T], List[T]]:
+        """Deprecated misspelling of `group_by_class`, kept for existing callers."""
+        return cls.group_by_class(documents)
     
     @classmethod
-    def group_by_category(
-        cls:Type[T], documents:List["VectorBaseDocument"]
-    ) -> Dict[DataCategory, List[T]]:
+    def group_by_category(cls: Type[T], documents: Iterable[T]) -> Dict[DataCategory, List[T]]:
         """        
         Public convenience method to group documents by their `DataCategory`.
 
         This category is typically defined in the document's inner `Config`
         class and retrieved via the `get_category()` method.
         
-        It calls the `_group_by` engine, passing a selector that uses 
-        `doc.get_category()` to determine the key.
+        Documents are first grouped by class, so `get_category()` is
+        resolved once per class instead of once per document.
 
         Args:
             documents: The list of document instances to group.
@@ -551,9 +1372,8 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
         این دسته‌بندی معمولاً در کلاس داخلی «کانفیگ» هر سند تعریف شده
         و از طریق متد «گت_کتگوری» قابل دسترسی است.
         
-        این تابع موتور «گروه‌بندی» داخلی را صدا می‌زند و به عنوان قانون،
-        دستور «گرفتن دسته‌بندی سند» (`doc.get_category()`) را برای
-        استخراج کلید دسته‌بندی ارسال می‌کند.
+        اسناد ابتدا بر اساس کلاس گروه‌بندی می‌شوند تا «گت_کتگوری»
+        برای هر کلاس فقط یک بار (و نه برای هر سند) صدا زده شود.
 
         ورودی‌ها:
             documents: لیست اسنادی که باید دسته‌بندی شوند.
@@ -561,10 +1381,14 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
         بازگشت:
             یک دیکشنری که بر اساس «دسته‌بندی داده» گروه‌بندی شده است.
         """
-        return cls._group_by(documents, selectors=lambda doc: doc.get_category())
+        grouped: defaultdict[DataCategory, List[T]] = defaultdict(list)
+        for document_class, class_documents in cls.group_by_class(documents).items():
+            grouped[document_class.get_category()].extend(class_documents)
+
+        return dict(grouped)
     
     @classmethod
-    def _group_by(cls: Type[T], documents: list[T], selector: Callable[[T], Any]) -> Dict[Any, list[T]]:
+    def _group_by(cls: Type[T], documents: Iterable[T], selector: Callable[[T], Any]) -> Dict[Any, list[T]]:
         """        
         The internal, generic grouping engine.
 
@@ -599,31 +1423,55 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
             دسته‌بندی‌ها یا نوع کلاس‌ها) و مقادیر آن، لیست اسناد
             مطابق با همان کلید هستند.
         """
-        grouped = {}
+        grouped: defaultdict[Any, list[T]] = defaultdict(list)
         for doc in documents:
-            key = selector(doc)
+            grouped[selector(doc)].append(doc)
 
-            if key not in grouped:
-                grouped[key] = []
-            grouped[key].append(doc)
+        return dict(grouped)
 
-        return grouped
+    @classmethod
+    def bulk_insert_mixed(
+        cls, documents: Iterable["VectorBaseDocument"], max_workers: int | None = None, **kwargs
+    ) -> bool:
+        """
+        Inserts documents of several classes, each into its own collection, uploading the collections concurrently.
+
+        Args:
+            documents (Iterable[VectorBaseDocument]): Documents of any mix of classes.
+            max_workers (int | None): The maximum number of collections uploaded at once.
+                Defaults to one thread per collection.
+            **kwargs: Passed to every class's `bulk_insert`.
+
+        Returns:
+            bool: True if every group was inserted.
+        """
+        groups = cls.group_by_class(documents)
+        if not groups:
+            return True
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(groups)) as executor:
+            futures = [
+                executor.submit(document_class.bulk_insert, class_documents, **kwargs)
+                for document_class, class_documents in groups.items()
+            ]
+
+        return all([future.result() for future in futures])
     
     @classmethod
-    def collection_name_to_class(cls: Type["VectorBaseDocument"], collection_name: str) -> type["VectorBaseDocument"]:
-        for subclass in cls.__subclasses__():
-            try:
-                if subclass.get_collection_name() == collection_name:
-                    return subclass
-            except ImproperlyConfigured:
-                pass
+    def collection_name_to_class(cls: Type[T], collection_name: str) -> Type[T]:
+        """Returns the subclass of `cls` that stores its documents in `collection_name`."""
+        document_class = _collection_registry.get(collection_name)
+        if document_class is None or not issubclass(document_class, cls):
+            raise ValueError(f"No subclass found for collection name: {collection_name}")
 
-            try:
-                return subclass.collection_name_to_class(collection_name)
-            except ValueError:
-                continue
+        return document_class
 
-        raise ValueError(f"No subclass found for collection name: {collection_name}")
+    @classmethod
+    def category_to_classes(cls: Type[T], category: DataCategory) -> list[Type[T]]:
+        """Returns the subclasses of `cls` that declare `category`, in the order they were defined."""
+        return [
+            document_class for document_class in _category_registry.get(category, ()) if issubclass(document_class, cls)
+        ]
 
     @classmethod
     def _has_class_attribute(cls: Type[T], attribute_name: str) -> bool:
@@ -635,4 +1483,43 @@ class VectorBaseDocument(ABC, Generic[T], BaseModel):
                 return True
 
         return False
-        
\ No newline at end of file
+
+
+def _qualified_name(document_class: type) -> str:
+    return f"{document_class.__module__}.{document_class.__qualname__}"
+
+
+def _estimate_point_size(point: PointStruct) -> int:
+    """Approximates the JSON size of a point: ~20 characters per float plus the payload repr."""
+    vector_size = len(point.vector) if isinstance(point.vector, list) else 0
+
+    return 20 * vector_size + len(repr(point.payload))
+
+
+def _num_points(points: list[PointStruct] | Batch) -> int:
+    return len(points.ids) if isinstance(points, Batch) else len(points)
+
+
+def _index_config(options: VectorIndexOptions) -> dict[str, Any]:
+    """Builds the HNSW, quantization and optimizer arguments of `create_collection`, omitting defaults."""
+    config = {}
+    if options.hnsw_m is not None or options.hnsw_ef_construct is not None:
+        config["hnsw_config"] = HnswConfigDiff(m=options.hnsw_m, ef_construct=options.hnsw_ef_construct)
+    if options.quantization == "int8":
+        config["quantization_config"] = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    elif options.quantization is not None:
+        raise ImproperlyConfigured(f"Unsupported quantization '{options.quantization}'. Use 'int8' or None.")
+    if options.indexing_threshold is not None:
+        config["optimizers_config"] = OptimizersConfigDiff(indexing_threshold=options.indexing_threshold)
+
+    return config
+
+
+def _schema_type(field_schema: Any) -> PayloadSchemaType:
+    """Maps a declared index (a schema type or its params, e.g. `TextIndexParams`) to its schema type."""
+    if isinstance(field_schema, PayloadSchemaType):
+        return field_schema
+
+    return PayloadSchemaType(getattr(field_schema, "type", field_schema))
@@ -1,4 +1,5 @@
 from abc import ABC
+from datetime import datetime, timezone
 from typing import Optional
 
 from sympy import O
@@ -10,8 +11,9 @@ Also, it serves as a base for other document models.
 از این برای تعریف ساختار و اعتبارسنجی داده‌های مرتبط با اسناد استفاده می‌شود.
 همچنین، به عنوان پایه‌ای برای سایر مدل‌های سند عمل می‌کند.   
 """
-from pydantic import UUID4, Field
+from pydantic import UUID4, ConfigDict, Field
 
+from .base.content import LazyContent, decode_content, encode_content
 from .base.nosql import NoSQLBaseDocument
 from .types import DataCategory
 
@@ -30,10 +32,61 @@ class UserDocument(NoSQLBaseDocument):
     
 
 class Document(NoSQLBaseDocument, ABC):
+    # The crawlers pass `author_id=`, MongoDB rows hold `authorId`: accept both.
+    model_config = ConfigDict(populate_by_name=True)
+
     content : dict
     platform : str
     author_id: UUID4 = Field(alias = "authorId")
     author_full_name: str = Field(alias = "author_full_name")
+    # Refreshed by `upsert`: the feature pipeline only re-embeds documents newer than its mark.
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    # Large `content` is stored compressed, or in the blob store (see `base.content`).
+    @classmethod
+    def from_mongo(cls, data: dict, trusted: bool | None = None) -> "Document":
+        if "content" not in data:
+            return super().from_mongo(data, trusted=trusted)
+
+        content = decode_content(data["content"])
+        if not isinstance(content, LazyContent):
+            data["content"] = content
+
+            return super().from_mongo(data, trusted=trusted)
+
+        # Validating a dict would read it, so the fetch-on-access content is attached afterwards.
+        data["content"] = {}
+        document = super().from_mongo(data, trusted=trusted)
+        document.content = content
+
+        return document
+
+    def to_mongo(self, **kwargs) -> dict:
+        exclude = set(kwargs.pop("exclude", None) or ())
+        parsed = super().to_mongo(exclude=exclude | {"content"}, **kwargs)
+        if "content" not in exclude:
+            parsed["content"] = encode_content(self.content)
+
+        return parsed
+
+    def upsert(self, **kwargs) -> "Document | None":
+        """Rewrite the document, marking it as changed since the feature pipeline last read it."""
+        self.updated_at = datetime.now(timezone.utc)
+
+        return super().upsert(**kwargs)
+
+    def model_dump(self, **kwargs) -> dict:
+        # Pydantic reads dicts natively, bypassing `LazyContent`'s methods.
+        if isinstance(self.content, LazyContent):
+            self.content.load()
+
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs) -> str:
+        if isinstance(self.content, LazyContent):
+            self.content.load()
+
+        return super().model_dump_json(**kwargs)
 
 
 class RepositoryDocument(Document):
@@ -59,5 +112,11 @@ class ArticleDocument(Document):
         name = DataCategory.ARTICLES
 
 
-    
+class IngestionStateDocument(NoSQLBaseDocument):
+    """The high-water mark of the incremental feature pipeline for one document collection."""
 
+    collection: str
+    updated_at: datetime | None = None
+
+    class Settings:
+        name = "ingestion_state"
@@ -0,0 +1,67 @@
+from abc import ABC
+
+from pydantic import UUID4, Field
+from qdrant_client.models import PayloadSchemaType
+
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.types import DataCategory
+
+
+class _EmbeddedChunkConfig:
+    use_vector_index = True
+
+    # Retrieval is mostly per author, so `author_id` is indexed; `document_id` is used to
+    # replace or delete the chunks of one document.
+    payload_indexes = {
+        "author_id": PayloadSchemaType.UUID,
+        "document_id": PayloadSchemaType.UUID,
+        "platform": PayloadSchemaType.KEYWORD,
+        "metadata.chunk_index": PayloadSchemaType.INTEGER,
+    }
+
+    # Only the int8 copy of the vectors stays in RAM; the float32 originals are memory-mapped
+    # and used to rescore the 2x oversampled candidates.
+    hnsw_m = 16
+    hnsw_ef_construct = 128
+    search_ef = 64
+    quantization = "int8"
+    quantization_oversampling = 2.0
+    on_disk_vectors = True
+    on_disk_payload = True
+
+
+class EmbeddedChunk(VectorBaseDocument, ABC):
+    content: str
+    embedding: list[float] | None
+    platform: str
+    document_id: UUID4
+    author_id: UUID4
+    author_full_name: str
+    metadata: dict = Field(default_factory=dict)
+
+
+class EmbeddedPostChunk(EmbeddedChunk):
+    image: str | None = None
+
+    class Config(_EmbeddedChunkConfig):
+        name = "embedded_posts"
+        category = DataCategory.POSTS
+
+
+class EmbeddedArticleChunk(EmbeddedChunk):
+    link: str
+
+    class Config(_EmbeddedChunkConfig):
+        name = "embedded_articles"
+        category = DataCategory.ARTICLES
+        payload_indexes = {**_EmbeddedChunkConfig.payload_indexes, "content": PayloadSchemaType.TEXT}
+
+
+class EmbeddedRepositoryChunk(EmbeddedChunk):
+    name: str
+    link: str
+
+    class Config(_EmbeddedChunkConfig):
+        name = "embedded_repositories"
+        category = DataCategory.REPOSITORIES
+        payload_indexes = {**_EmbeddedChunkConfig.payload_indexes, "name": PayloadSchemaType.KEYWORD}
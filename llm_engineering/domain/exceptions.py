@@ -3,4 +3,25 @@ class LLMTwinException(Exception):
 
 
 class ImproperlyConfigured(LLMTwinException):
-    pass
\ No newline at end of file
+    pass
+
+class EmbeddingError(LLMTwinException):
+    pass
+
+class CrawlError(LLMTwinException):
+    pass
+
+
+class TransientCrawlError(CrawlError):
+    """A failure worth retrying: the same request may succeed later."""
+
+
+class CircuitOpenError(CrawlError):
+    def __init__(self, domain: str, retry_after: float) -> None:
+        super().__init__(f"Circuit open for {domain}: retry in {retry_after:.1f}s.")
+        self.domain = domain
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(CrawlError):
+    pass
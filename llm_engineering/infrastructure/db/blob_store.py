@@ -0,0 +1,125 @@
+"""
+Content-addressed storage for document content too large to keep inline in MongoDB.
+
+Blobs are keyed by the SHA-256 of their bytes, so writing the same content twice
+stores it once and a key always refers to the same bytes.
+
+`settings.CONTENT_BLOB_STORE` selects the implementation used by `get_blob_store`:
+    - "gridfs": GridFS in the application's MongoDB database (default).
+    - "local":  files under `settings.CONTENT_BLOB_STORE_PATH`.
+
+این ماژول محتوای بزرگ اسناد را که نباید مستقیماً در مونگودیبی ذخیره شود، بر اساس
+هش محتوای آن نگه می‌دارد؛ محتوای تکراری فقط یک بار ذخیره می‌شود.
+"""
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import gridfs
+from loguru import logger
+
+from llm_engineering.settings import settings
+
+
+class BlobStore(ABC):
+    """Stores immutable byte strings under the hex SHA-256 of their content."""
+
+    name: str
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """Store `data` (a no-op if it is already stored) and return its key."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Return the bytes stored under `key`. Raises KeyError if there are none."""
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under `root`, sharded by the first two characters of their key."""
+
+    name = "local"
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def put(self, data: bytes) -> str:
+        key = self.key_for(data)
+        path = self._path(key)
+        if path.exists():
+            return key
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a partial blob.
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        return key
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+
+class GridFSBlobStore(BlobStore):
+    """Blobs as GridFS files whose `_id` is their key."""
+
+    name = "gridfs"
+
+    def __init__(self, database, collection: str = "content_blobs") -> None:
+        self._fs = gridfs.GridFS(database, collection=collection)
+
+    def put(self, data: bytes) -> str:
+        key = self.key_for(data)
+        if not self._fs.exists(key):
+            try:
+                self._fs.put(data, _id=key)
+            except gridfs.errors.FileExists:
+                pass  # Written by a concurrent writer: same key, same bytes.
+
+        return key
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self._fs.get(key).read()
+        except gridfs.errors.NoFile:
+            raise KeyError(key) from None
+
+
+_instance: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    """The process-wide blob store selected by `settings.CONTENT_BLOB_STORE`, built on first use."""
+    global _instance
+
+    if _instance is None:
+        if settings.CONTENT_BLOB_STORE == "gridfs":
+            from llm_engineering.infrastructure.db.mongo import connection
+
+            _instance = GridFSBlobStore(connection.get_database(settings.DATABASE_NAME))
+        elif settings.CONTENT_BLOB_STORE == "local":
+            _instance = LocalBlobStore(settings.CONTENT_BLOB_STORE_PATH)
+        else:
+            raise ValueError(f"Unknown content blob store '{settings.CONTENT_BLOB_STORE}'. Use 'gridfs' or 'local'.")
+
+        logger.info(f"Storing large document content in the '{_instance.name}' blob store.")
+
+    return _instance
@@ -0,0 +1,284 @@
+"""
+A durable crawl frontier: the state of every link of the ETL, kept in SQLite.
+
+Each link is `pending`, `in_flight`, `done` or `failed`, with its attempt count,
+the time it may next be claimed and its last error. Workers claim links with a
+single `UPDATE ... RETURNING`, so a link is handed to one worker at a time, and a
+claim is a lease: links held by a worker that died are claimable again once their
+lease expires. Outcomes are only recorded by the worker still holding the claim,
+so a worker that outlived its lease cannot overwrite its successor's state. A
+restarted run opens the same file and carries on from there.
+
+The database runs in WAL mode with one connection per thread, so readers never
+block the writer and several processes can share the file.
+
+این ماژول وضعیت هر پیوند خزش (در انتظار، در حال پردازش، انجام‌شده، ناموفق) را همراه
+با تعداد تلاش‌ها، زمان مجاز بعدی و آخرین خطا در اس‌کیولایت نگه می‌دارد تا اجرای
+دوباره‌ی خط لوله دقیقاً از همان جایی ادامه یابد که متوقف شده بود.
+"""
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+from typing import Callable, Iterable
+
+from llm_engineering.settings import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    link TEXT PRIMARY KEY,
+    user_id TEXT,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_eligible_at REAL NOT NULL,
+    lease_expires_at REAL,
+    worker_id TEXT,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS frontier_claimable ON frontier (state, next_eligible_at);
+"""
+
+
+class LinkState(StrEnum):
+    PENDING = "pending"
+    IN_FLIGHT = "in_flight"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class FrontierLink:
+    link: str
+    user_id: str | None
+    state: LinkState
+    attempts: int
+    next_eligible_at: float
+    last_error: str | None
+
+
+class CrawlFrontier:
+    """
+    Persistent per-link crawl state with atomic, leased claims.
+
+    Args:
+        path: SQLite file; ":memory:" is not supported, as every thread opens its own connection.
+        lease_s: Seconds a claim is held before the link can be claimed by another worker.
+        max_attempts: Claims after which a failing link is marked `failed` for good.
+        retry_backoff_s: Delay before a failed link is retried, doubled at every attempt.
+        timer: Clock in seconds since the epoch, replaceable in tests.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        lease_s: float | None = None,
+        max_attempts: int | None = None,
+        retry_backoff_s: float | None = None,
+        timer: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path or settings.CRAWL_FRONTIER_PATH)
+        self.lease_s = settings.CRAWL_FRONTIER_LEASE_S if lease_s is None else lease_s
+        self.max_attempts = max_attempts or settings.CRAWL_MAX_ATTEMPTS
+        self.retry_backoff_s = settings.CRAWL_RETRY_BACKOFF_S if retry_backoff_s is None else retry_backoff_s
+        self._timer = timer
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    def add(self, links: Iterable[str], user_id: str | None = None) -> int:
+        """Queue the links that are not in the frontier yet. Returns how many were new."""
+        now = self._timer()
+        with self._connection() as connection:
+            cursor = connection.executemany(
+                "INSERT OR IGNORE INTO frontier (link, user_id, state, next_eligible_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(link, user_id, LinkState.PENDING, now, now) for link in links],
+            )
+
+            return cursor.rowcount
+
+    def claim(self, worker_id: str, limit: int = 1, user_id: str | None = None) -> list[FrontierLink]:
+        """
+        Atomically take up to `limit` eligible links: pending ones whose retry time
+        has come, and in-flight ones whose lease has expired.
+        """
+        now = self._timer()
+        user_clause = "" if user_id is None else " AND user_id = :user_id"
+        with self._connection() as connection:
+            rows = connection.execute(
+                f"""
+                UPDATE frontier
+                SET state = :in_flight, attempts = attempts + 1, worker_id = :worker_id,
+                    lease_expires_at = :lease_expires_at, updated_at = :now
+                WHERE link IN (
+                    SELECT link FROM frontier
+                    WHERE ((state = :pending AND next_eligible_at <= :now)
+                        OR (state = :in_flight AND lease_expires_at <= :now)){user_clause}
+                    ORDER BY next_eligible_at
+                    LIMIT :limit
+                )
+                RETURNING link, user_id, state, attempts, next_eligible_at, last_error
+                """,
+                {
+                    "in_flight": LinkState.IN_FLIGHT,
+                    "pending": LinkState.PENDING,
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + self.lease_s,
+                    "now": now,
+                    "user_id": user_id,
+                    "limit": limit,
+                },
+            ).fetchall()
+
+        return [self._to_link(row) for row in rows]
+
+    def complete(self, link: str, worker_id: str) -> bool:
+        """
+        Mark a link claimed by `worker_id` as `done`. Returns False, changing nothing,
+        if the claim was lost: its lease expired and another worker took the link.
+        """
+        now = self._timer()
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "UPDATE frontier SET state = ?, last_error = NULL, worker_id = NULL, lease_expires_at = NULL,"
+                " updated_at = ? WHERE link = ? AND worker_id = ? AND state = ?",
+                (LinkState.DONE, now, link, worker_id, LinkState.IN_FLIGHT),
+            )
+
+            return cursor.rowcount == 1
+
+    def fail(self, link: str, worker_id: str, error: str) -> LinkState | None:
+        """
+        Schedule a retry of a link claimed by `worker_id` with exponential backoff, or
+        mark it `failed` after `max_attempts`. Returns the new state, or None if the
+        claim was lost.
+        """
+        now = self._timer()
+        with self._connection() as connection:
+            row = connection.execute(
+                """
+                UPDATE frontier
+                SET state = CASE WHEN attempts >= :max_attempts THEN :failed ELSE :pending END,
+                    next_eligible_at = CASE WHEN attempts >= :max_attempts THEN next_eligible_at
+                        ELSE :now + :backoff_s * (1 << MAX(attempts - 1, 0)) END,
+                    last_error = :error, worker_id = NULL, lease_expires_at = NULL, updated_at = :now
+                WHERE link = :link AND worker_id = :worker_id AND state = :in_flight
+                RETURNING state
+                """,
+                {
+                    "max_attempts": self.max_attempts,
+                    "failed": LinkState.FAILED,
+                    "pending": LinkState.PENDING,
+                    "in_flight": LinkState.IN_FLIGHT,
+                    "now": now,
+                    "backoff_s": self.retry_backoff_s,
+                    "error": error,
+                    "link": link,
+                    "worker_id": worker_id,
+                },
+            ).fetchone()
+
+        return LinkState(row[0]) if row else None
+
+    def postpone(self, link: str, worker_id: str, delay_s: float) -> bool:
+        """
+        Give a link claimed by `worker_id` back without counting the attempt, claimable
+        again in `delay_s`. Returns False if the claim was lost.
+        """
+        now = self._timer()
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "UPDATE frontier SET state = ?, attempts = MAX(attempts - 1, 0), worker_id = NULL,"
+                " lease_expires_at = NULL, next_eligible_at = ?, updated_at = ?"
+                " WHERE link = ? AND worker_id = ? AND state = ?",
+                (LinkState.PENDING, now + delay_s, now, link, worker_id, LinkState.IN_FLIGHT),
+            )
+
+            return cursor.rowcount == 1
+
+    def requeue_in_flight(self, user_id: str | None = None) -> int:
+        """
+        Make in-flight links claimable now, without waiting for their leases.
+
+        Call it when starting a run that owns the frontier: whatever is still in
+        flight was held by a previous run that stopped. Returns the number of links.
+        """
+        now = self._timer()
+        user_clause = "" if user_id is None else " AND user_id = ?"
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "UPDATE frontier SET state = ?, worker_id = NULL, lease_expires_at = NULL, next_eligible_at = ?,"
+                f" updated_at = ? WHERE state = ?{user_clause}",
+                (LinkState.PENDING, now, now, LinkState.IN_FLIGHT, *(() if user_id is None else (user_id,))),
+            )
+
+            return cursor.rowcount
+
+    def seconds_until_eligible(self, user_id: str | None = None) -> float | None:
+        """How long until the next link can be claimed: 0 if one can be now, None if none is left to crawl."""
+        user_clause = "" if user_id is None else " AND user_id = ?"
+        with self._connection() as connection:
+            (next_at,) = connection.execute(
+                "SELECT MIN(CASE WHEN state = ? THEN next_eligible_at ELSE lease_expires_at END)"
+                f" FROM frontier WHERE state IN (?, ?){user_clause}",
+                (LinkState.PENDING, LinkState.PENDING, LinkState.IN_FLIGHT, *(() if user_id is None else (user_id,))),
+            ).fetchone()
+        if next_at is None:
+            return None
+
+        return max(next_at - self._timer(), 0.0)
+
+    def get(self, link: str) -> FrontierLink | None:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT link, user_id, state, attempts, next_eligible_at, last_error FROM frontier WHERE link = ?",
+                (link,),
+            ).fetchone()
+
+        return self._to_link(row) if row else None
+
+    def stats(self, user_id: str | None = None) -> dict[str, int]:
+        """The number of links in each state."""
+        user_clause = "" if user_id is None else " WHERE user_id = ?"
+        with self._connection() as connection:
+            rows = connection.execute(
+                f"SELECT state, COUNT(*) FROM frontier{user_clause} GROUP BY state",
+                () if user_id is None else (user_id,),
+            ).fetchall()
+
+        return {state.value: 0 for state in LinkState} | dict(rows)
+
+    def close(self) -> None:
+        """Close the connections of every thread. Each thread reconnects if it uses the frontier again."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection. Used as a context manager, it commits or rolls back one transaction."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # With WAL, NORMAL only risks the last transactions on power loss, never corruption.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+
+        return connection
+
+    @staticmethod
+    def _to_link(row: tuple) -> FrontierLink:
+        link, user_id, state, attempts, next_eligible_at, last_error = row
+
+        return FrontierLink(link, user_id, LinkState(state), attempts, next_eligible_at, last_error)
@@ -0,0 +1,783 @@
+"""
+In-process exact-search vector backend built on NumPy.
+
+Each collection keeps its vectors in one contiguous float32 matrix, grown by
+doubling, so a search is a single matrix-vector product followed by
+`argpartition` for the top-k. Cosine collections store unit vectors and score
+with a dot product. For collections up to ~100k points this is exact and
+faster than an approximate index behind a network hop.
+
+Payload filters follow Qdrant's semantics for the conditions the project uses
+(match value/any/except/text, range, has-id and nested must/should/must_not).
+Fields with a keyword, uuid, integer or bool payload index are answered from an
+inverted index; other conditions scan the payloads.
+
+With a `path`, every collection is persisted as `<name>.npy` (vectors) plus a
+`<name>.json` sidecar (ids, payloads and config) on `flush()` / `close()`. With
+`mmap=True` the vectors are memory-mapped read-only at startup and copied into
+RAM on the first write.
+
+بک‌اندِ جست‌وجوی دقیق درون‌فرایندی: بردارها در یک ماتریس پیوستهٔ float32 نگه
+داشته می‌شوند و جست‌وجو با یک ضرب ماتریسی و argpartition انجام می‌شود.
+"""
+import json
+import os
+import threading
+import uuid
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+from qdrant_client.http.models import QueryResponse
+from qdrant_client.models import (
+    AliasDescription,
+    Batch,
+    CollectionConfig,
+    CollectionInfo,
+    CollectionParams,
+    CollectionsAliasesResponse,
+    CollectionStatus,
+    CountResult,
+    CreateAliasOperation,
+    DeleteAliasOperation,
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    HasIdCondition,
+    HnswConfig,
+    MatchAny,
+    MatchExcept,
+    MatchText,
+    MatchValue,
+    NearestQuery,
+    OptimizersConfig,
+    OptimizersStatusOneOf,
+    PayloadIndexInfo,
+    PayloadSchemaType,
+    PointIdsList,
+    QueryRequest,
+    Record,
+    RenameAliasOperation,
+    ScoredPoint,
+    UpdateResult,
+    UpdateStatus,
+    VectorParams,
+    WalConfig,
+)
+
+from llm_engineering.infrastructure.db.vector_backend import VectorBackend
+
+# Payload index types answered from an inverted index instead of a payload scan.
+_INVERTED_INDEX_TYPES = {
+    PayloadSchemaType.KEYWORD,
+    PayloadSchemaType.UUID,
+    PayloadSchemaType.INTEGER,
+    PayloadSchemaType.BOOL,
+}
+
+_DEFAULT_INDEXING_THRESHOLD = 20_000
+_ALIASES_FILE = "aliases.json"
+
+
+class NumpyVectorBackend(VectorBackend):
+    """
+    Exact-search `VectorBackend` living in the current process. Thread-safe.
+
+    Args:
+        path (str | Path | None): Directory to persist the collections to. In memory only if None.
+        mmap (bool): Memory-map the persisted vectors instead of reading them into RAM.
+    """
+
+    def __init__(self, path: str | Path | None = None, mmap: bool = False) -> None:
+        self._path = Path(path) if path is not None else None
+        self._mmap = mmap
+        self._lock = threading.RLock()
+        self._collections: dict[str, _Collection] = {}
+        self._aliases: dict[str, str] = {}
+        self._operation_id = 0
+
+        if self._path is not None:
+            self._load()
+
+    # -- Collections ---------------------------------------------------------------------------
+
+    def collection_exists(self, collection_name: str, **kwargs: Any) -> bool:
+        with self._lock:
+            return self._aliases.get(collection_name, collection_name) in self._collections
+
+    def create_collection(self, collection_name: str, vectors_config: Any, **kwargs: Any) -> bool:
+        with self._lock:
+            if collection_name in self._collections or collection_name in self._aliases:
+                raise ValueError(f"Collection {collection_name} already exists")
+
+            if isinstance(vectors_config, VectorParams):
+                size, distance = vectors_config.size, vectors_config.distance
+            else:
+                size, distance = 0, Distance.DOT
+
+            optimizers_config = kwargs.get("optimizers_config")
+            collection = _Collection(size=size, distance=distance)
+            if optimizers_config is not None and optimizers_config.indexing_threshold is not None:
+                collection.indexing_threshold = optimizers_config.indexing_threshold
+            self._collections[collection_name] = collection
+
+            return True
+
+    def delete_collection(self, collection_name: str, **kwargs: Any) -> bool:
+        with self._lock:
+            collection_name = self._aliases.get(collection_name, collection_name)
+            if self._collections.pop(collection_name, None) is None:
+                return False
+
+            self._aliases = {alias: name for alias, name in self._aliases.items() if name != collection_name}
+            if self._path is not None:
+                for suffix in (".npy", ".json"):
+                    (self._path / f"{collection_name}{suffix}").unlink(missing_ok=True)
+                self._save_aliases()
+
+            return True
+
+    def get_collection(self, collection_name: str, **kwargs: Any) -> CollectionInfo:
+        with self._lock:
+            return self._get(collection_name).info()
+
+    def update_collection(self, collection_name: str, **kwargs: Any) -> bool:
+        with self._lock:
+            collection = self._get(collection_name)
+            optimizers_config = kwargs.get("optimizers_config")
+            if optimizers_config is not None and optimizers_config.indexing_threshold is not None:
+                collection.indexing_threshold = optimizers_config.indexing_threshold
+
+            return True
+
+    def create_payload_index(
+        self, collection_name: str, field_name: str, field_schema: Any = None, **kwargs: Any
+    ) -> UpdateResult:
+        field_schema = field_schema if field_schema is not None else kwargs.get("field_type")
+        schema_type = PayloadSchemaType(getattr(field_schema, "type", field_schema))
+
+        with self._lock:
+            self._get(collection_name).create_index(field_name, schema_type)
+
+            return self._update_result()
+
+    def delete_payload_index(self, collection_name: str, field_name: str, **kwargs: Any) -> UpdateResult:
+        with self._lock:
+            self._get(collection_name).drop_index(field_name)
+
+            return self._update_result()
+
+    # -- Points --------------------------------------------------------------------------------
+
+    def upsert(self, collection_name: str, points: Any, wait: bool = True, **kwargs: Any) -> UpdateResult:
+        if isinstance(points, Batch):
+            ids, vectors, payloads = points.ids, points.vectors, points.payloads or [{}] * len(points.ids)
+        else:
+            ids = [point.id for point in points]
+            vectors = [point.vector for point in points]
+            payloads = [point.payload or {} for point in points]
+
+        with self._lock:
+            self._get(collection_name).upsert([_normalize_id(_id) for _id in ids], vectors, payloads)
+
+            return self._update_result()
+
+    def delete(self, collection_name: str, points_selector: Any, wait: bool = True, **kwargs: Any) -> UpdateResult:
+        with self._lock:
+            collection = self._get(collection_name)
+            if isinstance(points_selector, PointIdsList):
+                ids = [_normalize_id(_id) for _id in points_selector.points]
+            elif isinstance(points_selector, (FilterSelector, Filter)):
+                query_filter = points_selector.filter if isinstance(points_selector, FilterSelector) else points_selector
+                ids = [collection.ids[row] for row in np.flatnonzero(collection.mask(query_filter))]
+            else:
+                ids = [_normalize_id(_id) for _id in points_selector]
+            collection.delete(ids)
+
+            return self._update_result()
+
+    def count(
+        self, collection_name: str, count_filter: Filter | None = None, exact: bool = True, **kwargs: Any
+    ) -> CountResult:
+        with self._lock:
+            collection = self._get(collection_name)
+            if count_filter is None:
+                return CountResult(count=len(collection))
+
+            return CountResult(count=int(collection.mask(count_filter).sum()))
+
+    def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Filter | None = None,
+        limit: int = 10,
+        offset: Any = None,
+        with_payload: bool | Sequence[str] = True,
+        with_vectors: bool = False,
+        **kwargs: Any,
+    ) -> tuple[list[Record], Any]:
+        with self._lock:
+            collection = self._get(collection_name)
+            sorted_ids = collection.sorted_ids()
+            start = bisect_left(sorted_ids, _sort_key(_normalize_id(offset))) if offset is not None else 0
+            mask = collection.mask(scroll_filter) if scroll_filter is not None else None
+
+            records, next_offset = [], None
+            for _, point_id in sorted_ids[start:]:
+                row = collection.rows[point_id]
+                if mask is not None and not mask[row]:
+                    continue
+                if len(records) == limit:
+                    next_offset = point_id
+                    break
+
+                records.append(
+                    Record(
+                        id=point_id,
+                        payload=collection.payload(row, with_payload),
+                        vector=collection.vector(row) if with_vectors else None,
+                    )
+                )
+
+            return records, next_offset
+
+    def search(
+        self,
+        collection_name: str,
+        query_vector: Sequence[float],
+        query_filter: Filter | None = None,
+        search_params: Any = None,
+        limit: int = 10,
+        offset: int | None = None,
+        with_payload: bool | Sequence[str] = True,
+        with_vectors: bool = False,
+        score_threshold: float | None = None,
+        **kwargs: Any,
+    ) -> list[ScoredPoint]:
+        with self._lock:
+            return self._get(collection_name).search(
+                np.asarray(query_vector, dtype=np.float32)[None, :],
+                [query_filter],
+                [limit],
+                offset=offset or 0,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+                score_threshold=score_threshold,
+            )[0]
+
+    def query_batch_points(
+        self, collection_name: str, requests: Sequence[QueryRequest], **kwargs: Any
+    ) -> list[QueryResponse]:
+        if not requests:
+            return []
+        vectors = [_query_vector(request) for request in requests]
+        first = requests[0]
+        options = (first.with_payload, first.with_vector, first.offset, first.score_threshold)
+        if any((r.with_payload, r.with_vector, r.offset, r.score_threshold) != options for r in requests):
+            return [self.query_batch_points(collection_name, [request])[0] for request in requests]
+
+        with self._lock:
+            results = self._get(collection_name).search(
+                np.asarray(vectors, dtype=np.float32),
+                [request.filter for request in requests],
+                [10 if request.limit is None else request.limit for request in requests],
+                offset=first.offset or 0,
+                with_payload=first.with_payload if first.with_payload is not None else False,
+                with_vectors=bool(first.with_vector),
+                score_threshold=first.score_threshold,
+            )
+
+        return [QueryResponse(points=points) for points in results]
+
+    # -- Aliases -------------------------------------------------------------------------------
+
+    def get_aliases(self, **kwargs: Any) -> CollectionsAliasesResponse:
+        with self._lock:
+            return CollectionsAliasesResponse(
+                aliases=[AliasDescription(alias_name=alias, collection_name=name) for alias, name in self._aliases.items()]
+            )
+
+    def update_collection_aliases(self, change_aliases_operations: Sequence[Any], **kwargs: Any) -> bool:
+        with self._lock:
+            aliases = dict(self._aliases)
+            for operation in change_aliases_operations:
+                if isinstance(operation, CreateAliasOperation):
+                    if operation.create_alias.collection_name not in self._collections:
+                        raise ValueError(f"Collection {operation.create_alias.collection_name} not found")
+                    aliases[operation.create_alias.alias_name] = operation.create_alias.collection_name
+                elif isinstance(operation, DeleteAliasOperation):
+                    aliases.pop(operation.delete_alias.alias_name, None)
+                elif isinstance(operation, RenameAliasOperation):
+                    aliases[operation.rename_alias.new_alias_name] = aliases.pop(operation.rename_alias.old_alias_name)
+                else:
+                    raise ValueError(f"Unsupported alias operation: {operation!r}")
+
+            # Applied all at once, like Qdrant: readers see either the old or the new aliases.
+            self._aliases = aliases
+            self._save_aliases()
+
+            return True
+
+    # -- Persistence ---------------------------------------------------------------------------
+
+    def flush(self) -> None:
+        """Writes every collection changed since the last flush to `path`. A no-op without a path."""
+        if self._path is None:
+            return
+
+        with self._lock:
+            self._path.mkdir(parents=True, exist_ok=True)
+            for name, collection in self._collections.items():
+                if collection.dirty:
+                    collection.save(self._path / f"{name}.npy", self._path / f"{name}.json")
+            self._save_aliases()
+
+    def close(self, **kwargs: Any) -> None:
+        self.flush()
+
+    def _load(self) -> None:
+        if not self._path.exists():
+            return
+
+        for sidecar in sorted(self._path.glob("*.json")):
+            if sidecar.name == _ALIASES_FILE:
+                continue
+            self._collections[sidecar.stem] = _Collection.load(sidecar.with_suffix(".npy"), sidecar, mmap=self._mmap)
+
+        aliases_file = self._path / _ALIASES_FILE
+        if aliases_file.exists():
+            self._aliases = json.loads(aliases_file.read_text())
+
+    def _save_aliases(self) -> None:
+        if self._path is not None:
+            self._path.mkdir(parents=True, exist_ok=True)
+            _atomic_write_text(self._path / _ALIASES_FILE, json.dumps(self._aliases))
+
+    # -- Helpers -------------------------------------------------------------------------------
+
+    def _get(self, collection_name: str) -> "_Collection":
+        try:
+            return self._collections[self._aliases.get(collection_name, collection_name)]
+        except KeyError:
+            raise ValueError(f"Collection {collection_name} not found") from None
+
+    def _update_result(self) -> UpdateResult:
+        self._operation_id += 1
+
+        return UpdateResult(operation_id=self._operation_id, status=UpdateStatus.COMPLETED)
+
+
+class _Collection:
+    """Points of one collection: a float32 matrix, the ids and payloads in row order, and payload indexes."""
+
+    def __init__(self, size: int, distance: Distance) -> None:
+        self.size = size
+        self.distance = Distance(distance)
+        self.indexing_threshold = _DEFAULT_INDEXING_THRESHOLD
+        self.ids: list[Any] = []
+        self.rows: dict[Any, int] = {}
+        self.payloads: list[dict] = []
+        self.payload_schema: dict[str, PayloadSchemaType] = {}
+        self.indexes: dict[str, dict[Any, set]] = {}
+        self.dirty = True
+        self._matrix: NDArray[np.float32] = np.empty((0, size), dtype=np.float32)
+        self._sorted_ids: list[tuple] | None = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vectors(self) -> NDArray[np.float32]:
+        return self._matrix[: len(self.ids)]
+
+    # -- Writes --------------------------------------------------------------------------------
+
+    def upsert(self, ids: list[Any], vectors: Sequence[Any], payloads: Sequence[dict]) -> None:
+        matrix = self._prepare_vectors(vectors, len(ids))
+        self._make_writable()
+
+        # An id repeated within the batch is written once, with its last vector and payload, as Qdrant does.
+        latest = {point_id: i for i, (point_id, _) in enumerate(zip(ids, payloads, strict=True))}
+
+        new_rows = []
+        for point_id, i in latest.items():
+            row = self.rows.get(point_id)
+            if row is None:
+                new_rows.append(i)
+                continue
+
+            self._unindex(point_id, self.payloads[row])
+            self._matrix[row] = matrix[i]
+            self.payloads[row] = payloads[i]
+            self._index(point_id, payloads[i])
+
+        if new_rows:
+            start = len(self.ids)
+            self._reserve(start + len(new_rows))
+            self._matrix[start : start + len(new_rows)] = matrix[new_rows]
+            for offset, i in enumerate(new_rows):
+                self.rows[ids[i]] = start + offset
+                self.ids.append(ids[i])
+                self.payloads.append(payloads[i])
+                self._index(ids[i], payloads[i])
+
+        self._changed()
+
+    def delete(self, ids: Iterable[Any]) -> None:
+        self._make_writable()
+        for point_id in ids:
+            row = self.rows.pop(point_id, None)
+            if row is None:
+                continue
+            self._unindex(point_id, self.payloads[row])
+
+            # Keep the matrix contiguous: the last row takes the deleted row's place.
+            last = len(self.ids) - 1
+            if row != last:
+                moved_id = self.ids[last]
+                self._matrix[row] = self._matrix[last]
+                self.ids[row], self.payloads[row] = moved_id, self.payloads[last]
+                self.rows[moved_id] = row
+            self.ids.pop()
+            self.payloads.pop()
+
+        self._changed()
+
+    def create_index(self, field_name: str, schema_type: PayloadSchemaType) -> None:
+        self.payload_schema[field_name] = schema_type
+        if schema_type not in _INVERTED_INDEX_TYPES:
+            self.indexes.pop(field_name, None)
+            return
+
+        index: dict[Any, set] = {}
+        for point_id, payload in zip(self.ids, self.payloads):
+            for value in _values(payload, field_name):
+                index.setdefault(_hashable(value), set()).add(point_id)
+        self.indexes[field_name] = index
+        self.dirty = True
+
+    def drop_index(self, field_name: str) -> None:
+        self.payload_schema.pop(field_name, None)
+        self.indexes.pop(field_name, None)
+        self.dirty = True
+
+    # -- Reads ---------------------------------------------------------------------------------
+
+    def search(
+        self,
+        queries: NDArray[np.float32],
+        filters: list[Filter | None],
+        limits: list[int],
+        offset: int,
+        with_payload: bool | Sequence[str],
+        with_vectors: bool,
+        score_threshold: float | None,
+    ) -> list[list[ScoredPoint]]:
+        if len(self.ids) == 0:
+            return [[] for _ in limits]
+
+        if self.distance == Distance.COSINE:
+            queries = _normalize(queries)
+
+        unfiltered = [i for i, query_filter in enumerate(filters) if query_filter is None]
+        all_scores: dict[int, NDArray[np.float32]] = {}
+        if unfiltered:
+            # One (Q, D) x (D, N) product for every query without a filter.
+            for i, scores in zip(unfiltered, self._scores(queries[unfiltered], self.vectors), strict=True):
+                all_scores[i] = scores
+
+        results = []
+        for i, (query_filter, limit) in enumerate(zip(filters, limits, strict=True)):
+            if query_filter is None:
+                candidates, scores = None, all_scores[i]
+            else:
+                candidates = np.flatnonzero(self.mask(query_filter))
+                scores = self._scores(queries[i : i + 1], self.vectors[candidates])[0]
+
+            top = _top_k(scores, offset + limit, largest=self.distance != Distance.EUCLID)[offset:]
+            points = []
+            for position in top:
+                score = float(scores[position])
+                if score_threshold is not None and (
+                    score > score_threshold if self.distance == Distance.EUCLID else score < score_threshold
+                ):
+                    break
+                row = int(candidates[position]) if candidates is not None else int(position)
+                points.append(
+                    ScoredPoint(
+                        id=self.ids[row],
+                        version=0,
+                        score=score,
+                        payload=self.payload(row, with_payload),
+                        vector=self.vector(row) if with_vectors else None,
+                    )
+                )
+            results.append(points)
+
+        return results
+
+    def mask(self, query_filter: Filter) -> NDArray[np.bool_]:
+        """Boolean row mask of the points matching a Qdrant filter."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        for condition in _as_list(query_filter.must):
+            mask &= self._condition_mask(condition)
+        if query_filter.should:
+            should = np.zeros(len(self.ids), dtype=bool)
+            for condition in _as_list(query_filter.should):
+                should |= self._condition_mask(condition)
+            mask &= should
+        for condition in _as_list(query_filter.must_not):
+            mask &= ~self._condition_mask(condition)
+
+        return mask
+
+    def payload(self, row: int, with_payload: bool | Sequence[str]) -> dict | None:
+        if with_payload is True:
+            return dict(self.payloads[row])
+        if not with_payload:
+            return None
+
+        return {key: self.payloads[row][key] for key in with_payload if key in self.payloads[row]}
+
+    def vector(self, row: int) -> list[float]:
+        return self._matrix[row].tolist()
+
+    def sorted_ids(self) -> list[tuple]:
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(_sort_key(point_id) for point_id in self.ids)
+
+        return self._sorted_ids
+
+    def info(self) -> CollectionInfo:
+        return CollectionInfo(
+            status=CollectionStatus.GREEN,
+            optimizer_status=OptimizersStatusOneOf.OK,
+            indexed_vectors_count=0,
+            points_count=len(self.ids),
+            segments_count=1,
+            payload_schema={
+                field: PayloadIndexInfo(data_type=schema_type, points=len(self.ids))
+                for field, schema_type in self.payload_schema.items()
+            },
+            config=CollectionConfig(
+                params=CollectionParams(vectors=VectorParams(size=self.size, distance=self.distance)),
+                hnsw_config=HnswConfig(m=0, ef_construct=0, full_scan_threshold=0),
+                optimizer_config=OptimizersConfig(
+                    deleted_threshold=0.0,
+                    vacuum_min_vector_number=0,
+                    default_segment_number=1,
+                    indexing_threshold=self.indexing_threshold,
+                    flush_interval_sec=0,
+                ),
+                wal_config=WalConfig(wal_capacity_mb=0, wal_segments_ahead=0),
+            ),
+        )
+
+    # -- Persistence ---------------------------------------------------------------------------
+
+    def save(self, vectors_path: Path, sidecar_path: Path) -> None:
+        tmp_path = vectors_path.with_suffix(".npy.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.vectors))
+        os.replace(tmp_path, vectors_path)
+
+        sidecar = {
+            "size": self.size,
+            "distance": self.distance.value,
+            "indexing_threshold": self.indexing_threshold,
+            "payload_schema": {field: schema_type.value for field, schema_type in self.payload_schema.items()},
+            "ids": self.ids,
+            "payloads": self.payloads,
+        }
+        _atomic_write_text(sidecar_path, json.dumps(sidecar))
+        self.dirty = False
+
+    @classmethod
+    def load(cls, vectors_path: Path, sidecar_path: Path, mmap: bool) -> "_Collection":
+        sidecar = json.loads(sidecar_path.read_text())
+        collection = cls(size=sidecar["size"], distance=Distance(sidecar["distance"]))
+        collection.indexing_threshold = sidecar["indexing_threshold"]
+        collection._matrix = np.load(vectors_path, mmap_mode="r" if mmap else None)
+        collection.ids = sidecar["ids"]
+        collection.payloads = sidecar["payloads"]
+        collection.rows = {point_id: row for row, point_id in enumerate(collection.ids)}
+        for field, schema_type in sidecar["payload_schema"].items():
+            collection.create_index(field, PayloadSchemaType(schema_type))
+        collection.dirty = False
+
+        return collection
+
+    # -- Internals -----------------------------------------------------------------------------
+
+    def _scores(self, queries: NDArray[np.float32], vectors: NDArray[np.float32]) -> NDArray[np.float32]:
+        scores = queries @ vectors.T
+        if self.distance == Distance.EUCLID:
+            squared = np.einsum("ij,ij->i", vectors, vectors)[None, :] - 2 * scores
+            squared += np.einsum("ij,ij->i", queries, queries)[:, None]
+            scores = np.sqrt(np.maximum(squared, 0.0))
+
+        return scores
+
+    def _condition_mask(self, condition: Any) -> NDArray[np.bool_]:
+        if isinstance(condition, Filter):
+            return self.mask(condition)
+
+        if isinstance(condition, HasIdCondition):
+            mask = np.zeros(len(self.ids), dtype=bool)
+            rows = [self.rows[_id] for _id in map(_normalize_id, condition.has_id) if _id in self.rows]
+            mask[rows] = True
+
+            return mask
+
+        if not isinstance(condition, FieldCondition):
+            raise ValueError(f"Unsupported filter condition: {condition!r}")
+
+        index = self.indexes.get(condition.key)
+        if index is not None and isinstance(condition.match, (MatchValue, MatchAny)):
+            values = condition.match.any if isinstance(condition.match, MatchAny) else [condition.match.value]
+            mask = np.zeros(len(self.ids), dtype=bool)
+            for value in values:
+                rows = [self.rows[point_id] for point_id in index.get(_hashable(value), ())]
+                mask[rows] = True
+
+            return mask
+
+        return np.fromiter(
+            (_matches(condition, payload) for payload in self.payloads), dtype=bool, count=len(self.payloads)
+        )
+
+    def _prepare_vectors(self, vectors: Sequence[Any], count: int) -> NDArray[np.float32]:
+        if self.size == 0:
+            return np.empty((count, 0), dtype=np.float32)
+
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(count, self.size)
+        if self.distance == Distance.COSINE:
+            matrix = _normalize(matrix)
+
+        return matrix
+
+    def _reserve(self, num_rows: int) -> None:
+        capacity = len(self._matrix)
+        if num_rows <= capacity:
+            return
+
+        matrix = np.empty((max(num_rows, 2 * capacity, 64), self.size), dtype=np.float32)
+        matrix[: len(self.ids)] = self.vectors
+        self._matrix = matrix
+
+    def _make_writable(self) -> None:
+        if not self._matrix.flags.writeable:
+            self._matrix = np.array(self._matrix, dtype=np.float32)
+
+    def _index(self, point_id: Any, payload: dict) -> None:
+        for field, index in self.indexes.items():
+            for value in _values(payload, field):
+                index.setdefault(_hashable(value), set()).add(point_id)
+
+    def _unindex(self, point_id: Any, payload: dict) -> None:
+        for field, index in self.indexes.items():
+            for value in _values(payload, field):
+                index.get(_hashable(value), set()).discard(point_id)
+
+    def _changed(self) -> None:
+        self._sorted_ids = None
+        self.dirty = True
+
+
+def _matches(condition: FieldCondition, payload: dict) -> bool:
+    values = _values(payload, condition.key)
+    match = condition.match
+    if isinstance(match, MatchValue):
+        return any(value == match.value for value in values)
+    if isinstance(match, MatchAny):
+        return any(value in match.any for value in values)
+    if isinstance(match, MatchExcept):
+        return not any(value in match.except_ for value in values)
+    if isinstance(match, MatchText):
+        return any(isinstance(value, str) and match.text in value for value in values)
+    if condition.range is not None:
+        bounds = condition.range
+
+        return any(
+            isinstance(value, (int, float))
+            and (bounds.gt is None or value > bounds.gt)
+            and (bounds.gte is None or value >= bounds.gte)
+            and (bounds.lt is None or value < bounds.lt)
+            and (bounds.lte is None or value <= bounds.lte)
+            for value in values
+        )
+
+    raise ValueError(f"Unsupported field condition: {condition!r}")
+
+
+def _values(payload: dict, key: str) -> list[Any]:
+    """Values at a dotted payload path. Arrays are flattened, as Qdrant matches any of their elements."""
+    values = [payload]
+    for part in key.split("."):
+        next_values = []
+        for value in values:
+            if isinstance(value, dict) and part in value:
+                item = value[part]
+                next_values.extend(item if isinstance(item, list) else [item])
+        values = next_values
+
+    return values
+
+
+def _query_vector(request: QueryRequest) -> Sequence[float]:
+    query = request.query.nearest if isinstance(request.query, NearestQuery) else request.query
+    if request.prefetch or request.using or not isinstance(query, list) or (query and isinstance(query[0], list)):
+        raise ValueError(f"Unsupported query, only nearest-neighbour queries on a dense vector are: {request!r}")
+
+    return query
+
+
+def _top_k(scores: NDArray[np.float32], k: int, largest: bool) -> NDArray[np.intp]:
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    keys = -scores if largest else scores
+    if k < len(scores):
+        top = np.argpartition(keys, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+
+    return top[np.argsort(keys[top], kind="stable")]
+
+
+def _normalize(vectors: NDArray[np.float32]) -> NDArray[np.float32]:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return vectors / np.where(norms == 0.0, 1.0, norms)
+
+
+def _normalize_id(point_id: Any) -> Any:
+    if isinstance(point_id, int):
+        return point_id
+
+    return str(uuid.UUID(str(point_id)))
+
+
+def _sort_key(point_id: Any) -> tuple:
+    # Qdrant orders integer ids before UUIDs.
+    return (isinstance(point_id, str), point_id)
+
+
+def _hashable(value: Any) -> Any:
+    return json.dumps(value, sort_keys=True) if isinstance(value, (dict, list)) else value
+
+
+def _as_list(conditions: Any) -> list:
+    if conditions is None:
+        return []
+
+    return conditions if isinstance(conditions, list) else [conditions]
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,233 @@
+"""
+An append-only, compressed archive of the raw responses fetched by the crawlers.
+
+Like a WARC file, every record holds the URL, the fetch time, the status, the
+headers and the raw body, so documents can be rebuilt when parsing changes
+without fetching anything again.
+
+Layout under the archive directory:
+    - `*.warc.zst` segments: records appended one after the other, each its own
+      zstd frame (a JSON header line followed by the body), so any record can be
+      read on its own from its offset. Each writing process appends to its own
+      segment and starts a new one past `segment_bytes`.
+    - `index.sqlite3`: the URL, fetch time and location of every record.
+
+این ماژول پاسخ‌های خام دریافت‌شده توسط خزنده‌ها را به‌صورت فشرده و فقط-افزودنی
+ذخیره می‌کند تا با تغییر منطق تجزیه، اسناد بدون دریافت دوباره از شبکه بازسازی شوند.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+import zstandard
+from loguru import logger
+
+from llm_engineering.settings import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    status INTEGER NOT NULL,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_url ON responses (url, fetched_at);
+"""
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """Where a record is stored: enough to read it back from any process."""
+
+    id: int
+    url: str
+    fetched_at: float
+    status: int
+    segment: str
+    offset: int
+    length: int
+
+
+@dataclass(frozen=True)
+class ArchivedResponse:
+    url: str
+    fetched_at: float
+    status: int
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+    meta: dict = field(default_factory=dict)
+
+    @property
+    def text(self) -> str:
+        content_type = {key.lower(): value for key, value in self.headers.items()}.get("content-type", "")
+        _, _, charset = content_type.partition("charset=")
+
+        return self.body.decode(charset.split(";")[0].strip() or "utf-8", errors="replace")
+
+
+class ResponseArchive:
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        segment_bytes: int | None = None,
+        compression_level: int | None = None,
+    ) -> None:
+        self.root = Path(root or settings.RESPONSE_ARCHIVE_DIR)
+        self.segment_bytes = segment_bytes or settings.RESPONSE_ARCHIVE_SEGMENT_BYTES
+        self.compression_level = compression_level or settings.RESPONSE_ARCHIVE_COMPRESSION_LEVEL
+        self._lock = threading.Lock()
+        self._segment_file = None
+        self._segment_pid: int | None = None
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index = sqlite3.connect(self.root / "index.sqlite3", timeout=30.0, check_same_thread=False)
+        self._index.execute("PRAGMA journal_mode=WAL")
+        with self._index:
+            self._index.executescript(_SCHEMA)
+
+    def put(
+        self,
+        url: str,
+        body: bytes | str,
+        status: int = 200,
+        headers: dict[str, str] | None = None,
+        fetched_at: float | None = None,
+        **meta,
+    ) -> ArchiveEntry:
+        """Append a response. `meta` (e.g. the user the link was crawled for) is stored with it."""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+            headers = {"Content-Type": "text/html; charset=utf-8", **(headers or {})}
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        header = {"url": url, "fetched_at": fetched_at, "status": status, "headers": dict(headers or {}), "meta": meta}
+        frame = zstandard.ZstdCompressor(level=self.compression_level).compress(
+            json.dumps(header).encode("utf-8") + b"\n" + body
+        )
+
+        with self._lock:
+            segment_file = self._writable_segment()
+            offset = segment_file.tell()
+            segment_file.write(frame)
+            segment_file.flush()
+            segment = Path(segment_file.name).name
+            with self._index:
+                cursor = self._index.execute(
+                    "INSERT INTO responses (url, fetched_at, status, segment, offset, length) VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, fetched_at, status, segment, offset, len(frame)),
+                )
+
+        return ArchiveEntry(cursor.lastrowid, url, fetched_at, status, segment, offset, len(frame))
+
+    def entries(self, latest_only: bool = True) -> list[ArchiveEntry]:
+        """Every record in fetch order, or only the latest one of each URL."""
+        query = "SELECT id, url, fetched_at, status, segment, offset, length FROM responses"
+        if latest_only:
+            # SQLite returns the other columns of the row holding the MAX().
+            query = (
+                "SELECT id, url, MAX(fetched_at), status, segment, offset, length FROM responses GROUP BY url"
+            )
+        with self._lock:
+            rows = self._index.execute(f"{query} ORDER BY fetched_at").fetchall()
+
+        return [ArchiveEntry(*row) for row in rows]
+
+    def latest(self, url: str) -> ArchivedResponse | None:
+        with self._lock:
+            row = self._index.execute(
+                "SELECT id, url, fetched_at, status, segment, offset, length FROM responses"
+                " WHERE url = ? ORDER BY fetched_at DESC LIMIT 1",
+                (url,),
+            ).fetchone()
+
+        return self.read(ArchiveEntry(*row)) if row else None
+
+    def read(self, entry: ArchiveEntry) -> ArchivedResponse:
+        with open(self.root / entry.segment, "rb") as file:
+            file.seek(entry.offset)
+            frame = file.read(entry.length)
+
+        return decode_record(frame)
+
+    def iter_read(self, entries: list[ArchiveEntry]) -> Iterator[tuple[ArchiveEntry, ArchivedResponse]]:
+        return iter_records(self.root, entries)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+            self._index.close()
+
+    def _writable_segment(self):
+        # A forked process must not append to its parent's segment.
+        if self._segment_file is not None and (
+            self._segment_pid != os.getpid() or self._segment_file.tell() >= self.segment_bytes
+        ):
+            self._segment_file.close()
+            self._segment_file = None
+        if self._segment_file is None:
+            name = f"{time.time_ns()}-{os.getpid()}.warc.zst"
+            self._segment_file = open(self.root / name, "ab")  # noqa: SIM115
+            self._segment_pid = os.getpid()
+            logger.debug(f"Appending raw responses to {name}.")
+
+        return self._segment_file
+
+
+def iter_records(root: str | Path, entries: list[ArchiveEntry]) -> Iterator[tuple[ArchiveEntry, ArchivedResponse]]:
+    """
+    Read many records, in storage order so each segment is scanned forwards.
+
+    Only the segments are read, not the index: it is safe in any process.
+    """
+    root = Path(root)
+    handles = {}
+    try:
+        for entry in sorted(entries, key=lambda entry: (entry.segment, entry.offset)):
+            if entry.segment not in handles:
+                handles[entry.segment] = open(root / entry.segment, "rb")  # noqa: SIM115
+            file = handles[entry.segment]
+            file.seek(entry.offset)
+
+            yield entry, decode_record(file.read(entry.length))
+    finally:
+        for file in handles.values():
+            file.close()
+
+
+def decode_record(frame: bytes) -> ArchivedResponse:
+    header_line, _, body = zstandard.ZstdDecompressor().decompress(frame).partition(b"\n")
+    header = json.loads(header_line)
+
+    return ArchivedResponse(
+        url=header["url"],
+        fetched_at=header["fetched_at"],
+        status=header["status"],
+        body=body,
+        headers=header["headers"],
+        meta=header["meta"],
+    )
+
+
+_instance: ResponseArchive | None = None
+_instance_lock = threading.Lock()
+
+
+def get_response_archive() -> ResponseArchive:
+    """The process-wide archive under `settings.RESPONSE_ARCHIVE_DIR`, opened on first use."""
+    global _instance
+
+    # Crawler threads archive concurrently: only one of them may open the archive.
+    with _instance_lock:
+        if _instance is None:
+            _instance = ResponseArchive()
+
+        return _instance
@@ -0,0 +1,147 @@
+"""
+Pluggable storage behind `VectorBaseDocument`.
+
+`VectorBackend` is the subset of the `QdrantClient` API that the domain layer
+calls, with the same signatures and return types. `QdrantClient` is registered
+as a virtual subclass, so the Qdrant server (or its in-process mode) and
+`NumpyVectorBackend` are interchangeable.
+
+`settings.VECTOR_BACKEND` selects the implementation used by `connection`:
+    - "qdrant": the shared `QdrantClient` (default).
+    - "numpy":  an in-process exact-search backend, persisted under
+                `settings.NUMPY_VECTOR_BACKEND_PATH` if set.
+
+این ماژول رابط مشترک ذخیره‌سازی برداری را تعریف می‌کند تا بتوان به‌جای سرور کیودرانت
+از یک پیاده‌سازی درون‌فرایندی مبتنی بر نام‌پای استفاده کرد (برای تست‌ها، نوت‌بوک‌ها
+و مجموعه‌های کوچک).
+"""
+import atexit
+from abc import ABC, abstractmethod
+from typing import Any, Sequence
+
+from loguru import logger
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import QueryResponse
+from qdrant_client.models import (
+    CollectionInfo,
+    CollectionsAliasesResponse,
+    CountResult,
+    Filter,
+    QueryRequest,
+    Record,
+    ScoredPoint,
+    UpdateResult,
+)
+
+from llm_engineering.settings import settings
+
+
+class VectorBackend(ABC):
+    """The collection operations used by `VectorBaseDocument`, mirroring `QdrantClient`."""
+
+    @abstractmethod
+    def collection_exists(self, collection_name: str, **kwargs: Any) -> bool: ...
+
+    @abstractmethod
+    def create_collection(self, collection_name: str, vectors_config: Any, **kwargs: Any) -> bool: ...
+
+    @abstractmethod
+    def delete_collection(self, collection_name: str, **kwargs: Any) -> bool: ...
+
+    @abstractmethod
+    def get_collection(self, collection_name: str, **kwargs: Any) -> CollectionInfo: ...
+
+    @abstractmethod
+    def update_collection(self, collection_name: str, **kwargs: Any) -> bool: ...
+
+    @abstractmethod
+    def create_payload_index(
+        self, collection_name: str, field_name: str, field_schema: Any = None, **kwargs: Any
+    ) -> UpdateResult: ...
+
+    @abstractmethod
+    def delete_payload_index(self, collection_name: str, field_name: str, **kwargs: Any) -> UpdateResult: ...
+
+    @abstractmethod
+    def upsert(self, collection_name: str, points: Any, wait: bool = True, **kwargs: Any) -> UpdateResult: ...
+
+    @abstractmethod
+    def delete(self, collection_name: str, points_selector: Any, wait: bool = True, **kwargs: Any) -> UpdateResult: ...
+
+    @abstractmethod
+    def count(
+        self, collection_name: str, count_filter: Filter | None = None, exact: bool = True, **kwargs: Any
+    ) -> CountResult: ...
+
+    @abstractmethod
+    def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Filter | None = None,
+        limit: int = 10,
+        offset: Any = None,
+        with_payload: bool | Sequence[str] = True,
+        with_vectors: bool = False,
+        **kwargs: Any,
+    ) -> tuple[list[Record], Any]: ...
+
+    @abstractmethod
+    def search(
+        self,
+        collection_name: str,
+        query_vector: Sequence[float],
+        query_filter: Filter | None = None,
+        search_params: Any = None,
+        limit: int = 10,
+        offset: int | None = None,
+        with_payload: bool | Sequence[str] = True,
+        with_vectors: bool = False,
+        score_threshold: float | None = None,
+        **kwargs: Any,
+    ) -> list[ScoredPoint]: ...
+
+    @abstractmethod
+    def query_batch_points(
+        self, collection_name: str, requests: Sequence[QueryRequest], **kwargs: Any
+    ) -> list[QueryResponse]: ...
+
+    @abstractmethod
+    def get_aliases(self, **kwargs: Any) -> CollectionsAliasesResponse: ...
+
+    @abstractmethod
+    def update_collection_aliases(self, change_aliases_operations: Sequence[Any], **kwargs: Any) -> bool: ...
+
+    @abstractmethod
+    def close(self, **kwargs: Any) -> None: ...
+
+
+VectorBackend.register(QdrantClient)
+
+
+class VectorBackendConnector:
+    """Builds the process-wide vector backend selected by `settings.VECTOR_BACKEND`."""
+
+    _instance: VectorBackend | None = None
+
+    def __new__(cls) -> VectorBackend:
+        if cls._instance is None:
+            if settings.VECTOR_BACKEND == "qdrant":
+                from llm_engineering.infrastructure.db.qdrant import connection as qdrant_connection
+
+                cls._instance = qdrant_connection
+            elif settings.VECTOR_BACKEND == "numpy":
+                from llm_engineering.infrastructure.db.numpy_backend import NumpyVectorBackend
+
+                cls._instance = NumpyVectorBackend(
+                    path=settings.NUMPY_VECTOR_BACKEND_PATH, mmap=settings.NUMPY_VECTOR_BACKEND_MMAP
+                )
+                atexit.register(cls._instance.close)
+
+                logger.info(f"Using the in-process NumPy vector backend (path: {settings.NUMPY_VECTOR_BACKEND_PATH}).")
+            else:
+                raise ValueError(f"Unknown vector backend '{settings.VECTOR_BACKEND}'. Use 'qdrant' or 'numpy'.")
+
+        return cls._instance
+
+
+connection = VectorBackendConnector()
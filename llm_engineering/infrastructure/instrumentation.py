@@ -0,0 +1,435 @@
+"""
+Timing spans, counters and histograms for the hot paths: crawler fetch, parse and
+save, MongoDB and Qdrant calls, embedding batches, search and reranking.
+
+    with span("crawler.fetch", crawler="MediumCrawler"):    # a timed block
+        ...
+
+    @traced("rag.rerank")                                   # a timed function
+    def rerank(...): ...
+
+    count("crawler.retries", domain=domain)                 # a counter
+    observe("embedding.batch_size", len(texts), buckets=SIZE_BUCKETS)   # a histogram
+
+A span records its duration in the histogram of its name, in seconds, and counts
+the exceptions raised through it in `<name>.errors`. Metrics are kept per name and
+labels, in memory, for the life of the process: worker processes keep their own.
+
+With `settings.INSTRUMENTATION_ENABLED` off, `span` returns a shared no-op context
+manager and the other calls return at once: one flag check per call.
+
+The metrics can be read as:
+    - `summary()`: count, mean, p50, p95 and max per metric, for step metadata;
+    - `render_prometheus()`: the Prometheus text format, served on `/metrics` by
+      `start_metrics_server()` on `settings.INSTRUMENTATION_PROMETHEUS_PORT`;
+    - `to_otlp()`: the OTLP/JSON metrics format of OpenTelemetry, for collectors.
+
+ابزار اندازه‌گیری مسیرهای پرتکرار: بازه‌های زمانی، شمارنده‌ها و هیستوگرام‌ها برای خزش،
+تجزیه، ذخیره، فراخوانی‌های مونگو و کیودرانت، بردارسازی، جست‌وجو و رتبه‌بندی مجدد. در حالت
+خاموش تقریباً هزینه‌ای ندارد و خروجی آن به قالب پرومتئوس یا اوپن‌تلمتری در دسترس است.
+"""
+import bisect
+import functools
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from loguru import logger
+
+from llm_engineering.settings import settings
+
+F = TypeVar("F", bound=Callable)
+
+# Upper bounds of the histogram buckets: durations in seconds, and sizes such as batch lengths.
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+_PROMETHEUS_PREFIX = "llm_"
+_OTLP_CUMULATIVE = 2
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class Histogram:
+    bounds: tuple[float, ...]
+    unit: str = ""
+    # One count per bound, then the overflow bucket; not cumulative.
+    bucket_counts: list[int] = field(default_factory=list)
+    count: int = 0
+    sum: float = 0.0
+    min: float = float("inf")
+    max: float = float("-inf")
+
+    def __post_init__(self) -> None:
+        self.bucket_counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate of the `q` quantile, interpolated within its bucket and clamped to the observed range."""
+        if not self.count:
+            return 0.0
+
+        rank, seen = q * self.count, 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else self.min
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+
+        return self.max
+
+
+class Registry:
+    """The counters and histograms of the process, keyed by name and labels."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], Histogram] = {}
+        self.start_time_ns = time.time_ns()
+
+    def count(self, name: str, value: float, labels: Labels) -> None:
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Labels, buckets: tuple[float, ...], unit: str = "") -> None:
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets, unit)
+            histogram.observe(value)
+
+    def counters(self) -> dict[tuple[str, Labels], float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def histograms(self) -> dict[tuple[str, Labels], Histogram]:
+        with self._lock:
+            return {key: _copy(histogram) for key, histogram in self._histograms.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.start_time_ns = time.time_ns()
+
+
+def _copy(histogram: Histogram) -> Histogram:
+    copied = Histogram(histogram.bounds, histogram.unit)
+    copied.bucket_counts = list(histogram.bucket_counts)
+    copied.count, copied.sum, copied.min, copied.max = histogram.count, histogram.sum, histogram.min, histogram.max
+
+    return copied
+
+
+registry = Registry()
+_enabled = settings.INSTRUMENTATION_ENABLED
+
+
+def enable() -> None:
+    global _enabled
+
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Forget every metric recorded so far."""
+    registry.reset()
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class _Span:
+    __slots__ = ("name", "labels", "start_time")
+
+    def __init__(self, name: str, labels: Labels) -> None:
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Span":
+        self.start_time = time.perf_counter()
+
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        registry.observe(self.name, time.perf_counter() - self.start_time, self.labels, SECONDS_BUCKETS, unit="s")
+        if exc_type is not None:
+            registry.count(f"{self.name}.errors", 1, tuple(sorted((*self.labels, ("error", exc_type.__name__)))))
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **labels) -> _Span | _NoopSpan:
+    """A context manager recording the duration of its block in the `name` histogram."""
+    if not _enabled:
+        return _NOOP_SPAN
+
+    return _Span(name, _labels(labels))
+
+
+def traced(name: str | None = None, **labels) -> Callable[[F], F]:
+    """
+    Decorate a function to record each call as a span, named after the function by
+    default. Generator functions would only time the creation of the generator.
+    """
+
+    def decorate(fn: F) -> F:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+        span_labels = _labels(labels)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(span_name, span_labels):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def count(name: str, value: float = 1, **labels) -> None:
+    """Add `value` to the `name` counter."""
+    if _enabled:
+        registry.count(name, value, _labels(labels))
+
+
+def observe(name: str, value: float, buckets: tuple[float, ...] = SECONDS_BUCKETS, unit: str = "", **labels) -> None:
+    """Record `value` in the `name` histogram. `buckets` are fixed by the first observation of the metric."""
+    if _enabled:
+        registry.observe(name, value, _labels(labels), buckets, unit)
+
+
+def metric_key(name: str, labels: Labels) -> str:
+    """`name{key=value,...}`, the key of a metric in `summary()`."""
+    if not labels:
+        return name
+
+    return f"{name}{{{','.join(f'{key}={value}' for key, value in labels)}}}"
+
+
+def summary(prefix: str | None = None) -> dict[str, dict | float]:
+    """
+    A compact view of the metrics, for ZenML step metadata: the value of every
+    counter, and the count, mean, p50, p95 and max of every histogram.
+    Only the metrics whose name starts with `prefix` are kept, if given.
+    """
+    stats: dict[str, dict | float] = {}
+    for (name, labels), histogram in sorted(registry.histograms().items()):
+        if prefix is None or name.startswith(prefix):
+            stats[metric_key(name, labels)] = {
+                "count": histogram.count,
+                "sum": round(histogram.sum, 6),
+                "mean": round(histogram.sum / histogram.count, 6),
+                "p50": round(histogram.quantile(0.5), 6),
+                "p95": round(histogram.quantile(0.95), 6),
+                "max": round(histogram.max, 6),
+            }
+    for (name, labels), value in sorted(registry.counters().items()):
+        if prefix is None or name.startswith(prefix):
+            stats[metric_key(name, labels)] = value
+
+    return stats
+
+
+def _prometheus_name(name: str, unit: str = "") -> str:
+    name = _PROMETHEUS_PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+    return f"{name}_seconds" if unit == "s" else name
+
+
+def _prometheus_labels(labels: Labels, **extra: str) -> str:
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{re.sub(r"[^a-zA-Z0-9_]", "_", key)}="{escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus() -> str:
+    """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+    lines: list[str] = []
+    histograms: dict[str, list[tuple[Labels, Histogram]]] = {}
+    for (name, labels), histogram in sorted(registry.histograms().items()):
+        histograms.setdefault(_prometheus_name(name, histogram.unit), []).append((labels, histogram))
+    for metric, series in histograms.items():
+        lines.append(f"# TYPE {metric} histogram")
+        for labels, histogram in series:
+            cumulative = 0
+            for bound, bucket_count in zip((*histogram.bounds, float("inf")), histogram.bucket_counts, strict=True):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{_prometheus_labels(labels, le=_number(bound))} {cumulative}")
+            lines.append(f"{metric}_sum{_prometheus_labels(labels)} {_number(histogram.sum)}")
+            lines.append(f"{metric}_count{_prometheus_labels(labels)} {histogram.count}")
+
+    counters: dict[str, list[tuple[Labels, float]]] = {}
+    for (name, labels), value in sorted(registry.counters().items()):
+        counters.setdefault(_prometheus_name(name) + "_total", []).append((labels, value))
+    for metric, series in counters.items():
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(f"{metric}{_prometheus_labels(labels)} {_number(value)}" for labels, value in series)
+
+    return "\n".join(lines) + "\n"
+
+
+def to_otlp(service_name: str = "llm_engineering") -> dict:
+    """Every metric as an OTLP/JSON `ExportMetricsServiceRequest`, with cumulative temporality."""
+    now_ns, start_ns = str(time.time_ns()), str(registry.start_time_ns)
+
+    def attributes(labels: Labels) -> list[dict]:
+        return [{"key": key, "value": {"stringValue": value}} for key, value in labels]
+
+    metrics: dict[str, dict] = {}
+    for (name, labels), histogram in sorted(registry.histograms().items()):
+        metric = metrics.setdefault(
+            name,
+            {"name": name, "unit": histogram.unit, "histogram": {"aggregationTemporality": _OTLP_CUMULATIVE, "dataPoints": []}},
+        )
+        metric["histogram"]["dataPoints"].append(
+            {
+                "attributes": attributes(labels),
+                "startTimeUnixNano": start_ns,
+                "timeUnixNano": now_ns,
+                "count": str(histogram.count),
+                "sum": histogram.sum,
+                "bucketCounts": [str(bucket_count) for bucket_count in histogram.bucket_counts],
+                "explicitBounds": list(histogram.bounds),
+                "min": histogram.min,
+                "max": histogram.max,
+            }
+        )
+    for (name, labels), value in sorted(registry.counters().items()):
+        metric = metrics.setdefault(
+            name,
+            {"name": name, "sum": {"aggregationTemporality": _OTLP_CUMULATIVE, "isMonotonic": True, "dataPoints": []}},
+        )
+        metric["sum"]["dataPoints"].append(
+            {
+                "attributes": attributes(labels),
+                "startTimeUnixNano": start_ns,
+                "timeUnixNano": now_ns,
+                **({"asInt": str(value)} if float(value).is_integer() else {"asDouble": value}),
+            }
+        )
+
+    return {
+        "resourceMetrics": [
+            {
+                "resource": {"attributes": attributes((("service.name", service_name),))},
+                "scopeMetrics": [{"scope": {"name": __name__}, "metrics": list(metrics.values())}],
+            }
+        ]
+    }
+
+
+def write_otlp(path: str | Path) -> Path:
+    """Write `to_otlp()` to `path`, e.g. for the OTLP JSON file receiver of an OpenTelemetry collector."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(to_otlp()), encoding="utf-8")
+
+    return path
+
+
+_server: ThreadingHTTPServer | None = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int | None = None, host: str = "127.0.0.1") -> ThreadingHTTPServer | None:
+    """
+    Serve `render_prometheus()` on `http://host:port/metrics` from a daemon thread,
+    once per process. Returns None when no port is given or configured.
+    """
+    global _server
+
+    port = settings.INSTRUMENTATION_PROMETHEUS_PORT if port is None else port
+    if port is None:
+        return None
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info(f"Serving metrics on http://{host}:{_server.server_address[1]}/metrics")
+
+        return _server
+
+
+def stop_metrics_server() -> None:
+    global _server
+
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+
+            return
+
+        payload = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
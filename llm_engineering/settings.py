@@ -37,6 +37,12 @@ class Settings(BaseSettings):
     #MongoDB database settings.
     DATABASE_HOST: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "twin"
+    TRUSTED_DB_READS: bool = False                  # Build documents read from MongoDB/Qdrant without pydantic validation.
+    CONTENT_COMPRESSION_THRESHOLD_BYTES: int = 16 * 1024    # Document content larger than this (as BSON) is stored zstd-compressed.
+    CONTENT_COMPRESSION_LEVEL: int = 3                      # zstd level: higher compresses better but writes slower.
+    CONTENT_SPILL_THRESHOLD_BYTES: int = 4 * 1024 * 1024    # Compressed content larger than this goes to the blob store, fetched on access.
+    CONTENT_BLOB_STORE: str = "gridfs"                      # "gridfs" (in the MongoDB database above) or "local" (files).
+    CONTENT_BLOB_STORE_PATH: str = "data/content_blobs"     # Root directory of the "local" blob store.
 
     #Qdrant vector database settings.
     USE_QDRANT_CLOUD: bool = False                  # Whether to use Qdrant Cloud or local instance.
@@ -44,6 +50,17 @@ class Settings(BaseSettings):
     QDRANT_DATABASE_PORT: int = 6333
     QDRANT_CLOUD_URL: str = "str"                   # URL for local or cloud Qdrant instance.
     QDRANT_APIKEY: str | None = None                # API key for local or cloud Qdrant instance.
+    QDRANT_UPSERT_BATCH_SIZE: int = 256             # Maximum number of points per upsert request.
+    QDRANT_UPSERT_MAX_BATCH_BYTES: int = 16 * 1024 * 1024  # Approximate upper bound of an upsert request body.
+    QDRANT_UPSERT_MAX_WORKERS: int = 4              # Upsert requests in flight at the same time.
+    QDRANT_UPSERT_MAX_RETRIES: int = 3              # Retries of a single failed upsert request.
+    QDRANT_SCROLL_BATCH_SIZE: int = 256             # Points fetched per scroll request when walking a whole collection.
+    QDRANT_OPTIMIZATION_TIMEOUT: float = 3600.0     # Seconds a bulk load waits for Qdrant to finish indexing.
+
+    #Vector backend: "qdrant" (the Qdrant client above) or "numpy" (in-process exact search, no server).
+    VECTOR_BACKEND: str = "qdrant"
+    NUMPY_VECTOR_BACKEND_PATH: str | None = None    # Directory the NumPy backend persists to. In memory only if None.
+    NUMPY_VECTOR_BACKEND_MMAP: bool = False         # Memory-map the persisted vectors instead of loading them.
 
     # AWS Authentication.
     AWS_REGION: str = "eu-central-1"
@@ -139,6 +156,82 @@ Query → Embedding → Retrieve top matches → Re-rank → Inject into LLM pro
     RERANKING_CROSS_ENCODER_MODEL_ID: str = "cross-encoder/ms-marco-MiniLM-L-4-v2"
     RAG_MODEL_DEVICE: str = "cpu"
 
+    # Reranking
+    RERANKING_BATCH_SIZE: int = 32                       # Number of (query, document) pairs scored per cross-encoder call.
+    RERANKING_TOP_N: int = 50                            # Only the first N candidates from first-stage retrieval are scored.
+    RERANKING_LATENCY_BUDGET_MS: float = 250.0           # Reranking time budget per request. Batches past the budget are skipped.
+    RERANKING_CACHE_SIZE: int = 10_000                   # Maximum number of cached (query, document id) scores.
+
+    # Hybrid retrieval
+    BM25_K1: float = 1.2                                 # BM25 term-frequency saturation.
+    BM25_B: float = 0.75                                 # BM25 document-length normalisation.
+    SPARSE_INDEX_DIR: str = "data/sparse_index"          # Where the BM25 index of each collection is saved.
+    HYBRID_RRF_K: int = 60                               # Reciprocal-rank fusion constant: higher flattens rank differences.
+    HYBRID_CANDIDATES: int = 50                          # Candidates fetched from each of the dense and sparse retrievers.
+
+    # Retrieval
+    RETRIEVAL_CANDIDATES_PER_COLLECTION: int = 20        # Candidates fetched from each collection before deduplication and reranking.
+    RETRIEVAL_TOP_K: int = 10                            # Reranked documents kept, before fitting the token budget.
+    RETRIEVAL_CONTEXT_TOKEN_SHARE: float = 0.5           # Share of OPEN_MAX_TOKEN_WINDOW the retrieved context may fill.
+    RETRIEVAL_EMBEDDING_CACHE_SIZE: int = 1_024          # Maximum number of cached query embeddings.
+    RETRIEVAL_RESULT_CACHE_SIZE: int = 256               # Maximum number of cached retrieval results.
+    RETRIEVAL_RESULT_CACHE_TTL_S: float = 300.0          # Seconds a cached retrieval result is served before it is recomputed.
+
+    # Chunking
+    CHUNK_SIZE_TOKENS: int | None = None                 # Tokens per chunk. None uses the embedding model's max input length.
+    CHUNK_OVERLAP_TOKENS: int = 32                       # Tokens shared by two consecutive chunks of the same document.
+    CHUNKING_BATCH_SIZE: int = 64                        # Documents read from MongoDB and tokenized together.
+    CHUNKING_MAX_WORKERS: int = 4                        # Document batches chunked in parallel.
+
+    # Incremental ingestion
+    INGESTION_EMBEDDING_BATCH_SIZE: int = 64             # Chunks embedded per embedding model call.
+    INGESTION_WATERMARK_OVERLAP_S: float = 60.0          # Documents this much older than the mark are re-read, to tolerate late writes.
+    INGESTION_DETECT_DELETIONS: bool = True              # Compare document ids in MongoDB and Qdrant to delete points of removed documents.
+
+    # Crawling
+    CRAWL_FRONTIER_PATH: str = "data/crawl_frontier.sqlite3"   # SQLite file holding the state of every crawled link.
+    CRAWL_FRONTIER_LEASE_S: float = 900.0                # Seconds a claimed link stays with its worker before others may take it.
+    CRAWL_MAX_ATTEMPTS: int = 3                          # Claims of a failing link before it is marked failed.
+    CRAWL_RETRY_BACKOFF_S: float = 30.0                  # Delay before the first retry of a failed link, doubled at every attempt.
+    CRAWL_REQUEST_TIMEOUT_S: float = 30.0                # Timeout of a single fetch, page load or clone.
+    CRAWL_LINK_DEADLINE_S: float = 300.0                 # Time allowed to crawl one link, retries included.
+    CRAWL_RETRIES: int = 2                               # Immediate retries of a transient failure, within one claim.
+    CRAWL_RETRY_BASE_DELAY_S: float = 1.0                # Upper bound of the first retry's jittered delay, doubled at every retry.
+    CRAWL_RETRY_MAX_DELAY_S: float = 30.0                # Cap of the jittered retry delay.
+    CRAWL_BREAKER_FAILURE_THRESHOLD: int = 5             # Consecutive transient failures that open a domain's circuit.
+    CRAWL_BREAKER_RESET_S: float = 60.0                  # Seconds an open circuit rejects calls before letting a probe through.
+    CRAWL_PAGE_LOAD_STRATEGY: str = "eager"              # Selenium page-load strategy: "normal", "eager" (DOM parsed) or "none".
+    CRAWL_BLOCKED_RESOURCE_TYPES: list[str] = ["image", "media", "font"]  # Resources Selenium crawlers never download ("stylesheet" too).
+    CRAWL_BLOCKED_URL_PATTERNS: list[str] = [           # URL patterns Selenium crawlers never request: analytics, ads, trackers.
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*googlesyndication.com*",
+        "*connect.facebook.net*",
+        "*hotjar.com*",
+        "*segment.io*",
+        "*branch.io*",
+    ]
+    CRAWL_PARSE_WORKERS: int | None = None               # Processes parsing crawled pages; 0 parses inline, None one per concurrent crawl (up to the CPUs).
+    RESPONSE_ARCHIVE_ENABLED: bool = True                # Keep the raw responses of the crawlers, to re-parse them without fetching.
+    RESPONSE_ARCHIVE_DIR: str = "data/response_archive"  # Segments and index of the raw response archive.
+    RESPONSE_ARCHIVE_SEGMENT_BYTES: int = 256 * 1024 * 1024  # Size past which a new archive segment is started.
+    RESPONSE_ARCHIVE_COMPRESSION_LEVEL: int = 9          # zstd level of archived responses: written once, read rarely.
+
+    # Streaming ETL
+    ETL_CRAWL_WORKERS: int = 4                           # Links crawled at the same time (threads).
+    ETL_CHUNK_WORKERS: int = 2                           # Workers cleaning and chunking crawled documents.
+    ETL_CHUNK_EXECUTOR: str = "process"                  # "process" or "thread" workers for chunking.
+    ETL_EMBED_WORKERS: int = 1                           # Workers embedding chunks, each with its own copy of the model.
+    ETL_EMBED_EXECUTOR: str = "process"                  # "process" or "thread" workers for embedding.
+    ETL_LOAD_WORKERS: int = 2                            # Threads upserting embedded chunks into Qdrant.
+    ETL_QUEUE_SIZE: int = 64                             # Items waiting between two stages: bounds the memory of a run.
+
+    # Instrumentation
+    INSTRUMENTATION_ENABLED: bool = True                 # Record spans, counters and histograms of the hot paths; off costs one check per call.
+    INSTRUMENTATION_PROMETHEUS_PORT: int | None = None   # Serve the metrics in Prometheus text format on 127.0.0.1:<port>/metrics.
+    INSTRUMENTATION_OTLP_PATH: str | None = None         # Write the metrics there as OTLP/JSON when a pipeline run ends.
+
     # LinkedIn Credentials
     LINKEDIN_USERNAME: str | None = None
     LINKEDIN_PASSWORD: str | None = None
@@ -0,0 +1,62 @@
+import uuid
+
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import WhitespaceSplit
+from transformers import PreTrainedTokenizerFast
+
+from llm_engineering.application.preprocessing import ChunkingPipeline, TokenChunker, clean_text
+from llm_engineering.domain.chunks import PostChunk, RepositoryChunk
+from llm_engineering.domain.documents import PostDocument, RepositoryDocument
+
+
+def _whitespace_tokenizer() -> PreTrainedTokenizerFast:
+    vocab = {"[UNK]": 0, **{f"w{i}": i + 1 for i in range(20)}}
+    tokenizer = Tokenizer(WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = WhitespaceSplit()
+
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="[UNK]")
+
+
+def _words(count: int) -> str:
+    return " ".join(f"w{i}" for i in range(count))
+
+
+def test_clean_text_collapses_whitespace_and_drops_control_characters() -> None:
+    assert clean_text("  a \t b\x00\r\n\n\n\nc  ") == "a b\n\nc"
+
+
+def test_fast_and_slow_tokenizers_produce_the_same_overlapping_windows(whitespace_tokenizer) -> None:
+    fast = TokenChunker(tokenizer=_whitespace_tokenizer(), chunk_size=4, chunk_overlap=1)
+    slow = TokenChunker(tokenizer=whitespace_tokenizer, chunk_size=4, chunk_overlap=1)
+
+    expected = [("w0 w1 w2 w3", 4), ("w3 w4 w5 w6", 4), ("w6 w7 w8 w9", 4)]
+    assert fast.split([_words(10), ""]) == [expected, []]
+    assert slow.split([_words(10), ""]) == [expected, []]
+
+
+def test_pipeline_streams_typed_chunks_in_document_order() -> None:
+    author_id = uuid.uuid4()
+    documents = [
+        PostDocument(content={"text": _words(6)}, platform="linkedin", authorId=author_id, author_full_name="A B"),
+        RepositoryDocument(
+            content={"main.py": _words(2)},
+            name="repo",
+            link="https://github.com/a/repo",
+            platform="github",
+            authorId=author_id,
+            author_full_name="A B",
+        ),
+    ]
+    chunker = TokenChunker(tokenizer=_whitespace_tokenizer(), chunk_size=4, chunk_overlap=2)
+    pipeline = ChunkingPipeline(chunker=chunker, batch_size=1, max_workers=2)
+
+    chunks = list(pipeline.chunk(iter(documents)))
+
+    assert [type(chunk) for chunk in chunks] == [PostChunk, PostChunk, RepositoryChunk]
+    assert [chunk.metadata["chunk_index"] for chunk in chunks] == [0, 1, 0]
+    assert chunks[2].content == "main.py\nw0 w1"
+    assert all(chunk.author_id == author_id for chunk in chunks)
+
+    rechunked = list(pipeline.chunk(iter(documents)))
+    assert [chunk.id for chunk in rechunked] == [chunk.id for chunk in chunks]
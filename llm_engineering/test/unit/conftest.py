@@ -0,0 +1,315 @@
+import copy
+import functools
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from qdrant_client import QdrantClient
+
+from llm_engineering.domain.base import nosql, vector
+from llm_engineering.infrastructure.db import response_archive as response_archive_module
+from llm_engineering.infrastructure.db.numpy_backend import NumpyVectorBackend
+from llm_engineering.infrastructure.db.response_archive import ResponseArchive
+
+
+class _SerializedClient:
+    """The in-process Qdrant client is not thread-safe, so calls are serialised with a lock."""
+
+    def __init__(self, client: QdrantClient) -> None:
+        self._client = client
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def locked(*args, **kwargs):
+            with self._lock:
+                return attribute(*args, **kwargs)
+
+        return locked
+
+
+class RecordingConnection:
+    """Passes every call through to the client and records its keyword arguments, per method."""
+
+    def __init__(self, client) -> None:
+        self._client = client
+        self.calls: defaultdict[str, list[dict]] = defaultdict(list)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def recorded(*args, **kwargs):
+            self.calls[name].append(kwargs)
+
+            return attribute(*args, **kwargs)
+
+        return recorded
+
+
+class _InMemoryCursor(list):
+    def batch_size(self, size: int) -> "_InMemoryCursor":
+        return self
+
+
+class _InMemoryCollection:
+    """The subset of a pymongo collection used by `NoSQLBaseDocument`: equality, `$gt`, `$lt`, `$in`, `$or` filters."""
+
+    def __init__(self) -> None:
+        self.rows: dict[str, dict] = {}
+
+    def find(self, filter_options=None, projection=None) -> _InMemoryCursor:
+        rows = [row for row in self.rows.values() if _matches(row, filter_options or {})]
+        if projection is not None:
+            rows = [{key: row[key] for key in projection if key in row} for row in rows]
+
+        return _InMemoryCursor(copy.deepcopy(rows))
+
+    def find_one(self, filter_options=None) -> dict | None:
+        rows = self.find(filter_options)
+
+        return rows[0] if rows else None
+
+    def insert_one(self, row: dict) -> None:
+        self.rows[row["_id"]] = copy.deepcopy(row)
+
+    def insert_many(self, rows) -> None:
+        for row in rows:
+            self.insert_one(row)
+
+    def replace_one(self, filter_options: dict, row: dict, upsert: bool = False) -> None:
+        existing = self.find_one(filter_options)
+        if existing is not None or upsert:
+            self.rows.pop(existing["_id"] if existing else None, None)
+            self.insert_one(row)
+
+    def delete_one(self, filter_options: dict) -> None:
+        existing = self.find_one(filter_options)
+        if existing is not None:
+            del self.rows[existing["_id"]]
+
+
+def _matches(row: dict, filter_options: dict) -> bool:
+    for key, condition in filter_options.items():
+        if key == "$or":
+            if not any(_matches(row, alternative) for alternative in condition):
+                return False
+
+            continue
+        value = row.get(key)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+        elif "$in" in condition and value not in condition["$in"]:
+            return False
+        elif "$gt" in condition and (value is None or not value > condition["$gt"]):
+            return False
+        elif "$lt" in condition and (value is None or not value < condition["$lt"]):
+            return False
+
+    return True
+
+
+class WhitespaceTokenizer:
+    """A slow (pure Python) tokenizer whose tokens are the words of the text."""
+
+    is_fast = False
+
+    def encode(self, text, add_special_tokens=False):
+        return text.split()
+
+    def decode(self, token_ids):
+        return " ".join(token_ids)
+
+
+class CountingEmbedder:
+    """A 4-dimensional embedding model that records every text it embeds."""
+
+    embedding_size = 4
+
+    def __init__(self) -> None:
+        self.embedded: list[str] = []
+
+    def __call__(self, texts, to_list=True):
+        self.embedded.extend(texts)
+
+        return [[float(len(text)), 1.0, 0.0, 0.0] for text in texts]
+
+
+class FakeClock:
+    """A monotonic clock that only moves when a test advances `now`."""
+
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+ARTICLE_PAGE = """<html lang="en"><head><meta name="description" content="A subtitle"></head>
+<body><p>{}</p></body></html>"""
+
+
+@pytest.fixture
+def article_page():
+    """Builds an article page with the given text, as served to the crawlers by `fault_server`."""
+    return ARTICLE_PAGE.format
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def whitespace_tokenizer() -> WhitespaceTokenizer:
+    return WhitespaceTokenizer()
+
+
+@pytest.fixture
+def embedder(monkeypatch) -> CountingEmbedder:
+    """An embedding model for the chunk collections, which are created with its vector size."""
+    embedder = CountingEmbedder()
+    monkeypatch.setattr(vector, "EmbeddingModelSingleton", lambda: embedder)
+
+    return embedder
+
+
+@pytest.fixture
+def mongo_memory(monkeypatch) -> dict[str, _InMemoryCollection]:
+    """Points every NoSQLBaseDocument operation at in-memory collections, keyed by collection name."""
+    collections: dict[str, _InMemoryCollection] = {}
+
+    class _Database(dict):
+        def __missing__(self, name):
+            return collections.setdefault(name, _InMemoryCollection())
+
+    monkeypatch.setattr(nosql, "_database", _Database())
+
+    return collections
+
+
+@pytest.fixture
+def qdrant_memory(monkeypatch) -> QdrantClient:
+    """Points every VectorBaseDocument operation at an in-process Qdrant instance."""
+    client = QdrantClient(":memory:")
+    serialized_client = _SerializedClient(client)
+    monkeypatch.setattr(vector, "connection", serialized_client)
+
+    yield serialized_client
+
+    client.close()
+
+
+@pytest.fixture
+def recorded_connection(qdrant_memory, monkeypatch) -> RecordingConnection:
+    """The in-process Qdrant instance, recording the calls VectorBaseDocument makes to it."""
+    connection = RecordingConnection(qdrant_memory)
+    monkeypatch.setattr(vector, "connection", connection)
+
+    return connection
+
+
+@pytest.fixture(params=["qdrant", "numpy"])
+def vector_backend(request, monkeypatch):
+    """Runs a test once against in-process Qdrant and once against the NumPy backend."""
+    if request.param == "qdrant":
+        yield request.getfixturevalue("qdrant_memory")
+
+        return
+
+    backend = NumpyVectorBackend()
+    monkeypatch.setattr(vector, "connection", backend)
+
+    yield backend
+
+    backend.close()
+
+
+class FaultServer:
+    """
+    A local HTTP server whose responses are scripted per path, to inject faults.
+
+    `script(path, *responses)` queues `(status, body, delay_s)` responses; the last
+    one is repeated once the queue is down to it. Unscripted paths answer 404.
+    """
+
+    def __init__(self) -> None:
+        self.hits: Counter[str] = Counter()
+        self._responses: dict[str, deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def url(self, path: str) -> str:
+        host, port = self._server.server_address
+
+        return f"http://{host}:{port}{path}"
+
+    def script(self, path: str, *responses: tuple[int, str, float]) -> None:
+        with self._lock:
+            self._responses[path] = deque(responses)
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next(self, path: str) -> tuple[int, str, float]:
+        with self._lock:
+            self.hits[path] += 1
+            queue = self._responses.get(path)
+            if not queue:
+                return 404, "not found", 0.0
+
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                status, body, delay_s = server._next(self.path)
+                time.sleep(delay_s)
+                payload = body.encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client timed out and hung up.
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def response_archive(tmp_path, monkeypatch) -> ResponseArchive:
+    """Points the crawlers at a response archive under the test's temporary directory."""
+    archive = ResponseArchive(tmp_path / "response_archive")
+    monkeypatch.setattr(response_archive_module, "_instance", archive)
+
+    yield archive
+
+    archive.close()
+
+
+@pytest.fixture
+def fault_server(response_archive):
+    # Whatever is crawled from it is archived under the test's directory, not `data/`.
+    server = FaultServer()
+    yield server
+    server.close()
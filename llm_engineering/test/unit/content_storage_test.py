@@ -0,0 +1,84 @@
+import uuid
+
+import pytest
+from bson.binary import Binary
+
+from llm_engineering.domain.base import nosql
+from llm_engineering.domain.base.content import CODEC_KEY, LazyContent
+from llm_engineering.domain.documents import RepositoryDocument
+from llm_engineering.infrastructure.db import blob_store
+from llm_engineering.settings import settings
+
+
+@pytest.fixture
+def local_blobs(tmp_path, monkeypatch):
+    store = blob_store.LocalBlobStore(tmp_path)
+    gets = []
+    original_get = store.get
+    monkeypatch.setattr(store, "get", lambda key: gets.append(key) or original_get(key))
+    monkeypatch.setattr(blob_store, "_instance", store)
+    monkeypatch.setattr(settings, "CONTENT_COMPRESSION_THRESHOLD_BYTES", 1_000)
+    monkeypatch.setattr(settings, "CONTENT_SPILL_THRESHOLD_BYTES", 2_000)
+    store.gets = gets
+
+    return store
+
+
+def _repository(content: dict) -> RepositoryDocument:
+    return RepositoryDocument(
+        content=content,
+        platform="github",
+        name="repo",
+        link="https://github.com/a/repo",
+        authorId=uuid.uuid4(),
+        author_full_name="Jane Doe",
+    )
+
+
+def _random_sources() -> dict:
+    # Random hex compresses about 2x: still above the spill threshold once compressed.
+    return {f"src/{i}.py": "".join(uuid.uuid4().hex for _ in range(10)) for i in range(20)}
+
+
+def _stored(document: RepositoryDocument) -> dict:
+    return nosql._database[RepositoryDocument.get_collection_name()].rows[str(document.id)]["content"]
+
+
+def test_content_is_stored_inline_compressed_or_spilled_by_size(mongo_memory, local_blobs) -> None:
+    small = _repository({"README.md": "hello"})
+    medium = _repository({f"src/{i}.py": f"print({i})\n" * 20 for i in range(20)})
+    large = _repository(_random_sources())
+    RepositoryDocument.bulk_insert([small, medium, large])
+
+    assert _stored(small) == {"README.md": "hello"}
+    assert _stored(medium)[CODEC_KEY] == "zstd" and isinstance(_stored(medium)["data"], Binary)
+    assert "blob" in _stored(large) and "data" not in _stored(large)
+
+    found = {document.id: document for document in RepositoryDocument.bulk_find()}
+    assert found[small.id].content == small.content
+    assert found[medium.id].content == medium.content
+    assert isinstance(found[large.id].content, LazyContent) and local_blobs.gets == []
+    assert found[large.id].content == large.content
+    assert len(local_blobs.gets) == 1
+
+    trusted = {document.id: document for document in RepositoryDocument.bulk_find(trusted=True)}
+    assert {key: document.content for key, document in trusted.items()} == {
+        document.id: document.content for document in (small, medium, large)
+    }
+
+
+def test_unread_spilled_content_is_saved_back_without_fetching(mongo_memory, local_blobs) -> None:
+    original = _repository(_random_sources())
+    original.save()
+    stored = _stored(original)
+
+    document = RepositoryDocument.find(_id=str(original.id))
+    document.name = "renamed"
+    document.upsert()
+
+    assert local_blobs.gets == []
+    assert _stored(original) == stored
+    reread = RepositoryDocument.find(_id=str(original.id))
+    assert reread.name == "renamed"
+    assert reread.model_dump()["content"] == original.content
+    assert dict(reread.content.items()) == original.content
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_engineering.infrastructure.db.crawl_frontier import CrawlFrontier, LinkState
+
+
+def test_failed_links_back_off_then_give_up(tmp_path, clock) -> None:
+    frontier = CrawlFrontier(tmp_path / "frontier.db", lease_s=60, max_attempts=2, retry_backoff_s=10, timer=clock)
+    assert frontier.add(["https://a", "https://b"], user_id="u") == 2
+    assert frontier.add(["https://a"], user_id="u") == 0
+
+    claimed = frontier.claim("w1", limit=5)
+    assert sorted(link.link for link in claimed) == ["https://a", "https://b"]
+    assert frontier.claim("w2") == []
+
+    frontier.complete("https://a", "w1")
+    assert frontier.fail("https://b", "w1", "timeout") is LinkState.PENDING
+    assert frontier.claim("w1") == [] and frontier.seconds_until_eligible() == 10
+
+    clock.now += 10
+    (retry,) = frontier.claim("w1")
+    assert (retry.link, retry.attempts, retry.last_error) == ("https://b", 2, "timeout")
+    assert frontier.fail("https://b", "w1", "timeout again") is LinkState.FAILED
+    assert frontier.seconds_until_eligible() is None
+    assert frontier.stats("u") == {"pending": 0, "in_flight": 0, "done": 1, "failed": 1}
+
+
+def test_restarted_run_resumes_where_the_previous_one_stopped(tmp_path, clock) -> None:
+    first = CrawlFrontier(tmp_path / "frontier.db", lease_s=60, timer=clock)
+    first.add([f"https://site/{i}" for i in range(4)])
+    done, in_flight = first.claim("run-1", limit=2)
+    first.complete(done.link, "run-1")
+    first.close()  # The run dies with `in_flight` claimed.
+
+    second = CrawlFrontier(tmp_path / "frontier.db", lease_s=60, timer=clock)
+    assert second.get(done.link).state is LinkState.DONE
+    assert {link.link for link in second.claim("run-2", limit=10)} == {f"https://site/{i}" for i in (2, 3)}
+
+    clock.now += 60  # The dead run's lease expires.
+    assert [link.link for link in second.claim("run-2")] == [in_flight.link]
+
+    third = CrawlFrontier(tmp_path / "frontier.db", lease_s=60, timer=clock)
+    assert third.requeue_in_flight() == 3
+    assert len(third.claim("run-3", limit=10)) == 3
+
+
+def test_concurrent_workers_claim_every_link_exactly_once(tmp_path) -> None:
+    frontier = CrawlFrontier(tmp_path / "frontier.db")
+    links = [f"https://site/{i}" for i in range(400)]
+    frontier.add(links)
+
+    def work(worker_id: str) -> list[str]:
+        claimed = []
+        while batch := frontier.claim(worker_id, limit=3):
+            for link in batch:
+                frontier.complete(link.link, worker_id)
+                claimed.append(link.link)
+
+        return claimed
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(work, [f"w{i}" for i in range(8)]))
+    frontier.close()
+
+    claimed = [link for result in results for link in result]
+    assert sorted(claimed) == sorted(links)
+    assert frontier.stats()["done"] == len(links)
+
+
+def test_postponed_links_keep_their_attempts(tmp_path, clock) -> None:
+    frontier = CrawlFrontier(tmp_path / "frontier.db", timer=clock)
+    frontier.add(["https://a"])
+    frontier.claim("w1")
+
+    frontier.postpone("https://a", "w1", 30)
+
+    assert frontier.claim("w1") == [] and frontier.seconds_until_eligible() == 30
+    clock.now += 30
+    assert frontier.claim("w1")[0].attempts == 1
+
+
+def test_only_the_worker_holding_a_claim_records_its_outcome(tmp_path, clock) -> None:
+    frontier = CrawlFrontier(tmp_path / "frontier.db", lease_s=60, max_attempts=1, timer=clock)
+    frontier.add(["https://a", "https://b"])
+    frontier.claim("slow", limit=2)
+
+    clock.now += 60  # The slow worker's leases expire and a second worker takes the links over.
+    assert len(frontier.claim("fast", limit=2)) == 2
+
+    assert frontier.fail("https://a", "slow", "timeout") is None
+    assert not frontier.complete("https://b", "slow") and not frontier.postpone("https://b", "slow", 30)
+    assert frontier.stats() == {"pending": 0, "in_flight": 2, "done": 0, "failed": 0}
+
+    assert frontier.complete("https://a", "fast") and not frontier.complete("https://a", "fast")
+    assert frontier.fail("https://b", "fast", "timeout") is LinkState.FAILED
+    assert frontier.stats() == {"pending": 0, "in_flight": 0, "done": 1, "failed": 1}
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+import requests
+
+from llm_engineering.application.crawlers import base
+from llm_engineering.application.crawlers.custom_article import CustomArticleCrawler
+from llm_engineering.application.crawlers.resilience import CircuitBreakerRegistry, CircuitState, Deadline, RetryPolicy
+from llm_engineering.domain.documents import ArticleDocument, UserDocument
+from llm_engineering.domain.exceptions import CircuitOpenError, DeadlineExceeded
+
+PAGE = """<html lang="en"><head><meta name="description" content="A subtitle"></head>
+<body><h1>Title</h1><p>Body text.</p></body></html>"""
+FAST_RETRIES = RetryPolicy(max_attempts=3, base_delay_s=0.01)
+
+
+@pytest.fixture
+def breakers(clock, monkeypatch) -> CircuitBreakerRegistry:
+    registry = CircuitBreakerRegistry(failure_threshold=3, reset_timeout_s=30, timer=clock)
+    monkeypatch.setattr(base, "circuit_breakers", registry)
+
+    return registry
+
+
+@pytest.fixture
+def user() -> UserDocument:
+    return UserDocument(first_name="Jane", last_name="Doe")
+
+
+def test_transient_errors_are_retried_until_the_page_loads(mongo_memory, fault_server, breakers, user) -> None:
+    fault_server.script("/flaky", (503, "busy", 0.0), (502, "bad gateway", 0.0), (200, PAGE, 0.0))
+    link = fault_server.url("/flaky")
+
+    CustomArticleCrawler().crawl(link, retry_policy=FAST_RETRIES, user=user)
+
+    article = ArticleDocument.find(link=link)
+    assert fault_server.hits["/flaky"] == 3
+    assert "Body text." in article.content["Content"]
+    assert (article.content["Subtitle"], article.content["language"]) == ("A subtitle", "en")
+    assert breakers.states() == {article.platform: CircuitState.CLOSED}
+
+
+def test_permanent_errors_are_not_retried(mongo_memory, fault_server, breakers, user) -> None:
+    with pytest.raises(requests.HTTPError):
+        CustomArticleCrawler().crawl(fault_server.url("/missing"), retry_policy=FAST_RETRIES, user=user)
+
+    assert fault_server.hits["/missing"] == 1
+    assert set(breakers.states().values()) == {CircuitState.CLOSED}
+
+
+def test_open_circuit_fails_fast_until_a_probe_succeeds(mongo_memory, fault_server, breakers, clock, user) -> None:
+    fault_server.script("/down", (503, "down", 0.0))
+    fault_server.script("/other", (200, PAGE, 0.0))
+    crawler = CustomArticleCrawler()
+
+    with pytest.raises(requests.HTTPError):
+        crawler.crawl(fault_server.url("/down"), retry_policy=RetryPolicy(max_attempts=5, base_delay_s=0.01), user=user)
+    assert fault_server.hits["/down"] == 3  # The third failure opened the circuit and ended the retries.
+
+    with pytest.raises(CircuitOpenError) as error:
+        crawler.crawl(fault_server.url("/other"), retry_policy=FAST_RETRIES, user=user)
+    assert fault_server.hits["/other"] == 0 and error.value.retry_after == 30
+
+    clock.now += 30
+    crawler.crawl(fault_server.url("/other"), retry_policy=FAST_RETRIES, user=user)
+    assert fault_server.hits["/other"] == 1
+    assert set(breakers.states().values()) == {CircuitState.CLOSED}
+
+
+def test_deadline_bounds_slow_responses(mongo_memory, fault_server, breakers, user) -> None:
+    fault_server.script("/slow", (200, PAGE, 2.0))
+    start_time = time.monotonic()
+
+    with pytest.raises((requests.Timeout, DeadlineExceeded)):
+        CustomArticleCrawler().crawl(
+            fault_server.url("/slow"),
+            deadline=Deadline.after(0.5),
+            retry_policy=RetryPolicy(max_attempts=10, base_delay_s=0.01),
+            user=user,
+        )
+
+    assert time.monotonic() - start_time < 1.5
+    assert ArticleDocument.find(link=fault_server.url("/slow")) is None
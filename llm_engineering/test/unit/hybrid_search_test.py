@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from qdrant_client.http.models import Distance, VectorParams
+
+from llm_engineering.application.rag import BM25Index, HybridSearch, reciprocal_rank_fusion, sparse, tokenize
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.types import DataCategory
+
+
+class _CodeChunk(VectorBaseDocument):
+    content: str
+    platform: str
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "test_hybrid_chunks"
+        category = DataCategory.REPOSITORIES
+        use_vector_index = True
+
+
+def test_tokenize_splits_identifiers_and_keeps_them_whole() -> None:
+    assert tokenize("call getUserName(max_batch_bytes)") == [
+        "call",
+        "getusername",
+        "get",
+        "user",
+        "name",
+        "max_batch_bytes",
+        "max",
+        "batch",
+        "bytes",
+    ]
+    assert tokenize("HTTPServer v2") == ["httpserver", "http", "server", "v2", "v", "2"]
+
+
+def test_bm25_ranks_rare_terms_and_supports_updates(tmp_path) -> None:
+    index = BM25Index()
+    index.add("a", "def upsert_with_retry(points): retry the upsert")
+    index.add("b", "the quick brown fox jumps over the lazy dog")
+    index.add("c", "retry logic for the crawler")
+
+    assert [doc_id for doc_id, _ in index.search("upsertWithRetry")] == ["a", "c"]
+
+    index.add("a", "nothing relevant anymore")
+    index.remove(["c"])
+    assert index.search("retry") == []
+
+    index.save(tmp_path / "index.json.gz")
+    reloaded = BM25Index.load(tmp_path / "index.json.gz")
+    assert len(reloaded) == 2 and reloaded.search("fox") == index.search("fox")
+
+
+def test_interrupted_save_keeps_the_previous_index(tmp_path, monkeypatch) -> None:
+    index = BM25Index()
+    index.add("a", "the quick brown fox")
+    index.save(tmp_path / "index.json.gz")
+
+    def interrupted_dump(data, f):
+        f.write('{"k1": ')
+        raise KeyboardInterrupt
+
+    index.add("b", "the lazy dog")
+    monkeypatch.setattr(sparse.json, "dump", interrupted_dump)
+    with pytest.raises(KeyboardInterrupt):
+        index.save(tmp_path / "index.json.gz")
+    monkeypatch.undo()
+
+    assert len(BM25Index.load(tmp_path / "index.json.gz")) == 1
+
+
+def test_reciprocal_rank_fusion_rewards_agreement() -> None:
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a", "d"]], k=60)
+
+    assert [item for item, _ in fused] == ["a", "c", "b", "d"]
+
+
+def test_hybrid_search_recovers_lexical_matches_and_applies_filters(vector_backend) -> None:
+    vector_backend.create_collection(
+        collection_name=_CodeChunk.get_collection_name(), vectors_config=VectorParams(size=4, distance=Distance.COSINE)
+    )
+    chunks = [
+        _CodeChunk(content=f"generic text number {i}", platform="github", embedding=[1.0, 0.1 * i, 0.0, 0.0])
+        for i in range(20)
+    ]
+    target = _CodeChunk(content="def _upsert_with_retry(points)", platform="github", embedding=[0.0, 0.0, 1.0, 0.0])
+    hidden = _CodeChunk(content="def _upsert_with_retry(points)", platform="gitlab", embedding=[0.0, 0.0, 1.0, 0.0])
+    _CodeChunk.bulk_insert([*chunks, target, hidden])
+    index = BM25Index()
+    index.add_documents([*chunks, target, hidden])
+    search = HybridSearch(_CodeChunk, sparse_index=index, candidates=5)
+
+    documents, stats = search.search_with_stats(
+        "where is upsert_with_retry",
+        np.array([1.0, 0.0, 0.0, 0.0]),
+        limit=3,
+        query_filter=_CodeChunk.filter(platform="github"),
+    )
+    search.close()
+
+    assert target in documents and hidden not in documents
+    assert stats.dense_hits == 5 and stats.sparse_hits == 1 and stats.overlap == 0
@@ -0,0 +1,118 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from llm_engineering.application.preprocessing import ChunkingPipeline, IncrementalEmbeddingPipeline, TokenChunker
+from llm_engineering.application.rag.hybrid import sparse_index_path
+from llm_engineering.application.rag.sparse import BM25Index
+from llm_engineering.domain.documents import ArticleDocument, IngestionStateDocument
+from llm_engineering.domain.embedded_chunks import EmbeddedArticleChunk
+from llm_engineering.settings import settings
+
+AUTHOR_ID = uuid.uuid4()
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _article(num_words: int, minutes: int, **kwargs) -> ArticleDocument:
+    return ArticleDocument(
+        content={"Content": " ".join(f"w{i}" for i in range(num_words))},
+        platform="medium",
+        link="https://medium.com/a",
+        authorId=AUTHOR_ID,
+        author_full_name="Jane Doe",
+        updated_at=START + timedelta(minutes=minutes),
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def pipeline(vector_backend, mongo_memory, whitespace_tokenizer, embedder, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "SPARSE_INDEX_DIR", str(tmp_path))
+    chunker = TokenChunker(tokenizer=whitespace_tokenizer, chunk_size=4, chunk_overlap=0)
+
+    return IncrementalEmbeddingPipeline(
+        chunking_pipeline=ChunkingPipeline(chunker=chunker, batch_size=2, max_workers=1),
+        embedding_model=embedder,
+        embedding_batch_size=3,
+        watermark_overlap_s=0,
+    )
+
+
+def _point_ids_by_document() -> dict[uuid.UUID, set[str]]:
+    points: dict[uuid.UUID, set[str]] = {}
+    for chunk in EmbeddedArticleChunk.iter_all():
+        points.setdefault(chunk.document_id, set()).add(str(chunk.id))
+
+    return points
+
+
+def test_only_new_changed_and_removed_documents_are_processed(pipeline, mongo_memory) -> None:
+    kept, shrunk, removed = _article(8, 0), _article(12, 1), _article(4, 2)
+    for document in (kept, shrunk, removed):
+        document.save()
+
+    first = pipeline.ingest(ArticleDocument, EmbeddedArticleChunk)
+    assert (first.changed_documents, first.upserted_chunks, first.deleted_chunks) == (3, 6, 0)
+    assert first.watermark == START + timedelta(minutes=2)
+
+    embedder = pipeline._embedding_model
+    embedder.embedded.clear()
+    unchanged = pipeline.ingest(ArticleDocument, EmbeddedArticleChunk)
+    assert (unchanged.changed_documents, unchanged.upserted_chunks, unchanged.deleted_chunks) == (0, 0, 0)
+    assert embedder.embedded == []
+
+    shrunk.content = {"Content": "w0 w1 w2 w3 w4"}
+    shrunk.upsert()
+    mongo_memory[ArticleDocument.get_collection_name()].delete_one({"_id": str(removed.id)})
+    # Written before `updated_at` existed, so only the id comparison finds it.
+    legacy = _article(3, 0).to_mongo()
+    del legacy["updated_at"]
+    mongo_memory[ArticleDocument.get_collection_name()].insert_one(legacy)
+
+    delta = pipeline.ingest(ArticleDocument, EmbeddedArticleChunk)
+
+    assert (delta.changed_documents, delta.deleted_documents) == (2, 1)
+    assert delta.upserted_chunks == 2 + 1
+    assert delta.deleted_chunks == 1 + 1
+    assert delta.watermark == shrunk.updated_at > START + timedelta(minutes=2)
+    assert sorted(embedder.embedded) == ["w0 w1 w2", "w0 w1 w2 w3", "w4"]
+
+    points = _point_ids_by_document()
+    assert {document_id: len(ids) for document_id, ids in points.items()} == {
+        kept.id: 2,
+        shrunk.id: 2,
+        uuid.UUID(legacy["_id"]): 1,
+    }
+    sparse_index = BM25Index.load(sparse_index_path(EmbeddedArticleChunk))
+    assert len(sparse_index) == 5 and all(chunk_id in sparse_index for ids in points.values() for chunk_id in ids)
+    assert IngestionStateDocument.find(collection=ArticleDocument.get_collection_name()).updated_at == delta.watermark
+
+
+def test_stale_chunks_are_found_without_the_id_comparison(pipeline) -> None:
+    pipeline.detect_deletions = False
+    document = _article(12, 0)
+    document.save()
+    pipeline.ingest(ArticleDocument, EmbeddedArticleChunk)
+
+    document.content = {"Content": "w0"}
+    document.upsert()
+    report = pipeline.ingest(ArticleDocument, EmbeddedArticleChunk)
+
+    assert (report.changed_documents, report.upserted_chunks, report.deleted_chunks) == (1, 1, 2)
+    assert [chunk.content for chunk in EmbeddedArticleChunk.iter_all()] == ["w0"]
+
+
+def test_documents_edited_in_place_are_embedded_again(pipeline) -> None:
+    document = _article(4, 0)
+    document.save()
+    first = pipeline.ingest(ArticleDocument, EmbeddedArticleChunk)
+
+    # The writer only changes the content: `upsert` marks the document as changed.
+    document.content = {"Content": "w8 w9"}
+    document.upsert()
+    report = pipeline.ingest(ArticleDocument, EmbeddedArticleChunk)
+
+    assert (report.changed_documents, report.upserted_chunks) == (1, 1)
+    assert report.watermark == document.updated_at > first.watermark
+    assert [chunk.content for chunk in EmbeddedArticleChunk.iter_all()] == ["w8 w9"]
@@ -0,0 +1,97 @@
+import urllib.request
+
+import pytest
+
+from llm_engineering.application.crawlers.custom_article import CustomArticleCrawler
+from llm_engineering.domain.documents import UserDocument
+from llm_engineering.infrastructure import instrumentation
+
+PAGE = """<html lang="en"><head><meta name="description" content="A subtitle"></head>
+<body><p>Some words</p></body></html>"""
+
+
+@pytest.fixture
+def metrics():
+    instrumentation.enable()
+    instrumentation.reset()
+    yield instrumentation
+    instrumentation.reset()
+
+
+def test_spans_counters_and_histograms_are_summarised(metrics) -> None:
+    @metrics.traced("work", kind="test")
+    def work(fail: bool) -> None:
+        if fail:
+            raise ValueError("boom")
+
+    work(False)
+    with pytest.raises(ValueError):
+        work(True)
+    metrics.count("items", 3, source="a")
+    metrics.count("items", 2, source="a")
+    for size in (1, 2, 3, 50):
+        metrics.observe("batch_size", size, buckets=metrics.SIZE_BUCKETS)
+
+    summary = metrics.summary()
+
+    assert summary["work{kind=test}"]["count"] == 2
+    assert summary["work.errors{error=ValueError,kind=test}"] == 1
+    assert summary["items{source=a}"] == 5
+    assert summary["batch_size"]["count"] == 4 and summary["batch_size"]["max"] == 50
+    assert 2 <= summary["batch_size"]["p50"] <= 3 and summary["batch_size"]["p95"] <= 50
+    assert metrics.summary(prefix="items") == {"items{source=a}": 5}
+
+
+def test_nothing_is_recorded_when_disabled(metrics) -> None:
+    metrics.disable()
+    try:
+        with metrics.span("work") as span:
+            metrics.count("items")
+            metrics.observe("latency", 0.1)
+        metrics.traced()(lambda: None)()
+    finally:
+        metrics.enable()
+
+    assert span is None and metrics.summary() == {}
+
+
+def test_metrics_are_exported_to_prometheus_and_otlp(metrics) -> None:
+    with metrics.span("mongo.find", collection='say "hi"'):
+        pass
+    metrics.count("rag.rerank.cache_hits", 4)
+
+    text = metrics.render_prometheus()
+    assert "# TYPE llm_mongo_find_seconds histogram" in text
+    assert 'llm_mongo_find_seconds_bucket{collection="say \\"hi\\"",le="+Inf"} 1' in text
+    assert 'llm_mongo_find_seconds_count{collection="say \\"hi\\""} 1' in text
+    assert "llm_rag_rerank_cache_hits_total 4" in text
+
+    otlp_metrics = metrics.to_otlp()["resourceMetrics"][0]["scopeMetrics"][0]["metrics"]
+    histogram, counter = otlp_metrics
+    assert histogram["name"] == "mongo.find" and histogram["unit"] == "s"
+    point = histogram["histogram"]["dataPoints"][0]
+    assert point["count"] == "1" and len(point["bucketCounts"]) == len(point["explicitBounds"]) + 1
+    assert point["attributes"] == [{"key": "collection", "value": {"stringValue": 'say "hi"'}}]
+    assert counter["sum"]["isMonotonic"] and counter["sum"]["dataPoints"][0]["asInt"] == "4"
+
+    server = metrics.start_metrics_server(port=0)
+    try:
+        host, port = server.server_address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "llm_rag_rerank_cache_hits_total 4" in response.read().decode("utf-8")
+    finally:
+        metrics.stop_metrics_server()
+
+
+def test_crawls_record_fetch_parse_save_and_mongo_spans(metrics, mongo_memory, fault_server) -> None:
+    fault_server.script("/post", (200, PAGE, 0.0))
+    user = UserDocument(first_name="Jane", last_name="Doe")
+
+    CustomArticleCrawler().crawl(fault_server.url("/post"), user=user)
+
+    summary = metrics.summary()
+    for operation in ("crawl", "fetch", "parse", "save"):
+        assert summary[f"crawler.{operation}{{crawler=CustomArticleCrawler}}"]["count"] == 1
+    assert summary["mongo.insert_one{collection=articles}"]["count"] == 1
+    assert summary["mongo.find_one{collection=articles}"]["count"] == 1
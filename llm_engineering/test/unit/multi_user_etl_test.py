@@ -0,0 +1,76 @@
+from itertools import islice
+
+from llm_engineering.application.crawlers.dispatcher import CrawlerDispatcher
+from llm_engineering.application.preprocessing import TokenChunker
+from llm_engineering.application.streaming import StreamingETL
+from llm_engineering.domain.documents import UserDocument
+from llm_engineering.infrastructure.db.crawl_frontier import CrawlFrontier
+from llm_engineering.settings import settings
+
+
+def test_users_are_got_or_created_in_one_batch(mongo_memory) -> None:
+    existing = UserDocument(first_name="Jane", last_name="Doe").save()
+
+    users = UserDocument.bulk_get_or_create(
+        [
+            {"first_name": "John", "last_name": "Roe"},
+            {"first_name": "Jane", "last_name": "Doe"},
+            {"first_name": "John", "last_name": "Roe"},
+        ]
+    )
+
+    assert [user.full_name for user in users] == ["John Roe", "Jane Doe", "John Roe"]
+    assert users[1].id == existing.id and users[0].id == users[2].id
+    assert len(mongo_memory["users"].rows) == 2
+    assert [user.id for user in UserDocument.bulk_get_or_create([{"first_name": "John", "last_name": "Roe"}])] == [
+        users[0].id
+    ]
+
+
+def test_claims_take_turns_between_users(tmp_path) -> None:
+    etl = StreamingETL(dispatcher=CrawlerDispatcher.build(), frontier=CrawlFrontier(tmp_path / "frontier.db"))
+    etl.frontier.add([f"https://a.example/{i}" for i in range(2000)], user_id="prolific")
+    etl.frontier.add([f"https://b.example/{i}" for i in range(2)], user_id="occasional")
+
+    claimed = [link.user_id for link in islice(etl._claims(["prolific", "occasional"]), 6)]
+
+    # Once the occasional author's links are claimed, the prolific one has the crawlers to themselves.
+    assert claimed == ["prolific", "occasional", "prolific", "occasional", "prolific", "prolific"]
+
+
+def test_one_run_streams_every_user_and_reports_each(
+    mongo_memory, vector_backend, fault_server, article_page, whitespace_tokenizer, embedder, monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setattr(settings, "SPARSE_INDEX_DIR", str(tmp_path / "sparse_index"))
+    monkeypatch.setattr(settings, "CRAWL_PARSE_WORKERS", 0)
+    jane, john = UserDocument.bulk_get_or_create(
+        [{"first_name": "Jane", "last_name": "Doe"}, {"first_name": "John", "last_name": "Roe"}]
+    )
+    jane_paths, john_paths = [f"/jane/{i}" for i in range(4)], [f"/john/{i}" for i in range(2)]
+    for path in jane_paths[:3] + john_paths:
+        fault_server.script(path, (200, article_page(" ".join(f"w{j}" for j in range(10))), 0.0))
+    # /jane/3 answers 404.
+    jane_links = [fault_server.url(path) for path in jane_paths]
+    john_links = [fault_server.url(path) for path in john_paths]
+
+    etl = StreamingETL(
+        dispatcher=CrawlerDispatcher.build(),
+        frontier=CrawlFrontier(tmp_path / "frontier.db", max_attempts=1),
+        chunker=TokenChunker(tokenizer=whitespace_tokenizer, chunk_size=4, chunk_overlap=0),
+        embedding_model=embedder,
+        crawl_workers=2,
+        chunk_executor="thread",
+        embed_executor="thread",
+        queue_size=2,
+    )
+    report = etl.run_many([(jane, jane_links), (john, john_links)])
+
+    assert sorted(report.crawled_links) == sorted(jane_links[:3] + john_links) and report.failed_links == 1
+    assert report.frontier == {"pending": 0, "in_flight": 0, "done": 5, "failed": 1}
+
+    jane_report, john_report = report.users[str(jane.id)], report.users[str(john.id)]
+    assert (jane_report.full_name, jane_report.links, jane_report.failed_links) == ("Jane Doe", 4, 1)
+    assert sorted(jane_report.crawled_links) == sorted(jane_links[:3]) and jane_report.documents == 3
+    assert sorted(john_report.crawled_links) == sorted(john_links) and john_report.frontier["done"] == 2
+    assert jane_report.chunks + john_report.chunks == report.chunks and john_report.chunks > 0
+    assert john_report.as_dict()["crawled_links"] == 2
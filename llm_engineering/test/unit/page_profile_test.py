@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+from llm_engineering.application.crawlers import base
+from llm_engineering.application.crawlers.medium import MediumCrawler
+from llm_engineering.application.crawlers.page_profile import BlockingPolicy, PageLoadStats, count_network_events
+
+
+def _event(method: str, **params) -> dict:
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class _FakeDriver:
+    """Records what a crawler asks of Chrome; the page is ready on the second poll."""
+
+    def __init__(self, options=None) -> None:
+        self.options = options
+        self.cdp_commands = []
+        self.visited = []
+        self.page_load_timeout = None
+        self.quit_calls = 0
+        self._polls = 0
+
+    def execute_cdp_cmd(self, command: str, params: dict) -> dict:
+        self.cdp_commands.append((command, params))
+
+        return {}
+
+    def set_page_load_timeout(self, timeout: float) -> None:
+        self.page_load_timeout = timeout
+
+    def get(self, link: str) -> None:
+        self.visited.append(link)
+        if "broken" in link:
+            raise ValueError(f"Cannot open {link}")
+
+    def quit(self) -> None:
+        self.quit_calls += 1
+
+    def execute_script(self, script: str):
+        self._polls += 1
+
+        return "loading" if self._polls == 1 else "interactive"
+
+    def find_elements(self, by, selector: str) -> list:
+        return ["<article>"] if selector == "article" else []
+
+    def get_log(self, log_type: str) -> list[dict]:
+        return [
+            _event("Network.requestWillBeSent"),
+            _event("Network.requestWillBeSent"),
+            _event("Network.requestWillBeSent"),
+            _event("Network.loadingFinished", encodedDataLength=1200),
+            _event("Network.loadingFailed", blockedReason="inspector"),
+            _event("Network.loadingFailed", errorText="net::ERR_FAILED"),
+        ]
+
+
+@pytest.fixture
+def chrome(monkeypatch) -> list[_FakeDriver]:
+    drivers = []
+
+    def start(options):
+        drivers.append(_FakeDriver(options))
+
+        return drivers[-1]
+
+    monkeypatch.setattr(base.webdriver, "Chrome", start)
+    monkeypatch.setattr(base.BaseSeleniumCrawler, "_chromedriver_installed", True)
+    monkeypatch.setattr(base, "page_load_stats", PageLoadStats())
+
+    return drivers
+
+
+def test_blocking_policy_translates_resource_types_to_url_patterns() -> None:
+    policy = BlockingPolicy(resource_types=frozenset({"font", "image"}), url_patterns=("*tracker.io*",))
+
+    assert "*.woff2" in policy.blocked_urls() and "*.png" in policy.blocked_urls()
+    assert policy.blocked_urls()[-1] == "*tracker.io*" and policy.blocks_images
+    assert BlockingPolicy().blocked_urls() == []
+    with pytest.raises(ValueError):
+        BlockingPolicy(resource_types=frozenset({"video"}))
+
+
+def test_network_events_are_counted() -> None:
+    assert count_network_events(_FakeDriver().get_log("performance")) == (3, 1, 1200)
+
+
+def test_browser_starts_with_the_crawler_page_profile(chrome) -> None:
+    policy = BlockingPolicy(resource_types=frozenset({"image"}), url_patterns=("*ads.example*",))
+
+    MediumCrawler(blocking_policy=policy, page_load_strategy="none")
+
+    (driver,) = chrome
+    assert driver.options.page_load_strategy == "none"
+    assert driver.options.experimental_options["prefs"] == {"profile.managed_default_content_settings.images": 2}
+    assert driver.cdp_commands == [
+        ("Network.enable", {}),
+        ("Network.setBlockedURLs", {"urls": policy.blocked_urls()}),
+    ]
+
+    with pytest.raises(ValueError):
+        MediumCrawler(page_load_strategy="lazy")
+
+
+def test_page_load_waits_for_readiness_and_is_counted(chrome) -> None:
+    crawler = MediumCrawler(blocking_policy=BlockingPolicy())
+    driver = chrome[0]
+
+    crawler.load_page("https://medium.com/@jane/post", timeout=5)
+
+    assert driver.visited == ["https://medium.com/@jane/post"] and driver.page_load_timeout == 5
+    assert driver._polls == 2 and driver.cdp_commands == []
+    stats = crawler.page_stats.as_dict()
+    assert (stats["pages"], stats["requests"], stats["blocked_requests"], stats["bytes_received"]) == (1, 3, 1, 1200)
+    assert base.page_load_stats.as_dict()["pages"] == 1
+
+
+def test_browser_is_quit_even_when_the_crawl_fails(chrome, mongo_memory) -> None:
+    crawler = MediumCrawler(blocking_policy=BlockingPolicy())
+
+    with pytest.raises(ValueError):
+        crawler.crawl("https://medium.com/@jane/broken", user=None)
+
+    (driver,) = chrome
+    assert driver.quit_calls == 1
+    assert "--remote-debugging-port=0" in driver.options.arguments
@@ -0,0 +1,66 @@
+from bs4 import SoupStrainer
+
+from llm_engineering.application.crawlers import parsing
+from llm_engineering.application.crawlers.custom_article import CustomArticleCrawler
+from llm_engineering.application.crawlers.medium import MediumCrawler
+from llm_engineering.domain.documents import UserDocument
+from llm_engineering.settings import settings
+
+MEDIUM_PAGE = """<html lang="en"><head><meta name="description" content="About parsing">
+<script>window.__STATE__ = {"secret": "state"};</script><style>p { margin: 0 }</style></head>
+<body><nav>Sign in Get started</nav><article>
+<h1 class="pw-post-title">Fast <em>parsing</em></h1><h2 class="pw-subtitle- paragraph">With lxml</h2>
+<p>First paragraph.</p><script>track()</script><p>Second paragraph.</p></article>
+<aside><h1 class="pw-post-title">Recommended</h1>More from Medium</aside></body></html>"""
+
+USER = UserDocument(first_name="Jane", last_name="Doe")
+
+
+def test_medium_article_is_extracted_from_its_subtree() -> None:
+    article = MediumCrawler.parse("https://medium.com/@jane/fast-parsing", MEDIUM_PAGE, USER)
+
+    assert (article.content["Title"], article.content["Subtitle"]) == ("Fast parsing", "With lxml")
+    assert "First paragraph." in article.content["Content"] and "Second paragraph." in article.content["Content"]
+    for outside in ("Sign in", "secret", "track()", "More from Medium", "margin"):
+        assert outside not in article.content["Content"]
+
+
+def test_medium_pages_without_an_article_fall_back_to_the_body() -> None:
+    article = MediumCrawler.parse("https://medium.com/@jane", "<html><body><p>Profile</p></body></html>", USER)
+
+    assert article.content == {"Title": None, "Subtitle": None, "Content": "Profile"}
+    assert MediumCrawler.parse("https://medium.com/@jane", "", USER).content["Content"] == ""
+
+
+def test_strainer_class_filter_matches_elements_with_several_classes() -> None:
+    html = '<div class="post relative wide">A</div><div class="ad">B</div><button class="image">C</button>'
+
+    soup = parsing.parse_html(html, parse_only=SoupStrainer(["div", "button"], class_=parsing.any_class("post", "image")))
+
+    assert [element.get_text() for element in soup.find_all(["div", "button"])] == ["A", "C"]
+
+
+def test_page_metadata_and_xpath_text() -> None:
+    assert parsing.page_metadata(MEDIUM_PAGE) == {"description": "About parsing", "language": "en"}
+    assert parsing.page_metadata("") == {"description": None, "language": None}
+    assert CustomArticleCrawler._metadata(MEDIUM_PAGE, "https://a") == {
+        "source": "https://a",
+        "description": "About parsing",
+        "language": "en",
+    }
+
+    tree = parsing.parse_tree(MEDIUM_PAGE)
+    assert parsing.xpath_text(tree, parsing.class_xpath("h2", "paragraph")) == "With lxml"
+    assert parsing.xpath_text(tree, '//div[@id="missing"]') == ""
+
+
+def test_parsing_runs_in_the_process_pool_when_enabled(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "CRAWL_PARSE_WORKERS", 2)
+    monkeypatch.setattr(parsing, "_pool", None)
+
+    article = parsing.run_parser(MediumCrawler.parse, "https://medium.com/@jane/fast-parsing", MEDIUM_PAGE, USER)
+
+    assert parsing._pool is not None and article.content["Title"] == "Fast parsing"
+    assert parsing._pool._mp_context.get_start_method() == "spawn"
+    assert parsing.start_parse_pool(4) is parsing._pool
+    parsing._pool.shutdown()
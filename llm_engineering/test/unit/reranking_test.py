@@ -0,0 +1,69 @@
+import uuid
+from dataclasses import dataclass, field
+
+from llm_engineering.application.rag.reranking import Reranker
+
+
+@dataclass
+class _Candidate:
+    content: str
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+
+
+class _LengthScorer:
+    """Scores a pair by the length of the document and records every call."""
+
+    def __init__(self) -> None:
+        self.calls: list[list[tuple[str, str]]] = []
+
+    def __call__(self, pairs, to_list=True, batch_size=32):
+        self.calls.append(pairs)
+
+        return [float(len(document)) for _, document in pairs]
+
+
+def test_reranker_keeps_top_k_best_scored() -> None:
+    candidates = [_Candidate("a"), _Candidate("ccc"), _Candidate("bb")]
+    reranker = Reranker(model=_LengthScorer(), batch_size=2, latency_budget_ms=None)
+
+    reranked, stats = reranker.rerank("query", candidates, keep_top_k=2)
+
+    assert [c.content for c in reranked] == ["ccc", "bb"]
+    assert stats.scored == 3
+    assert stats.batches == 2
+
+
+def test_reranker_sorts_batches_by_length_and_prunes_to_top_n() -> None:
+    candidates = [_Candidate("x" * n) for n in (5, 1, 4, 2, 3)]
+    model = _LengthScorer()
+    reranker = Reranker(model=model, batch_size=2, top_n=4, latency_budget_ms=None)
+
+    reranker.rerank("query", candidates, keep_top_k=4)
+
+    batch_lengths = [[len(document) for _, document in pairs] for pairs in model.calls]
+    assert batch_lengths == [[1, 2], [4, 5]]
+
+
+def test_reranker_caches_scores_per_query_and_document() -> None:
+    candidates = [_Candidate("a"), _Candidate("bb")]
+    model = _LengthScorer()
+    reranker = Reranker(model=model, latency_budget_ms=None)
+
+    reranker.rerank("query", candidates, keep_top_k=2)
+    _, stats = reranker.rerank("query", candidates, keep_top_k=2)
+
+    assert len(model.calls) == 1
+    assert stats.cache_hits == 2
+
+
+def test_reranker_skips_batches_past_the_latency_budget() -> None:
+    candidates = [_Candidate("x" * n) for n in (1, 2, 3, 4)]
+    model = _LengthScorer()
+    reranker = Reranker(model=model, batch_size=2, latency_budget_ms=0.0)
+
+    reranked, stats = reranker.rerank("query", candidates, keep_top_k=4)
+
+    assert stats.batches == 1
+    assert stats.skipped == 2
+    assert stats.budget_exceeded
+    assert [c.content for c in reranked] == ["xx", "x", "xxx", "xxxx"]
@@ -0,0 +1,75 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_engineering.application.crawlers.custom_article import CustomArticleCrawler
+from llm_engineering.application.crawlers.dispatcher import CrawlerDispatcher
+from llm_engineering.application.crawlers.reparse import reparse_archive
+from llm_engineering.domain.documents import ArticleDocument, UserDocument
+from llm_engineering.infrastructure.db import response_archive as response_archive_module
+from llm_engineering.infrastructure.db.response_archive import ResponseArchive
+
+PAGE = """<html lang="en"><head><meta name="description" content="A subtitle"></head>
+<body><h1>Title</h1><p>Body text {}.</p></body></html>"""
+
+
+def test_latest_response_of_each_url_is_read_back(tmp_path) -> None:
+    archive = ResponseArchive(tmp_path, segment_bytes=256)
+    for fetched_at in range(3):
+        for url in ("https://a", "https://b"):
+            archive.put(url, PAGE.format(fetched_at) * 4, fetched_at=float(fetched_at), user_id="u")
+
+    assert len(archive.entries(latest_only=False)) == 6
+    assert sorted((entry.url, entry.fetched_at) for entry in archive.entries()) == [("https://a", 2.0), ("https://b", 2.0)]
+    assert len(list(tmp_path.glob("*.warc.zst"))) > 1  # Segments rotate past `segment_bytes`.
+
+    latest = archive.latest("https://a")
+    assert "Body text 2." in latest.text and latest.meta == {"user_id": "u"}
+    assert archive.latest("https://missing") is None
+    assert [response.fetched_at for _, response in archive.iter_read(archive.entries(latest_only=False))] == sorted(
+        [0.0, 0.0, 1.0, 1.0, 2.0, 2.0]
+    )
+    archive.close()
+
+    reopened = ResponseArchive(tmp_path)
+    assert reopened.latest("https://b").body == (PAGE.format(2) * 4).encode("utf-8")
+    reopened.close()
+
+
+def test_documents_are_rebuilt_from_the_archive_without_fetching(mongo_memory, fault_server, response_archive) -> None:
+    user = UserDocument(first_name="Jane", last_name="Doe")
+    links = [fault_server.url(f"/article/{i}") for i in range(5)]
+    for i, link in enumerate(links):
+        fault_server.script(f"/article/{i}", (200, PAGE.format(i), 0.0))
+        CustomArticleCrawler().crawl(link, user=user)
+    original_ids = {link: ArticleDocument.find(link=link).id for link in links}
+    hits = sum(fault_server.hits.values())
+
+    for article in ArticleDocument.bulk_find():
+        article.content = {"Content": "stale"}
+        article.upsert()
+
+    report = reparse_archive(response_archive, dispatcher=CrawlerDispatcher.build(), max_workers=2, batch_size=2)
+
+    assert (report.parsed, report.failed, report.skipped) == (5, 0, 0)
+    assert sum(fault_server.hits.values()) == hits
+    for i, link in enumerate(links):
+        article = ArticleDocument.find(link=link)
+        assert article.id == original_ids[link] and article.author_id == user.id
+        assert f"Body text {i}." in article.content["Content"]
+
+
+def test_concurrent_first_uses_open_one_archive(tmp_path, monkeypatch) -> None:
+    opened = []
+
+    def open_archive() -> ResponseArchive:
+        time.sleep(0.05)  # Long enough for every thread to find no archive yet.
+        opened.append(ResponseArchive(tmp_path))
+
+        return opened[-1]
+
+    monkeypatch.setattr(response_archive_module, "_instance", None)
+    monkeypatch.setattr(response_archive_module, "ResponseArchive", open_archive)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        archives = list(executor.map(lambda _: response_archive_module.get_response_archive(), range(4)))
+
+    assert len(opened) == 1 and all(archive is opened[0] for archive in archives)
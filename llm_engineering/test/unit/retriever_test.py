@@ -0,0 +1,165 @@
+import uuid
+
+import pytest
+from qdrant_client.http.models import Distance, VectorParams
+
+from llm_engineering.application.rag import ContextRetriever, Reranker
+from llm_engineering.application.utils import TTLCache
+from llm_engineering.domain.embedded_chunks import EmbeddedArticleChunk, EmbeddedPostChunk, EmbeddedRepositoryChunk
+from llm_engineering.domain.exceptions import EmbeddingError
+
+AUTHORS = [uuid.uuid4(), uuid.uuid4()]
+
+
+class _FixedEmbedder:
+    """Embeds every query as the same vector and counts the calls."""
+
+    embedding_size = 4
+
+    def __init__(self, failures: int = 0) -> None:
+        self.calls = 0
+        self.failures = failures
+
+    def __call__(self, text, to_list=True):
+        self.calls += 1
+        if self.calls <= self.failures:
+            return []  # As EmbeddingModelSingleton does when the model fails.
+
+        return [1.0, 0.0, 0.0, 0.0]
+
+
+def _length_scorer(pairs, to_list=True, batch_size=32):
+    return [float(len(document)) for _, document in pairs]
+
+
+def _chunk(chunk_class, content, vector, author_id=AUTHORS[0], **fields):
+    return chunk_class(
+        content=content,
+        embedding=vector,
+        platform="github" if chunk_class is EmbeddedRepositoryChunk else "medium",
+        document_id=uuid.uuid4(),
+        author_id=author_id,
+        author_full_name="Jane Doe",
+        **fields,
+    )
+
+
+@pytest.fixture
+def chunks(vector_backend) -> dict[str, list]:
+    for chunk_class in (EmbeddedPostChunk, EmbeddedArticleChunk, EmbeddedRepositoryChunk):
+        vector_backend.create_collection(
+            collection_name=chunk_class.get_collection_name(),
+            vectors_config=VectorParams(size=4, distance=Distance.COSINE),
+        )
+
+    chunks = {
+        "posts": [
+            _chunk(EmbeddedPostChunk, "post about rust", [1.0, 0.1, 0.0, 0.0]),
+            _chunk(EmbeddedPostChunk, "duplicated text", [1.0, 0.2, 0.0, 0.0]),
+        ],
+        "articles": [
+            _chunk(EmbeddedArticleChunk, "duplicated text", [1.0, 0.3, 0.0, 0.0], link="https://a"),
+            _chunk(EmbeddedArticleChunk, "an article by someone else", [1.0, 0.0, 0.0, 0.0], AUTHORS[1], link="x"),
+        ],
+        "repositories": [
+            _chunk(
+                EmbeddedRepositoryChunk,
+                "a long repository chunk about rust crates",
+                [0.0, 1.0, 0.0, 0.0],
+                name="r",
+                link="x",
+            ),
+        ],
+    }
+    for chunk_class, class_chunks in zip(
+        (EmbeddedPostChunk, EmbeddedArticleChunk, EmbeddedRepositoryChunk), chunks.values()
+    ):
+        assert chunk_class.bulk_insert(class_chunks)
+
+    return chunks
+
+
+def _retriever(**kwargs) -> ContextRetriever:
+    options = {
+        "embedding_model": _FixedEmbedder(),
+        "reranker": Reranker(model=_length_scorer, latency_budget_ms=None),
+        "token_counter": lambda text: len(text.split()),
+    }
+
+    return ContextRetriever(**{**options, **kwargs})
+
+
+def test_retriever_searches_every_collection_deduplicates_and_reranks(chunks) -> None:
+    retriever = _retriever()
+
+    result = retriever.retrieve("  what about   rust ", author_id=AUTHORS[0])
+
+    assert [d.content for d in result.documents] == [
+        "a long repository chunk about rust crates",
+        "post about rust",
+        "duplicated text",
+    ]
+    assert result.context == "\n\n".join(d.content for d in result.documents)
+    assert result.num_tokens == 7 + 3 + 2
+    assert result.stats.duplicates == 1
+    assert set(result.stats.stages) == {"embed", "search", "dedupe", "rerank", "budget"}
+
+
+def test_retriever_fits_the_token_budget(chunks) -> None:
+    retriever = _retriever(max_context_tokens=5)
+
+    result = retriever.retrieve("rust", author_id=AUTHORS[0])
+
+    # The best chunk does not fit, so the next ones fill the budget instead.
+    assert [d.content for d in result.documents] == ["post about rust", "duplicated text"]
+    assert result.num_tokens == 5
+    assert result.stats.dropped_by_budget == 1
+
+
+def test_retriever_caches_embeddings_and_results_by_normalised_query_and_filters(chunks) -> None:
+    embedder = _FixedEmbedder()
+    retriever = _retriever(embedding_model=embedder)
+
+    first = retriever.retrieve("rust  crates", author_id=AUTHORS[0])
+    second = retriever.retrieve(" rust crates ", author_id=AUTHORS[0])
+    other_filter = retriever.retrieve("rust crates", author_id=AUTHORS[1])
+
+    assert second.stats.cached and not first.stats.cached
+    assert second.documents == first.documents
+    assert not other_filter.stats.cached and other_filter.stats.embedding_cached
+    assert [d.author_id for d in other_filter.documents] == [AUTHORS[1]]
+    assert embedder.calls == 1
+
+
+def test_cached_results_are_handed_out_as_copies(chunks) -> None:
+    retriever = _retriever()
+
+    first = retriever.retrieve("rust", author_id=AUTHORS[0])
+    first.documents.clear()
+
+    assert len(retriever.retrieve("rust", author_id=AUTHORS[0]).documents) == 3
+
+
+def test_failed_query_embeddings_are_not_cached(chunks) -> None:
+    embedder = _FixedEmbedder(failures=1)
+    retriever = _retriever(embedding_model=embedder)
+
+    with pytest.raises(EmbeddingError):
+        retriever.retrieve("rust", author_id=AUTHORS[0])
+
+    assert len(retriever.retrieve("rust", author_id=AUTHORS[0]).documents) == 3
+    assert embedder.calls == 2
+
+
+def test_ttl_cache_expires_entries() -> None:
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10.0, timer=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)
+
+    assert cache.get("a") is None and cache.get("b") == 2
+
+    now[0] = 10.0
+    assert cache.get("b") is None and len(cache) == 1
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,102 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import UUID4, BaseModel
+from qdrant_client.models import Record
+
+from llm_engineering.domain.base import nosql
+from llm_engineering.domain.base.serialization import construct_trusted, stringify_uuids, uuid_field_keys
+from llm_engineering.domain.documents import ArticleDocument, IngestionStateDocument
+from llm_engineering.domain.embedded_chunks import EmbeddedPostChunk
+from llm_engineering.settings import settings
+
+
+def _article() -> ArticleDocument:
+    return ArticleDocument(
+        content={"Content": "text"},
+        platform="medium",
+        link="https://medium.com/a",
+        authorId=uuid.uuid4(),
+        author_full_name="Jane Doe",
+        updated_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_field_plan_lists_only_uuid_fields_by_alias_or_name() -> None:
+    assert uuid_field_keys(ArticleDocument) == ("id", "authorId")
+    assert uuid_field_keys(ArticleDocument, by_alias=False) == ("id", "author_id")
+    assert uuid_field_keys(EmbeddedPostChunk) == ("id", "document_id", "author_id")
+    assert uuid_field_keys(IngestionStateDocument) == ("id",)
+
+
+def test_optional_uuid4_fields_are_uuid_fields() -> None:
+    class _Model(BaseModel):
+        a: UUID4
+        b: Optional[UUID4] = None
+        c: UUID4 | None = None
+        d: str | None = None
+
+    assert uuid_field_keys(_Model) == ("a", "b", "c")
+
+    ids = {key: uuid.uuid4() for key in ("a", "b", "c")}
+    row = stringify_uuids(_Model, _Model(**ids).model_dump())
+    assert row == {**{key: str(value) for key, value in ids.items()}, "d": None}
+    assert construct_trusted(_Model, row).model_dump() == {**ids, "d": None}
+
+
+def test_mongo_round_trip_is_identical_with_and_without_validation() -> None:
+    article = _article()
+    row = article.to_mongo()
+
+    assert row["_id"] == str(article.id) and row["authorId"] == str(article.author_id)
+    assert row["updated_at"] == article.updated_at
+
+    validated = ArticleDocument.from_mongo(dict(row))
+    trusted = ArticleDocument.from_mongo(dict(row), trusted=True)
+    assert trusted.model_dump() == validated.model_dump() == article.model_dump()
+    assert isinstance(trusted.author_id, uuid.UUID)
+    assert trusted.model_fields_set == validated.model_fields_set
+
+
+def test_partial_rows_fall_back_to_defaults() -> None:
+    row = _article().to_mongo()
+    del row["updated_at"]
+
+    article = ArticleDocument.from_mongo(row, trusted=True)
+
+    assert article.updated_at.tzinfo is not None
+    assert "updated_at" not in article.model_fields_set
+
+
+def test_trusted_reads_follow_the_setting(mongo_memory, monkeypatch) -> None:
+    article = _article()
+    article.save()
+    calls = []
+    monkeypatch.setattr(nosql, "construct_trusted", lambda cls, data: calls.append(data) or construct_trusted(cls, data))
+
+    assert list(ArticleDocument.iter_find()) == [article]
+    assert calls == []
+
+    monkeypatch.setattr(settings, "TRUSTED_DB_READS", True)
+    assert ArticleDocument.bulk_find() == [article]
+    assert len(calls) == 1
+
+
+def test_qdrant_record_is_identical_with_and_without_validation() -> None:
+    chunk = EmbeddedPostChunk(
+        content="c",
+        embedding=[1.0, 0.0],
+        platform="linkedin",
+        document_id=uuid.uuid4(),
+        author_id=uuid.uuid4(),
+        author_full_name="Jane Doe",
+        metadata={"chunk_index": 0},
+    )
+    point = chunk.to_point()
+    record = Record(id=point.id, payload=point.payload, vector=point.vector)
+
+    trusted = EmbeddedPostChunk.from_record(record, trusted=True)
+
+    assert trusted.model_dump() == EmbeddedPostChunk.from_record(record).model_dump() == chunk.model_dump()
+    assert isinstance(trusted.document_id, uuid.UUID)
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from llm_engineering.application.streaming import Stage, StreamingPipeline
+
+
+class _Sink:
+    def __init__(self) -> None:
+        self.items = []
+        self._lock = threading.Lock()
+
+    def __call__(self, item):
+        with self._lock:
+            self.items.append(item)
+
+
+def test_items_stream_through_stages_with_bounded_memory() -> None:
+    produced = consumed = max_in_flight = 0
+    lock = threading.Lock()
+
+    def source():
+        nonlocal produced, max_in_flight
+        for i in range(300):
+            with lock:
+                produced += 1
+                max_in_flight = max(max_in_flight, produced - consumed)
+            yield i
+
+    def slow_sink(batch):
+        nonlocal consumed
+        time.sleep(0.002)
+        with lock:
+            consumed += len(batch)
+
+    pipeline = StreamingPipeline(
+        [
+            Stage("split", lambda i: [i, -i - 1], workers=4, queue_size=8, fan_out=True),
+            Stage("drop-negatives", lambda i: i if i >= 0 else None, workers=2, queue_size=8),
+            Stage("sink", slow_sink, queue_size=8, batch_size=5),
+        ]
+    )
+    report = pipeline.run(source())
+
+    assert consumed == 300 and report.errors == 0
+    assert report.stages["split"]["items_out"] == 600 and report.stages["drop-negatives"]["items_out"] == 300
+    assert all(stats["max_queue_depth"] <= 8 for stats in report.stages.values())
+    # Queues, workers and the batch being filled bound what is in memory, not the input size.
+    assert max_in_flight <= 3 * 8 + 4 + 2 + 1 + 5 + 2
+
+
+def test_failing_items_are_skipped_unless_the_stage_fails_fast() -> None:
+    def fragile(i):
+        if i % 10 == 0:
+            raise ValueError(f"bad item {i}")
+
+        return i
+
+    sink = _Sink()
+    report = StreamingPipeline([Stage("fragile", fragile, workers=2), Stage("sink", sink)]).run(range(50))
+
+    assert sorted(sink.items) == [i for i in range(50) if i % 10]
+    assert report.stages["fragile"]["errors"] == 5
+
+    pulled = 0
+
+    def endless():
+        nonlocal pulled
+        while True:
+            pulled += 1
+            yield pulled
+
+    with pytest.raises(ValueError):
+        StreamingPipeline([Stage("fragile", fragile, fail_fast=True, queue_size=4)]).run(endless())
+    assert pulled < 100
+
+
+def test_process_stages_run_in_worker_processes() -> None:
+    sink = _Sink()
+    words = [f"word-{'x' * i}" for i in range(40)]
+
+    report = StreamingPipeline(
+        [Stage("measure", len, workers=2, executor="process"), Stage("sink", sink)], progress_interval_s=None
+    ).run(words)
+
+    assert sorted(sink.items) == sorted(len(word) for word in words)
+    assert report.stages["measure"]["executor"] == "process" and report.stages["measure"]["items_in"] == 40
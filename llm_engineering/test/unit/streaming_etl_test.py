@@ -0,0 +1,57 @@
+from llm_engineering.application.crawlers import parsing
+from llm_engineering.application.crawlers.dispatcher import CrawlerDispatcher
+from llm_engineering.application.preprocessing import TokenChunker
+from llm_engineering.application.rag import BM25Index
+from llm_engineering.application.rag.hybrid import sparse_index_path
+from llm_engineering.application.streaming import StreamingETL
+from llm_engineering.domain.documents import ArticleDocument, UserDocument
+from llm_engineering.domain.embedded_chunks import EmbeddedArticleChunk
+from llm_engineering.infrastructure.db.crawl_frontier import CrawlFrontier, LinkState
+from llm_engineering.settings import settings
+
+
+def test_links_are_streamed_into_documents_and_embedded_chunks(
+    mongo_memory, vector_backend, fault_server, article_page, whitespace_tokenizer, embedder, monkeypatch, tmp_path
+) -> None:
+    monkeypatch.setattr(settings, "SPARSE_INDEX_DIR", str(tmp_path / "sparse_index"))
+    monkeypatch.setattr(parsing, "_pool", None)
+    user = UserDocument(first_name="Jane", last_name="Doe")
+    links = [fault_server.url(f"/article/{i}") for i in range(6)]
+    for i in range(5):
+        fault_server.script(f"/article/{i}", (200, article_page(" ".join(f"w{j}" for j in range(8 + i))), 0.0))
+    # /article/5 answers 404: a permanent failure.
+
+    etl = StreamingETL(
+        dispatcher=CrawlerDispatcher.build(),
+        frontier=CrawlFrontier(tmp_path / "frontier.db", max_attempts=1),
+        chunker=TokenChunker(tokenizer=whitespace_tokenizer, chunk_size=4, chunk_overlap=0),
+        embedding_model=embedder,
+        crawl_workers=3,
+        chunk_executor="thread",
+        embed_executor="thread",
+        embed_batch_size=4,
+        queue_size=2,
+    )
+    report = etl.run(user, links)
+    # The three crawl workers parse their pages in a process pool.
+    assert parsing._pool is not None
+    parsing._pool.shutdown()
+
+    assert sorted(report.crawled_links) == sorted(links[:5]) and report.failed_links == 1
+    assert report.documents == 5 and report.frontier == {"pending": 0, "in_flight": 0, "done": 5, "failed": 1}
+    assert list(report.stages) == ["crawl", "chunk", "embed", "load"]
+    assert report.stages["crawl"]["items_in"] == 6 and report.stages["embed"]["items_in"] == report.chunks
+    assert all(stats["max_queue_depth"] <= 2 for stats in report.stages.values())
+
+    chunks = list(EmbeddedArticleChunk.iter_all())
+    assert len(chunks) == report.chunks > 5
+    assert {chunk.document_id for chunk in chunks} == {ArticleDocument.find(link=link).id for link in links[:5]}
+    assert etl.frontier.get(links[5]).state is LinkState.FAILED
+
+    # The chunks are searchable by keyword too: the BM25 index of the collection was saved.
+    sparse_index = BM25Index.load(sparse_index_path(EmbeddedArticleChunk))
+    assert len(sparse_index) == report.chunks and all(chunk.id in sparse_index for chunk in chunks)
+
+    monkeypatch.setattr(parsing, "_pool", None)
+    rerun = etl.run(user, links)
+    assert (rerun.crawled_links, rerun.chunks) == ([], 0)
@@ -0,0 +1,213 @@
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from qdrant_client.http.models import (
+    Distance,
+    FilterSelector,
+    NearestQuery,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    QueryRequest,
+    VectorParams,
+)
+
+from llm_engineering.domain.base import vector
+from llm_engineering.domain.base.filters import FilterBuilder
+from llm_engineering.domain.base.vector import VectorBaseDocument, VectorQuery
+from llm_engineering.domain.types import DataCategory
+from llm_engineering.infrastructure.db.numpy_backend import NumpyVectorBackend
+from llm_engineering.infrastructure.db.vector_backend import VectorBackend
+
+DIM = 16
+AUTHORS = [uuid.uuid4() for _ in range(3)]
+
+
+class _ContractDocument(VectorBaseDocument):
+    content: str
+    platform: str
+    author_id: uuid.UUID
+    metadata: dict
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "test_contract_documents"
+        category = DataCategory.ARTICLES
+        use_vector_index = True
+
+
+@pytest.fixture
+def documents(vector_backend) -> list[_ContractDocument]:
+    vector_backend.create_collection(
+        collection_name=_ContractDocument.get_collection_name(),
+        vectors_config=VectorParams(size=DIM, distance=Distance.COSINE),
+    )
+    rng = np.random.default_rng(7)
+    documents = [
+        _ContractDocument(
+            content=f"chunk {i} about {('rust', 'python')[i % 2]}",
+            platform=("medium", "linkedin", "github")[(i // 2) % 3],
+            author_id=AUTHORS[i % len(AUTHORS)],
+            metadata={"chunk_index": i % 10},
+            embedding=rng.normal(size=DIM).tolist(),
+        )
+        for i in range(150)
+    ]
+    assert _ContractDocument.bulk_insert(documents, batch_size=40)
+
+    return documents
+
+
+def _exact_top_k(documents, query, k, keep=lambda d: True) -> list[uuid.UUID]:
+    candidates = [d for d in documents if keep(d)]
+    matrix = np.asarray([d.embedding for d in candidates])
+    scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+
+    return [candidates[i].id for i in np.argsort(-scores)[:k]]
+
+
+def test_backends_implement_the_interface(vector_backend) -> None:
+    client = getattr(vector_backend, "_client", vector_backend)
+
+    assert isinstance(client, VectorBackend)
+
+
+def test_search_is_exact_and_ordered(documents) -> None:
+    query = np.random.default_rng(1).normal(size=DIM)
+
+    results = _ContractDocument.search(query.tolist(), limit=10)
+
+    assert [d.id for d in results] == _exact_top_k(documents, query, 10)
+    assert results[0].embedding is None
+
+
+def test_filters_match_qdrant_semantics(documents) -> None:
+    query = np.random.default_rng(2).normal(size=DIM)
+    author_id = AUTHORS[1]
+    query_filter = (
+        _ContractDocument.filter(author_id=author_id, platform=["medium", "github"])
+        .exclude(platform="github")
+        .range("metadata.chunk_index", gte=2, lt=8)
+    )
+
+    def keep(d):
+        return d.author_id == author_id and d.platform == "medium" and 2 <= d.metadata["chunk_index"] < 8
+
+    results = _ContractDocument.search(query.tolist(), limit=5, query_filter=query_filter)
+    assert [d.id for d in results] == _exact_top_k(documents, query, 5, keep)
+
+    batched = _ContractDocument.search_batch([VectorQuery(query, 5, query_filter), VectorQuery(query, 3)])
+    assert [[d.id for d in r] for r in batched] == [
+        _exact_top_k(documents, query, 5, keep),
+        _exact_top_k(documents, query, 3),
+    ]
+
+    text_filter = _ContractDocument.filter().text("content", "rust")
+    assert all("rust" in d.content for d in _ContractDocument.iter_all(filter=text_filter))
+
+
+def test_batch_queries_answer_each_request_with_its_own_options(vector_backend, documents) -> None:
+    query = np.random.default_rng(4).normal(size=DIM)
+    requests = [
+        QueryRequest(query=query.tolist(), limit=4, with_payload=True),
+        QueryRequest(query=NearestQuery(nearest=query.tolist()), limit=3, offset=2, with_vector=True),
+    ]
+
+    plain, paged = vector_backend.query_batch_points(
+        collection_name=_ContractDocument.get_collection_name(), requests=requests
+    )
+
+    assert [uuid.UUID(str(point.id)) for point in plain.points] == _exact_top_k(documents, query, 4)
+    assert [uuid.UUID(str(point.id)) for point in paged.points] == _exact_top_k(documents, query, 5)[2:]
+    assert plain.points[0].payload["platform"] and plain.points[0].vector is None
+    assert not paged.points[0].payload and len(paged.points[0].vector) == DIM
+
+
+def test_scroll_pages_through_every_point_in_id_order(documents) -> None:
+    seen, offset = [], None
+    while True:
+        page, offset = _ContractDocument.bulk_find(limit=32, offset=offset)
+        seen.extend(page)
+        if offset is None:
+            break
+
+    assert [d.id for d in seen] == sorted((d.id for d in documents), key=str)
+    assert {d.id: d for d in seen} == {d.id: d for d in documents}
+    assert [d.content for d in seen] == [{d.id: d for d in documents}[d.id].content for d in seen]
+
+
+def test_upsert_overwrites_and_delete_removes(vector_backend, documents) -> None:
+    collection_name = _ContractDocument.get_collection_name()
+    replaced = documents[0].model_copy(update={"content": "replaced", "embedding": [1.0] + [0.0] * (DIM - 1)})
+    assert _ContractDocument.bulk_insert([replaced])
+
+    assert vector_backend.count(collection_name=collection_name).count == 150
+    assert _ContractDocument.search([1.0] + [0.0] * (DIM - 1), limit=1)[0].content == "replaced"
+
+    vector_backend.delete(collection_name=collection_name, points_selector=PointIdsList(points=[str(replaced.id)]))
+    only_github = FilterSelector(filter=_ContractDocument.filter(platform="github").build())
+    vector_backend.delete(collection_name=collection_name, points_selector=only_github)
+
+    remaining = list(_ContractDocument.iter_all(batch_size=50))
+    assert len(remaining) == vector_backend.count(collection_name=collection_name).count == 99
+    assert all(d.platform != "github" and d.id != replaced.id for d in remaining)
+    query = np.random.default_rng(3).normal(size=DIM)
+    assert [d.id for d in _ContractDocument.search(query.tolist(), limit=4)] == _exact_top_k(
+        documents, query, 4, lambda d: d.platform != "github" and d.id != replaced.id
+    )
+
+
+def test_an_id_repeated_in_one_upsert_is_written_once(vector_backend, documents) -> None:
+    collection_name = _ContractDocument.get_collection_name()
+    first = documents[0].model_copy(update={"id": uuid.uuid4(), "content": "first", "embedding": [1.0] * DIM})
+    last = first.model_copy(update={"content": "last", "embedding": [1.0] + [0.0] * (DIM - 1)})
+    existing = documents[1].model_copy(update={"content": "existing, last"})
+    assert _ContractDocument.bulk_insert([first, existing, documents[1], last, existing])
+
+    assert vector_backend.count(collection_name=collection_name).count == 151
+    assert _ContractDocument.search([1.0] + [0.0] * (DIM - 1), limit=1)[0].content == "last"
+    assert sum(d.id == first.id for d in _ContractDocument.iter_all(batch_size=50)) == 1
+
+    vector_backend.delete(collection_name=collection_name, points_selector=PointIdsList(points=[str(first.id)]))
+    assert vector_backend.count(collection_name=collection_name).count == 150
+    assert next(d for d in _ContractDocument.iter_all(batch_size=50) if d.id == existing.id).content == "existing, last"
+
+
+def test_shadow_bulk_load_swaps_the_alias(vector_backend, documents, monkeypatch) -> None:
+    monkeypatch.setattr(vector, "EmbeddingModelSingleton", lambda: SimpleNamespace(embedding_size=DIM))
+    vector_backend.delete_collection(collection_name=_ContractDocument.get_collection_name())
+
+    for batch in (documents[:10], documents[10:25]):
+        with _ContractDocument.bulk_load(shadow=True) as load:
+            load.bulk_insert(batch)
+
+    assert [a.collection_name for a in vector_backend.get_aliases().aliases] == [load.collection_name]
+    assert vector_backend.count(collection_name=_ContractDocument.get_collection_name()).count == 15
+
+
+def test_numpy_backend_persists_and_memory_maps(tmp_path) -> None:
+    backend = NumpyVectorBackend(path=tmp_path)
+    backend.create_collection("persisted", vectors_config=VectorParams(size=4, distance=Distance.DOT))
+    backend.create_payload_index("persisted", "platform", PayloadSchemaType.KEYWORD)
+    backend.upsert("persisted", _points(10))
+    backend.close()
+
+    reopened = NumpyVectorBackend(path=tmp_path, mmap=True)
+    hits = reopened.search(
+        "persisted", [1.0, 0.0, 0.0, 0.0], limit=3, query_filter=FilterBuilder().where(platform="1").build()
+    )
+
+    assert [hit.payload["i"] for hit in hits] == [9, 7, 5]
+    assert reopened.get_collection("persisted").payload_schema["platform"].data_type == "keyword"
+
+    reopened.upsert("persisted", _points(2, start=100))
+    assert reopened.count("persisted").count == 12
+
+
+def _points(count: int, start: int = 0) -> list[PointStruct]:
+    return [
+        PointStruct(id=str(uuid.uuid4()), vector=[float(i), 0.0, 0.0, 1.0], payload={"i": i, "platform": str(i % 2)})
+        for i in range(start, start + count)
+    ]
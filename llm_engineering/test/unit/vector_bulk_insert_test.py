@@ -0,0 +1,129 @@
+import uuid
+
+import numpy as np
+from qdrant_client.http import exceptions
+from qdrant_client.http.models import Distance, VectorParams
+
+from llm_engineering.domain.base import vector
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.chunks import ArticleChunk
+from llm_engineering.domain.types import DataCategory
+
+
+class _BulkDocument(VectorBaseDocument):
+    content: str
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "test_bulk_documents"
+        category = DataCategory.POSTS
+        use_vector_index = True
+
+
+class _RecordingConnection:
+    """Forwards to a real client, failing the first `failures` upserts with a 503."""
+
+    def __init__(self, client, failures: int = 0) -> None:
+        self._client = client
+        self.failures = failures
+        self.upserts: list[tuple[int, bool]] = []
+
+    def upsert(self, collection_name, points, wait=True):
+        if self.failures:
+            self.failures -= 1
+            raise exceptions.UnexpectedResponse(503, "Service Unavailable", b"", None)
+
+        self.upserts.append((len(points), wait))
+
+        return self._client.upsert(collection_name=collection_name, points=points, wait=wait)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def _documents(count: int) -> list[_BulkDocument]:
+    return [_BulkDocument(content=f"doc {i}", embedding=[float(i), 1.0, 0.0, 0.0]) for i in range(count)]
+
+
+def _create_collection(client) -> None:
+    client.create_collection(
+        collection_name=_BulkDocument.get_collection_name(),
+        vectors_config=VectorParams(size=4, distance=Distance.COSINE),
+    )
+
+
+def test_bulk_insert_splits_by_count_and_ends_with_a_barrier(qdrant_memory, monkeypatch) -> None:
+    _create_collection(qdrant_memory)
+    recorder = _RecordingConnection(qdrant_memory)
+    monkeypatch.setattr(vector, "connection", recorder)
+
+    assert _BulkDocument.bulk_insert(_documents(10), batch_size=4, max_workers=2)
+
+    assert sorted(recorder.upserts[:-1]) == [(2, False), (4, False), (4, False)]
+    assert recorder.upserts[-1] == (2, True)
+    assert qdrant_memory.count(_BulkDocument.get_collection_name()).count == 10
+
+
+def test_bulk_insert_splits_by_request_size(qdrant_memory, monkeypatch) -> None:
+    _create_collection(qdrant_memory)
+    recorder = _RecordingConnection(qdrant_memory)
+    monkeypatch.setattr(vector, "connection", recorder)
+
+    point_size = vector._estimate_point_size(_documents(1)[0].to_point())
+    assert _BulkDocument.bulk_insert(_documents(6), batch_size=100, max_batch_bytes=2 * point_size + 1)
+
+    assert [size for size, wait in recorder.upserts if not wait] == [2, 2, 2]
+
+
+def test_bulk_insert_retries_transient_failures(qdrant_memory, monkeypatch) -> None:
+    _create_collection(qdrant_memory)
+    recorder = _RecordingConnection(qdrant_memory, failures=2)
+    monkeypatch.setattr(vector, "connection", recorder)
+    monkeypatch.setattr(vector, "_UPSERT_BACKOFF_SECONDS", 0.0)
+
+    assert _BulkDocument.bulk_insert(_documents(3), batch_size=3, max_retries=2)
+    assert qdrant_memory.count(_BulkDocument.get_collection_name()).count == 3
+
+
+def test_bulk_insert_gives_up_after_max_retries(qdrant_memory, monkeypatch) -> None:
+    _create_collection(qdrant_memory)
+    monkeypatch.setattr(vector, "connection", _RecordingConnection(qdrant_memory, failures=5))
+    monkeypatch.setattr(vector, "_UPSERT_BACKOFF_SECONDS", 0.0)
+
+    assert not _BulkDocument.bulk_insert(_documents(3), max_retries=1)
+
+
+def test_columnar_insert_and_read_round_trip_numpy_vectors(qdrant_memory) -> None:
+    _create_collection(qdrant_memory)
+    vectors = np.random.default_rng(0).random((7, 4), dtype=np.float32)
+    payloads = [{"content": f"doc {i}"} for i in range(7)]
+
+    assert _BulkDocument.bulk_insert_vectors(vectors, payloads, batch_size=3)
+
+    batch, next_offset = _BulkDocument.bulk_find_vectors(limit=10)
+    assert next_offset is None
+    assert batch.vectors.dtype == np.float32
+    assert batch.vectors.shape == (7, 4)
+
+    rows = {payload["content"]: row for payload, row in zip(batch.payloads, batch.vectors, strict=True)}
+    for i, expected in enumerate(vectors):
+        np.testing.assert_allclose(rows[f"doc {i}"] / np.linalg.norm(rows[f"doc {i}"]), expected / np.linalg.norm(expected), rtol=1e-5)
+
+
+def test_to_point_serialises_uuid_fields_without_the_embedding() -> None:
+    document = _BulkDocument(content="doc", embedding=[1.0, 0.0, 0.0, 0.0])
+    chunk = ArticleChunk(
+        content="text",
+        platform="medium",
+        document_id=uuid.uuid4(),
+        author_id=uuid.uuid4(),
+        author_full_name="A B",
+        link="https://medium.com/a",
+    )
+
+    assert document.to_point().vector == [1.0, 0.0, 0.0, 0.0]
+    assert "embedding" not in document.to_point().payload
+
+    payload = chunk.to_point().payload
+    assert payload["document_id"] == str(chunk.document_id)
+    assert payload["author_id"] == str(chunk.author_id)
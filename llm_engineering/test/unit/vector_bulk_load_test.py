@@ -0,0 +1,65 @@
+import pytest
+
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.exceptions import ImproperlyConfigured
+from llm_engineering.domain.types import DataCategory
+
+
+class _LoadedDocument(VectorBaseDocument):
+    content: str
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "test_loaded_documents"
+        category = DataCategory.POSTS
+        use_vector_index = True
+
+
+def _documents(count: int, offset: int = 0) -> list[_LoadedDocument]:
+    return [
+        _LoadedDocument(content=f"doc {i}", embedding=[float(i), 1.0, 0.0, 0.0]) for i in range(offset, offset + count)
+    ]
+
+
+def test_bulk_load_disables_then_restores_indexing(recorded_connection, embedder) -> None:
+    with _LoadedDocument.bulk_load() as load:
+        assert load.bulk_insert(_documents(10))
+
+    updates = recorded_connection.calls["update_collection"]
+    assert [update["optimizers_config"].indexing_threshold for update in updates] == [0, 20_000]
+    assert load.report.collection_name == "test_loaded_documents" and load.report.alias is None
+    assert load.report.num_points == 10
+    assert load.report.total_seconds >= load.report.upload_seconds
+
+
+def test_shadow_bulk_load_swaps_the_alias(recorded_connection, embedder) -> None:
+    with _LoadedDocument.bulk_load(shadow=True) as first:
+        first.bulk_insert(_documents(5))
+    with _LoadedDocument.bulk_load(shadow=True) as second:
+        second.bulk_insert(_documents(8, offset=100))
+
+    aliases = {a.alias_name: a.collection_name for a in recorded_connection.get_aliases().aliases}
+    assert aliases == {"test_loaded_documents": second.collection_name}
+    assert not recorded_connection.collection_exists(first.collection_name)
+    assert {d.content for d in _LoadedDocument.bulk_find(limit=20)[0]} == {f"doc {i}" for i in range(100, 108)}
+
+
+def test_failed_shadow_bulk_load_keeps_the_live_collection(recorded_connection, embedder) -> None:
+    with _LoadedDocument.bulk_load(shadow=True) as live:
+        live.bulk_insert(_documents(3))
+
+    with pytest.raises(RuntimeError):
+        with _LoadedDocument.bulk_load(shadow=True) as failed:
+            failed.bulk_insert(_documents(4))
+            raise RuntimeError("embedding failed")
+
+    assert not recorded_connection.collection_exists(failed.collection_name)
+    assert [a.collection_name for a in recorded_connection.get_aliases().aliases] == [live.collection_name]
+
+
+def test_shadow_bulk_load_requires_an_alias(recorded_connection, embedder) -> None:
+    _LoadedDocument.create_collection()
+
+    with pytest.raises(ImproperlyConfigured):
+        with _LoadedDocument.bulk_load(shadow=True):
+            pass
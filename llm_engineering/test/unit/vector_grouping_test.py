@@ -0,0 +1,68 @@
+import uuid
+from types import SimpleNamespace
+
+from llm_engineering.domain.base import vector
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.chunks import ArticleChunk, PostChunk
+from llm_engineering.domain.embedded_chunks import EmbeddedArticleChunk, EmbeddedPostChunk, EmbeddedRepositoryChunk
+from llm_engineering.domain.types import DataCategory
+
+AUTHOR_ID = uuid.uuid4()
+
+
+def _fields(i: int) -> dict:
+    return {
+        "content": f"chunk {i}",
+        "platform": "medium",
+        "document_id": uuid.uuid4(),
+        "author_id": AUTHOR_ID,
+        "author_full_name": "Jane Doe",
+    }
+
+
+def _embedded(i: int) -> list[VectorBaseDocument]:
+    vector_ = [float(i), 1.0, 0.0, 0.0]
+
+    return [
+        EmbeddedPostChunk(**_fields(i), embedding=vector_),
+        EmbeddedArticleChunk(**_fields(i), embedding=vector_, link="https://a"),
+        EmbeddedRepositoryChunk(**_fields(i), embedding=vector_, name="repo", link="https://b"),
+    ]
+
+
+def test_grouping_by_class_and_category(monkeypatch) -> None:
+    documents = [PostChunk(**_fields(0)), ArticleChunk(**_fields(1), link="x"), *_embedded(2), PostChunk(**_fields(3))]
+    calls = []
+    original = VectorBaseDocument.get_category.__func__
+
+    def counting_get_category(cls):
+        calls.append(cls)
+
+        return original(cls)
+
+    monkeypatch.setattr(VectorBaseDocument, "get_category", classmethod(counting_get_category))
+
+    by_class = VectorBaseDocument.group_by_class(documents)
+    by_category = VectorBaseDocument.group_by_category(documents)
+
+    assert list(by_class) == [PostChunk, ArticleChunk, EmbeddedPostChunk, EmbeddedArticleChunk, EmbeddedRepositoryChunk]
+    assert by_class[PostChunk] == [documents[0], documents[5]]
+    assert VectorBaseDocument.grou_by_class(documents) == by_class
+    assert by_category == {
+        DataCategory.POSTS: [documents[0], documents[5], documents[2]],
+        DataCategory.ARTICLES: [documents[1], documents[3]],
+        DataCategory.REPOSITORIES: [documents[4]],
+    }
+    assert len(calls) == len(by_class)
+
+
+def test_bulk_insert_mixed_routes_every_class_to_its_collection(vector_backend, monkeypatch) -> None:
+    monkeypatch.setattr(vector, "EmbeddingModelSingleton", lambda: SimpleNamespace(embedding_size=4))
+    documents = [document for i in range(5) for document in _embedded(i)]
+
+    assert VectorBaseDocument.bulk_insert_mixed(documents, batch_size=2)
+
+    for document_class in (EmbeddedPostChunk, EmbeddedArticleChunk, EmbeddedRepositoryChunk):
+        stored = {document.id for document in document_class.iter_all()}
+        assert stored == {document.id for document in documents if type(document) is document_class}
+    assert VectorBaseDocument.bulk_insert_mixed([])
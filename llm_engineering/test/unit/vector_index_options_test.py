@@ -0,0 +1,56 @@
+import pytest
+from qdrant_client.http.models import ScalarType
+
+from llm_engineering.domain.base import vector
+from llm_engineering.domain.base.vector import VectorBaseDocument, VectorIndexOptions, VectorQuery
+from llm_engineering.domain.embedded_chunks import EmbeddedArticleChunk
+from llm_engineering.domain.exceptions import ImproperlyConfigured
+from llm_engineering.domain.types import DataCategory
+
+
+class _TunedDocument(VectorBaseDocument):
+    content: str
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "test_tuned_documents"
+        category = DataCategory.POSTS
+        use_vector_index = True
+        hnsw_m = 8
+        search_ef = 32
+        quantization = "int8"
+        on_disk_vectors = True
+        indexing_threshold = 0
+
+
+def test_create_collection_applies_index_options(recorded_connection, embedder) -> None:
+    assert _TunedDocument.create_collection()
+
+    kwargs = recorded_connection.calls["create_collection"][-1]
+    assert kwargs["vectors_config"].on_disk is True
+    assert kwargs["hnsw_config"].m == 8 and kwargs["hnsw_config"].ef_construct is None
+    assert kwargs["quantization_config"].scalar.type == ScalarType.INT8
+    assert kwargs["optimizers_config"].indexing_threshold == 0
+
+
+def test_search_uses_ef_and_rescoring(recorded_connection, embedder) -> None:
+    _TunedDocument.create_collection()
+    _TunedDocument.bulk_insert(
+        [_TunedDocument(content=f"doc {i}", embedding=[float(i), 1.0, 0.0, 0.0]) for i in range(5)]
+    )
+
+    assert len(_TunedDocument.search([1.0, 0.5, 0.0, 0.0], limit=3)) == 3
+    search_params = recorded_connection.calls["search"][-1]["search_params"]
+    assert search_params.hnsw_ef == 32 and search_params.quantization.rescore is True
+
+    _TunedDocument.search_batch([VectorQuery([1.0, 0.5, 0.0, 0.0], limit=2)])
+    assert recorded_connection.calls["query_batch_points"][-1]["requests"][0].params == search_params
+
+
+def test_index_options_defaults_and_validation() -> None:
+    assert VectorIndexOptions().search_params is None
+    assert EmbeddedArticleChunk.get_index_options().on_disk_vectors is True
+    assert "content" in EmbeddedArticleChunk.get_payload_indexes()
+
+    with pytest.raises(ImproperlyConfigured):
+        vector._index_config(VectorIndexOptions(quantization="binary"))
@@ -0,0 +1,127 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from qdrant_client.http.models import Distance, PayloadIndexInfo, PayloadSchemaType, VectorParams
+
+from llm_engineering.domain.base import vector
+from llm_engineering.domain.base.vector import VectorBaseDocument, VectorQuery
+from llm_engineering.domain.types import DataCategory
+
+
+class _IndexedDocument(VectorBaseDocument):
+    content: str
+    platform: str
+    author_id: uuid.UUID
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "test_indexed_documents"
+        category = DataCategory.ARTICLES
+        use_vector_index = True
+        payload_indexes = {
+            "author_id": PayloadSchemaType.UUID,
+            "platform": PayloadSchemaType.KEYWORD,
+            "content": PayloadSchemaType.TEXT,
+        }
+
+
+class _IndexRecordingConnection:
+    """The in-process client ignores payload indexes, so their state is tracked here instead."""
+
+    def __init__(self, client, payload_schema: dict[str, PayloadSchemaType] | None = None) -> None:
+        self._client = client
+        self.payload_schema = dict(payload_schema or {})
+        self.calls: list[tuple[str, str]] = []
+
+    def get_collection(self, collection_name):
+        info = self._client.get_collection(collection_name=collection_name)
+        info.payload_schema = {
+            field: PayloadIndexInfo(data_type=data_type, points=0) for field, data_type in self.payload_schema.items()
+        }
+
+        return info
+
+    def create_payload_index(self, collection_name, field_name, field_schema, wait=True):
+        self.calls.append(("create", field_name))
+        self.payload_schema[field_name] = field_schema
+
+    def delete_payload_index(self, collection_name, field_name, wait=True):
+        self.calls.append(("delete", field_name))
+        del self.payload_schema[field_name]
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+@pytest.fixture
+def index_recorder(qdrant_memory, monkeypatch) -> _IndexRecordingConnection:
+    qdrant_memory.create_collection(
+        collection_name=_IndexedDocument.get_collection_name(),
+        vectors_config=VectorParams(size=2, distance=Distance.COSINE),
+    )
+    recorder = _IndexRecordingConnection(
+        qdrant_memory, payload_schema={"author_id": PayloadSchemaType.KEYWORD, "platform": PayloadSchemaType.KEYWORD}
+    )
+    monkeypatch.setattr(vector, "connection", recorder)
+
+    return recorder
+
+
+def test_migrate_payload_indexes_is_idempotent(index_recorder) -> None:
+    assert _IndexedDocument.migrate_payload_indexes() == ["author_id", "content"]
+    assert index_recorder.calls == [("delete", "author_id"), ("create", "author_id"), ("create", "content")]
+
+    assert _IndexedDocument.migrate_payload_indexes() == []
+    assert index_recorder.payload_schema == _IndexedDocument.get_payload_indexes()
+
+
+def test_inserting_into_an_existing_named_collection_migrates_that_collection(index_recorder, monkeypatch) -> None:
+    monkeypatch.setattr(vector, "_migrated_collections", set())
+    index_recorder.delete_collection(_IndexedDocument.get_collection_name())
+    index_recorder.create_collection(
+        collection_name="custom_indexed_documents", vectors_config=VectorParams(size=2, distance=Distance.COSINE)
+    )
+    document = _IndexedDocument(content="doc", platform="medium", author_id=uuid.uuid4(), embedding=[1.0, 1.0])
+
+    assert _IndexedDocument.bulk_insert([document], collection_name="custom_indexed_documents")
+
+    assert index_recorder.count(collection_name="custom_indexed_documents").count == 1
+    assert vector._migrated_collections == {"custom_indexed_documents"}
+
+
+def test_new_collection_is_created_with_its_payload_indexes(index_recorder, monkeypatch) -> None:
+    index_recorder.delete_collection(_IndexedDocument.get_collection_name())
+    index_recorder.payload_schema, index_recorder.calls = {}, []
+    monkeypatch.setattr(vector, "EmbeddingModelSingleton", lambda: SimpleNamespace(embedding_size=2))
+
+    assert _IndexedDocument.create_collection()
+
+    assert sorted(field for _, field in index_recorder.calls) == ["author_id", "content", "platform"]
+
+
+def test_filter_builder_checks_fields_and_filters_search(index_recorder) -> None:
+    author_id, other_author_id = uuid.uuid4(), uuid.uuid4()
+    documents = [
+        _IndexedDocument(
+            content=f"doc {i}",
+            platform=("medium", "linkedin")[i % 2],
+            author_id=(author_id, other_author_id)[i % 3 == 0],
+            embedding=[float(i), 1.0],
+        )
+        for i in range(12)
+    ]
+    assert _IndexedDocument.bulk_insert(documents)
+
+    with pytest.raises(ValueError, match="no field 'author'"):
+        _IndexedDocument.filter(author=author_id)
+
+    query_filter = _IndexedDocument.filter(author_id=author_id).exclude(platform="linkedin")
+    expected = {d.id for d in documents if d.author_id == author_id and d.platform == "medium"}
+
+    assert {d.id for d in _IndexedDocument.search([1.0, 1.0], limit=12, query_filter=query_filter)} == expected
+    assert {d.id for d in _IndexedDocument.bulk_find(limit=12, scroll_filter=query_filter)[0]} == expected
+    assert {d.id for d in _IndexedDocument.search_batch([VectorQuery([1.0, 1.0], 12, query_filter)])[0]} == expected
+
+    any_platform = _IndexedDocument.filter(platform=["medium", "linkedin"], author_id=other_author_id)
+    assert len(list(_IndexedDocument.iter_all(filter=any_platform))) == 4
@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+from qdrant_client.models import Record
+
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.chunks import PostChunk
+from llm_engineering.domain.embedded_chunks import EmbeddedChunk, EmbeddedPostChunk
+from llm_engineering.domain.exceptions import ImproperlyConfigured
+from llm_engineering.domain.types import DataCategory
+
+
+def test_collection_names_and_categories_resolve_to_their_classes() -> None:
+    assert VectorBaseDocument.collection_name_to_class("embedded_posts") is EmbeddedPostChunk
+    assert EmbeddedChunk.collection_name_to_class("embedded_posts") is EmbeddedPostChunk
+    with pytest.raises(ValueError):
+        PostChunk.collection_name_to_class("embedded_posts")
+    with pytest.raises(ValueError):
+        VectorBaseDocument.collection_name_to_class("missing")
+
+    assert {EmbeddedPostChunk, PostChunk} <= set(VectorBaseDocument.category_to_classes(DataCategory.POSTS))
+    assert EmbeddedChunk.category_to_classes(DataCategory.POSTS) == [EmbeddedPostChunk]
+
+
+def test_duplicate_collection_names_are_rejected() -> None:
+    with pytest.raises(ImproperlyConfigured, match="embedded_posts"):
+
+        class _Clash(VectorBaseDocument):
+            class Config:
+                name = "embedded_posts"
+
+    assert VectorBaseDocument.collection_name_to_class("embedded_posts") is EmbeddedPostChunk
+
+
+def test_redefining_the_same_class_replaces_its_registration() -> None:
+    # What re-importing a module does: a new class object with the same qualified name.
+    first = type(
+        "_Reloaded",
+        (VectorBaseDocument,),
+        {"__module__": __name__, "__qualname__": "_Reloaded", "Config": _config("test_reloaded_documents")},
+    )
+    second = type(
+        "_Reloaded",
+        (VectorBaseDocument,),
+        {"__module__": __name__, "__qualname__": "_Reloaded", "Config": _config("test_reloaded_documents")},
+    )
+
+    assert first is not second
+    assert VectorBaseDocument.collection_name_to_class("test_reloaded_documents") is second
+    assert VectorBaseDocument.category_to_classes(DataCategory.REPOSITORIES).count(second) == 1
+    assert first not in VectorBaseDocument.category_to_classes(DataCategory.REPOSITORIES)
+
+
+def test_embedding_field_is_resolved_once_per_class(monkeypatch) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("_has_class_attribute should not run per record")
+
+    monkeypatch.setattr(VectorBaseDocument, "_has_class_attribute", classmethod(fail))
+    record = Record(
+        id=str(uuid.uuid4()),
+        payload={
+            "content": "c",
+            "platform": "p",
+            "document_id": str(uuid.uuid4()),
+            "author_id": str(uuid.uuid4()),
+            "author_full_name": "a",
+        },
+        vector=[1.0, 0.0],
+    )
+
+    assert EmbeddedPostChunk.from_record(record).embedding == [1.0, 0.0]
+    assert PostChunk.from_record(record).content == "c"
+    assert EmbeddedPostChunk._has_embedding and not PostChunk._has_embedding
+
+
+def _config(name: str) -> type:
+    return type("Config", (), {"__qualname__": "_Reloaded.Config", "name": name, "category": DataCategory.REPOSITORIES})
@@ -0,0 +1,56 @@
+import pytest
+from qdrant_client.http.models import Distance, FieldCondition, Filter, MatchValue, VectorParams
+
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.types import DataCategory
+
+
+class _ScrollDocument(VectorBaseDocument):
+    content: str
+    platform: str
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "test_scroll_documents"
+        category = DataCategory.ARTICLES
+        use_vector_index = True
+
+
+@pytest.fixture
+def scroll_collection(qdrant_memory):
+    qdrant_memory.create_collection(
+        collection_name=_ScrollDocument.get_collection_name(),
+        vectors_config=VectorParams(size=2, distance=Distance.DOT),
+    )
+    documents = [
+        _ScrollDocument(content=f"doc {i}", platform="medium" if i % 2 else "github", embedding=[float(i), 1.0])
+        for i in range(25)
+    ]
+    assert _ScrollDocument.bulk_insert(documents)
+
+    return documents
+
+
+def test_iter_all_walks_every_page(scroll_collection) -> None:
+    documents = list(_ScrollDocument.iter_all(batch_size=10))
+
+    assert sorted(documents, key=lambda d: str(d.id)) == sorted(scroll_collection, key=lambda d: str(d.id))
+    assert all(document.embedding is None for document in documents)
+
+
+def test_iter_all_applies_filter_and_fetches_vectors(scroll_collection) -> None:
+    only_medium = Filter(must=[FieldCondition(key="platform", match=MatchValue(value="medium"))])
+
+    documents = list(_ScrollDocument.iter_all(batch_size=4, filter=only_medium, with_vectors=True))
+
+    assert len(documents) == 12
+    assert all(document.platform == "medium" for document in documents)
+    assert all(document.embedding is not None for document in documents)
+
+
+def test_iter_all_selects_payload_fields(scroll_collection) -> None:
+    documents = list(_ScrollDocument.iter_all(batch_size=7, payload_fields=["content"]))
+
+    assert len(documents) == 25
+    assert all(document.content.startswith("doc ") for document in documents)
+    assert all("platform" not in document.model_fields_set for document in documents)
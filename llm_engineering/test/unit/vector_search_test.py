@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from qdrant_client.http.models import Distance, FieldCondition, Filter, MatchValue, VectorParams
+
+from llm_engineering.domain.base.vector import VectorBaseDocument, VectorQuery
+from llm_engineering.domain.types import DataCategory
+
+
+class _PostVector(VectorBaseDocument):
+    content: str
+    platform: str
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "test_search_posts"
+        category = DataCategory.POSTS
+        use_vector_index = True
+
+
+class _ArticleVector(VectorBaseDocument):
+    content: str
+    platform: str
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "test_search_articles"
+        category = DataCategory.ARTICLES
+        use_vector_index = True
+
+
+@pytest.fixture
+def search_collections(qdrant_memory):
+    rng = np.random.default_rng(42)
+    for document_class in (_PostVector, _ArticleVector):
+        qdrant_memory.create_collection(
+            collection_name=document_class.get_collection_name(),
+            vectors_config=VectorParams(size=8, distance=Distance.COSINE),
+        )
+        document_class.bulk_insert(
+            [
+                document_class(content=f"doc {i}", platform=("a", "b")[i % 2], embedding=rng.random(8).tolist())
+                for i in range(40)
+            ]
+        )
+
+    return rng
+
+
+def test_search_batch_matches_sequential_searches(search_collections) -> None:
+    only_a = Filter(must=[FieldCondition(key="platform", match=MatchValue(value="a"))])
+    queries = [
+        VectorQuery(vector=search_collections.random(8, dtype=np.float32), limit=3),
+        VectorQuery(vector=search_collections.random(8).tolist(), limit=5, filter=only_a),
+    ]
+
+    batched = _PostVector.search_batch(queries)
+    sequential = [
+        _PostVector.search(np.asarray(query.vector).tolist(), limit=query.limit, query_filter=query.filter)
+        for query in queries
+    ]
+
+    assert [[d.id for d in result] for result in batched] == [[d.id for d in result] for result in sequential]
+    assert [len(result) for result in batched] == [3, 5]
+    assert all(document.platform == "a" for document in batched[1])
+
+
+def test_search_collections_fans_out_per_collection(search_collections) -> None:
+    query = VectorQuery(vector=search_collections.random(8).tolist(), limit=2)
+
+    results = VectorBaseDocument.search_collections({_PostVector: [query], _ArticleVector: [query, query]})
+
+    assert [len(r) for r in results[_PostVector]] == [2]
+    assert [len(r) for r in results[_ArticleVector]] == [2, 2]
+    assert all(isinstance(d, _ArticleVector) for d in results[_ArticleVector][0])
@@ -1,17 +1,32 @@
-"""crawl_links and get_or_create_user are defined in steps/etl.py
+"""stream_etl and get_or_create_users are defined in steps/etl.
 They are imported here to be used in the pipeline.
 
 1)
-crawl_links: A step that crawls web links to extract data. |>*
- مرحله‌ای که پیوندهای وب را برای استخراج داده‌ها بررسی می‌کند.
+get_or_create_users: A step that retrieves the existing users and creates
+the missing ones, all in one read and one write. |>*
+مرحله‌ای که کاربران موجود را بازیابی می‌کند و کاربران ناموجود را
+می‌سازد، همه با یک خواندن و یک نوشتن.
 
 2)
-get_or_create_user: A step that retrieves 
-an existing user or creates a new one if not found. |>*
-مرحله‌ای که یک کاربر موجود را بازیابی می‌کند یا 
-در صورت عدم وجود، یک کاربر جدید ایجاد می‌کند
+stream_etl: A step that crawls the users' links, taking turns between users,
+and streams the crawled documents through cleaning, chunking, embedding and
+loading into Qdrant. |>*
+مرحله‌ای که پیوندهای کاربران را به نوبت می‌خزد و اسناد به‌دست‌آمده را به‌صورت
+جریانی پاک‌سازی، قطعه‌بندی، بردارسازی و در کیودرانت بارگذاری می‌کند.
+
+A run takes a list of authors, `{"user_full_name": ..., "links": [...]}`, so that
+hundreds of authors are onboarded in one run rather than one run each.
 
 """
 
 from zenml import pipeline
-from steps.etl import crawl_links, get_or_create_user
+
+from steps.etl import get_or_create_users, stream_etl
+
+
+@pipeline
+def digital_data_etl(authors: list[dict]) -> str:
+    users = get_or_create_users([author["user_full_name"] for author in authors])
+    last_step = stream_etl(users=users, links=[author["links"] for author in authors])
+
+    return last_step.invocation_id
@@ -0,0 +1,15 @@
+"""embed_changed_documents is defined in steps/feature_engineering.
+
+It keeps the Qdrant collections in sync with MongoDB, so scheduling this pipeline
+nightly costs in proportion to the documents crawled or removed since the last run.
+این خط لوله فقط اسناد جدید، تغییریافته یا حذف‌شده از آخرین اجرا را پردازش می‌کند.
+"""
+
+from zenml import pipeline
+
+from steps.feature_engineering import embed_changed_documents
+
+
+@pipeline
+def feature_engineering() -> None:
+    embed_changed_documents()
@@ -1,22 +1,62 @@
+"""
+Run the pipelines from the command line.
+
+    python run_pipeline.py --authors authors.json    # the digital-data ETL of many authors
+    python run_pipeline.py                           # the user test pipeline
+
+`authors.json` lists the authors and their links, all onboarded in one run:
+    [{"user_full_name": "Ali Rezaei", "links": ["https://medium.com/@ali/..."]}, ...]
+
+While the pipeline runs, its metrics are served in Prometheus format on
+`http://127.0.0.1:<port>/metrics` with `--metrics-port` (or
+`INSTRUMENTATION_PROMETHEUS_PORT`), and written as OTLP/JSON to
+`INSTRUMENTATION_OTLP_PATH` once it ends.
+
+اجرای خط لوله‌ها از خط فرمان؛ با `--authors` همه‌ی نویسندگان فهرست در یک اجرا
+خزیده و بارگذاری می‌شوند.
+"""
+import argparse
+import json
+
 from zenml import pipeline
 from loguru import logger
 
-from steps.etl.get_or_create_user import get_or_create_user
+from llm_engineering.infrastructure import instrumentation
+from llm_engineering.settings import settings
+from pipelines.digital_data_etl import digital_data_etl
+from steps.etl.get_or_create_users import get_or_create_users
 
 
 @pipeline
-def user_test_pipeline(user_name: str):
-    """یک پایپ‌لاین ساده برای تست گام get_or_create_user."""
-    logger.info(f"Pipeline started for user: {user_name}")
-    
-    get_or_create_user(user_full_name=user_name)
-    
+def user_test_pipeline(user_names: list[str]):
+    """یک پایپ‌لاین ساده برای تست گام get_or_create_users."""
+    logger.info(f"Pipeline started for {len(user_names)} users")
+
+    get_or_create_users(user_full_names=user_names)
+
     logger.info("Pipeline finished successfully.")
 
 
 if __name__ == "__main__":
-    logger.info("Running test pipeline...")
-    
-    user_test_pipeline(user_name="Ali Rezaei (Test Run)")
-    
-    logger.info("Pipeline run finished. Check ZenML dashboard.")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--authors", help="JSON file of the authors and their links to crawl.")
+    parser.add_argument("--metrics-port", type=int, help="Serve the metrics of the run on this local port.")
+    args = parser.parse_args()
+
+    instrumentation.start_metrics_server(args.metrics_port)
+
+    if args.authors:
+        with open(args.authors, encoding="utf-8") as f:
+            authors = json.load(f)
+        logger.info(f"Running the digital data ETL for {len(authors)} authors...")
+
+        digital_data_etl(authors=authors)
+    else:
+        logger.info("Running test pipeline...")
+
+        user_test_pipeline(user_names=["Ali Rezaei (Test Run)", "Sara Ahmadi (Test Run)"])
+
+    if settings.INSTRUMENTATION_OTLP_PATH:
+        instrumentation.write_otlp(settings.INSTRUMENTATION_OTLP_PATH)
+
+    logger.info("Pipeline run finished. Check ZenML dashboard.")
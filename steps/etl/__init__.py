@@ -1,3 +1,6 @@
+from .crawl_links import crawl_links
 from .get_or_create_user import get_or_create_user
+from .get_or_create_users import get_or_create_users
+from .stream_etl import stream_etl
 
-__all__ = ["get_or_create_user"]
\ No newline at end of file
+__all__ = ["crawl_links", "get_or_create_user", "get_or_create_users", "stream_etl"]
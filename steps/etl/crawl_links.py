@@ -5,7 +5,9 @@ It is used to extract components such as the scheme, netloc, path, etc.
 این کتابخانه در پایتون برای تجزیه و تحلیل و دستکاری یو ار ال ها استفاده می‌شود
 تا بتوانید اجزای مختلف یک یو ار ال را استخراج کنید
 """
-from asyncore import dispatcher
+import os
+import socket
+import time
 from urllib.parse import urlparse
 """
 Importing logger for logging purposes.*|>
@@ -17,7 +19,7 @@ ETL means Extract, Transform, Load, which is a common process in data engineerin
 همچنین قابلیت‌های پیشرفته‌ای مانند قالب‌بندی انعطاف‌پذیر،
 مدیریت سطح لاگینگ، و خروجی به چندین مقصد را فراهم می‌کند.
 """
-from loguru import Logger, logger
+from loguru import logger
 from tqdm import tqdm
 """
 For type annotations.*|>
@@ -52,6 +54,9 @@ LLM Twin می‌خواد از چندین منبع
 لینک رو بده من، خودم تشخیص می‌دم از چه نوعیه و با کدوم crawler باید خونده بشه.
 """
 from llm_engineering.application.crawlers.dispatcher import CrawlerDispatcher
+from llm_engineering.application.crawlers.page_profile import page_load_stats
+from llm_engineering.application.crawlers.resilience import circuit_breakers
+from llm_engineering.application.streaming.etl import crawl_claimed_link
 """
 بوزر داکیومنت یک مدل داده برای کاربر است که در پایگاه داده (مانند مونگو) ذخیره می‌شود.
 در ساختار تمیز نرم‌افزار، بخش «هسته منطقی» جایی است که موجودیت‌های اصلی سیستم، مانند کاربر، تعریف می‌شوند.
@@ -65,6 +70,8 @@ from llm_engineering.application.crawlers.dispatcher import CrawlerDispatcher
 «من در حال جمع‌آوری داده‌های مربوط به این کاربر خاص هستم؛ لطفاً داده‌های استخراج‌شده را به همان کاربر متصل کن.»    
 """
 from llm_engineering.domain.documents import UserDocument
+from llm_engineering.infrastructure import instrumentation
+from llm_engineering.infrastructure.db.crawl_frontier import CrawlFrontier
 
 """
 یعنی تو به این گام از خط لوله می‌گی:
@@ -75,5 +82,64 @@ from llm_engineering.domain.documents import UserDocument
 #crawl_links(user=mona, links=["https://medium.com/@mona/article1", "https://github.com/mona/project1"])
 @step
 def crawl_links(user: UserDocument, links: list[str]) -> Annotated[list[str], "crawled_links"]:
+    """
+    Crawl the user's links through the durable crawl frontier.
 
-    return[]
\ No newline at end of file
+    Links done by an earlier run are skipped, links it left in flight are retried,
+    and failures are retried with backoff until `settings.CRAWL_MAX_ATTEMPTS`.
+    Each link is crawled within `settings.CRAWL_LINK_DEADLINE_S`; links to a
+    domain whose circuit is open are postponed rather than failed.
+    """
+    dispatcher = CrawlerDispatcher.build().register_linkedin().register_medium().register_github()
+    frontier = CrawlFrontier()
+    user_id = str(user.id)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    new_links = frontier.add(links, user_id=user_id)
+    resumed = frontier.requeue_in_flight(user_id=user_id)
+    logger.info(f"Crawling {len(links)} link(s): {new_links} new, {resumed} resumed from an interrupted run.")
+
+    crawled_links = []
+    metadata = {}
+    with tqdm(total=len(links)) as progress:
+        while (wait := frontier.seconds_until_eligible(user_id=user_id)) is not None:
+            if wait > 0:
+                time.sleep(wait)
+            for claimed in frontier.claim(worker_id, user_id=user_id):
+                successful, crawled_domain = _crawl_link(dispatcher, frontier, claimed.link, user, worker_id)
+                metadata = _add_to_metadata(metadata, crawled_domain, successful)
+                if successful:
+                    crawled_links.append(claimed.link)
+                    progress.update(1)
+
+    frontier.close()
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(
+        output_name="crawled_links",
+        metadata={
+            **metadata,
+            "frontier": frontier.stats(user_id=user_id),
+            "circuits": {domain: str(state) for domain, state in circuit_breakers.states().items()},
+            "page_loads": page_load_stats.as_dict(),
+            "instrumentation": instrumentation.summary(),
+        },
+    )
+    logger.info(f"Successfully crawled {len(crawled_links)} / {len(links)} links.")
+
+    return crawled_links
+
+
+def _crawl_link(
+    dispatcher: CrawlerDispatcher, frontier: CrawlFrontier, link: str, user: UserDocument, worker_id: str
+) -> tuple[bool, str]:
+    return crawl_claimed_link(dispatcher, frontier, link, user, worker_id), urlparse(link).netloc
+
+
+def _add_to_metadata(metadata: dict, domain: str, successful: bool) -> dict:
+    if domain not in metadata:
+        metadata[domain] = {}
+    metadata[domain]["successful"] = metadata[domain].get("successful", 0) + successful
+    metadata[domain]["attempts"] = metadata[domain].get("attempts", 0) + 1
+
+    return metadata
\ No newline at end of file
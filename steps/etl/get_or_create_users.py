@@ -0,0 +1,43 @@
+from loguru import logger
+from typing_extensions import Annotated
+from zenml import step, get_step_context
+
+from llm_engineering.domain.documents import UserDocument
+from llm_engineering.application import utils
+
+@step
+def get_or_create_users(user_full_names: list[str]) -> Annotated[list[UserDocument], "users"]:
+    """Get or create the user documents of many users at once, in one read and one write.
+
+    Args:
+        user_full_names (list[str]): The full names of the users.
+
+    Returns:
+        list[UserDocument]: The user documents, in the order of `user_full_names`.
+    """
+    logger.info(f"Getting or creating {len(user_full_names)} users")
+
+    filters = []
+    for user_full_name in user_full_names:
+        first_name, last_name = utils.split_user_full_name(user_full_name)
+        filters.append({"first_name": first_name, "last_name": last_name})
+
+    users = UserDocument.bulk_get_or_create(filters)
+
+    step_context = get_step_context() # zenml step context
+    step_context.add_output_metadata(
+        output_name="users",
+        metadata=_get_metadata(user_full_names, users)
+    )
+
+    return users
+
+def _get_metadata(user_full_names: list[str], users: list[UserDocument]) -> dict:
+    return {
+        "query": {
+            "user_full_names": user_full_names,
+        },
+        "retrived": {
+            user_full_name: str(user.id) for user_full_name, user in zip(user_full_names, users)
+        },
+    }
@@ -0,0 +1,51 @@
+from loguru import logger
+from typing_extensions import Annotated
+from zenml import get_step_context, step
+
+from llm_engineering.application.crawlers.page_profile import page_load_stats
+from llm_engineering.application.crawlers.resilience import circuit_breakers
+from llm_engineering.application.streaming import StreamingETL
+from llm_engineering.domain.documents import UserDocument
+from llm_engineering.infrastructure import instrumentation
+
+
+@step
+def stream_etl(users: list[UserDocument], links: list[list[str]]) -> Annotated[list[str], "crawled_links"]:
+    """Crawl the users' links and chunk, embed and load their documents, all stages streaming at once.
+
+    The links of all the users are crawled in one run, taking turns between users.
+
+    Args:
+        users (list[UserDocument]): The authors of the links.
+        links (list[list[str]]): The links to crawl of each user, in the order of `users`.
+
+    Returns:
+        list[str]: The links crawled successfully.
+    """
+    if len(users) != len(links):
+        raise ValueError(f"Got links for {len(links)} users, expected {len(users)}.")
+
+    report = StreamingETL().run_many(list(zip(users, links)))
+    total_links = sum(len(user_links) for user_links in links)
+    logger.info(
+        f"Loaded {report.chunks} chunks from {len(report.crawled_links)} / {total_links} links of {len(users)} users."
+    )
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(
+        output_name="crawled_links",
+        metadata={
+            "documents": report.documents,
+            "chunks": report.chunks,
+            "failed_links": report.failed_links,
+            "elapsed_s": round(report.elapsed_s, 3),
+            "stages": report.stages,
+            "frontier": report.frontier,
+            "users": {user_id: user_report.as_dict() for user_id, user_report in report.users.items()},
+            "circuits": {domain: str(state) for domain, state in circuit_breakers.states().items()},
+            "page_loads": page_load_stats.as_dict(),
+            "instrumentation": instrumentation.summary(),
+        },
+    )
+
+    return report.crawled_links
@@ -0,0 +1,3 @@
+from .embed_changed_documents import embed_changed_documents
+
+__all__ = ["embed_changed_documents"]
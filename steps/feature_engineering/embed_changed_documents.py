@@ -0,0 +1,38 @@
+from dataclasses import asdict
+
+from loguru import logger
+from typing_extensions import Annotated
+from zenml import get_step_context, step
+
+from llm_engineering.application.preprocessing import IncrementalEmbeddingPipeline
+from llm_engineering.infrastructure import instrumentation
+
+
+@step
+def embed_changed_documents() -> Annotated[int, "upserted_chunks"]:
+    """Chunk, embed and upsert the documents written since the previous run, and drop removed ones.
+
+    Returns:
+        int: The number of chunks upserted into Qdrant.
+    """
+    reports = IncrementalEmbeddingPipeline().run()
+    upserted_chunks = sum(report.upserted_chunks for report in reports)
+    logger.info(f"Upserted {upserted_chunks} chunks across {len(reports)} collections.")
+
+    step_context = get_step_context()
+    step_context.add_output_metadata(
+        output_name="upserted_chunks",
+        metadata={**_get_metadata(reports), "instrumentation": instrumentation.summary()},
+    )
+
+    return upserted_chunks
+
+
+def _get_metadata(reports) -> dict:
+    return {
+        report.collection: {
+            **asdict(report),
+            "watermark": report.watermark.isoformat() if report.watermark else None,
+        }
+        for report in reports
+    }
@@ -0,0 +1,50 @@
+"""
+Claim throughput of the SQLite `CrawlFrontier`: workers claim links one at a time and mark them done.
+
+Usage:
+    python -m tools.benchmarks.crawl_frontier --num-links 5000 --workers 8
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from llm_engineering.infrastructure.db.crawl_frontier import CrawlFrontier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-links", type=int, default=5_000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--claim-size", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        frontier = CrawlFrontier(Path(directory) / "frontier.db")
+
+        start_time = time.perf_counter()
+        frontier.add(f"https://example.com/{i}" for i in range(args.num_links))
+        print(f"queued {args.num_links} links in {time.perf_counter() - start_time:.2f}s")
+
+        def work(worker_id: str) -> int:
+            claimed = 0
+            while batch := frontier.claim(worker_id, limit=args.claim_size):
+                for link in batch:
+                    frontier.complete(link.link, worker_id)
+                claimed += len(batch)
+
+            return claimed
+
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            claimed = sum(executor.map(work, [f"worker-{i}" for i in range(args.workers)]))
+        elapsed = time.perf_counter() - start_time
+        frontier.close()
+
+    print(f"{args.workers} workers: {claimed / elapsed:,.0f} claim+complete/s ({claimed} links in {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Rows per second for the Mongo and Qdrant (de)serialisation round trips, validated vs trusted reads.
+
+Everything runs in memory: rows are produced by `to_mongo` / `to_point` and read back
+with `from_mongo` / `from_record`, so the numbers isolate the conversion cost.
+
+Usage:
+    python -m tools.benchmarks.db_roundtrip --num-rows 20000
+"""
+
+import argparse
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable
+
+from qdrant_client.models import Record
+
+from llm_engineering.domain.documents import ArticleDocument
+from llm_engineering.domain.embedded_chunks import EmbeddedArticleChunk
+
+
+def _report(name: str, num_rows: int, run: Callable[[], object], repeats: int) -> None:
+    best = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start_time)
+    print(f"{name:<28} {num_rows / best:>12,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-rows", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    author_id = uuid.uuid4()
+    articles = [
+        ArticleDocument(
+            content={"Title": f"article {i}", "Content": "lorem ipsum " * 50},
+            platform="medium",
+            link=f"https://medium.com/{i}",
+            authorId=author_id,
+            author_full_name="Jane Doe",
+            updated_at=datetime.now(timezone.utc),
+        )
+        for i in range(args.num_rows)
+    ]
+    chunks = [
+        EmbeddedArticleChunk(
+            content="lorem ipsum " * 50,
+            embedding=[0.1] * args.dim,
+            platform="medium",
+            link=f"https://medium.com/{i}",
+            document_id=uuid.uuid4(),
+            author_id=author_id,
+            author_full_name="Jane Doe",
+            metadata={"chunk_index": i},
+        )
+        for i in range(args.num_rows)
+    ]
+
+    rows = [article.to_mongo() for article in articles]
+    points = [chunk.to_point() for chunk in chunks]
+    records = [Record(id=point.id, payload=point.payload, vector=point.vector) for point in points]
+
+    cases = (
+        ("mongo write (to_mongo)", lambda: [article.to_mongo() for article in articles]),
+        ("mongo read, validated", lambda: [ArticleDocument.from_mongo(dict(row)) for row in rows]),
+        ("mongo read, trusted", lambda: [ArticleDocument.from_mongo(dict(row), trusted=True) for row in rows]),
+        ("qdrant write (to_point)", lambda: [chunk.to_point() for chunk in chunks]),
+        ("qdrant read, validated", lambda: [EmbeddedArticleChunk.from_record(r) for r in records]),
+        ("qdrant read, trusted", lambda: [EmbeddedArticleChunk.from_record(r, trusted=True) for r in records]),
+    )
+    for name, run in cases:
+        _report(name, args.num_rows, run, args.repeats)
+
+if __name__ == "__main__":
+    main()
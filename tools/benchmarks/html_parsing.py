@@ -0,0 +1,120 @@
+"""
+Parsing time of Medium pages: the previous full `html.parser` BeautifulSoup tree
+against an lxml tree whose `<article>` alone is read (`MediumCrawler.parse`), and
+the throughput of a parsing process pool.
+
+Pages come from the response archive when `--archive` is given, otherwise from a
+generator of Medium-like pages (navigation, inline scripts and JSON state,
+recommendations and comments around the article).
+
+Usage:
+    python -m tools.benchmarks.html_parsing --pages 50 --workers 4
+    python -m tools.benchmarks.html_parsing --archive data/response_archive
+"""
+
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from llm_engineering.application.crawlers.medium import MediumCrawler
+from llm_engineering.domain.documents import UserDocument
+from llm_engineering.infrastructure.db.response_archive import ResponseArchive
+
+WORDS = "the of model data crawler vector retrieval pipeline token article embedding query latency".split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def generate_page(rng: random.Random, paragraphs: int = 60) -> str:
+    navigation = "".join(f'<li><a href="/tag/{i}" class="nav-link">{rng.choice(WORDS)}</a></li>' for i in range(80))
+    state = json.dumps({f"k{j}": _sentence(rng, 3) for j in range(200)})
+    scripts = "".join(f"<script>window.__STATE_{i}__ = {state};</script>" for i in range(10))
+    article = "".join(
+        f'<p class="pw-post-body-paragraph"><span>{_sentence(rng, 40)}</span> <a href="#">{_sentence(rng, 4)}</a></p>'
+        for _ in range(paragraphs)
+    )
+    sidebar = "".join(
+        f'<div class="recommendation"><img src="https://miro.medium.com/{i}"/><h2>{_sentence(rng, 8)}</h2>'
+        f"<p>{_sentence(rng, 20)}</p></div>"
+        for i in range(40)
+    )
+    comments = "".join(f'<div class="response"><p>{_sentence(rng, 25)}</p></div>' for _ in range(80))
+
+    return (
+        f'<html lang="en"><head><title>t</title><style>{"p{margin:0}" * 500}</style>{scripts}</head><body>'
+        f"<nav><ul>{navigation}</ul></nav><main><article>"
+        f'<h1 class="pw-post-title">{_sentence(rng, 6)}</h1><h2 class="pw-subtitle- paragraph">{_sentence(rng, 10)}</h2>'
+        f"{article}</article><aside>{sidebar}</aside><section>{comments}</section></main></body></html>"
+    )
+
+
+def legacy_parse(link: str, html: str, user: UserDocument) -> dict:
+    # The Medium parsing before the lxml parsing layer.
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.find_all("h1", class_="pw-post-title")
+    subtitle = soup.find_all("h2", class_="pw-subtitle- paragraph")
+
+    return {
+        "Title": title[0].string if title else None,
+        "Subtitle": subtitle[0].string if subtitle else None,
+        "Content": soup.get_text(),
+    }
+
+
+def _time(parse, pages: list[str], user: UserDocument, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        for html in pages:
+            parse("https://medium.com/@jane/post", html, user)
+        best = min(best, time.perf_counter() - start_time)
+
+    return best
+
+
+def _parse_page(html: str) -> int:
+    return len(MediumCrawler.parse("https://medium.com/@jane/post", html, _USER).content["Content"])
+
+
+_USER = UserDocument(first_name="Jane", last_name="Doe")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--archive", help="Parse the latest pages of this response archive instead of generated ones.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.archive:
+        archive = ResponseArchive(args.archive)
+        pages = [response.text for _, response in archive.iter_read(archive.entries()[: args.pages])]
+        archive.close()
+    else:
+        rng = random.Random(0)
+        pages = [generate_page(rng) for _ in range(args.pages)]
+    size_mb = sum(len(page) for page in pages) / 1e6
+    print(f"{len(pages)} pages, {size_mb:.1f} MB of HTML")
+
+    legacy_s = _time(legacy_parse, pages, _USER, args.repeats)
+    lxml_s = _time(MediumCrawler.parse, pages, _USER, args.repeats)
+    print(f"html.parser, full tree  : {legacy_s * 1e3 / len(pages):7.2f} ms/page")
+    print(f"lxml, <article> only    : {lxml_s * 1e3 / len(pages):7.2f} ms/page ({legacy_s / lxml_s:.1f}x faster)")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(_parse_page, pages[: args.workers]))  # Start the workers.
+        start_time = time.perf_counter()
+        list(executor.map(_parse_page, pages, chunksize=4))
+        pool_s = time.perf_counter() - start_time
+    print(f"lxml, {args.workers} parse workers: {len(pages) / pool_s:7.1f} pages/s ({lxml_s / pool_s:.1f}x inline)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Recall and latency of dense, sparse (BM25) and hybrid (RRF) retrieval on code.
+
+The fixture corpus is this repository's own Python source, one chunk per
+function or method. Every query is the function name spelled out as words
+(`bulk_insert_vectors` -> "bulk insert vectors") and the only relevant chunk is
+the one defining it, which is the identifier-heavy case the sparse index exists for.
+
+The dense side embeds with `EmbeddingModelSingleton`, so the embedding model must
+be available locally or downloadable. Points are stored in the in-process
+`NumpyVectorBackend` unless a Qdrant `--url` is given.
+
+Usage:
+    python -m tools.benchmarks.hybrid_retrieval --limit 10
+    python -m tools.benchmarks.hybrid_retrieval --url http://localhost:6333
+"""
+
+import argparse
+import ast
+import statistics
+import time
+import uuid
+from pathlib import Path
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+
+from llm_engineering.application.networks import EmbeddingModelSingleton
+from llm_engineering.application.rag.hybrid import HybridSearch
+from llm_engineering.application.rag.sparse import BM25Index
+from llm_engineering.domain.base import vector
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.types import DataCategory
+from llm_engineering.infrastructure.db.numpy_backend import NumpyVectorBackend
+
+SOURCE_ROOT = Path(__file__).resolve().parents[2] / "llm_engineering"
+
+
+class CodeChunk(VectorBaseDocument):
+    content: str
+    name: str
+    path: str
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "benchmark_hybrid_retrieval"
+        category = DataCategory.REPOSITORIES
+        use_vector_index = True
+
+
+def load_corpus(root: Path = SOURCE_ROOT) -> list[CodeChunk]:
+    """One chunk per function or method with a distinctive, multi-word name."""
+    chunks, seen_names = [], set()
+    for path in sorted(root.rglob("*.py")):
+        source = path.read_text(encoding="utf-8")
+        for node in ast.walk(ast.parse(source)):
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            name = node.name.strip("_")
+            if "_" not in name or name in seen_names:
+                continue
+            seen_names.add(name)
+            chunks.append(
+                CodeChunk(
+                    content=ast.get_source_segment(source, node) or "",
+                    name=name,
+                    path=str(path.relative_to(root.parent)),
+                )
+            )
+
+    return chunks
+
+
+def _report(name: str, ranks: list[int | None], samples: list[float], k: int) -> None:
+    recall = sum(rank is not None and rank < k for rank in ranks) / len(ranks)
+    mrr = sum(1 / (rank + 1) for rank in ranks if rank is not None) / len(ranks)
+    quantiles = statistics.quantiles(samples, n=100)
+    print(
+        f"{name:<8} recall@{k} {recall:.3f}  MRR {mrr:.3f}  "
+        f"p50 {quantiles[49] * 1000:7.2f}ms  p95 {quantiles[94] * 1000:7.2f}ms"
+    )
+
+
+def _rank(results: list, expected_id: uuid.UUID) -> int | None:
+    return next((rank for rank, document in enumerate(results) if document.id == expected_id), None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Qdrant server URL. Defaults to the in-process numpy backend.")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--max-queries", type=int, default=300)
+    args = parser.parse_args()
+
+    vector.connection = QdrantClient(url=args.url) if args.url else NumpyVectorBackend()
+    embedding_model = EmbeddingModelSingleton()
+
+    chunks = load_corpus()
+    start_time = time.perf_counter()
+    embeddings = embedding_model([chunk.content for chunk in chunks], to_list=True)
+    for chunk, embedding in zip(chunks, embeddings):
+        chunk.embedding = embedding
+    print(f"embedded {len(chunks)} chunks in {time.perf_counter() - start_time:.1f}s")
+
+    collection_name = CodeChunk.get_collection_name()
+    if vector.connection.collection_exists(collection_name):
+        vector.connection.delete_collection(collection_name)
+    vector.connection.create_collection(
+        collection_name, vectors_config=VectorParams(size=embedding_model.embedding_size, distance=Distance.COSINE)
+    )
+    CodeChunk.bulk_insert(chunks)
+
+    sparse_index = BM25Index()
+    sparse_index.add_documents(chunks)
+    hybrid = HybridSearch(CodeChunk, sparse_index=sparse_index)
+
+    queries = chunks[: args.max_queries]
+    query_texts = [chunk.name.replace("_", " ") for chunk in queries]
+    query_vectors = embedding_model(query_texts, to_list=True)
+
+    retrievers = {
+        "dense": lambda text, query_vector: hybrid._dense(query_vector, None)[: args.limit],
+        "sparse": lambda text, query_vector: hybrid._sparse(text, None)[: args.limit],
+        "hybrid": lambda text, query_vector: hybrid.search(text, query_vector, limit=args.limit),
+    }
+    for name, retrieve in retrievers.items():
+        ranks, samples = [], []
+        for chunk, text, query_vector in zip(queries, query_texts, query_vectors):
+            start_time = time.perf_counter()
+            results = retrieve(text, query_vector)
+            samples.append(time.perf_counter() - start_time)
+            ranks.append(_rank(results, chunk.id))
+        _report(name, ranks, samples, args.limit)
+
+    hybrid.close()
+
+
+if __name__ == "__main__":
+    main()
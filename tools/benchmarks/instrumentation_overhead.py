@@ -0,0 +1,66 @@
+"""
+Cost of the instrumentation on a hot path: a span, a traced call, a counter and a
+histogram observation, with the instrumentation enabled and disabled, against the
+bare call.
+
+Usage:
+    python -m tools.benchmarks.instrumentation_overhead --calls 200000
+"""
+
+import argparse
+import time
+
+from llm_engineering.infrastructure import instrumentation
+
+
+def _noop() -> None:
+    pass
+
+
+@instrumentation.traced("bench.traced")
+def _traced() -> None:
+    pass
+
+
+def _ns_per_call(fn, calls: int, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter_ns()
+        for _ in range(calls):
+            fn()
+        best = min(best, time.perf_counter_ns() - start_time)
+
+    return best / calls
+
+
+def _span() -> None:
+    with instrumentation.span("bench.span", stage="bench"):
+        pass
+
+
+def _count() -> None:
+    instrumentation.count("bench.count", stage="bench")
+
+
+def _observe() -> None:
+    instrumentation.observe("bench.observe", 0.01, stage="bench")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    bare_ns = _ns_per_call(_noop, args.calls, args.repeats)
+    print(f"bare call               : {bare_ns:7.1f} ns")
+    for enabled in (False, True):
+        instrumentation.enable() if enabled else instrumentation.disable()
+        instrumentation.reset()
+        state = "enabled " if enabled else "disabled"
+        for name, fn in (("span", _span), ("traced call", _traced), ("counter", _count), ("histogram", _observe)):
+            print(f"{name:<12} {state}: {_ns_per_call(fn, args.calls, args.repeats) - bare_ns:7.1f} ns over a bare call")
+
+
+if __name__ == "__main__":
+    main()
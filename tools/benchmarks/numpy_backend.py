@@ -0,0 +1,73 @@
+"""
+Search latency of the in-process `NumpyVectorBackend`, unfiltered and with a payload filter.
+
+Usage:
+    python -m tools.benchmarks.numpy_backend --num-points 100000 --dim 384
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+from qdrant_client.models import Batch, Distance, PayloadSchemaType, QueryRequest, VectorParams
+
+from llm_engineering.domain.base.filters import FilterBuilder
+from llm_engineering.infrastructure.db.numpy_backend import NumpyVectorBackend
+
+
+def _report(name: str, samples: list[float]) -> None:
+    quantiles = statistics.quantiles(samples, n=100)
+    print(f"{name:<22} p50 {quantiles[49] * 1000:7.3f}ms  p95 {quantiles[94] * 1000:7.3f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-points", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--num-authors", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    authors = [str(uuid.uuid4()) for _ in range(args.num_authors)]
+    backend = NumpyVectorBackend()
+    backend.create_collection("benchmark", vectors_config=VectorParams(size=args.dim, distance=Distance.COSINE))
+    backend.create_payload_index("benchmark", "author_id", PayloadSchemaType.UUID)
+
+    start_time = time.perf_counter()
+    for start in range(0, args.num_points, 10_000):
+        count = min(10_000, args.num_points - start)
+        backend.upsert(
+            "benchmark",
+            Batch(
+                ids=[str(uuid.uuid4()) for _ in range(count)],
+                vectors=rng.random((count, args.dim), dtype=np.float32).tolist(),
+                payloads=[{"author_id": authors[i % args.num_authors]} for i in range(start, start + count)],
+            ),
+        )
+    print(f"loaded {args.num_points} points x {args.dim} dims in {time.perf_counter() - start_time:.2f}s")
+
+    queries = rng.random((args.repeats, args.dim), dtype=np.float32)
+    author_filter = FilterBuilder().where(author_id=authors[0]).build()
+    for name, query_filter in (("unfiltered", None), ("filtered by author", author_filter)):
+        samples = []
+        for query in queries:
+            start_time = time.perf_counter()
+            backend.search("benchmark", query, query_filter=query_filter, limit=args.limit)
+            samples.append(time.perf_counter() - start_time)
+        _report(name, samples)
+
+    samples = []
+    for start in range(0, args.repeats, 8):
+        requests = [QueryRequest(query=q.tolist(), limit=args.limit) for q in queries[start : start + 8]]
+        start_time = time.perf_counter()
+        backend.query_batch_points("benchmark", requests)
+        samples.append((time.perf_counter() - start_time) / len(requests))
+    _report("batch of 8, per query", samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Latency benchmark of N sequential `search` calls against one `search_batch` call.
+
+By default it runs against an in-process Qdrant instance, where there is no
+network round-trip, so the gap is a lower bound. Pass `--url` to measure
+against a real Qdrant server.
+
+Usage:
+    python -m tools.benchmarks.search_batch --num-queries 8 --url http://localhost:6333
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, VectorParams
+
+from llm_engineering.domain.base import vector
+from llm_engineering.domain.base.vector import VectorBaseDocument, VectorQuery
+from llm_engineering.domain.types import DataCategory
+
+
+class BenchmarkDocument(VectorBaseDocument):
+    content: str
+
+    class Config:
+        name = "benchmark_search_batch"
+        category = DataCategory.POSTS
+        use_vector_index = True
+
+
+def _percentiles(samples: list[float]) -> str:
+    quantiles = statistics.quantiles(samples, n=100)
+
+    return f"p50 {quantiles[49] * 1000:7.2f}ms  p95 {quantiles[94] * 1000:7.2f}ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Qdrant server URL. Defaults to an in-process instance.")
+    parser.add_argument("--num-points", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--num-queries", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url) if args.url else QdrantClient(":memory:")
+    vector.connection = client
+
+    collection_name = BenchmarkDocument.get_collection_name()
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    client.create_collection(collection_name, vectors_config=VectorParams(size=args.dim, distance=Distance.COSINE))
+
+    rng = np.random.default_rng(0)
+    # The in-process client is not thread-safe, so it is loaded with a single worker.
+    BenchmarkDocument.bulk_insert_vectors(
+        rng.random((args.num_points, args.dim), dtype=np.float32),
+        [{"content": f"document {i}"} for i in range(args.num_points)],
+        max_workers=4 if args.url else 1,
+    )
+
+    sequential, batched = [], []
+    for _ in range(args.repeats):
+        queries = [
+            VectorQuery(vector=rng.random(args.dim, dtype=np.float32), limit=args.limit) for _ in range(args.num_queries)
+        ]
+
+        start_time = time.perf_counter()
+        for query in queries:
+            BenchmarkDocument.search(query.vector.tolist(), limit=query.limit)
+        sequential.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        BenchmarkDocument.search_batch(queries)
+        batched.append(time.perf_counter() - start_time)
+
+    client.delete_collection(collection_name)
+
+    print(f"{args.num_queries} queries over {args.num_points} points x {args.dim} dims, {args.repeats} repeats")
+    print(f"sequential  {_percentiles(sequential)}")
+    print(f"batched     {_percentiles(batched)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of the two ways of preparing vectors for a Qdrant upsert.
+
+- model path: one VectorBaseDocument per point, built from a row of the
+  embedding matrix and converted with `to_point`.
+- columnar path: one (N, D) float32 matrix sliced into Qdrant `Batch` requests,
+  as done by `VectorBaseDocument.bulk_insert_vectors`.
+
+Only the client-side conversion is measured, so no Qdrant server is needed.
+Wall time and peak traced memory are measured in separate runs, because
+tracing allocations slows the conversion down.
+
+Usage:
+    python -m tools.benchmarks.vector_payloads --num-points 100000 --dim 384
+"""
+
+import argparse
+import time
+import tracemalloc
+import uuid
+
+import numpy as np
+from qdrant_client.models import Batch
+
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.types import DataCategory
+
+
+class BenchmarkDocument(VectorBaseDocument):
+    content: str
+    author_id: uuid.UUID
+    embedding: list[float] | None = None
+
+    class Config:
+        name = "benchmark_vector_payloads"
+        category = DataCategory.POSTS
+        use_vector_index = True
+
+
+def _measure(name: str, fn) -> None:
+    start_time = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<10} {elapsed:8.3f}s  peak {peak / 2**20:8.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num-points", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.random((args.num_points, args.dim), dtype=np.float32)
+    author_id = uuid.uuid4()
+    payloads = [{"content": f"document {i}", "author_id": str(author_id)} for i in range(args.num_points)]
+
+    def model_path() -> None:
+        for start in range(0, len(vectors), args.batch_size):
+            [
+                BenchmarkDocument(content=payload["content"], author_id=author_id, embedding=vector).to_point()
+                for payload, vector in zip(
+                    payloads[start : start + args.batch_size], vectors[start : start + args.batch_size], strict=True
+                )
+            ]
+
+    def columnar_path() -> None:
+        ids = [str(uuid.uuid4()) for _ in range(args.num_points)]
+        for start in range(0, len(vectors), args.batch_size):
+            Batch.model_construct(
+                ids=ids[start : start + args.batch_size],
+                vectors=vectors[start : start + args.batch_size].tolist(),
+                payloads=payloads[start : start + args.batch_size],
+            )
+
+    print(f"{args.num_points} points x {args.dim} dims, {args.batch_size} points per request")
+    _measure("model", model_path)
+    _measure("columnar", columnar_path)
+
+
+if __name__ == "__main__":
+    main()
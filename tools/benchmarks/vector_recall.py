@@ -0,0 +1,133 @@
+"""
+Recall-vs-latency benchmark of the collection index options (`VectorIndexOptions`).
+
+Each variant creates its own collection through `VectorBaseDocument.create_collection`,
+loads the same clustered, normalised vectors and, once Qdrant reports the
+collection as optimised, sweeps the search-time `ef`. Recall@k is measured
+against an exact numpy search.
+
+HNSW and quantization only exist in the Qdrant server, so run a local one first
+(the in-process client always searches exhaustively and would report recall 1.0):
+
+    docker run -p 6333:6333 qdrant/qdrant
+
+Usage:
+    python -m tools.benchmarks.vector_recall --url http://localhost:6333 --num-points 50000
+"""
+
+import argparse
+import statistics
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import QuantizationSearchParams, SearchParams
+
+from llm_engineering.domain.base import vector
+from llm_engineering.domain.base.vector import VectorBaseDocument
+from llm_engineering.domain.types import DataCategory
+
+VARIANTS = {
+    "float32 in RAM": {},
+    "m=8": {"hnsw_m": 8},
+    "int8 + rescore": {"quantization": "int8", "on_disk_vectors": True},
+    "int8 no rescore": {"quantization": "int8", "on_disk_vectors": True, "quantization_rescore": False},
+}
+
+
+class BenchmarkDocument(VectorBaseDocument):
+    content: str
+
+
+def _document_class(index: int, options: dict) -> type[BenchmarkDocument]:
+    class_name = f"BenchmarkDocument{index}"
+    # The qualified name marks `Config` as a nested class, which pydantic does not treat as a field.
+    config = type(
+        "Config",
+        (),
+        {
+            "__qualname__": f"{class_name}.Config",
+            "name": f"benchmark_vector_recall_{index}",
+            "category": DataCategory.POSTS,
+            "use_vector_index": True,
+            **options,
+        },
+    )
+
+    return type(class_name, (BenchmarkDocument,), {"__module__": __name__, "__qualname__": class_name, "Config": config})
+
+
+def _clustered_vectors(rng: np.random.Generator, num_points: int, dim: int, num_clusters: int = 64) -> np.ndarray:
+    centers = rng.normal(size=(num_clusters, dim))
+    vectors = centers[rng.integers(num_clusters, size=num_points)] + 0.5 * rng.normal(size=(num_points, dim))
+
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _wait_until_optimised(client: QdrantClient, collection_name: str, timeout: float = 600.0) -> None:
+    deadline = time.monotonic() + timeout
+    while client.get_collection(collection_name).status != "green":
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"'{collection_name}' was not optimised within {timeout:.0f}s.")
+        time.sleep(0.5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:6333", help="Qdrant server URL.")
+    parser.add_argument("--num-points", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url)
+    vector.connection = client
+    vector.EmbeddingModelSingleton = lambda: SimpleNamespace(embedding_size=args.dim)
+
+    rng = np.random.default_rng(0)
+    vectors = _clustered_vectors(rng, args.num_points + args.num_queries, args.dim)
+    vectors, queries = vectors[: args.num_points], vectors[args.num_points :]
+    ids = [f"00000000-0000-4000-8000-{i:012d}" for i in range(args.num_points)]
+    payloads = [{"content": f"document {i}"} for i in range(args.num_points)]
+    exact = np.argpartition(-(queries @ vectors.T), args.limit, axis=1)[:, : args.limit]
+    ground_truth = [{ids[i] for i in row} for row in exact]
+
+    print(f"{args.num_points} points x {args.dim} dims, {args.num_queries} queries, recall@{args.limit}")
+    print(f"{'variant':<18} {'ef':>5} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for index, (variant, options) in enumerate(VARIANTS.items()):
+        document_class = _document_class(index, options)
+        collection_name = document_class.get_collection_name()
+        if client.collection_exists(collection_name):
+            client.delete_collection(collection_name)
+        document_class.create_collection()
+        document_class.bulk_insert_vectors(vectors, payloads, ids=ids)
+        _wait_until_optimised(client, collection_name)
+
+        index_options = document_class.get_index_options()
+        for ef in args.ef:
+            quantization = None
+            if index_options.quantization is not None:
+                quantization = QuantizationSearchParams(rescore=index_options.quantization_rescore)
+            search_params = SearchParams(hnsw_ef=ef, quantization=quantization)
+
+            latencies, recalls = [], []
+            for query, expected in zip(queries, ground_truth, strict=True):
+                start_time = time.perf_counter()
+                documents = document_class.search(query.tolist(), limit=args.limit, search_params=search_params)
+                latencies.append(time.perf_counter() - start_time)
+                recalls.append(len({str(d.id) for d in documents} & expected) / args.limit)
+
+            quantiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{variant:<18} {ef:>5} {statistics.fmean(recalls):>7.3f} "
+                f"{quantiles[49] * 1000:>8.2f} {quantiles[94] * 1000:>8.2f}"
+            )
+
+        client.delete_collection(collection_name)
+
+
+if __name__ == "__main__":
+    main()